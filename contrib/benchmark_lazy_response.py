@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+"""
+Micro-benchmark for the lazy response body decoding and parsing.
+
+It builds a multi-megabyte S3 "list bucket" response and measures the time
+and the peak memory used to construct the response object (eager and lazy
+parsing) and, optionally, to access the parsed body.
+
+Use it as following:
+    $ python contrib/benchmark_lazy_response.py --num-objects 20000
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import argparse
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from libcloud.utils.py3 import b
+from libcloud.storage.drivers.s3 import S3Response
+
+OBJECT_TEMPLATE = """
+  <Contents>
+    <Key>some/prefix/object-%(index)08d.bin</Key>
+    <LastModified>2018-10-17T12:00:00.000Z</LastModified>
+    <ETag>&quot;0123456789abcdef0123456789abcdef&quot;</ETag>
+    <Size>%(index)d</Size>
+    <Owner>
+      <ID>75aa57f09aa0c8caeab4f8c24e99d10f8e7faeebf76c078efc7c6caea54ba06a</ID>
+      <DisplayName>mtd@amazon.com</DisplayName>
+    </Owner>
+    <StorageClass>STANDARD</StorageClass>
+  </Contents>"""
+
+
+class EagerS3Response(S3Response):
+    parse_body_lazily = False
+
+
+def build_http_response(num_objects):
+    body = ['<?xml version="1.0" encoding="UTF-8"?>',
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/'
+            '2006-03-01/">',
+            '<Name>bucket</Name><IsTruncated>false</IsTruncated>']
+    body.extend(OBJECT_TEMPLATE % {'index': index}
+                for index in range(num_objects))
+    body.append('</ListBucketResult>')
+
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers['Content-Type'] = 'application/xml'
+    response._content = b(''.join(body))
+    return response
+
+
+class DummyConnection(object):
+    driver = None
+
+
+def measure(response_cls, http_response, access_object):
+    # Skip the charset detection which would dominate the timings
+    http_response.encoding = 'utf-8'
+
+    if tracemalloc:
+        tracemalloc.start()
+
+    start = time.time()
+    response = response_cls(http_response, DummyConnection())
+
+    if access_object:
+        response.object
+
+    duration = time.time() - start
+
+    peak = 0
+    if tracemalloc:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return duration, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--num-objects', type=int, default=20000,
+                        help='Number of objects in the list response')
+    args = parser.parse_args()
+
+    http_response = build_http_response(args.num_objects)
+    size = len(http_response.content) / 1024.0 / 1024.0
+
+    print('Response body size: %.1f MB' % (size))
+    print('%-8s %-14s %10s %12s' % ('parse', 'access', 'seconds', 'peak MB'))
+
+    for name, response_cls in (('eager', EagerS3Response),
+                               ('lazy', S3Response)):
+        for access_object in (False, True):
+            duration, peak = measure(response_cls, http_response,
+                                     access_object)
+            print('%-8s %-14s %10.3f %12.1f' %
+                  (name, 'object' if access_object else 'status only',
+                   duration, peak / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+"""
+Benchmark for listing the objects of a LocalStorageDriver container.
+
+It creates a synthetic tree of empty files and measures the time it takes to
+list all the objects (scandir and os.walk based listing) and the objects
+with a prefix.
+
+Use it as following:
+    $ python contrib/benchmark_local_listing.py --num-files 100000
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from libcloud.storage.drivers import local
+from libcloud.storage.drivers.local import LocalStorageDriver
+
+
+def create_tree(path, num_files, files_per_directory):
+    for index in range(num_files):
+        directory = os.path.join(path, 'dir-%04d' %
+                                 (index // files_per_directory))
+
+        if index % files_per_directory == 0:
+            os.makedirs(directory)
+
+        open(os.path.join(directory, 'file-%08d' % (index)), 'w').close()
+
+
+def measure(driver, container, prefix=None):
+    start = time.time()
+    count = 0
+
+    for _ in driver.iterate_container_objects(container, ex_prefix=prefix):
+        count += 1
+
+    return time.time() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--num-files', type=int, default=100000,
+                        help='Number of files in the container')
+    parser.add_argument('--files-per-directory', type=int, default=1000,
+                        help='Number of files in a single directory')
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+
+    try:
+        driver = LocalStorageDriver(base_path)
+        container = driver.create_container('container')
+        create_tree(os.path.join(base_path, 'container'), args.num_files,
+                    args.files_per_directory)
+
+        scandir = local.scandir
+        print('%-8s %-18s %10s %10s' %
+              ('listing', 'prefix', 'objects', 'seconds'))
+
+        for name in ('scandir', 'walk'):
+            local.scandir = scandir if name == 'scandir' else None
+
+            for prefix in (None, 'dir-0001/'):
+                duration, count = measure(driver, container, prefix=prefix)
+                print('%-8s %-18s %10d %10.3f' % (name, prefix or '-', count,
+                                                  duration))
+
+        local.scandir = scandir
+    finally:
+        shutil.rmtree(base_path)
+
+
+if __name__ == '__main__':
+    main()
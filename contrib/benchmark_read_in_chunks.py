@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+#
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+"""
+Micro-benchmark for libcloud.utils.files.read_in_chunks.
+
+It compares the current implementation with the previous bytes
+concatenation based one using the chunk sizes and arguments of the multipart
+upload code paths in the S3, Azure Blobs and OSS drivers.
+
+Use it as following:
+    $ python contrib/benchmark_read_in_chunks.py --size-mb 64 \
+        --input-chunk-size 4096
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from libcloud.utils.py3 import b, next
+from libcloud.utils.files import read_in_chunks
+from libcloud.storage.drivers.s3 import CHUNK_SIZE as S3_CHUNK_SIZE
+from libcloud.storage.drivers.oss import CHUNK_SIZE as OSS_CHUNK_SIZE
+from libcloud.storage.drivers.azure_blobs import AZURE_CHUNK_SIZE
+
+# (name, read_in_chunks keyword arguments) used by the driver multipart code
+CALLERS = [
+    ('s3', {'chunk_size': S3_CHUNK_SIZE, 'fill_size': True,
+            'yield_empty': True}),
+    ('oss', {'chunk_size': OSS_CHUNK_SIZE, 'fill_size': True,
+             'yield_empty': True}),
+    ('azure_blobs', {'chunk_size': AZURE_CHUNK_SIZE}),
+]
+
+
+def legacy_read_in_chunks(iterator, chunk_size=None, fill_size=False,
+                          yield_empty=False):
+    """
+    Previous implementation which concatenates and re-slices bytes objects.
+    """
+    if hasattr(iterator, 'read'):
+        get_data = iterator.read
+        args = (chunk_size, )
+    else:
+        get_data = next
+        args = (iterator, )
+
+    data = b('')
+    empty = False
+
+    while not empty or len(data) > 0:
+        if not empty:
+            try:
+                chunk = b(get_data(*args))
+                if len(chunk) > 0:
+                    data += chunk
+                else:
+                    empty = True
+            except StopIteration:
+                empty = True
+
+        if len(data) == 0:
+            if empty and yield_empty:
+                yield b('')
+
+            return
+
+        if fill_size:
+            if empty or len(data) >= chunk_size:
+                yield data[:chunk_size]
+                data = data[chunk_size:]
+        else:
+            yield data
+            data = b('')
+
+
+def iterate_data(size, input_chunk_size):
+    chunk = b('a') * input_chunk_size
+    for _ in range(size // input_chunk_size):
+        yield chunk
+
+
+def measure(func, make_input, kwargs):
+    start = time.time()
+    total = 0
+
+    for data in func(make_input(), **kwargs):
+        total += len(data)
+
+    return time.time() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size-mb', type=int, default=32,
+                        help='Amount of data to chunk (in MB)')
+    parser.add_argument('--input-chunk-size', type=int, default=8096,
+                        help='Size of the chunks returned by the iterator')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Only measure the current implementation')
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+
+    fd, file_path = tempfile.mkstemp()
+    with os.fdopen(fd, 'wb') as fp:
+        for chunk in iterate_data(size, 1024 * 1024):
+            fp.write(chunk)
+
+    inputs = [
+        ('iterator', lambda: iterate_data(size, args.input_chunk_size)),
+        ('file', lambda: open(file_path, 'rb', buffering=0)),
+    ]
+
+    implementations = [('current', read_in_chunks)]
+    if not args.skip_legacy:
+        implementations.append(('legacy', legacy_read_in_chunks))
+
+    print('%-12s %-9s %-8s %10s %10s' %
+          ('caller', 'input', 'impl', 'seconds', 'MB/s'))
+
+    try:
+        for caller, kwargs in CALLERS:
+            for input_name, make_input in inputs:
+                for impl_name, func in implementations:
+                    duration, total = measure(func, make_input, kwargs)
+                    assert total == size
+                    throughput = (total / 1024.0 / 1024.0) / max(duration,
+                                                                 1e-9)
+                    print('%-12s %-9s %-8s %10.3f %10.1f' %
+                          (caller, input_name, impl_name, duration,
+                           throughput))
+    finally:
+        os.unlink(file_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,520 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio support for libcloud connections and drivers.
+
+Requests are sent with aiohttp while the request pre-processing, signing
+(``add_default_params``, ``add_default_headers``, ``pre_connect_hook``) and
+the response parsing are delegated to the wrapped synchronous
+:class:`libcloud.common.base.Connection` so every driver keeps using its own
+``Response`` classes.
+
+The requests also go through the retry policy, the rate limiter, the
+response cache and the instruments of the wrapped connection, just like the
+synchronous requests. Waiting for the rate limiter happens in an executor
+thread so it doesn't block the event loop.
+
+Note: This module requires Python 3.6+ and the aiohttp library.
+"""
+
+import io
+import os
+import ssl
+import copy
+import asyncio
+import threading
+import functools
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import libcloud.security
+import libcloud.common.base
+from libcloud.http import ALLOW_REDIRECTS
+from libcloud.utils.py3 import httplib
+from libcloud.utils.misc import lowercase_keys
+from libcloud.common.base import _RetryResponse
+from libcloud.common.instrumentation import RequestEvent, get_body_size
+
+__all__ = [
+    'AsyncConnection',
+    'AsyncResponseProxy',
+    'AsyncBaseDriver'
+]
+
+# Request bodies larger than this are sent in chunks so sending them doesn't
+# block the event loop
+LARGE_BODY_SIZE = 1024 * 1024
+
+
+class AsyncResponseProxy(object):
+    """
+    Provides the subset of the :class:`requests.Response` interface which is
+    used by the libcloud ``Response`` classes on top of an aiohttp response.
+
+    For buffered responses ``body`` contains the whole response body. For
+    streamed responses ``body`` is ``None`` and :meth:`iter_content` returns
+    an asynchronous iterator over the response data.
+    """
+
+    def __init__(self, response, body=None):
+        self._response = response
+        self.headers = response.headers
+        self.reason = response.reason
+        self.status_code = response.status
+        self.request = response.request_info
+        self.content = body
+
+    @property
+    def status(self):
+        return self.status_code
+
+    @property
+    def text(self):
+        if self.content is None:
+            return None
+
+        encoding = self._response.charset or 'utf-8'
+        return self.content.decode(encoding, 'replace')
+
+    @property
+    def body(self):
+        return self.content
+
+    def read(self, amt=None):
+        return self.text
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def getheaders(self):
+        return list(self.headers.items())
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        if self.content is not None:
+            return self._iter_buffered_content(chunk_size)
+
+        return self._iter_streamed_content(chunk_size)
+
+    def _iter_buffered_content(self, chunk_size):
+        for index in range(0, len(self.content), chunk_size):
+            yield self.content[index:index + chunk_size]
+
+    async def _iter_streamed_content(self, chunk_size):
+        try:
+            async for chunk in self._response.content.iter_chunked(
+                    chunk_size):
+                yield chunk
+        finally:
+            self._response.release()
+
+    def close(self):
+        self._response.release()
+
+
+class AsyncConnection(object):
+    """
+    Sends the requests of a :class:`libcloud.common.base.Connection` with
+    aiohttp.
+
+    All the connections created for the same instance share a single
+    :class:`aiohttp.ClientSession` (and its connection pool) which is created
+    on the first request.
+    """
+
+    def __init__(self, connection, session=None, limit=100):
+        """
+        :param connection: Connection which is used to sign the requests and
+                           to parse the responses.
+        :type connection: :class:`libcloud.common.base.Connection`
+
+        :param session: Existing aiohttp session to use (optional). Sessions
+                        which are passed in are not closed by :meth:`close`.
+        :type session: :class:`aiohttp.ClientSession`
+
+        :param limit: Maximum number of simultaneous connections when the
+                      session is created by this class.
+        :type limit: ``int``
+        """
+        if aiohttp is None:
+            raise RuntimeError('aiohttp library is not available')
+
+        self.connection = connection
+        self.limit = limit
+        self._session = session
+        self._owns_session = session is None
+
+    @property
+    def session(self):
+        if self._session is None:
+            timeout = None
+
+            if self.connection.timeout:
+                timeout = aiohttp.ClientTimeout(total=self.connection.timeout)
+
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                                             ssl=self._get_ssl_context())
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout)
+        return self._session
+
+    async def request(self, action, params=None, data=None, headers=None,
+                      method='GET', raw=False, stream=False):
+        """
+        Asynchronous version of
+        :meth:`libcloud.common.base.Connection.request`.
+
+        ``data`` can be anything aiohttp accepts as a request body, including
+        an asynchronous iterator.
+
+        When both ``raw`` and ``stream`` are True, the response body is not
+        read and ``iter_content`` of the returned response is an
+        asynchronous iterator which must be consumed by the caller.
+
+        :return: An instance of the connection ``responseCls`` (or
+                 ``rawResponseCls`` if ``raw`` is True).
+        """
+        connection = self.connection
+        retry_enabled = os.environ.get(
+            'LIBCLOUD_RETRY_FAILED_HTTP_REQUESTS', False) or \
+            libcloud.common.base.RETRY_FAILED_HTTP_REQUESTS
+
+        instruments = connection._get_instruments()
+        event = None
+
+        if instruments:
+            event = RequestEvent(
+                driver=connection._get_driver_name(), action=action,
+                method=method, raw=raw,
+                action_name=connection._get_action_name(action, params))
+
+        cache_key = None
+
+        if connection.response_cache is not None and method == 'GET' and \
+                not raw and not stream:
+            cache_key = connection._get_cache_key(action=action,
+                                                  params=params,
+                                                  headers=headers)
+
+        cache_entry = None
+
+        if cache_key is not None:
+            cache_entry = connection.response_cache.get(cache_key)
+
+        retry_state = connection._start_retry(retry_enabled=retry_enabled,
+                                              data=data, method=method,
+                                              params=params)
+        context = connection.context
+        rate_limiter = connection.rate_limiter
+
+        try:
+            if cache_entry is not None and not cache_entry.expired:
+                return connection._get_cached_response(cache_entry,
+                                                       event=event)
+
+            action_class = None
+
+            if rate_limiter is not None:
+                action_class = rate_limiter.classify(
+                    connection=connection, method=method, action=action,
+                    params=params)
+
+            while True:
+                if action_class is not None:
+                    loop = asyncio.get_event_loop()
+                    await loop.run_in_executor(None, rate_limiter.acquire,
+                                               action_class)
+
+                    if event:
+                        event.lap('rate_limit_wait')
+
+                try:
+                    try:
+                        response = await self._send_request(
+                            action=action, params=params, data=data,
+                            headers=headers, method=method, raw=raw,
+                            stream=stream, event=event, cache_key=cache_key,
+                            cache_entry=cache_entry, retry_state=retry_state)
+                    finally:
+                        if action_class is not None:
+                            rate_limiter.release(action_class)
+
+                    break
+                except Exception as e:
+                    delay = connection._get_retry_delay(retry_state, e)
+
+                    if delay is None:
+                        raise
+
+                    retry_state.retries += 1
+                    await asyncio.sleep(delay)
+                    connection._rewind_body(data, retry_state)
+                    connection.context = context
+
+                    if event:
+                        event.retries = retry_state.retries
+        except Exception as e:
+            if event:
+                event.error = e
+                event.status = getattr(e, 'code', event.status)
+            raise
+        finally:
+            if event:
+                event.finish()
+                connection._emit_request_event(instruments, event)
+
+        return response
+
+    async def _send_request(self, action, params, data, headers, method,
+                            raw, stream, event=None, cache_key=None,
+                            cache_entry=None, retry_state=None):
+        """
+        Asynchronous version of
+        :meth:`libcloud.common.base.Connection._send_request`.
+        """
+        connection = self.connection
+
+        if cache_entry is not None:
+            headers = copy.copy(headers) or {}
+            headers['If-None-Match'] = cache_entry.etag
+
+        # Request preparation is synchronous so the state the signing hooks
+        # read (connection.action, method, data) can't be changed by other
+        # coroutines in the meantime
+        url, data, headers = connection._prepare_request(
+            action=action, params=params, data=data, headers=headers,
+            method=method)
+        url = self._get_base_url() + url
+
+        if isinstance(data, (bytes, bytearray)) and \
+                len(data) > LARGE_BODY_SIZE:
+            data = io.BytesIO(data)
+
+        # all headers should be strings
+        headers = dict((key, str(value)) if isinstance(value, (int, float))
+                       else (key, value) for key, value in headers.items())
+
+        if event:
+            event.lap('prepare')
+            event.bytes_sent = get_body_size(data)
+
+        try:
+            response = await self.session.request(
+                method, url, data=data, headers=headers,
+                allow_redirects=ALLOW_REDIRECTS,
+                proxy=getattr(connection, 'proxy_url', None))
+
+            if raw and stream:
+                proxy = AsyncResponseProxy(response)
+            else:
+                try:
+                    body = await response.read()
+                finally:
+                    response.release()
+
+                proxy = AsyncResponseProxy(response, body=body)
+
+            if event:
+                connection._record_response_details(event, proxy,
+                                                    raw=raw or stream)
+
+            if retry_state is not None:
+                delay = retry_state.get_response_delay(
+                    status=proxy.status_code,
+                    headers=lowercase_keys(dict(proxy.headers)),
+                    body_func=lambda: proxy.text or '')
+
+                if delay is not None:
+                    proxy.close()
+                    raise _RetryResponse(delay)
+
+            revalidated = cache_entry is not None and \
+                proxy.status_code == httplib.NOT_MODIFIED
+
+            if revalidated:
+                cache_entry.refresh()
+                proxy = cache_entry.response
+
+                if event:
+                    event.cached = True
+
+            if raw:
+                result = connection.rawResponseCls(connection=connection,
+                                                   response=proxy)
+                # RawResponse.response would otherwise read the response of
+                # the synchronous connection
+                result._response = proxy
+            else:
+                result = connection.responseCls(connection=connection,
+                                                response=proxy)
+        finally:
+            # Always reset the context after the request has completed
+            connection.reset_context()
+
+            if event:
+                event.lap('parse')
+
+        if cache_key is not None and not revalidated and \
+                result.status == httplib.OK:
+            connection.response_cache.set(cache_key, proxy)
+
+        return result
+
+    async def close(self):
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_base_url(self):
+        connection = self.connection
+
+        if getattr(connection, 'base_url', None):
+            host, port, secure, _ = \
+                connection._tuple_from_url(connection.base_url)
+        else:
+            host, port, secure = (connection.host, connection.port,
+                                  connection.secure)
+
+        port = int(port)
+        scheme = 'https' if secure or port == 443 else 'http'
+
+        if port in (80, 443):
+            return '%s://%s' % (scheme, host)
+
+        return '%s://%s:%d' % (scheme, host, port)
+
+    def _get_ssl_context(self):
+        if not libcloud.security.VERIFY_SSL_CERT:
+            return False
+
+        ca_cert = libcloud.security.CA_CERTS_PATH
+
+        if isinstance(ca_cert, list):
+            ca_cert = ca_cert[0] if ca_cert else None
+
+        if ca_cert:
+            return ssl.create_default_context(cafile=ca_cert)
+
+        return None
+
+
+class AsyncBaseDriver(object):
+    """
+    Base class for the asyncio driver interfaces.
+
+    Methods which don't have a native asynchronous implementation for the
+    wrapped driver fall back to running the blocking driver method in an
+    executor. Each executor thread uses its own copy of the driver so the
+    (not thread safe) driver connection is never shared between threads.
+
+    Subclasses with native implementations set ``driver_cls`` to the driver
+    class they mirror. A native implementation is only used if the wrapped
+    driver doesn't override the corresponding blocking method.
+    """
+
+    # Driver class whose methods are implemented natively by this class
+    driver_cls = None
+
+    def __init__(self, driver, session=None, executor=None):
+        """
+        :param driver: Driver instance to wrap.
+        :type driver: :class:`libcloud.common.base.BaseDriver`
+
+        :param session: aiohttp session to use (optional).
+        :type session: :class:`aiohttp.ClientSession`
+
+        :param executor: Executor used by the methods without a native
+                         asynchronous implementation (defaults to the event
+                         loop default executor).
+        :type executor: :class:`concurrent.futures.Executor`
+        """
+        self.driver = driver
+        self.connection = AsyncConnection(driver.connection, session=session)
+        self.executor = executor
+        self._local = threading.local()
+
+    async def close(self):
+        await self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _is_native(self, method_name):
+        """
+        Return True if the native implementation of the method can be used
+        for the wrapped driver.
+        """
+        if self.driver_cls is None:
+            return False
+
+        return (getattr(type(self.driver), method_name, None) is
+                getattr(self.driver_cls, method_name, None))
+
+    async def _run_sync(self, method_name, *args, **kwargs):
+        """
+        Run a blocking method of the wrapped driver in the executor.
+        """
+        def run():
+            method = getattr(self._get_thread_driver(), method_name)
+            return method(*args, **kwargs)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, run)
+
+    async def _iterate_sync(self, method_name, *args, **kwargs):
+        """
+        Asynchronously iterate over the generator returned by a blocking
+        method of the wrapped driver. Every item is produced in the executor.
+        """
+        # The generator can be resumed from different executor threads so it
+        # gets a driver copy of its own
+        driver = self.driver._copy_driver()
+        method = getattr(driver, method_name)
+        sentinel = object()
+
+        loop = asyncio.get_event_loop()
+        iterator = await loop.run_in_executor(
+            self.executor, lambda: iter(method(*args, **kwargs)))
+        get_next = functools.partial(next, iterator, sentinel)
+
+        while True:
+            item = await loop.run_in_executor(self.executor, get_next)
+
+            if item is sentinel:
+                break
+
+            yield item
+
+    def _get_thread_driver(self):
+        driver = getattr(self._local, 'driver', None)
+
+        if driver is None:
+            driver = self.driver._copy_driver()
+            self._local.driver = driver
+
+        return driver
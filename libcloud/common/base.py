@@ -19,7 +19,9 @@ import sys
 import ssl
 import socket
 import copy
+import threading
 import binascii
+import logging
 import time
 
 from libcloud.utils.py3 import ET
@@ -31,10 +33,16 @@ import libcloud
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import urlencode
+from libcloud.utils.py3 import basestring
 
-from libcloud.utils.misc import lowercase_keys, retry
+from libcloud.utils.misc import lowercase_keys
+from libcloud.utils.misc import DEFAULT_TIMEOUT, DEFAULT_DELAY
+from libcloud.utils.concurrency import imap_bounded, DEFAULT_MAX_WORKERS
+from libcloud.utils.retry import RetryPolicy, is_idempotent_request
 from libcloud.common.exceptions import exception_from_message
 from libcloud.common.types import LibcloudError, MalformedResponseError
+from libcloud.common.instrumentation import RequestEvent, get_instruments
+from libcloud.common.instrumentation import get_body_size
 from libcloud.http import LibcloudConnection, HttpLibResponseProxy
 
 __all__ = [
@@ -55,6 +63,8 @@ __all__ = [
     'RawResponse'
 ]
 
+LOG = logging.getLogger(__name__)
+
 # Module level variable indicates if the failed HTTP requests should be retried
 RETRY_FAILED_HTTP_REQUESTS = False
 
@@ -111,6 +121,22 @@ class HTTPResponse(httplib.HTTPResponse):
         return httplib.HTTPResponse.read(self, amt)
 
 
+class _RetryResponse(Exception):
+    """
+    Raised by Connection._send_request for the responses which should be
+    retried after ``delay`` seconds.
+    """
+
+    def __init__(self, delay):
+        super(_RetryResponse, self).__init__(delay)
+        self.delay = delay
+
+
+# Marker for the lazily computed Response attributes which haven't been
+# computed yet
+_NOT_LOADED = object()
+
+
 class Response(object):
     """
     A base Response class to derive from.
@@ -118,13 +144,25 @@ class Response(object):
 
     status = httplib.OK  # Response status code
     headers = {}  # Response headers
-    body = None  # Raw response body
-    object = None  # Parsed response body
 
     error = None  # Reason returned by the server.
     connection = None  # Parent connection class
     parse_zero_length_body = False
 
+    # True to defer parse_body() until the first access of the object
+    # attribute. In that case malformed bodies raise when object is accessed
+    # instead of in the constructor so it should only be enabled for the
+    # response classes whose drivers don't rely on parse_body() validating
+    # (or raising errors for) every response.
+    parse_body_lazily = False
+
+    # Raw and parsed response body. Both are computed on the first access so
+    # the callers which only need the status and the headers don't pay for
+    # decoding and parsing (potentially large) bodies.
+    _body = None
+    _object = None
+    _http_response = None
+
     def __init__(self, response, connection):
         """
         :param response: HTTP response object. (optional)
@@ -143,16 +181,49 @@ class Response(object):
         self.request = response.request
         self.iter_content = response.iter_content
 
-        self.body = response.text.strip() \
-            if response.text is not None and hasattr(response.text, 'strip') \
-            else ''
+        self._http_response = response
+        self._body = _NOT_LOADED
+        self._object = _NOT_LOADED
 
         if not self.success():
             raise exception_from_message(code=self.status,
                                          message=self.parse_error(),
                                          headers=self.headers)
 
-        self.object = self.parse_body()
+        if not self.parse_body_lazily:
+            self._object = self.parse_body()
+
+    @property
+    def body(self):
+        """
+        Raw (decoded and stripped) response body.
+
+        :rtype: ``str``
+        """
+        if self._body is _NOT_LOADED:
+            text = self._http_response.text
+            self._body = text.strip() \
+                if text is not None and hasattr(text, 'strip') else ''
+
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+
+    @property
+    def object(self):
+        """
+        Parsed response body (see :meth:`parse_body`).
+        """
+        if self._object is _NOT_LOADED:
+            self._object = self.parse_body()
+
+        return self._object
+
+    @object.setter
+    def object(self, value):
+        self._object = value
 
     def parse_body(self):
         """
@@ -310,6 +381,33 @@ class Connection(object):
     backoff = None
     retry_delay = None
 
+    # Connection pool settings which are passed to the conn_class (None means
+    # use the defaults from libcloud.http)
+    pool_connections = None
+    pool_maxsize = None
+    pool_block = None
+    share_session = None
+
+    # Instruments which receive the events of the requests sent by this
+    # connection (in addition to the ones registered using
+    # libcloud.common.instrumentation.add_instrument)
+    instruments = None
+
+    # Optional libcloud.common.cache.ResponseCache for the GET requests
+    response_cache = None
+
+    # Optional libcloud.utils.retry.RetryPolicy. If not set, the requests are
+    # only retried if LIBCLOUD_RETRY_FAILED_HTTP_REQUESTS is set
+    retry_policy = None
+    _default_retry_policy = None
+
+    # True if the non idempotent requests (e.g. POST) can be retried after a
+    # server or connection error, e.g. because the API deduplicates them
+    retry_non_idempotent = False
+
+    # Optional libcloud.common.ratelimit.RateLimiter
+    rate_limiter = None
+
     allow_insecure = True
 
     def __init__(self, secure=True, host=None, port=None, url=None,
@@ -445,6 +543,13 @@ class Connection(object):
         if self.proxy_url:
             kwargs.update({'proxy_url': self.proxy_url})
 
+        for name in ('pool_connections', 'pool_maxsize', 'pool_block',
+                     'share_session'):
+            value = getattr(self, name, None)
+
+            if value is not None:
+                kwargs.update({name: value})
+
         connection = self.conn_class(**kwargs)
         # You can uncoment this line, if you setup a reverse proxy server
         # which proxies to your endpoint, and lets you easily capture
@@ -519,64 +624,130 @@ class Connection(object):
         :rtype: :class:`Response` instance
 
         """
-        if params is None:
-            params = {}
-        else:
-            params = copy.copy(params)
-
-        if headers is None:
-            headers = {}
-        else:
-            headers = copy.copy(headers)
-
         retry_enabled = os.environ.get('LIBCLOUD_RETRY_FAILED_HTTP_REQUESTS',
                                        False) or RETRY_FAILED_HTTP_REQUESTS
 
-        action = self.morph_action_hook(action)
-        self.action = action
-        self.method = method
-        self.data = data
+        instruments = self._get_instruments()
+        event = None
 
-        # Extend default parameters
-        params = self.add_default_params(params)
+        if instruments:
+            event = RequestEvent(driver=self._get_driver_name(),
+                                 action=action, method=method, raw=raw,
+                                 action_name=self._get_action_name(action,
+                                                                   params))
 
-        # Add cache busting parameters (if enabled)
-        if self.cache_busting and method == 'GET':
-            params = self._add_cache_busting_to_params(params=params)
+        cache_key = None
 
-        # Extend default headers
-        headers = self.add_default_headers(headers)
+        if self.response_cache is not None and method == 'GET' and \
+                not raw and not stream:
+            cache_key = self._get_cache_key(action=action, params=params,
+                                            headers=headers)
 
-        # We always send a user-agent header
-        headers.update({'User-Agent': self._user_agent()})
+        cache_entry = None
 
-        # Indicate that we support gzip and deflate compression
-        headers.update({'Accept-Encoding': 'gzip,deflate'})
+        if cache_key is not None:
+            cache_entry = self.response_cache.get(cache_key)
 
-        port = int(self.port)
+        retry_state = self._start_retry(retry_enabled=retry_enabled, data=data,
+                                        method=method, params=params)
+        context = self.context
 
-        if port not in (80, 443):
-            headers.update({'Host': "%s:%d" % (self.host, port)})
-        else:
-            headers.update({'Host': self.host})
+        try:
+            if cache_entry is not None and not cache_entry.expired:
+                return self._get_cached_response(cache_entry, event=event)
+
+            action_class = None
+
+            if self.rate_limiter is not None:
+                action_class = self.rate_limiter.classify(
+                    connection=self, method=method, action=action,
+                    params=params)
+
+            while True:
+                if action_class is not None:
+                    self.rate_limiter.acquire(action_class)
+
+                    if event:
+                        event.lap('rate_limit_wait')
+
+                try:
+                    try:
+                        response = self._send_request(
+                            action=action, params=params, data=data,
+                            headers=headers, method=method, raw=raw,
+                            stream=stream, event=event, cache_key=cache_key,
+                            cache_entry=cache_entry, retry_state=retry_state)
+                    finally:
+                        # The slot is not held while waiting for a retry
+                        if action_class is not None:
+                            self.rate_limiter.release(action_class)
+
+                    break
+                except Exception:
+                    exc = sys.exc_info()[1]
+                    delay = self._get_retry_delay(retry_state, exc)
+
+                    if delay is None:
+                        raise
+
+                    retry_state.sleep(delay)
+                    self._rewind_body(data, retry_state)
+                    self.context = context
+
+                    if event:
+                        event.retries = retry_state.retries
+        except Exception:
+            if event:
+                event.error = sys.exc_info()[1]
+                event.status = getattr(event.error, 'code', event.status)
+            raise
+        finally:
+            if event:
+                event.finish()
+                self._emit_request_event(instruments, event)
 
-        if data:
-            data = self.encode_data(data)
+        return response
 
-        params, headers = self.pre_connect_hook(params, headers)
+    def _send_request(self, action, params, data, headers, method, raw,
+                      stream, event=None, cache_key=None, cache_entry=None,
+                      retry_state=None):
+        """
+        Send the request and return the response object.
 
-        if params:
-            if '?' in action:
-                url = '&'.join((action, urlencode(params, doseq=True)))
-            else:
-                url = '?'.join((action, urlencode(params, doseq=True)))
-        else:
-            url = action
+        :param event: Event which is populated with the request details
+                      (optional).
+        :type event: :class:`libcloud.common.instrumentation.RequestEvent`
+
+        :param cache_key: Key of the request in the response cache
+                          (optional).
+        :type cache_key: ``tuple``
+
+        :param cache_entry: Expired response cache entry which is revalidated
+                            by this request (optional).
+        :type cache_entry: :class:`libcloud.common.cache.CacheEntry`
+
+        :param retry_state: Retry state of the request (optional). If the
+                            response should be retried, _RetryResponse is
+                            raised.
+        :type retry_state: :class:`libcloud.utils.retry.RetryState`
+        """
+        if cache_entry is not None:
+            headers = copy.copy(headers) or {}
+            headers['If-None-Match'] = cache_entry.etag
+
+        url, data, headers = self._prepare_request(action=action,
+                                                   params=params, data=data,
+                                                   headers=headers,
+                                                   method=method)
 
         # IF connection has not yet been established
         if self.connection is None:
             self.connect()
 
+        if event:
+            event.lap('prepare')
+            event.bytes_sent = get_body_size(data)
+
         try:
             # @TODO: Should we just pass File object as body to request method
             # instead of dealing with splitting and sending the file ourselves?
@@ -589,18 +760,8 @@ class Connection(object):
                     raw=raw,
                     stream=stream)
             else:
-                if retry_enabled:
-                    retry_request = retry(timeout=self.timeout,
-                                          retry_delay=self.retry_delay,
-                                          backoff=self.backoff)
-                    retry_request(self.connection.request)(method=method,
-                                                           url=url,
-                                                           body=data,
-                                                           headers=headers,
-                                                           stream=stream)
-                else:
-                    self.connection.request(method=method, url=url, body=data,
-                                            headers=headers, stream=stream)
+                self.connection.request(method=method, url=url, body=data,
+                                        headers=headers, stream=stream)
         except socket.gaierror:
             e = sys.exc_info()[1]
             message = str(e)
@@ -633,14 +794,311 @@ class Connection(object):
             kwargs = {'connection': self,
                       'response': self.connection.getresponse()}
 
+        if event:
+            self._record_response_details(event, kwargs['response'],
+                                          raw=raw or stream)
+
+        if retry_state is not None:
+            http_response = kwargs['response']
+            delay = retry_state.get_response_delay(
+                status=getattr(http_response, 'status_code', None),
+                headers=lowercase_keys(dict(http_response.headers)),
+                body_func=lambda: http_response.text or '')
+
+            if delay is not None:
+                # Release the connection of the responses which are not read
+                if raw or stream:
+                    http_response.close()
+
+                raise _RetryResponse(delay)
+
+        revalidated = cache_entry is not None and \
+            kwargs['response'].status_code == httplib.NOT_MODIFIED
+
+        if revalidated:
+            cache_entry.refresh()
+            kwargs['response'] = cache_entry.response
+
+            if event:
+                event.cached = True
+
         try:
             response = responseCls(**kwargs)
         finally:
             # Always reset the context after the request has completed
             self.reset_context()
 
+            if event:
+                event.lap('parse')
+
+        if cache_key is not None and not revalidated and \
+                response.status == httplib.OK:
+            self.response_cache.set(cache_key, kwargs['response'])
+
         return response
 
+    def _get_retry_policy(self, retry_enabled=False):
+        """
+        Return the retry policy of this connection.
+
+        If no policy is set and the retries are enabled using the
+        LIBCLOUD_RETRY_FAILED_HTTP_REQUESTS environment variable (or the
+        RETRY_FAILED_HTTP_REQUESTS constant) a policy which uses the timeout,
+        retry_delay and backoff attributes of this connection is returned.
+
+        :rtype: :class:`libcloud.utils.retry.RetryPolicy`
+        """
+        if self.retry_policy is not None:
+            return self.retry_policy
+
+        if not retry_enabled:
+            return None
+
+        if self._default_retry_policy is None:
+            kwargs = {'max_attempts': None,
+                      'timeout': self.timeout or DEFAULT_TIMEOUT,
+                      'base_delay': DEFAULT_DELAY}
+
+            if self.retry_delay is not None:
+                kwargs['base_delay'] = self.retry_delay
+
+            if self.backoff:
+                kwargs['backoff'] = self.backoff
+
+            self._default_retry_policy = RetryPolicy(**kwargs)
+
+        return self._default_retry_policy
+
+    def _start_retry(self, retry_enabled, data=None, method='GET',
+                     params=None):
+        """
+        Return the retry state for a new request or ``None`` if the request
+        can't be retried (no policy or the body can't be sent again).
+
+        The non idempotent requests are only retried when they are throttled
+        unless ``retry_non_idempotent`` is True.
+
+        :rtype: :class:`libcloud.utils.retry.RetryState`
+        """
+        policy = self._get_retry_policy(retry_enabled=retry_enabled)
+
+        if policy is None:
+            return None
+
+        position = None
+
+        if data is not None and not isinstance(data, (basestring, bytes)):
+            # File objects are rewound before they are sent again, the
+            # iterators can't be replayed
+            try:
+                position = data.tell()
+            except Exception:
+                return None
+
+        idempotent = self.retry_non_idempotent or \
+            is_idempotent_request(method=method, params=params)
+
+        return policy.start(driver=self._get_driver_name(),
+                            body_position=position, idempotent=idempotent)
+
+    def _get_retry_delay(self, retry_state, exc):
+        if retry_state is None:
+            return None
+
+        if isinstance(exc, _RetryResponse):
+            return exc.delay
+
+        return retry_state.get_exception_delay(exc)
+
+    def _rewind_body(self, data, retry_state):
+        if retry_state.body_position is not None:
+            data.seek(retry_state.body_position)
+
+    def _get_action_name(self, action, params=None):
+        """
+        Return the name of the API call of a request: the ``Action``
+        parameter of the query APIs (e.g. EC2) or the path without the query
+        string.
+
+        :rtype: ``str``
+        """
+        if isinstance(params, dict) and params.get('Action', None):
+            return params['Action']
+
+        return action.split('?')[0]
+
+    def _get_cache_key(self, action, params=None, headers=None):
+        """
+        Return the response cache key for a GET request or ``None`` if the
+        action is not cached.
+
+        The key is based on the endpoint, the action, the parameters and the
+        headers passed by the caller (before the default parameters and
+        headers, which include the signatures, timestamps and nonces, are
+        added) and a hash of the credentials of this connection so it's
+        stable across the requests and never shared between accounts.
+
+        :rtype: ``tuple``
+        """
+        action_name = self._get_action_name(action, params)
+        driver_name = self._get_driver_name()
+
+        if not self.response_cache.is_cacheable(driver_name, action_name):
+            return None
+
+        credentials = [getattr(self, name, None) for name in
+                       ('user_id', 'key', 'secret', 'token')]
+
+        if isinstance(params, dict):
+            params = sorted(params.items(), key=lambda item: str(item[0]))
+
+        url = repr((self.__class__.__name__, self.secure, self.host,
+                    self.port, self.request_path, action, params,
+                    sorted((headers or {}).items()), credentials))
+
+        return self.response_cache.get_key(driver=driver_name,
+                                           action=action_name, url=url)
+
+    def _get_cached_response(self, entry, event=None):
+        """
+        Return a response object for the provided cache entry.
+        """
+        if event:
+            event.cached = True
+            event.status = entry.response.status_code
+            event.bytes_sent = 0
+            event.bytes_received = 0
+            event.lap('prepare')
+
+        try:
+            response = self.responseCls(connection=self,
+                                        response=entry.response)
+        finally:
+            self.reset_context()
+
+            if event:
+                event.lap('parse')
+
+        return response
+
+    def _get_instruments(self):
+        """
+        Return the instruments which receive the events of this connection.
+
+        :rtype: ``list`` of :class:`libcloud.common.instrumentation.Instrument`
+        """
+        instruments = get_instruments()
+
+        if self.instruments:
+            instruments.extend(self.instruments)
+
+        return instruments
+
+    def _get_driver_name(self):
+        driver = getattr(self, 'driver', None)
+
+        if driver is not None:
+            return getattr(driver, 'name', driver.__class__.__name__)
+
+        return self.__class__.__name__
+
+    def _record_response_details(self, event, response, raw=False):
+        """
+        Record the status, the size and the timings of the provided HTTP
+        response in the event.
+        """
+        network = time.time() - event._last
+        elapsed = getattr(response, 'elapsed', None)
+
+        # requests measures the time until the response headers are parsed
+        first_byte = network
+        if elapsed is not None and not raw:
+            first_byte = min(elapsed.total_seconds(), network)
+
+        event.timings['first_byte'] = first_byte
+        event.timings['download'] = network - first_byte
+        event._last += network
+
+        event.status = getattr(response, 'status_code', None)
+
+        if raw:
+            length = getattr(response, 'headers', {}).get('content-length')
+            event.bytes_received = int(length) if length else None
+        else:
+            event.bytes_received = len(getattr(response, 'content', '') or '')
+
+    def _emit_request_event(self, instruments, event):
+        for instrument in instruments:
+            try:
+                instrument.on_request(event)
+            except Exception:
+                # Instruments should never break the requests
+                LOG.exception('Instrument %r failed', instrument)
+
+    def _prepare_request(self, action, params=None, data=None, headers=None,
+                         method='GET'):
+        """
+        Run the request pre-processing and signing hooks and return the
+        request URL (path and query string), encoded body and headers.
+
+        This is shared between :meth:`request` and the asyncio connection in
+        :mod:`libcloud.common.aio`.
+
+        :rtype: ``tuple`` of (``str``, ``object``, ``dict``)
+        """
+        if params is None:
+            params = {}
+        else:
+            params = copy.copy(params)
+
+        if headers is None:
+            headers = {}
+        else:
+            headers = copy.copy(headers)
+
+        action = self.morph_action_hook(action)
+        self.action = action
+        self.method = method
+        self.data = data
+
+        # Extend default parameters
+        params = self.add_default_params(params)
+
+        # Add cache busting parameters (if enabled)
+        if self.cache_busting and method == 'GET':
+            params = self._add_cache_busting_to_params(params=params)
+
+        # Extend default headers
+        headers = self.add_default_headers(headers)
+
+        # We always send a user-agent header
+        headers.update({'User-Agent': self._user_agent()})
+
+        # Indicate that we support gzip and deflate compression
+        headers.update({'Accept-Encoding': 'gzip,deflate'})
+
+        port = int(self.port)
+
+        if port not in (80, 443):
+            headers.update({'Host': "%s:%d" % (self.host, port)})
+        else:
+            headers.update({'Host': self.host})
+
+        if data:
+            data = self.encode_data(data)
+
+        params, headers = self.pre_connect_hook(params, headers)
+
+        if params:
+            if '?' in action:
+                url = '&'.join((action, urlencode(params, doseq=True)))
+            else:
+                url = '?'.join((action, urlencode(params, doseq=True)))
+        else:
+            url = action
+
+        return url, data, headers
+
     def morph_action_hook(self, action):
         url = urlparse.urljoin(self.request_path.lstrip('/').rstrip('/') +
                                '/', action.lstrip('/'))
@@ -721,6 +1179,9 @@ class PollingConnection(Connection):
     timeout = 200
     request_method = 'request'
 
+    # True while async_request is polling for the job status
+    polling = False
+
     def async_request(self, action, params=None, data=None, headers=None,
                       method='GET', context=None):
         """
@@ -776,11 +1237,16 @@ class PollingConnection(Connection):
 
         end = time.time() + self.timeout
         completed = False
-        while time.time() < end and not completed:
-            response = request(**kwargs)
-            completed = self.has_completed(response=response)
-            if not completed:
-                time.sleep(self.poll_interval)
+        self.polling = True
+
+        try:
+            while time.time() < end and not completed:
+                response = request(**kwargs)
+                completed = self.has_completed(response=response)
+                if not completed:
+                    time.sleep(self.poll_interval)
+        finally:
+            self.polling = False
 
         if not completed:
             raise LibcloudError('Job did not complete in %s seconds' %
@@ -945,6 +1411,35 @@ class BaseDriver(object):
                        support multiple regions.
         :type region: ``str``
 
+        :keyword pool_maxsize: Maximum number of connections which are kept
+                               open for a single host.
+        :type pool_maxsize: ``int``
+
+        :keyword pool_connections: Number of hosts whose connection pools are
+                                   cached.
+        :type pool_connections: ``int``
+
+        :keyword pool_block: True to wait for a free connection instead of
+                             opening a new one when the pool is exhausted.
+        :type pool_block: ``bool``
+
+        :keyword share_session: True to share the HTTP session (and its
+                                connection pool) with all the other
+                                connections in this process which use the
+                                same endpoint and settings.
+        :type share_session: ``bool``
+
+        :keyword response_cache: Cache for the responses of the GET requests
+                                 (it can be shared by multiple drivers).
+        :type response_cache: :class:`libcloud.common.cache.ResponseCache`
+
+        :keyword retry_policy: Policy for retrying the failed requests.
+        :type retry_policy: :class:`libcloud.utils.retry.RetryPolicy`
+
+        :keyword rate_limiter: Client side rate and concurrency limits (it
+                               can be shared by multiple drivers).
+        :type rate_limiter: :class:`libcloud.common.ratelimit.RateLimiter`
+
         :rtype: ``None``
         """
 
@@ -974,6 +1469,14 @@ class BaseDriver(object):
                             'proxy_url': kwargs.pop('proxy_url', None)})
         self.connection = self.connectionCls(*args, **conn_kwargs)
 
+        for name in ('pool_connections', 'pool_maxsize', 'pool_block',
+                     'share_session', 'response_cache', 'retry_policy',
+                     'rate_limiter'):
+            value = kwargs.pop(name, None)
+
+            if value is not None:
+                setattr(self.connection, name, value)
+
         self.connection.driver = self
         self.connection.connect()
 
@@ -983,3 +1486,84 @@ class BaseDriver(object):
         Connection class constructor.
         """
         return {}
+
+    def _clone_connection(self):
+        """
+        Return a new connection object with the same settings as the
+        driver connection.
+
+        The returned connection uses its own HTTP session which means it can
+        be used from a worker thread concurrently with ``self.connection``.
+
+        :rtype: :class:`Connection`
+        """
+        connection = copy.copy(self.connection)
+        connection.connection = None
+        connection.context = {}
+        connection.ua = list(self.connection.ua)
+        connection.connect()
+        return connection
+
+    def _close_connection(self, connection):
+        """
+        Close the HTTP session of a connection returned by
+        :meth:`_clone_connection`.
+
+        Sessions which are shared with other connections (see
+        :class:`libcloud.http.SessionRegistry`) are left open.
+
+        :param connection: Connection to close.
+        :type connection: :class:`Connection`
+        """
+        http_connection = connection.connection
+
+        if http_connection is None or http_connection.shared_session:
+            return
+
+        http_connection.session.close()
+
+    def _copy_driver(self):
+        """
+        Return a shallow copy of this driver which uses its own cloned
+        connection (see :meth:`_clone_connection`) and can be used from
+        another thread.
+
+        :rtype: :class:`BaseDriver`
+        """
+        # Some drivers define __new__ with required arguments which
+        # copy.copy() doesn't provide, so the shallow copy is made by hand
+        driver = object.__new__(self.__class__)
+        driver.__dict__.update(self.__dict__)
+        driver.connection = self._clone_connection()
+        driver.connection.driver = driver
+        return driver
+
+    def _imap_with_drivers(self, func, iterable, max_concurrency=None):
+        """
+        Return a generator which calls ``func(driver, item)`` for every item
+        in ``iterable`` using up to ``max_concurrency`` threads and yields the
+        results in the input order.
+
+        Each worker thread uses its own copy of this driver with a cloned
+        connection (see :meth:`_clone_connection`).
+
+        :rtype: ``generator``
+        """
+        if max_concurrency is None:
+            max_concurrency = DEFAULT_MAX_WORKERS
+
+        if max_concurrency <= 1:
+            return (func(self, item) for item in iterable)
+
+        local = threading.local()
+
+        def call(item):
+            driver = getattr(local, 'driver', None)
+
+            if driver is None:
+                driver = self._copy_driver()
+                local.driver = driver
+
+            return func(driver, item)
+
+        return imap_bounded(call, iterable, max_workers=max_concurrency)
@@ -0,0 +1,289 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-memory cache for the responses of the read-only (GET) requests.
+
+The cache is opt-in. It's enabled by assigning a :class:`ResponseCache` to
+the ``response_cache`` attribute of a connection (or passing it to the
+driver constructor using the ``response_cache`` keyword argument). The same
+cache can be shared by multiple drivers.
+
+Only the actions with a TTL are cached. Actions are the value of the
+``Action`` query parameter for the query APIs (e.g. EC2) and the request
+path for the REST APIs.
+
+Example usage::
+
+    cache = ResponseCache(ttls={
+        'DescribeImages': 3600,
+        ('Amazon EC2', 'DescribeAvailabilityZones'): 3600,
+        '/compute/v1/projects/project/zones': 600
+    })
+
+    driver = cls('key', 'secret', response_cache=cache)
+    driver.list_images()  # Sends a request
+    driver.list_images()  # Served from the cache
+
+    cache.invalidate(action='DescribeImages')
+"""
+
+import hashlib
+import threading
+import time
+
+from collections import OrderedDict
+
+from libcloud.utils.py3 import b, basestring
+
+__all__ = [
+    'CacheEntry',
+    'ResponseCache',
+
+    'DEFAULT_CACHE_MAX_BYTES'
+]
+
+# Default maximum size of the cached bodies (in bytes)
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Approximate size of an entry without its body (headers, key and the
+# response object)
+ENTRY_OVERHEAD = 1024
+
+
+class CacheEntry(object):
+    """
+    A cached HTTP response.
+    """
+
+    def __init__(self, key, response, ttl):
+        """
+        :param key: Cache key (see :meth:`ResponseCache.get_key`).
+        :type key: ``tuple``
+
+        :param response: HTTP response with the body already read.
+        :type response: :class:`requests.Response`
+
+        :param ttl: Number of seconds for which the entry is fresh.
+        :type ttl: ``int``
+        """
+        self.key = key
+        self.response = response
+        self.ttl = ttl
+        self.expires = time.time() + ttl
+        self.etag = response.headers.get('etag', None)
+        self.size = len(response.content or b('')) + ENTRY_OVERHEAD
+
+    @property
+    def expired(self):
+        return time.time() >= self.expires
+
+    def refresh(self):
+        self.expires = time.time() + self.ttl
+
+
+class ResponseCache(object):
+    """
+    Thread-safe LRU cache for the HTTP responses which is bounded by the
+    total size of the cached bodies.
+    """
+
+    def __init__(self, ttls=None, default_ttl=0,
+                 max_bytes=DEFAULT_CACHE_MAX_BYTES, revalidate=True):
+        """
+        :param ttls: Number of seconds for which the responses are fresh.
+                     Keys are action names (path prefixes for the REST APIs),
+                     driver names or ``(driver name, action)`` tuples. The
+                     most specific match is used.
+        :type ttls: ``dict``
+
+        :param default_ttl: TTL for the actions which don't match any of the
+                            ``ttls`` keys (0 means they are not cached).
+        :type default_ttl: ``int``
+
+        :param max_bytes: Maximum total size of the cached responses. The
+                          least recently used entries are evicted first.
+        :type max_bytes: ``int``
+
+        :param revalidate: True to keep the expired entries with an ETag
+                           and revalidate them using ``If-None-Match``
+                           requests.
+        :type revalidate: ``bool``
+        """
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """
+        Total size (in bytes) of the cached entries.
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_key(self, driver, action, url):
+        """
+        Return the key for a request.
+
+        :param driver: Driver name.
+        :type driver: ``str``
+
+        :param action: Action name.
+        :type action: ``str``
+
+        :param url: Request identifier without the signature and the
+                    credentials (see
+                    :meth:`libcloud.common.base.Connection._get_cache_key`).
+        :type url: ``str``
+
+        :rtype: ``tuple``
+        """
+        digest = hashlib.sha256(b(url)).hexdigest()
+        return (driver, action, digest)
+
+    def get_ttl(self, driver, action):
+        """
+        Return the TTL for the provided driver and action.
+
+        :rtype: ``int``
+        """
+        ttls = self.ttls
+
+        if (driver, action) in ttls:
+            return ttls[(driver, action)]
+
+        if action in ttls:
+            return ttls[action]
+
+        # Longest matching path prefix
+        prefixes = [key for key in ttls if isinstance(key, basestring) and
+                    key.startswith('/') and action.startswith(key)]
+
+        if prefixes:
+            return ttls[max(prefixes, key=len)]
+
+        return ttls.get(driver, self.default_ttl)
+
+    def is_cacheable(self, driver, action):
+        return self.get_ttl(driver, action) > 0
+
+    def get(self, key):
+        """
+        Return the entry for the provided key.
+
+        The entry can be expired (if it has an ETag and revalidation is
+        enabled) in which case it should be revalidated before it's used.
+
+        :rtype: :class:`CacheEntry` or ``None``
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expired and not (self.revalidate and entry.etag):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Mark as the most recently used
+            self._entries.pop(key)
+            self._entries[key] = entry
+
+            if entry.expired:
+                self.revalidations += 1
+            else:
+                self.hits += 1
+
+            return entry
+
+    def set(self, key, response):
+        """
+        Cache the provided response.
+
+        :return: The new entry or ``None`` if the response is not cacheable.
+        :rtype: :class:`CacheEntry`
+        """
+        driver, action = key[0], key[1]
+        ttl = self.get_ttl(driver, action)
+
+        if ttl <= 0:
+            return None
+
+        cache_control = response.headers.get('cache-control', '') or ''
+        if 'no-store' in cache_control.lower():
+            return None
+
+        entry = CacheEntry(key=key, response=response, ttl=ttl)
+
+        if entry.size > self.max_bytes:
+            return None
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+        return entry
+
+    def invalidate(self, driver=None, action=None):
+        """
+        Remove the entries for the provided driver and / or action (path
+        prefix for the REST APIs).
+
+        If neither is provided, all the entries are removed.
+
+        :return: Number of the removed entries.
+        :rtype: ``int``
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (driver is None or key[0] == driver) and
+                    (action is None or key[1] == action or
+                     (action.startswith('/') and key[1].startswith(action)))]
+
+            for key in keys:
+                self._remove(key)
+
+        return len(keys)
+
+    def clear(self):
+        """
+        Remove all the entries.
+        """
+        self.invalidate()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._size -= entry.size
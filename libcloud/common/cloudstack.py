@@ -17,6 +17,7 @@ import base64
 import hashlib
 import copy
 import hmac
+import re
 
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlencode
@@ -29,6 +30,12 @@ from libcloud.common.base import JsonResponse
 from libcloud.common.types import MalformedResponseError
 from libcloud.compute.types import InvalidCredsError
 
+# Number of results requested per page by the list commands
+DEFAULT_PAGE_SIZE = 500
+
+# Error returned when the page size exceeds the default.page.size setting
+PAGE_SIZE_ERROR = "Page size can't exceed max allowed page size value"
+
 
 class CloudStackResponse(JsonResponse):
     def parse_error(self):
@@ -183,6 +190,11 @@ class CloudStackDriverMixIn(object):
 
     connectionCls = CloudStackConnection
 
+    # Number of results requested per page by the list commands, if None the
+    # results aren't paginated. It's lowered to the maximum allowed by the
+    # server if the server rejects it.
+    page_size = DEFAULT_PAGE_SIZE
+
     def __init__(self, key, secret=None, secure=True, host=None, port=None):
         host = host or self.host
         super(CloudStackDriverMixIn, self).__init__(key, secret, secure, host,
@@ -200,3 +212,70 @@ class CloudStackDriverMixIn(object):
                                               params=params, data=data,
                                               headers=headers, method=method,
                                               context=context)
+
+    def _iterate_sync_request(self, command, key, params=None, method='GET',
+                              page_size=None, page=1):
+        """
+        Return a generator which yields the ``key`` elements of a list
+        command, requesting the results page by page (``page`` and
+        ``pagesize`` parameters) while the generator is consumed.
+
+        ``page_size`` defaults to the ``page_size`` attribute of the driver.
+        """
+        while True:
+            # The page size used by the first request is kept for the
+            # following pages
+            values, page_size = self._sync_request_page(
+                command=command, key=key, params=params, method=method,
+                page_size=page_size, page=page)
+
+            for value in values:
+                yield value
+
+            if not page_size or len(values) < page_size:
+                break
+
+            page += 1
+
+    def _sync_request_page(self, command, key, params=None, method='GET',
+                           page_size=None, page=1):
+        """
+        Return the ``key`` elements of a single page of a list command and
+        the page size which was requested (None if the results aren't
+        paginated).
+
+        If ``page_size`` isn't specified the ``page_size`` attribute of the
+        driver is used. If the server rejects it on the first page, the
+        attribute is lowered to the maximum page size of the server (or set
+        to None if the maximum is unknown) and the page is requested again.
+
+        :rtype: ``tuple`` of (``list``, ``int``)
+        """
+        request_params = dict(params or {})
+        request_page_size = page_size or self.page_size
+
+        if request_page_size:
+            request_params['pagesize'] = request_page_size
+            request_params['page'] = page
+
+        try:
+            result = self._sync_request(command=command,
+                                        params=request_params, method=method)
+        except ProviderError as e:
+            if (page_size or not request_page_size or page != 1 or
+                    PAGE_SIZE_ERROR not in str(e.value)):
+                raise
+
+            match = re.search(r'(\d+)\s*$', str(e.value))
+            max_page_size = int(match.group(1)) if match else None
+
+            if max_page_size and max_page_size < request_page_size:
+                self.page_size = max_page_size
+            else:
+                self.page_size = None
+
+            return self._sync_request_page(command=command, key=key,
+                                           params=params, method=method,
+                                           page=page)
+
+        return result.get(key, []), request_page_size
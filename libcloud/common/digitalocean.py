@@ -138,8 +138,24 @@ class DigitalOceanBaseDriver(BaseDriver):
             'ex_get_event not implemented for this driver')
 
     def _paginated_request(self, url, obj):
+        """
+        Perform multiple calls in order to have a full list of elements when
+        the API responses are paginated.
+
+        :param url: API endpoint
+        :type url: ``str``
+
+        :param obj: Result object key
+        :type obj: ``str``
+
+        :return: ``list`` of API response objects
+        :rtype: ``list``
+        """
+        return list(self._iterate_paginated_request(url, obj))
+
+    def _iterate_paginated_request(self, url, obj):
         raise NotImplementedError(
-            '_paginated_requests not implemented for this driver')
+            '_iterate_paginated_request not implemented for this driver')
 
 
 class DigitalOcean_v2_BaseDriver(DigitalOceanBaseDriver):
@@ -173,10 +189,10 @@ class DigitalOcean_v2_BaseDriver(DigitalOceanBaseDriver):
         return self.connection.request('/v2/actions/%s' % event_id,
                                        params=params).object['action']
 
-    def _paginated_request(self, url, obj):
+    def _iterate_paginated_request(self, url, obj):
         """
-        Perform multiple calls in order to have a full list of elements when
-        the API responses are paginated.
+        Return a generator which yields the elements of a paginated list,
+        requesting the pages one by one while it is consumed.
 
         :param url: API endpoint
         :type url: ``str``
@@ -184,24 +200,24 @@ class DigitalOcean_v2_BaseDriver(DigitalOceanBaseDriver):
         :param obj: Result object key
         :type obj: ``str``
 
-        :return: ``list`` of API response objects
-        :rtype: ``list``
+        :return: ``generator`` of API response objects
+        :rtype: ``generator``
         """
-        params = {}
-        data = self.connection.request(url)
+        data = self.connection.request(url).object
+
+        for value in data[obj]:
+            yield value
+
         try:
-            query = urlparse.urlparse(data.object['links']['pages']['last'])
-            # The query[4] references the query parameters from the url
-            pages = parse_qs(query[4])['page'][0]
-            values = data.object[obj]
-            for page in range(2, int(pages) + 1):
-                params.update({'page': page})
-                new_data = self.connection.request(url, params=params)
-
-                more_values = new_data.object[obj]
-                for value in more_values:
-                    values.append(value)
-            data = values
+            query = urlparse.urlparse(data['links']['pages']['last'])
         except KeyError:  # No pages.
-            data = data.object[obj]
-        return data
+            return
+
+        # The query[4] references the query parameters from the url
+        pages = parse_qs(query[4])['page'][0]
+
+        for page in range(2, int(pages) + 1):
+            new_data = self.connection.request(url, params={'page': page})
+
+            for value in new_data.object[obj]:
+                yield value
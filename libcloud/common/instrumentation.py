@@ -0,0 +1,307 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-request instrumentation for :class:`libcloud.common.base.Connection`.
+
+Instruments receive a :class:`RequestEvent` for every request sent by a
+connection. They can be registered for all the connections in the process
+using :func:`add_instrument` or for a single connection by appending them
+to the ``instruments`` list of the connection.
+
+Example usage::
+
+    from libcloud.common.instrumentation import MetricsAggregator
+    from libcloud.common.instrumentation import add_instrument
+
+    metrics = MetricsAggregator()
+    add_instrument(metrics)
+
+    driver.list_nodes()
+
+    stats = metrics.get_stats()
+"""
+
+import bisect
+import threading
+import time
+
+from libcloud.utils.py3 import b, basestring
+
+__all__ = [
+    'RequestEvent',
+    'Instrument',
+    'MetricsAggregator',
+
+    'add_instrument',
+    'remove_instrument',
+    'get_instruments',
+    'get_body_size',
+
+    'DEFAULT_LATENCY_BUCKETS'
+]
+
+# Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                           10.0, 30.0, 60.0)
+
+# Instruments which receive the events of all the connections
+_INSTRUMENTS = []
+_INSTRUMENTS_LOCK = threading.Lock()
+
+
+class RequestEvent(object):
+    """
+    Details of a single request sent by a connection.
+
+    ``timings`` is a dictionary with the following durations (in seconds):
+
+    * ``prepare`` - building and signing the request
+    * ``first_byte`` - sending the request and waiting for the response
+      headers (includes connecting, TLS handshake and the server time)
+    * ``download`` - reading the response body (``0`` for the raw and the
+      streaming requests whose body is read by the caller)
+    * ``parse`` - constructing the response object (status handling and
+      body parsing)
+    * ``rate_limit_wait`` - waiting for the rate limiter of the connection
+      (only present if the connection has a rate limiter)
+    * ``total`` - all of the above
+
+    ``bytes_sent`` and ``bytes_received`` are ``None`` when the size of the
+    body is not known (e.g. streamed uploads and downloads).
+
+    ``cached`` is True for the responses which were served from (or
+    revalidated by) the response cache.
+
+    ``action`` is the request path and ``action_name`` the name of the API
+    call: the ``Action`` parameter of the query APIs (e.g. EC2) or the path
+    without the query string.
+    """
+
+    def __init__(self, driver, action, method, raw=False, action_name=None):
+        self.driver = driver
+        self.action = action
+        self.method = method
+
+        if action_name is None and isinstance(action, basestring):
+            action_name = action.split('?', 1)[0]
+
+        self.action_name = action_name
+        self.raw = raw
+
+        self.status = None
+        self.error = None
+        self.retries = 0
+        self.cached = False
+        self.bytes_sent = None
+        self.bytes_received = None
+        self.timings = {}
+
+        self._start = time.time()
+        self._last = self._start
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def lap(self, name):
+        """
+        Record the time elapsed since the previous lap under ``name``.
+        """
+        now = time.time()
+        self.timings[name] = now - self._last
+        self._last = now
+
+    def finish(self):
+        self.timings['total'] = time.time() - self._start
+
+    def __repr__(self):
+        return ('<RequestEvent driver=%s, method=%s, action=%s, status=%s, '
+                'retries=%s, total=%.3f>' %
+                (self.driver, self.method, self.action, self.status,
+                 self.retries, self.timings.get('total', 0)))
+
+
+class Instrument(object):
+    """
+    Base class for the instruments. Subclasses override
+    :meth:`on_request`.
+
+    Note: Connections in multiple threads can call the same instrument
+    concurrently.
+    """
+
+    def on_request(self, event):
+        """
+        Called after every request (successful or not).
+
+        :param event: Request details.
+        :type event: :class:`RequestEvent`
+        """
+        pass
+
+
+class MetricsAggregator(Instrument):
+    """
+    In-process instrument which aggregates request counters and latency
+    histograms per driver and action.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS, key_func=None):
+        """
+        :param buckets: Upper bounds (in seconds) of the latency histogram
+                        buckets. Latencies above the last bound are counted
+                        in an additional ``+Inf`` bucket.
+        :type buckets: ``tuple`` of ``float``
+
+        :param key_func: Callable which returns the action name which is
+                         used to aggregate an event. Defaults to the request
+                         method and the ``action_name`` of the event (the
+                         ``Action`` parameter or the path).
+                         Use it to group paths which contain object ids.
+        :type key_func: ``callable``
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.key_func = key_func or self._default_key
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def on_request(self, event):
+        key = (event.driver, self.key_func(event))
+
+        with self._lock:
+            metrics = self._metrics.get(key, None)
+
+            if metrics is None:
+                metrics = {
+                    'count': 0,
+                    'errors': 0,
+                    'retries': 0,
+                    'statuses': {},
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                    'timings': {},
+                    'histogram': [0] * (len(self.buckets) + 1)
+                }
+                self._metrics[key] = metrics
+
+            metrics['count'] += 1
+            metrics['retries'] += event.retries
+
+            if event.error is not None:
+                metrics['errors'] += 1
+
+            if event.status is not None:
+                statuses = metrics['statuses']
+                statuses[event.status] = statuses.get(event.status, 0) + 1
+
+            metrics['bytes_sent'] += event.bytes_sent or 0
+            metrics['bytes_received'] += event.bytes_received or 0
+
+            for name, value in event.timings.items():
+                timings = metrics['timings']
+                timings[name] = timings.get(name, 0) + value
+
+            total = event.timings.get('total', 0)
+            index = bisect.bisect_left(self.buckets, total)
+            metrics['histogram'][index] += 1
+
+    def get_stats(self):
+        """
+        Return the aggregated metrics.
+
+        The result is a dictionary keyed by ``(driver, action)`` tuples. Each
+        value contains the ``count`` of requests, the number of ``errors``
+        and ``retries``, the ``statuses`` counters, the ``bytes_sent`` and
+        ``bytes_received`` totals, the sums of the ``timings`` (see
+        :class:`RequestEvent`) and the latency ``histogram`` which is a list
+        of ``(upper bound, count)`` tuples.
+
+        :rtype: ``dict``
+        """
+        bounds = list(self.buckets) + [float('inf')]
+        stats = {}
+
+        with self._lock:
+            for key, metrics in self._metrics.items():
+                item = dict(metrics)
+                item['statuses'] = dict(metrics['statuses'])
+                item['timings'] = dict(metrics['timings'])
+                item['histogram'] = list(zip(bounds, metrics['histogram']))
+                stats[key] = item
+
+        return stats
+
+    def reset(self):
+        """
+        Remove all the aggregated metrics.
+        """
+        with self._lock:
+            self._metrics = {}
+
+    @staticmethod
+    def _default_key(event):
+        return '%s %s' % (event.method, event.action_name)
+
+
+def add_instrument(instrument):
+    """
+    Register an instrument for all the connections.
+
+    :type instrument: :class:`Instrument`
+    """
+    with _INSTRUMENTS_LOCK:
+        if instrument not in _INSTRUMENTS:
+            _INSTRUMENTS.append(instrument)
+
+
+def remove_instrument(instrument):
+    """
+    Unregister an instrument which was registered using
+    :func:`add_instrument`.
+
+    :type instrument: :class:`Instrument`
+    """
+    with _INSTRUMENTS_LOCK:
+        if instrument in _INSTRUMENTS:
+            _INSTRUMENTS.remove(instrument)
+
+
+def get_instruments():
+    """
+    Return the instruments registered for all the connections.
+
+    :rtype: ``list`` of :class:`Instrument`
+    """
+    return list(_INSTRUMENTS)
+
+
+def get_body_size(data):
+    """
+    Return the size (in bytes) of a request body or ``None`` if it's not
+    known (e.g. iterators and file objects).
+
+    :rtype: ``int``
+    """
+    if data is None:
+        return 0
+
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+
+    if isinstance(data, basestring):
+        return len(b(data))
+
+    return None
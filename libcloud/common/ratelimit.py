@@ -0,0 +1,275 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client side rate limiting for :class:`libcloud.common.base.Connection`.
+
+A :class:`RateLimiter` limits the rate (token bucket) and the number of in
+flight requests per action class:
+
+* ``read`` - requests which don't modify resources (GET and HEAD requests
+  and the query API ``Describe*``, ``List*`` and ``Get*`` actions)
+* ``mutate`` - all the other requests
+* ``poll`` - job status requests sent by
+  :meth:`libcloud.common.base.PollingConnection.async_request`
+
+A limiter is attached to a connection using the ``rate_limiter`` attribute
+(or the ``rate_limiter`` driver keyword argument). Drivers which share an
+API quota (e.g. multiple drivers for the same account) should share a
+limiter, see :func:`get_rate_limiter`.
+
+Example usage::
+
+    limiter = get_rate_limiter(('ec2', 'access key'),
+                               rates={'read': 20, 'mutate': 5},
+                               concurrency=10)
+    driver = cls('access key', 'secret', rate_limiter=limiter)
+"""
+
+import threading
+import time
+
+from libcloud.utils.py3 import basestring
+
+__all__ = [
+    'TokenBucket',
+    'RateLimiter',
+
+    'get_rate_limiter',
+    'clear_rate_limiters',
+
+    'ACTION_CLASSES'
+]
+
+ACTION_CLASSES = ('read', 'mutate', 'poll')
+
+# Query API (e.g. EC2) action prefixes which are classified as reads
+READ_ACTION_PREFIXES = ('Describe', 'List', 'Get')
+
+_RATE_LIMITERS = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: Number of tokens added per second.
+        :type rate: ``float``
+
+        :param burst: Maximum number of tokens (defaults to ``rate``, but at
+                      least 1).
+        :type burst: ``float``
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, waiting until they are available.
+
+        :return: Number of seconds spent waiting.
+        :rtype: ``float``
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens +
+                                   (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                delay = (tokens - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter(object):
+    """
+    Limits the request rate and the number of in flight requests per action
+    class.
+    """
+
+    def __init__(self, rates=None, concurrency=None, classify=None):
+        """
+        :param rates: Requests per second. Either a number (which applies to
+                      every action class) or a dictionary keyed by the
+                      action class with a number or a ``(rate, burst)``
+                      tuple. Classes without a rate are not limited.
+        :type rates: ``float`` or ``dict``
+
+        :param concurrency: Maximum number of in flight requests. Either a
+                            number (shared by all the action classes) or a
+                            dictionary keyed by the action class.
+        :type concurrency: ``int`` or ``dict``
+
+        :param classify: Callable which is called with the connection, the
+                         method, the action and the parameters of a request
+                         and returns its action class (see
+                         :meth:`classify`).
+        :type classify: ``callable``
+        """
+        self._buckets = {}
+        self._semaphores = {}
+
+        if rates is not None and not isinstance(rates, dict):
+            rates = dict((name, rates) for name in ACTION_CLASSES)
+
+        for name, rate in (rates or {}).items():
+            if isinstance(rate, (tuple, list)):
+                self._buckets[name] = TokenBucket(*rate)
+            elif rate:
+                self._buckets[name] = TokenBucket(rate)
+
+        if isinstance(concurrency, dict):
+            for name, value in concurrency.items():
+                self._semaphores[name] = threading.BoundedSemaphore(value)
+        elif concurrency:
+            semaphore = threading.BoundedSemaphore(concurrency)
+            self._semaphores = dict((name, semaphore)
+                                    for name in ACTION_CLASSES)
+
+        if classify is not None:
+            self.classify = classify
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def classify(self, connection, method, action, params=None):
+        """
+        Return the action class (``read``, ``mutate`` or ``poll``) of a
+        request.
+
+        :rtype: ``str``
+        """
+        if getattr(connection, 'polling', False):
+            return 'poll'
+
+        action_name = (params or {}).get('Action', None)
+
+        if isinstance(action_name, basestring):
+            return 'read' if action_name.startswith(READ_ACTION_PREFIXES) \
+                else 'mutate'
+
+        if method in ('GET', 'HEAD'):
+            return 'read'
+
+        return 'mutate'
+
+    def acquire(self, action_class):
+        """
+        Wait until a request of the provided action class can be sent.
+
+        :return: Number of seconds spent waiting.
+        :rtype: ``float``
+        """
+        start = time.time()
+
+        # The tokens are taken once a slot is available so the requests
+        # which wait for a slot don't use up the rate (and then reach the
+        # server in a burst)
+        semaphore = self._semaphores.get(action_class, None)
+        if semaphore is not None:
+            semaphore.acquire()
+
+        bucket = self._buckets.get(action_class, None)
+        if bucket is not None:
+            bucket.acquire()
+
+        waited = time.time() - start
+
+        with self._lock:
+            stats = self._stats.get(action_class, None)
+
+            if stats is None:
+                stats = {'requests': 0, 'waited': 0, 'total_wait': 0.0,
+                         'max_wait': 0.0, 'in_flight': 0}
+                self._stats[action_class] = stats
+
+            stats['requests'] += 1
+            stats['in_flight'] += 1
+            stats['total_wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+
+            # Count only the requests which were actually delayed
+            if waited >= 0.001:
+                stats['waited'] += 1
+
+        return waited
+
+    def release(self, action_class):
+        """
+        Mark a request which was started using :meth:`acquire` as finished.
+        """
+        semaphore = self._semaphores.get(action_class, None)
+        if semaphore is not None:
+            semaphore.release()
+
+        with self._lock:
+            self._stats[action_class]['in_flight'] -= 1
+
+    def get_stats(self):
+        """
+        Return the wait time statistics per action class.
+
+        Each value contains the number of ``requests``, the number of
+        requests which ``waited``, the ``total_wait`` and ``max_wait`` times
+        (in seconds) and the number of requests ``in_flight``.
+
+        :rtype: ``dict``
+        """
+        with self._lock:
+            return dict((name, dict(stats))
+                        for name, stats in self._stats.items())
+
+
+def get_rate_limiter(key, **kwargs):
+    """
+    Return the process wide rate limiter for the provided key (e.g. a
+    ``(provider, account key)`` tuple), creating it with the provided
+    keyword arguments if it doesn't exist yet.
+
+    :rtype: :class:`RateLimiter`
+    """
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(key, None)
+
+        if limiter is None:
+            limiter = RateLimiter(**kwargs)
+            _RATE_LIMITERS[key] = limiter
+
+    return limiter
+
+
+def clear_rate_limiters():
+    """
+    Remove all the limiters which were created using
+    :func:`get_rate_limiter`.
+    """
+    with _RATE_LIMITERS_LOCK:
+        _RATE_LIMITERS.clear()
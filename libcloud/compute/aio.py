@@ -0,0 +1,316 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio interface for the compute drivers.
+
+Example usage::
+
+    driver = get_driver(Provider.EC2)('key', 'secret', region='us-east-1')
+
+    async with get_async_driver(driver) as async_driver:
+        nodes, volumes = await asyncio.gather(async_driver.list_nodes(),
+                                              async_driver.list_volumes())
+
+Note: This module requires Python 3.6+ and the aiohttp library.
+"""
+
+from libcloud.utils.misc import chunked
+from libcloud.utils.xml import fixxpath, findall, findtext
+from libcloud.common.aio import AsyncBaseDriver
+from libcloud.compute.drivers.ec2 import BaseEC2NodeDriver, EC2NodeLocation
+from libcloud.compute.drivers.ec2 import NAMESPACE, MAX_FILTER_VALUES
+
+__all__ = [
+    'AsyncNodeDriver',
+    'AsyncEC2NodeDriver',
+
+    'get_async_driver'
+]
+
+
+class AsyncNodeDriver(AsyncBaseDriver):
+    """
+    asyncio interface to a :class:`libcloud.compute.base.NodeDriver`.
+
+    All the methods run the corresponding blocking driver method in an
+    executor. Subclasses provide native implementations for specific
+    drivers.
+
+    Extra keyword arguments of all the methods are passed to the driver.
+    """
+
+    async def list_nodes(self, *args, **kwargs):
+        """
+        List all nodes.
+
+        :rtype: ``list`` of :class:`.Node`
+        """
+        return await self._run_sync('list_nodes', *args, **kwargs)
+
+    async def list_sizes(self, location=None, **kwargs):
+        """
+        List sizes on a provider
+
+        :rtype: ``list`` of :class:`.NodeSize`
+        """
+        return await self._run_sync('list_sizes', location=location,
+                                    **kwargs)
+
+    async def list_locations(self, **kwargs):
+        """
+        List data centers for a provider
+
+        :rtype: ``list`` of :class:`.NodeLocation`
+        """
+        return await self._run_sync('list_locations', **kwargs)
+
+    async def list_images(self, location=None, **kwargs):
+        """
+        List images on a provider.
+
+        :rtype: ``list`` of :class:`.NodeImage`
+        """
+        return await self._run_sync('list_images', location=location,
+                                    **kwargs)
+
+    async def list_volumes(self, **kwargs):
+        """
+        List storage volumes.
+
+        :rtype: ``list`` of :class:`.StorageVolume`
+        """
+        return await self._run_sync('list_volumes', **kwargs)
+
+    async def list_volume_snapshots(self, volume, **kwargs):
+        """
+        List snapshots for a storage volume.
+
+        :rtype: ``list`` of :class:`VolumeSnapshot`
+        """
+        return await self._run_sync('list_volume_snapshots', volume,
+                                    **kwargs)
+
+    async def list_snapshots(self, **kwargs):
+        """
+        List all the available snapshots.
+
+        :rtype: ``list`` of :class:`VolumeSnapshot`
+        """
+        return await self._run_sync('list_snapshots', **kwargs)
+
+    async def list_key_pairs(self, **kwargs):
+        """
+        List all the available key pair objects.
+
+        :rtype: ``list`` of :class:`.KeyPair` objects
+        """
+        return await self._run_sync('list_key_pairs', **kwargs)
+
+
+class AsyncEC2NodeDriver(AsyncNodeDriver):
+    """
+    asyncio interface to the EC2 (and EC2 compatible) compute drivers.
+    """
+
+    driver_cls = BaseEC2NodeDriver
+
+    async def list_nodes(self, ex_node_ids=None, ex_filters=None,
+                         ex_page_size=None):
+        if not self._is_native('list_nodes'):
+            return await super().list_nodes(ex_node_ids=ex_node_ids,
+                                            ex_filters=ex_filters,
+                                            ex_page_size=ex_page_size)
+
+        driver = self.driver
+        params = {'Action': 'DescribeInstances'}
+
+        if ex_node_ids:
+            params.update(driver._pathlist('InstanceId', ex_node_ids))
+        else:
+            page_size = ex_page_size or driver.list_nodes_page_size
+
+            if page_size:
+                params['MaxResults'] = page_size
+
+        if ex_filters:
+            params.update(driver._build_filters(ex_filters))
+
+        nodes = []
+
+        while True:
+            response = await self.connection.request(driver.path,
+                                                     params=params)
+
+            page_nodes = []
+            for rs in findall(element=response.object,
+                              xpath='reservationSet/item',
+                              namespace=NAMESPACE):
+                page_nodes += driver._to_nodes(rs, 'instancesSet/item')
+
+            nodes_elastic_ips_mappings = \
+                await self.ex_describe_addresses(page_nodes)
+
+            for node in page_nodes:
+                ips = nodes_elastic_ips_mappings[node.id]
+                node.public_ips.extend(ips)
+
+            nodes.extend(page_nodes)
+
+            next_token = findtext(element=response.object, xpath='nextToken',
+                                  namespace=NAMESPACE)
+
+            if not next_token:
+                break
+
+            params['NextToken'] = next_token
+
+        return nodes
+
+    async def ex_describe_addresses(self, nodes):
+        """
+        Return Elastic IP addresses for all the nodes in the provided list.
+
+        @inherits: :class:`BaseEC2NodeDriver.ex_describe_addresses`
+        """
+        if not self._is_native('ex_describe_addresses'):
+            return await self._run_sync('ex_describe_addresses', nodes)
+
+        if not nodes:
+            return {}
+
+        driver = self.driver
+        nodes_elastic_ip_mappings = {}
+
+        for batch in chunked(nodes, MAX_FILTER_VALUES):
+            params = {'Action': 'DescribeAddresses'}
+            driver._add_instances_filter(params, batch)
+
+            response = await self.connection.request(driver.path,
+                                                     params=params)
+            nodes_elastic_ip_mappings.update(
+                driver._to_nodes_elastic_ip_mappings(response.object, batch))
+
+        return nodes_elastic_ip_mappings
+
+    async def list_sizes(self, location=None):
+        if not self._is_native('list_sizes'):
+            return await super().list_sizes(location=location)
+
+        # Sizes are static so no request is made
+        return self.driver.list_sizes(location=location)
+
+    async def list_locations(self):
+        if not self._is_native('list_locations'):
+            return await super().list_locations()
+
+        driver = self.driver
+        params = {'Action': 'DescribeAvailabilityZones'}
+        filters = {'region-name': driver.region_name, 'state': 'available'}
+        params.update(driver._build_filters(filters))
+
+        response = await self.connection.request(driver.path, params=params)
+        availability_zones = driver._to_availability_zones(response.object)
+
+        return [EC2NodeLocation(index, availability_zone.name,
+                                driver.country, driver, availability_zone)
+                for index, availability_zone in
+                enumerate(availability_zones)]
+
+    async def list_images(self, location=None, ex_image_ids=None,
+                          ex_owner=None, ex_executableby=None,
+                          ex_filters=None):
+        if not self._is_native('list_images'):
+            return await super().list_images(
+                location=location, ex_image_ids=ex_image_ids,
+                ex_owner=ex_owner, ex_executableby=ex_executableby,
+                ex_filters=ex_filters)
+
+        driver = self.driver
+        params = {'Action': 'DescribeImages'}
+
+        if ex_owner:
+            params.update({'Owner.1': ex_owner})
+
+        if ex_executableby:
+            params.update({'ExecutableBy.1': ex_executableby})
+
+        if ex_image_ids:
+            for index, image_id in enumerate(ex_image_ids):
+                index += 1
+                params.update({'ImageId.%s' % (index): image_id})
+
+        if ex_filters:
+            params.update(driver._build_filters(ex_filters))
+
+        response = await self.connection.request(driver.path, params=params)
+        return driver._to_images(response.object)
+
+    async def list_volumes(self, node=None):
+        if not self._is_native('list_volumes'):
+            return await super().list_volumes(node=node)
+
+        driver = self.driver
+        params = {'Action': 'DescribeVolumes'}
+
+        if node:
+            filters = {'attachment.instance-id': node.id}
+            params.update(driver._build_filters(filters))
+
+        response = await self.connection.request(driver.path, params=params)
+        return [driver._to_volume(el) for el in response.object.findall(
+            fixxpath(xpath='volumeSet/item', namespace=NAMESPACE))]
+
+    async def list_key_pairs(self):
+        if not self._is_native('list_key_pairs'):
+            return await super().list_key_pairs()
+
+        driver = self.driver
+        params = {'Action': 'DescribeKeyPairs'}
+
+        response = await self.connection.request(driver.path, params=params)
+        elems = findall(element=response.object, xpath='keySet/item',
+                        namespace=NAMESPACE)
+        return driver._to_key_pairs(elems=elems)
+
+
+# (driver class, asyncio interface class) pairs, the most specific first
+ASYNC_DRIVERS = [
+    (BaseEC2NodeDriver, AsyncEC2NodeDriver),
+]
+
+
+def get_async_driver(driver, session=None, executor=None):
+    """
+    Return the asyncio interface for the provided compute driver.
+
+    :param driver: Compute driver instance.
+    :type driver: :class:`libcloud.compute.base.NodeDriver`
+
+    :param session: aiohttp session to use (optional).
+    :type session: :class:`aiohttp.ClientSession`
+
+    :param executor: Executor for the methods without a native
+                     implementation (optional).
+    :type executor: :class:`concurrent.futures.Executor`
+
+    :rtype: :class:`AsyncNodeDriver`
+    """
+    for driver_cls, async_driver_cls in ASYNC_DRIVERS:
+        if isinstance(driver, driver_cls):
+            return async_driver_cls(driver, session=session,
+                                    executor=executor)
+
+    return AsyncNodeDriver(driver, session=session, executor=executor)
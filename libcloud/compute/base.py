@@ -22,10 +22,12 @@ from __future__ import with_statement
 import sys
 import time
 import hashlib
+import itertools
 import os
 import socket
 import random
 import binascii
+import threading
 
 from libcloud.utils.py3 import b
 
@@ -38,9 +40,12 @@ from libcloud.common.base import ConnectionKey
 from libcloud.common.base import BaseDriver
 from libcloud.common.types import LibcloudError
 from libcloud.compute.ssh import have_paramiko
+from libcloud.compute.polling import NodePoller, PollTimeout
 
 from libcloud.utils.networking import is_private_subnet
 from libcloud.utils.networking import is_valid_ip_address
+from libcloud.utils.concurrency import DEFAULT_MAX_WORKERS
+from libcloud.utils.concurrency import imap_unordered_bounded
 
 if have_paramiko:
     from paramiko.ssh_exception import SSHException
@@ -51,6 +56,9 @@ if have_paramiko:
 else:
     SSH_TIMEOUT_EXCEPTION_CLASSES = (IOError, socket.gaierror, socket.error)
 
+# Serializes the creation of the per driver node pollers
+_NODE_POLLER_LOCK = threading.Lock()
+
 # How long to wait for the node to come online after creating it
 NODE_ONLINE_WAIT_TIMEOUT = 10 * 60
 
@@ -729,15 +737,34 @@ class NodeDriver(BaseDriver):
 
     NODE_STATE_MAP = {}
 
-    def list_nodes(self):
+    def iterate_nodes(self, **kwargs):
+        """
+        Return a generator of nodes.
+
+        Drivers which support pagination request the nodes page by page, so
+        the memory usage doesn't depend on the number of the nodes. Other
+        drivers return the nodes returned by :meth:`list_nodes`.
+
+        :rtype: ``generator`` of :class:`.Node`
+        """
+        if not self._is_overridden('list_nodes'):
+            raise NotImplementedError(
+                'iterate_nodes not implemented for this driver')
+
+        return iter(self.list_nodes(**kwargs))
+
+    def list_nodes(self, **kwargs):
         """
         List all nodes.
 
         :return:  list of node objects
         :rtype: ``list`` of :class:`.Node`
         """
-        raise NotImplementedError(
-            'list_nodes not implemented for this driver')
+        if not self._is_overridden('iterate_nodes'):
+            raise NotImplementedError(
+                'list_nodes not implemented for this driver')
+
+        return list(self.iterate_nodes(**kwargs))
 
     def list_sizes(self, location=None):
         """
@@ -931,37 +958,10 @@ class NodeDriver(BaseDriver):
                                    'public_ips', other option is 'private_ips'.
         :type ssh_interface: ``str``
         """
-        if not libcloud.compute.ssh.have_paramiko:
-            raise RuntimeError('paramiko is not installed. You can install ' +
-                               'it using pip: pip install paramiko')
-
-        if 'auth' in kwargs:
-            auth = kwargs['auth']
-            if not isinstance(auth, (NodeAuthSSHKey, NodeAuthPassword)):
-                raise NotImplementedError(
-                    'If providing auth, only NodeAuthSSHKey or'
-                    'NodeAuthPassword is supported')
-        elif 'ssh_key' in kwargs:
-            # If an ssh_key is provided we can try deploy_node
-            pass
-        elif 'create_node' in self.features:
-            f = self.features['create_node']
-            if 'generates_password' not in f and "password" not in f:
-                raise NotImplementedError(
-                    'deploy_node not implemented for this driver')
-        else:
-            raise NotImplementedError(
-                'deploy_node not implemented for this driver')
+        self._check_deploy_node_kwargs(kwargs)
 
         node = self.create_node(**kwargs)
-        max_tries = kwargs.get('max_tries', 3)
-
-        password = None
-        if 'auth' in kwargs:
-            if isinstance(kwargs['auth'], NodeAuthPassword):
-                password = kwargs['auth'].password
-        elif 'password' in node.extra:
-            password = node.extra['password']
+        password = self._get_deploy_password(node, kwargs)
 
         ssh_interface = kwargs.get('ssh_interface', 'public_ips')
 
@@ -976,39 +976,153 @@ class NodeDriver(BaseDriver):
             e = sys.exc_info()[1]
             raise DeploymentError(node=node, original_exception=e, driver=self)
 
-        ssh_username = kwargs.get('ssh_username', 'root')
-        ssh_alternate_usernames = kwargs.get('ssh_alternate_usernames', [])
-        ssh_port = kwargs.get('ssh_port', 22)
-        ssh_timeout = kwargs.get('ssh_timeout', 10)
-        ssh_key_file = kwargs.get('ssh_key', None)
-        timeout = kwargs.get('timeout', SSH_CONNECT_TIMEOUT)
+        return self._deploy_to_node(
+            task=kwargs['deploy'], node=node, ssh_hostname=ip_addresses[0],
+            ssh_password=password,
+            timeout=kwargs.get('timeout', SSH_CONNECT_TIMEOUT), kwargs=kwargs)
 
-        deploy_error = None
+    def deploy_nodes(self, deploy, nodes=None, create_node_kwargs=None,
+                     max_concurrency=None, **kwargs):
+        """
+        Deploy multiple nodes concurrently.
+
+        The provided nodes and the nodes created using ``create_node_kwargs``
+        are waited for using a single poll loop (see
+        :meth:`iterate_until_running`). Every node is deployed as soon as it's
+        running, using up to ``max_concurrency`` SSH sessions at the same
+        time.
+
+        The nodes are created when this method is called. The waiting and
+        the deployment happen while the returned generator is consumed, it
+        yields a ``(node, error)`` tuple for every node as soon as its
+        deployment finishes. ``error`` is None on success, otherwise it's a
+        :class:`DeploymentError` (the node is not destroyed).
+
+        A failed ``create_node`` call doesn't affect the other nodes. A
+        ``(node_kwargs, error)`` tuple with the ``create_node`` keyword
+        arguments of the node is yielded for it first.
+
+        :param deploy: Deployment to run on every node.
+        :type deploy: :class:`Deployment`
+
+        :param nodes: Existing nodes to deploy. (optional)
+        :type nodes: ``list`` of :class:`.Node`
+
+        :param create_node_kwargs: Keyword arguments for ``create_node``, one
+                                   dictionary per node to create. The
+                                   ``auth`` argument is added if it's not
+                                   present. (optional)
+        :type create_node_kwargs: ``list`` of ``dict``
+
+        :param max_concurrency: Maximum number of nodes which are created or
+                                deployed at the same time.
+                                (default is 4)
+        :type max_concurrency: ``int``
+
+        :param timeout: How many seconds a node can take to come up and
+                        accept the SSH connection, counted from the start of
+                        the call. (default is 600)
+        :type timeout: ``int``
+
+        :param wait_period: How many seconds to wait between the polls of
+                            the nodes. (default is 3)
+        :type wait_period: ``int``
+
+        The ``auth``, ``ssh_username``, ``ssh_alternate_usernames``,
+        ``ssh_port``, ``ssh_timeout``, ``ssh_key``, ``max_tries`` and
+        ``ssh_interface`` arguments are the same as for :meth:`deploy_node`.
+
+        :rtype: ``generator`` of ``tuple``
+        """
+        nodes = list(nodes or [])
+        timeout = kwargs.get('timeout', NODE_ONLINE_WAIT_TIMEOUT)
+        end = time.time() + timeout
+
+        if max_concurrency is None:
+            max_concurrency = DEFAULT_MAX_WORKERS
+
+        failed = []
+
+        if create_node_kwargs:
+            self._check_deploy_node_kwargs(kwargs)
+
+            all_node_kwargs = []
+            for node_kwargs in create_node_kwargs:
+                node_kwargs = dict(node_kwargs)
+
+                if 'auth' in kwargs:
+                    node_kwargs.setdefault('auth', kwargs['auth'])
+
+                all_node_kwargs.append(node_kwargs)
+
+            def create_node(driver, node_kwargs):
+                try:
+                    return driver.create_node(**node_kwargs), None
+                except Exception:
+                    return None, sys.exc_info()[1]
+
+            # The nodes which were created are deployed even if other
+            # create_node calls fail so they are not orphaned
+            for node_kwargs, (node, error) in zip(
+                    all_node_kwargs, self._imap_with_drivers(
+                        create_node, all_node_kwargs,
+                        max_concurrency=max_concurrency)):
+                if error is None:
+                    nodes.append(node)
+                else:
+                    failed.append((node_kwargs, DeploymentError(
+                        node=None, original_exception=error, driver=self)))
+        elif not libcloud.compute.ssh.have_paramiko:
+            raise RuntimeError('paramiko is not installed. You can install ' +
+                               'it using pip: pip install paramiko')
+
+        # The nodes returned by the poll loop don't necessarily include the
+        # password generated by create_node
+        passwords = dict((node.uuid, self._get_deploy_password(node, kwargs))
+                         for node in nodes)
+
+        # Set when the consumer stops early so the nodes are not polled
+        # anymore
+        cancelled = threading.Event()
+
+        def iterate_running_nodes():
+            pending = dict((node.uuid, node) for node in nodes)
 
-        for username in ([ssh_username] + ssh_alternate_usernames):
             try:
-                self._connect_and_run_deployment_script(
-                    task=kwargs['deploy'], node=node,
-                    ssh_hostname=ip_addresses[0], ssh_port=ssh_port,
-                    ssh_username=username, ssh_password=password,
-                    ssh_key_file=ssh_key_file, ssh_timeout=ssh_timeout,
-                    timeout=timeout, max_tries=max_tries)
+                for node, ip_addresses in self.iterate_until_running(
+                        nodes=nodes, wait_period=kwargs.get('wait_period', 3),
+                        timeout=timeout,
+                        ssh_interface=kwargs.get('ssh_interface',
+                                                 'public_ips'),
+                        cancelled=cancelled):
+                    pending.pop(node.uuid, None)
+                    yield node, ip_addresses, None
             except Exception:
-                # Try alternate username
-                # Todo: Need to fix paramiko so we can catch a more specific
-                # exception
                 e = sys.exc_info()[1]
-                deploy_error = e
+
+                for node in pending.values():
+                    yield node, None, e
+
+        def deploy_running_node(item):
+            node, ip_addresses, error = item
+
+            if error is None:
+                try:
+                    self._deploy_to_node(
+                        task=deploy, node=node, ssh_hostname=ip_addresses[0],
+                        ssh_password=passwords.get(node.uuid),
+                        timeout=max(end - time.time(), 0), kwargs=kwargs)
+                except DeploymentError:
+                    error = sys.exc_info()[1]
             else:
-                # Script successfully executed, don't try alternate username
-                deploy_error = None
-                break
+                error = DeploymentError(node=node, original_exception=error,
+                                        driver=self)
 
-        if deploy_error is not None:
-            raise DeploymentError(node=node, original_exception=deploy_error,
-                                  driver=self)
+            return node, error
 
-        return node
+        return itertools.chain(failed, imap_unordered_bounded(
+            deploy_running_node, iterate_running_nodes(),
+            max_workers=max_concurrency, cancelled=cancelled))
 
     def reboot_node(self, node):
         """
@@ -1043,14 +1157,31 @@ class NodeDriver(BaseDriver):
     # Volume and snapshot management methods
     ##
 
-    def list_volumes(self):
+    def iterate_volumes(self, **kwargs):
+        """
+        Return a generator of storage volumes.
+
+        See :meth:`iterate_nodes`.
+
+        :rtype: ``generator`` of :class:`.StorageVolume`
+        """
+        if not self._is_overridden('list_volumes'):
+            raise NotImplementedError(
+                'iterate_volumes not implemented for this driver')
+
+        return iter(self.list_volumes(**kwargs))
+
+    def list_volumes(self, **kwargs):
         """
         List storage volumes.
 
         :rtype: ``list`` of :class:`.StorageVolume`
         """
-        raise NotImplementedError(
-            'list_volumes not implemented for this driver')
+        if not self._is_overridden('iterate_volumes'):
+            raise NotImplementedError(
+                'list_volumes not implemented for this driver')
+
+        return list(self.iterate_volumes(**kwargs))
 
     def list_volume_snapshots(self, volume):
         """
@@ -1159,7 +1290,27 @@ class NodeDriver(BaseDriver):
     # Image management methods
     ##
 
-    def list_images(self, location=None):
+    def iterate_images(self, location=None, **kwargs):
+        """
+        Return a generator of images.
+
+        See :meth:`iterate_nodes`.
+
+        :param location: The location at which to list images.
+        :type location: :class:`.NodeLocation`
+
+        :rtype: ``generator`` of :class:`.NodeImage`
+        """
+        if not self._is_overridden('list_images'):
+            raise NotImplementedError(
+                'iterate_images not implemented for this driver')
+
+        if location is not None:
+            kwargs['location'] = location
+
+        return iter(self.list_images(**kwargs))
+
+    def list_images(self, location=None, **kwargs):
         """
         List images on a provider.
 
@@ -1169,8 +1320,14 @@ class NodeDriver(BaseDriver):
         :return: list of node image objects.
         :rtype: ``list`` of :class:`.NodeImage`
         """
-        raise NotImplementedError(
-            'list_images not implemented for this driver')
+        if not self._is_overridden('iterate_images'):
+            raise NotImplementedError(
+                'list_images not implemented for this driver')
+
+        if location is not None:
+            kwargs['location'] = location
+
+        return list(self.iterate_images(**kwargs))
 
     def create_image(self, node, name, description=None):
         """
@@ -1358,8 +1515,45 @@ class NodeDriver(BaseDriver):
                  list of ip_address on success.
         :rtype: ``list`` of ``tuple``
         """
-        ex_list_nodes_kwargs = ex_list_nodes_kwargs or {}
+        results = dict((node.uuid, (node, addresses)) for node, addresses in
+                       self.iterate_until_running(
+                           nodes=nodes, wait_period=wait_period,
+                           timeout=timeout, ssh_interface=ssh_interface,
+                           force_ipv4=force_ipv4,
+                           ex_list_nodes_kwargs=ex_list_nodes_kwargs))
+
+        # Return the nodes in the order they were provided
+        uuids = []
+        for node in nodes:
+            if node.uuid not in uuids:
+                uuids.append(node.uuid)
+
+        return [results[uuid] for uuid in uuids]
+
+    def iterate_until_running(self, nodes, wait_period=3,
+                              timeout=600, ssh_interface='public_ips',
+                              force_ipv4=True, ex_list_nodes_kwargs=None,
+                              cancelled=None):
+        """
+        Return a generator which yields the provided nodes as soon as each
+        of them is considered running.
 
+        Only the nodes which are not running yet are polled. Drivers which
+        support it request just those nodes instead of listing all the
+        nodes, the delay between two polls grows (up to
+        ``libcloud.compute.polling.MAX_WAIT_PERIOD``) while none of the
+        nodes change, and concurrent calls on the same driver share a single
+        poll loop.
+
+        See :meth:`wait_until_running` for the other parameters.
+
+        :param cancelled: Event which stops the generator (without an error)
+                          when it's set. (optional)
+        :type cancelled: :class:`threading.Event`
+
+        :return: generator of ``(Node, ip_addresses)`` tuples.
+        :rtype: ``generator`` of ``tuple``
+        """
         def is_supported(address):
             """
             Return True for supported address.
@@ -1375,43 +1569,82 @@ class NodeDriver(BaseDriver):
             """
             return [address for address in addresses if is_supported(address)]
 
+        def get_addresses(node):
+            """
+            Return the supported addresses of a running node.
+            """
+            if node.state != NodeState.RUNNING:
+                return None
+
+            return filter_addresses(getattr(node, ssh_interface))
+
         if ssh_interface not in ['public_ips', 'private_ips']:
             raise ValueError('ssh_interface argument must either be' +
                              'public_ips or private_ips')
 
-        start = time.time()
-        end = start + timeout
+        poller = self._get_node_poller(ex_list_nodes_kwargs)
+
+        try:
+            for item in poller.iterate(nodes, get_addresses,
+                                       wait_period=wait_period,
+                                       timeout=timeout, cancelled=cancelled):
+                yield item
+        except PollTimeout:
+            raise LibcloudError(value='Timed out after %s seconds' % (timeout),
+                                driver=self)
+
+    def _get_node_poller(self, list_nodes_kwargs=None):
+        """
+        Return the :class:`libcloud.compute.polling.NodePoller` used for
+        waiting on the nodes of this driver.
+
+        All the waiters which don't pass ``list_nodes_kwargs`` share a single
+        poller (and poll loop).
+        """
+        if list_nodes_kwargs:
+            return NodePoller(
+                lambda nodes: self._list_polled_nodes(nodes,
+                                                      list_nodes_kwargs))
+
+        with _NODE_POLLER_LOCK:
+            poller = self.__dict__.get('_node_poller')
+
+            if poller is None:
+                poller = NodePoller(self._list_polled_nodes)
+                self._node_poller = poller
+
+        return poller
+
+    def _list_polled_nodes(self, nodes, list_nodes_kwargs=None):
+        """
+        Return the current version of the provided nodes. Nodes which can't
+        be found are omitted.
 
+        The default implementation lists all the nodes, drivers which can
+        request specific nodes override it.
+
+        :param nodes: Nodes to retrieve.
+        :type nodes: ``list`` of :class:`.Node`
+
+        :param list_nodes_kwargs: Keyword arguments for ``list_nodes``.
+        :type list_nodes_kwargs: ``dict``
+
+        :rtype: ``list`` of :class:`.Node`
+        """
         uuids = set([node.uuid for node in nodes])
 
-        while time.time() < end:
-            all_nodes = self.list_nodes(**ex_list_nodes_kwargs)
-            matching_nodes = list([node for node in all_nodes
-                                   if node.uuid in uuids])
-
-            if len(matching_nodes) > len(uuids):
-                found_uuids = [node.uuid for node in matching_nodes]
-                msg = ('Unable to match specified uuids ' +
-                       '(%s) with existing nodes. Found ' % (uuids) +
-                       'multiple nodes with same uuid: (%s)' % (found_uuids))
-                raise LibcloudError(value=msg, driver=self)
-
-            running_nodes = [node for node in matching_nodes
-                             if node.state == NodeState.RUNNING]
-            addresses = []
-            for node in running_nodes:
-                node_addresses = filter_addresses(getattr(node, ssh_interface))
-                if len(node_addresses) >= 1:
-                    addresses.append(node_addresses)
-
-            if len(running_nodes) == len(uuids) == len(addresses):
-                return list(zip(running_nodes, addresses))
-            else:
-                time.sleep(wait_period)
-                continue
+        all_nodes = self.list_nodes(**(list_nodes_kwargs or {}))
+        matching_nodes = list([node for node in all_nodes
+                               if node.uuid in uuids])
 
-        raise LibcloudError(value='Timed out after %s seconds' % (timeout),
-                            driver=self)
+        if len(matching_nodes) > len(uuids):
+            found_uuids = [node.uuid for node in matching_nodes]
+            msg = ('Unable to match specified uuids ' +
+                   '(%s) with existing nodes. Found ' % (uuids) +
+                   'multiple nodes with same uuid: (%s)' % (found_uuids))
+            raise LibcloudError(value=msg, driver=self)
+
+        return matching_nodes
 
     def _get_and_check_auth(self, auth):
         """
@@ -1513,6 +1746,91 @@ class NodeDriver(BaseDriver):
         raise LibcloudError(value='Could not connect to the remote SSH ' +
                             'server. Giving up.', driver=self)
 
+    def _check_deploy_node_kwargs(self, kwargs):
+        """
+        Check that the nodes created using the provided ``deploy_node``
+        arguments can be accessed using SSH.
+        """
+        if not libcloud.compute.ssh.have_paramiko:
+            raise RuntimeError('paramiko is not installed. You can install ' +
+                               'it using pip: pip install paramiko')
+
+        if 'auth' in kwargs:
+            auth = kwargs['auth']
+            if not isinstance(auth, (NodeAuthSSHKey, NodeAuthPassword)):
+                raise NotImplementedError(
+                    'If providing auth, only NodeAuthSSHKey or'
+                    'NodeAuthPassword is supported')
+        elif 'ssh_key' in kwargs:
+            # If an ssh_key is provided we can try deploy_node
+            pass
+        elif 'create_node' in self.features:
+            f = self.features['create_node']
+            if 'generates_password' not in f and "password" not in f:
+                raise NotImplementedError(
+                    'deploy_node not implemented for this driver')
+        else:
+            raise NotImplementedError(
+                'deploy_node not implemented for this driver')
+
+    def _get_deploy_password(self, node, kwargs):
+        """
+        Return the password used to SSH into the provided node (if any).
+        """
+        password = None
+        if 'auth' in kwargs:
+            if isinstance(kwargs['auth'], NodeAuthPassword):
+                password = kwargs['auth'].password
+        elif 'password' in node.extra:
+            password = node.extra['password']
+
+        return password
+
+    def _deploy_to_node(self, task, node, ssh_hostname, ssh_password, timeout,
+                        kwargs):
+        """
+        Run the deployment task on the provided node, trying the alternate
+        SSH usernames if the deployment fails with the default one.
+
+        :raises: :class:`DeploymentError` if the deployment fails.
+
+        :rtype: :class:`.Node`
+        :return: Node instance on success.
+        """
+        ssh_username = kwargs.get('ssh_username', 'root')
+        ssh_alternate_usernames = kwargs.get('ssh_alternate_usernames', [])
+        ssh_port = kwargs.get('ssh_port', 22)
+        ssh_timeout = kwargs.get('ssh_timeout', 10)
+        ssh_key_file = kwargs.get('ssh_key', None)
+        max_tries = kwargs.get('max_tries', 3)
+
+        deploy_error = None
+
+        for username in ([ssh_username] + ssh_alternate_usernames):
+            try:
+                self._connect_and_run_deployment_script(
+                    task=task, node=node,
+                    ssh_hostname=ssh_hostname, ssh_port=ssh_port,
+                    ssh_username=username, ssh_password=ssh_password,
+                    ssh_key_file=ssh_key_file, ssh_timeout=ssh_timeout,
+                    timeout=timeout, max_tries=max_tries)
+            except Exception:
+                # Try alternate username
+                # Todo: Need to fix paramiko so we can catch a more specific
+                # exception
+                e = sys.exc_info()[1]
+                deploy_error = e
+            else:
+                # Script successfully executed, don't try alternate username
+                deploy_error = None
+                break
+
+        if deploy_error is not None:
+            raise DeploymentError(node=node, original_exception=deploy_error,
+                                  driver=self)
+
+        return node
+
     def _connect_and_run_deployment_script(self, task, node, ssh_hostname,
                                            ssh_port, ssh_username,
                                            ssh_password, ssh_key_file,
@@ -1585,6 +1903,17 @@ class NodeDriver(BaseDriver):
                               driver_name=self.api_name,
                               size_id=size_id)
 
+    def _is_overridden(self, method_name):
+        """
+        Return True if the driver class overrides the provided
+        :class:`NodeDriver` method.
+        """
+        for cls in type(self).__mro__:
+            if method_name in cls.__dict__:
+                return cls is not NodeDriver
+
+        return False
+
 
 if __name__ == '__main__':
     import doctest
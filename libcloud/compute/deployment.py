@@ -86,16 +86,22 @@ class FileDeployment(Deployment):
     Installs a file on the server.
     """
 
-    def __init__(self, source, target):
+    def __init__(self, source, target, progress_callback=None):
         """
         :type source: ``str``
         :keyword source: Local path of file to be installed
 
         :type target: ``str``
         :keyword target: Path to install file on node
+
+        :type progress_callback: ``callable``
+        :keyword progress_callback: Optional callable which is called with
+                                    the number of bytes uploaded so far and
+                                    the total number of bytes.
         """
         self.source = source
         self.target = target
+        self.progress_callback = progress_callback
 
     def run(self, node, client):
         """
@@ -105,11 +111,9 @@ class FileDeployment(Deployment):
         """
         perms = int(oct(os.stat(self.source).st_mode)[4:], 8)
 
-        with open(self.source, 'rb') as fp:
-            content = fp.read()
-
-        client.put(path=self.target, chmod=perms,
-                   contents=content)
+        # The file is streamed by the clients which support it
+        client.put_file(path=self.target, local_path=self.source,
+                        chmod=perms, progress_callback=self.progress_callback)
         return node
 
 
@@ -125,7 +129,9 @@ class ScriptDeployment(Deployment):
     you are running a plan shell script.
     """
 
-    def __init__(self, script, args=None, name=None, delete=False):
+    def __init__(self, script, args=None, name=None, delete=False,
+                 stdout_callback=None, stderr_callback=None,
+                 max_output_size=None):
         """
         :type script: ``str``
         :keyword script: Contents of the script to run.
@@ -140,6 +146,23 @@ class ScriptDeployment(Deployment):
 
         :type delete: ``bool``
         :keyword delete: Whether to delete the script on completion.
+
+        :type stdout_callback: ``callable``
+        :keyword stdout_callback: Optional callable which receives the
+                                  standard output of the script as it's
+                                  produced (:class:`ShellOutSSHClient` calls
+                                  it once with the whole output).
+
+        :type stderr_callback: ``callable``
+        :keyword stderr_callback: Optional callable which receives the
+                                  standard error of the script as it's
+                                  produced (:class:`ShellOutSSHClient` calls
+                                  it once with the whole output).
+
+        :type max_output_size: ``int``
+        :keyword max_output_size: Optional maximum number of trailing
+                                  characters of the output which are kept in
+                                  ``stdout`` and ``stderr``.
         """
         script = self._get_string_value(argument_name='script',
                                         argument_value=script)
@@ -151,6 +174,9 @@ class ScriptDeployment(Deployment):
         self.exit_status = None
         self.delete = delete
         self.name = name
+        self.stdout_callback = stdout_callback
+        self.stderr_callback = stderr_callback
+        self.max_output_size = max_output_size
 
         if self.name is None:
             # File is put under user's home directory
@@ -183,7 +209,19 @@ class ScriptDeployment(Deployment):
         else:
             cmd = name
 
-        self.stdout, self.stderr, self.exit_status = client.run(cmd)
+        run_kwargs = {}
+
+        if self.stdout_callback:
+            run_kwargs['stdout_callback'] = self.stdout_callback
+
+        if self.stderr_callback:
+            run_kwargs['stderr_callback'] = self.stderr_callback
+
+        if self.max_output_size is not None:
+            run_kwargs['max_output_size'] = self.max_output_size
+
+        self.stdout, self.stderr, self.exit_status = client.run(cmd,
+                                                                **run_kwargs)
 
         if self.delete:
             client.delete(self.name)
@@ -198,7 +236,9 @@ class ScriptFileDeployment(ScriptDeployment):
     the script content.
     """
 
-    def __init__(self, script_file, args=None, name=None, delete=False):
+    def __init__(self, script_file, args=None, name=None, delete=False,
+                 stdout_callback=None, stderr_callback=None,
+                 max_output_size=None):
         """
         :type script_file: ``str``
         :keyword script_file: Path to a file containing the script to run.
@@ -214,6 +254,9 @@ class ScriptFileDeployment(ScriptDeployment):
 
         :type delete: ``bool``
         :keyword delete: Whether to delete the script on completion.
+
+        See :class:`ScriptDeployment` for the ``stdout_callback``,
+        ``stderr_callback`` and ``max_output_size`` arguments.
         """
         with open(script_file, 'rb') as fp:
             content = fp.read()
@@ -221,10 +264,10 @@ class ScriptFileDeployment(ScriptDeployment):
         if PY3:
             content = content.decode('utf-8')
 
-        super(ScriptFileDeployment, self).__init__(script=content,
-                                                   args=args,
-                                                   name=name,
-                                                   delete=delete)
+        super(ScriptFileDeployment, self).__init__(
+            script=content, args=args, name=name, delete=delete,
+            stdout_callback=stdout_callback, stderr_callback=stderr_callback,
+            max_output_size=max_output_size)
 
 
 class MultiStepDeployment(Deployment):
@@ -36,11 +36,16 @@ from libcloud.storage.types import ObjectDoesNotExistError
 from libcloud.common.exceptions import BaseHTTPError
 from libcloud.storage.drivers.azure_blobs import AzureBlobsStorageDriver
 from libcloud.utils.py3 import basestring
+from libcloud.utils.py3 import urlparse
+from libcloud.utils.py3 import parse_qsl
 from libcloud.utils import iso8601
 
 
 RESOURCE_API_VERSION = '2016-04-30-preview'
 
+# API version of the virtual machine list calls which support ``statusOnly``
+VM_STATUS_API_VERSION = '2019-07-01'
+
 
 class AzureImage(NodeImage):
     """Represents a Marketplace node image that an Azure VM can boot from."""
@@ -370,34 +375,65 @@ class AzureNodeDriver(NodeDriver):
         :type ex_urn: ``str``
 
         :param ex_fetch_nic: Fetch NIC resources in order to get
-        IP address information for nodes.  If True, requires an extra API
-        call for each NIC of each node.  If False, IP addresses will not
-        be returned.
+        IP address information for nodes.  If True, the NICs and public IP
+        addresses of the subscription (or resource group) are listed once and
+        joined to the nodes; NICs and public IP addresses which aren't listed
+        (e.g. located in another resource group) require an extra API call
+        each.  If False, IP addresses will not be returned.
         :type ex_urn: ``bool``
 
-        :param ex_fetch_power_state: Fetch node power state.  If True, requires
-        an extra API call for each node.  If False, node state
-        will be returned based on provisioning state only.
+        :param ex_fetch_power_state: Fetch node power state.  If True, the
+        power states are retrieved using a single ``statusOnly`` listing of
+        the virtual machines; nodes missing from it require an extra API call
+        each.  If False, node state will be returned based on provisioning
+        state only.
         :type ex_urn: ``bool``
 
         :return:  list of node objects
         :rtype: ``list`` of :class:`.Node`
         """
+        return list(self.iterate_nodes(
+            ex_resource_group=ex_resource_group,
+            ex_fetch_nic=ex_fetch_nic,
+            ex_fetch_power_state=ex_fetch_power_state))
 
-        if ex_resource_group:
-            action = "/subscriptions/%s/resourceGroups/%s/" \
-                     "providers/Microsoft.Compute/virtualMachines" \
-                     % (self.subscription_id, ex_resource_group)
-        else:
-            action = "/subscriptions/%s/providers/Microsoft.Compute/" \
-                     "virtualMachines" \
-                     % (self.subscription_id)
-        r = self.connection.request(action,
-                                    params={"api-version": "2015-06-15"})
-        return [self._to_node(n,
-                              fetch_nic=ex_fetch_nic,
-                              fetch_power_state=ex_fetch_power_state)
-                for n in r.object["value"]]
+    def iterate_nodes(self, ex_resource_group=None,
+                      ex_fetch_nic=True,
+                      ex_fetch_power_state=True):
+        """
+        Return a generator of all nodes, following the ``nextLink`` of
+        the paginated API responses.
+
+        See :meth:`list_nodes` for the parameters.
+
+        :return:  generator of node objects
+        :rtype: ``generator`` of :class:`.Node`
+        """
+        action = self._get_resource_list_action(
+            "Microsoft.Compute/virtualMachines", ex_resource_group)
+        values = self._iterate_paginated_request(
+            action, params={"api-version": "2015-06-15"})
+
+        nic_map = None
+        public_ip_map = None
+        power_state_map = None
+
+        for value in values:
+            # The lookup tables are only built once the first node is
+            # received, so listing an empty subscription stays a single call
+            if ex_fetch_nic and nic_map is None:
+                nic_map = self._get_nic_map(ex_resource_group)
+                public_ip_map = self._get_public_ip_map(ex_resource_group)
+
+            if ex_fetch_power_state and power_state_map is None:
+                power_state_map = self._get_power_state_map(ex_resource_group)
+
+            yield self._to_node(value,
+                                fetch_nic=ex_fetch_nic,
+                                fetch_power_state=ex_fetch_power_state,
+                                nic_map=nic_map,
+                                public_ip_map=public_ip_map,
+                                power_state_map=power_state_map)
 
     def create_node(self,
                     name,
@@ -905,6 +941,19 @@ class AzureNodeDriver(NodeDriver):
 
         :rtype: list of :class:`StorageVolume`
         """
+        return list(self.iterate_volumes(ex_resource_group=ex_resource_group))
+
+    def iterate_volumes(self, ex_resource_group=None):
+        """
+        Return a generator of all the disks under a resource group or
+        subscription.
+
+        :param ex_resource_group: The identifier of your subscription
+            where the managed disks are located.
+        :type ex_resource_group: ``str``
+
+        :rtype: generator of :class:`StorageVolume`
+        """
         if ex_resource_group:
             action = u'/subscriptions/{subscription_id}/resourceGroups' \
                      u'/{resource_group}/providers/Microsoft.Compute/disks'
@@ -917,14 +966,13 @@ class AzureNodeDriver(NodeDriver):
             resource_group=ex_resource_group
         )
 
-        response = self.connection.request(
+        values = self._iterate_paginated_request(
             action,
-            method='GET',
             params={
                 'api-version': RESOURCE_API_VERSION
             }
         )
-        return [self._to_volume(volume) for volume in response.object['value']]
+        return (self._to_volume(volume) for volume in values)
 
     def attach_volume(self, node, volume, ex_lun=None,
                       ex_vhd_uri=None, ex_vhd_create=False, **ex_kwargs):
@@ -1556,10 +1604,10 @@ class AzureNodeDriver(NodeDriver):
             action = "/subscriptions/%s/resourceGroups/%s/providers" \
                      "/Microsoft.Network/networkInterfaces" % \
                      (self.subscription_id, resource_group)
-        r = self.connection.request(
+        values = self._iterate_paginated_request(
             action,
             params={"api-version": "2015-06-15"})
-        return [self._to_nic(net) for net in r.object["value"]]
+        return [self._to_nic(net) for net in values]
 
     def ex_get_nic(self, id):
         """
@@ -1673,9 +1721,9 @@ class AzureNodeDriver(NodeDriver):
         action = "/subscriptions/%s/resourceGroups/%s/" \
                  "providers/Microsoft.Network/publicIPAddresses" \
                  % (self.subscription_id, resource_group)
-        r = self.connection.request(action,
-                                    params={"api-version": "2015-06-15"})
-        return [self._to_ip_address(net) for net in r.object["value"]]
+        values = self._iterate_paginated_request(
+            action, params={"api-version": "2015-06-15"})
+        return [self._to_ip_address(net) for net in values]
 
     def ex_create_public_ip(self, name, resource_group, location=None,
                             public_ip_allocation_method=None):
@@ -1990,50 +2038,161 @@ class AzureNodeDriver(NodeDriver):
         return kwargs
 
     def _fetch_power_state(self, data):
-        state = NodeState.UNKNOWN
         try:
             action = "%s/InstanceView" % (data["id"])
             r = self.connection.request(action,
                                         params={"api-version": "2015-06-15"})
-            for status in r.object["statuses"]:
-                if status["code"] in ["ProvisioningState/creating"]:
-                    state = NodeState.PENDING
-                    break
-                elif status["code"] == "ProvisioningState/deleting":
-                    state = NodeState.TERMINATED
-                    break
-                elif status["code"].startswith("ProvisioningState/failed"):
-                    state = NodeState.ERROR
-                    break
-                elif status["code"] == "ProvisioningState/updating":
-                    state = NodeState.UPDATING
-                    break
-                elif status["code"] == "ProvisioningState/succeeded":
-                    pass
+            return self._to_power_state(r.object["statuses"])
+        except BaseHTTPError:
+            return NodeState.UNKNOWN
 
-                if status["code"] == "PowerState/deallocated":
-                    state = NodeState.STOPPED
-                    break
-                elif status["code"] == "PowerState/stopped":
-                    state = NodeState.PAUSED
-                    break
-                elif status["code"] == "PowerState/deallocating":
-                    state = NodeState.PENDING
-                    break
-                elif status["code"] == "PowerState/running":
-                    state = NodeState.RUNNING
+    def _to_power_state(self, statuses):
+        state = NodeState.UNKNOWN
+        for status in statuses:
+            if status["code"] in ["ProvisioningState/creating"]:
+                state = NodeState.PENDING
+                break
+            elif status["code"] == "ProvisioningState/deleting":
+                state = NodeState.TERMINATED
+                break
+            elif status["code"].startswith("ProvisioningState/failed"):
+                state = NodeState.ERROR
+                break
+            elif status["code"] == "ProvisioningState/updating":
+                state = NodeState.UPDATING
+                break
+            elif status["code"] == "ProvisioningState/succeeded":
+                pass
+
+            if status["code"] == "PowerState/deallocated":
+                state = NodeState.STOPPED
+                break
+            elif status["code"] == "PowerState/stopped":
+                state = NodeState.PAUSED
+                break
+            elif status["code"] == "PowerState/deallocating":
+                state = NodeState.PENDING
+                break
+            elif status["code"] == "PowerState/running":
+                state = NodeState.RUNNING
+        return state
+
+    def _get_resource_list_action(self, resource_type, resource_group=None):
+        if resource_group:
+            return "/subscriptions/%s/resourceGroups/%s/providers/%s" \
+                   % (self.subscription_id, resource_group, resource_type)
+
+        return "/subscriptions/%s/providers/%s" \
+               % (self.subscription_id, resource_type)
+
+    def _get_nic_map(self, resource_group=None):
+        """
+        Return the NICs of the subscription or resource group indexed by
+        their (lower case) resource ID.
+        """
+        action = self._get_resource_list_action(
+            "Microsoft.Network/networkInterfaces", resource_group)
+
+        try:
+            return dict((nic["id"].lower(), self._to_nic(nic))
+                        for nic in self._iterate_paginated_request(
+                            action, params={"api-version": "2015-06-15"}))
+        except BaseHTTPError:
+            # The NICs are fetched one by one
+            return {}
+
+    def _get_public_ip_map(self, resource_group=None):
+        """
+        Return the public IP addresses of the subscription or resource group
+        indexed by their (lower case) resource ID.
+        """
+        action = self._get_resource_list_action(
+            "Microsoft.Network/publicIPAddresses", resource_group)
+
+        try:
+            return dict((ip["id"].lower(), self._to_ip_address(ip))
+                        for ip in self._iterate_paginated_request(
+                            action, params={"api-version": "2015-06-15"}))
         except BaseHTTPError:
+            # The public IP addresses are fetched one by one
+            return {}
+
+    def _get_power_state_map(self, resource_group=None):
+        """
+        Return the power states of the virtual machines of the subscription
+        or resource group indexed by their (lower case) resource ID.
+
+        Virtual machines without an instance view in the ``statusOnly``
+        listing are not included.
+        """
+        action = self._get_resource_list_action(
+            "Microsoft.Compute/virtualMachines", resource_group)
+        params = {"api-version": VM_STATUS_API_VERSION, "statusOnly": "true"}
+        power_states = {}
+
+        try:
+            for vm in self._iterate_paginated_request(action, params=params):
+                instance_view = vm.get("properties", {}).get("instanceView")
+
+                if instance_view and "statuses" in instance_view:
+                    power_states[vm["id"].lower()] = \
+                        self._to_power_state(instance_view["statuses"])
+        except BaseHTTPError:
+            # The power states are fetched one by one
             pass
-        return state
 
-    def _to_node(self, data, fetch_nic=True, fetch_power_state=True):
+        return power_states
+
+    def _iterate_paginated_request(self, action, params=None):
+        """
+        Return a generator which yields the ``value`` elements of a list
+        API call, requesting the next page (``nextLink``) once the previous
+        one has been consumed.
+
+        :param action: Path of the list API call
+        :type action: ``str``
+
+        :param params: Query parameters of the first request
+        :type params: ``dict``
+
+        :rtype: ``generator`` of ``dict``
+        """
+        while action:
+            response = self.connection.request(action, method='GET',
+                                               params=params).object
+
+            for value in response.get('value', []):
+                yield value
+
+            next_link = response.get('nextLink')
+
+            if not next_link:
+                break
+
+            next_link = urlparse.urlparse(next_link)
+            action = next_link.path
+            params = dict(parse_qsl(next_link.query))
+
+    def _to_node(self, data, fetch_nic=True, fetch_power_state=True,
+                 nic_map=None, public_ip_map=None, power_state_map=None):
+        """
+        ``nic_map``, ``public_ip_map`` and ``power_state_map`` are optional
+        lookup tables (indexed by lower case resource ID) of already listed
+        resources, the resources missing from them are requested one by one.
+        """
+        nic_map = nic_map or {}
+        public_ip_map = public_ip_map or {}
+        power_state_map = power_state_map or {}
+
         private_ips = []
         public_ips = []
         nics = data["properties"]["networkProfile"]["networkInterfaces"]
         if fetch_nic:
             for nic in nics:
                 try:
-                    n = self.ex_get_nic(nic["id"])
+                    n = nic_map.get(nic["id"].lower())
+                    if n is None:
+                        n = self.ex_get_nic(nic["id"])
                     priv = n.extra["ipConfigurations"][0]["properties"] \
                         .get("privateIPAddress")
                     if priv:
@@ -2041,7 +2200,9 @@ class AzureNodeDriver(NodeDriver):
                     pub = n.extra["ipConfigurations"][0]["properties"].get(
                         "publicIPAddress")
                     if pub:
-                        pub_addr = self.ex_get_public_ip(pub["id"])
+                        pub_addr = public_ip_map.get(pub["id"].lower())
+                        if pub_addr is None:
+                            pub_addr = self.ex_get_public_ip(pub["id"])
                         addr = pub_addr.extra.get("ipAddress")
                         if addr:
                             public_ips.append(addr)
@@ -2050,7 +2211,9 @@ class AzureNodeDriver(NodeDriver):
 
         state = NodeState.UNKNOWN
         if fetch_power_state:
-            state = self._fetch_power_state(data)
+            state = power_state_map.get(data["id"].lower())
+            if state is None:
+                state = self._fetch_power_state(data)
         else:
             ps = data["properties"]["provisioningState"].lower()
             if ps == "creating":
@@ -18,6 +18,7 @@ from __future__ import with_statement
 import sys
 import base64
 import warnings
+import itertools
 
 from libcloud.utils.py3 import b
 from libcloud.utils.py3 import urlparse
@@ -1320,17 +1321,20 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
                                                    port=port)
 
     def list_images(self, location=None):
+        return list(self.iterate_images(location=location))
+
+    def iterate_images(self, location=None):
         args = {
             'templatefilter': 'executable'
         }
         if location is not None:
             args['zoneid'] = location.id
 
-        imgs = self._sync_request(command='listTemplates',
-                                  params=args,
-                                  method='GET')
-        images = []
-        for img in imgs.get('template', []):
+        imgs = self._iterate_sync_request(command='listTemplates',
+                                          key='template',
+                                          params=args,
+                                          method='GET')
+        for img in imgs:
 
             extra = {'hypervisor': img['hypervisor'],
                      'format': img['format'],
@@ -1341,12 +1345,11 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
             if size is not None:
                 extra.update({'size': img['size']})
 
-            images.append(NodeImage(
+            yield NodeImage(
                 id=img['id'],
                 name=img['name'],
                 driver=self.connection.driver,
-                extra=extra))
-        return images
+                extra=extra)
 
     def list_locations(self):
         """
@@ -1376,7 +1379,17 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
 
         :rtype: ``list`` of :class:`CloudStackNode`
         """
+        return list(self.iterate_nodes(project=project, location=location))
+
+    def iterate_nodes(self, project=None, location=None):
+        """
+        Return a generator of the nodes, the virtual machines are requested
+        page by page while the generator is consumed.
 
+        See :meth:`list_nodes` for the parameters.
+
+        :rtype: ``generator`` of :class:`CloudStackNode`
+        """
         args = {}
 
         if project:
@@ -1385,13 +1398,39 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         if location is not None:
             args['zoneid'] = location.id
 
-        vms = self._sync_request('listVirtualMachines', params=args)
-        addrs = self._sync_request('listPublicIpAddresses', params=args)
-        port_forwarding_rules = self._sync_request('listPortForwardingRules')
-        ip_forwarding_rules = self._sync_request('listIpForwardingRules')
+        # The first page of the virtual machines, the public IP addresses and
+        # the forwarding rules are requested concurrently
+        listings = [('listVirtualMachines', 'virtualmachine', args),
+                    ('listPublicIpAddresses', 'publicipaddress', args),
+                    ('listPortForwardingRules', 'portforwardingrule', None),
+                    ('listIpForwardingRules', 'ipforwardingrule', None)]
+
+        def fetch(driver, listing):
+            command, key, params = listing
+
+            if command == 'listVirtualMachines':
+                return driver._sync_request_page(command, key=key,
+                                                 params=params)
+
+            return list(driver._iterate_sync_request(command, key=key,
+                                                     params=params))
+
+        (vms, page_size), addrs, port_forwarding_rules, ip_forwarding_rules = \
+            self._imap_with_drivers(fetch, listings,
+                                    max_concurrency=len(listings))
+
+        # The page size may have been lowered to the maximum of the server
+        self.page_size = page_size
+
+        if page_size and len(vms) == page_size:
+            vms = itertools.chain(vms, self._iterate_sync_request(
+                'listVirtualMachines', key='virtualmachine', params=args,
+                page_size=page_size, page=2))
 
         public_ips_map = {}
-        for addr in addrs.get('publicipaddress', []):
+        addrs_by_ip = {}
+        for addr in addrs:
+            addrs_by_ip.setdefault(addr['ipaddress'], addr)
             if 'virtualmachineid' not in addr:
                 continue
             vm_id = str(addr['virtualmachineid'])
@@ -1399,9 +1438,19 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
                 public_ips_map[vm_id] = {}
             public_ips_map[vm_id][addr['ipaddress']] = addr['id']
 
-        nodes = []
+        # Index the forwarding rules by virtual machine so every node only
+        # looks at its own rules
+        ip_forwarding_rules_map = {}
+        for r in ip_forwarding_rules:
+            ip_forwarding_rules_map.setdefault(
+                str(r['virtualmachineid']), []).append(r)
+
+        port_forwarding_rules_map = {}
+        for r in port_forwarding_rules:
+            port_forwarding_rules_map.setdefault(
+                str(r['virtualmachineid']), []).append(r)
 
-        for vm in vms.get('virtualmachine', []):
+        for vm in vms:
             public_ips = public_ips_map.get(str(vm['id']), {}).keys()
             public_ips = list(public_ips)
             node = self._to_node(data=vm, public_ips=public_ips)
@@ -1414,40 +1463,35 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
 
             rules = []
             for addr in addresses:
-                for r in ip_forwarding_rules.get('ipforwardingrule', []):
-                    if str(r['virtualmachineid']) == node.id:
-                        rule = CloudStackIPForwardingRule(node, r['id'],
-                                                          addr,
-                                                          r['protocol']
-                                                          .upper(),
-                                                          r['startport'],
-                                                          r['endport'])
-                        rules.append(rule)
+                for r in ip_forwarding_rules_map.get(node.id, []):
+                    rule = CloudStackIPForwardingRule(node, r['id'],
+                                                      addr,
+                                                      r['protocol']
+                                                      .upper(),
+                                                      r['startport'],
+                                                      r['endport'])
+                    rules.append(rule)
             node.extra['ip_forwarding_rules'] = rules
 
             rules = []
-            for r in port_forwarding_rules.get('portforwardingrule', []):
-                if str(r['virtualmachineid']) == node.id:
-                    addr = [CloudStackAddress(id=a['id'],
-                                              address=a['ipaddress'],
-                                              driver=node.driver)
-                            for a in addrs.get('publicipaddress', [])
-                            if a['ipaddress'] == r['ipaddress']]
-                    rule = CloudStackPortForwardingRule(node, r['id'],
-                                                        addr[0],
-                                                        r['protocol'].upper(),
-                                                        r['publicport'],
-                                                        r['privateport'],
-                                                        r['publicendport'],
-                                                        r['privateendport'])
-                    if not addr[0].address in node.public_ips:
-                        node.public_ips.append(addr[0].address)
-                    rules.append(rule)
+            for r in port_forwarding_rules_map.get(node.id, []):
+                a = addrs_by_ip[r['ipaddress']]
+                addr = CloudStackAddress(id=a['id'],
+                                         address=a['ipaddress'],
+                                         driver=node.driver)
+                rule = CloudStackPortForwardingRule(node, r['id'],
+                                                    addr,
+                                                    r['protocol'].upper(),
+                                                    r['publicport'],
+                                                    r['privateport'],
+                                                    r['publicendport'],
+                                                    r['privateendport'])
+                if addr.address not in node.public_ips:
+                    node.public_ips.append(addr.address)
+                rules.append(rule)
             node.extra['port_forwarding_rules'] = rules
 
-            nodes.append(node)
-
-        return nodes
+            yield node
 
     def ex_get_node(self, node_id, project=None):
         """
@@ -1816,10 +1860,10 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         if project is not None:
             args['projectid'] = project.id
 
-        res = self._sync_request(command='listNetworks',
-                                 params=args,
-                                 method='GET')
-        nets = res.get('network', [])
+        nets = self._iterate_sync_request(command='listNetworks',
+                                          key='network',
+                                          params=args,
+                                          method='GET')
 
         networks = []
         extra_map = RESOURCE_EXTRA_ATTRIBUTES_MAP['network']
@@ -2010,10 +2054,10 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         if project is not None:
             args['projectid'] = project.id
 
-        res = self._sync_request(command='listVPCs',
-                                 params=args,
-                                 method='GET')
-        vpcs = res.get('vpc', [])
+        vpcs = self._iterate_sync_request(command='listVPCs',
+                                          key='vpc',
+                                          params=args,
+                                          method='GET')
 
         networks = []
         for vpc in vpcs:
@@ -2041,10 +2085,10 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         if vpc_id is not None:
             args['vpcid'] = vpc_id
 
-        res = self._sync_request(command='listRouters',
-                                 params=args,
-                                 method='GET')
-        rts = res.get('router', [])
+        rts = self._iterate_sync_request(command='listRouters',
+                                         key='router',
+                                         params=args,
+                                         method='GET')
 
         routers = []
         for router in rts:
@@ -2255,18 +2299,28 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
 
         :rtype: ``list`` of :class:`StorageVolume`
         """
+        return list(self.iterate_volumes(node=node))
+
+    def iterate_volumes(self, node=None):
+        """
+        Return a generator of the volumes, requested page by page.
+
+        :param node: Only return volumes for the provided node.
+        :type node: :class:`CloudStackNode`
+
+        :rtype: ``generator`` of :class:`StorageVolume`
+        """
+        params = {}
+
         if node:
-            volumes = self._sync_request(command='listVolumes',
-                                         params={'virtualmachineid': node.id},
-                                         method='GET')
-        else:
-            volumes = self._sync_request(command='listVolumes',
-                                         method='GET')
+            params['virtualmachineid'] = node.id
 
-        list_volumes = []
+        volumes = self._iterate_sync_request(command='listVolumes',
+                                             key='volume', params=params,
+                                             method='GET')
 
         extra_map = RESOURCE_EXTRA_ATTRIBUTES_MAP['volume']
-        for vol in volumes.get('volume', []):
+        for vol in volumes:
             extra = self._get_extra_dict(vol, extra_map)
 
             if 'tags' in vol:
@@ -2274,13 +2328,12 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
 
             state = self._to_volume_state(vol)
 
-            list_volumes.append(StorageVolume(id=vol['id'],
-                                              name=vol['name'],
-                                              size=vol['size'],
-                                              state=state,
-                                              driver=self,
-                                              extra=extra))
-        return list_volumes
+            yield StorageVolume(id=vol['id'],
+                                name=vol['name'],
+                                size=vol['size'],
+                                state=state,
+                                driver=self,
+                                extra=extra)
 
     def ex_get_volume(self, volume_id, project=None):
         """
@@ -2363,11 +2416,11 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         :rtype:   ``list`` of :class:`libcloud.compute.base.KeyPair`
         """
         extra_args = kwargs.copy()
-        res = self._sync_request(command='listSSHKeyPairs',
-                                 params=extra_args,
-                                 method='GET')
-        key_pairs = res.get('sshkeypair', [])
-        key_pairs = self._to_key_pairs(data=key_pairs)
+        key_pairs = self._iterate_sync_request(command='listSSHKeyPairs',
+                                               key='sshkeypair',
+                                               params=extra_args,
+                                               method='GET')
+        key_pairs = self._to_key_pairs(data=list(key_pairs))
         return key_pairs
 
     def get_key_pair(self, name):
@@ -2485,14 +2538,12 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         """
         ips = []
 
-        res = self._sync_request(command='listPublicIpAddresses',
-                                 method='GET')
-
-        # Workaround for basic zones
-        if not res:
-            return ips
+        # Basic zones return an empty response
+        res = self._iterate_sync_request(command='listPublicIpAddresses',
+                                         key='publicipaddress',
+                                         method='GET')
 
-        for ip in res['publicipaddress']:
+        for ip in res:
             ips.append(CloudStackAddress(ip['id'],
                                          ip['ipaddress'],
                                          self,
@@ -2836,21 +2887,19 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
             args['projectid'] = project_id
 
         rules = []
-        result = self._sync_request(command='listPortForwardingRules',
-                                    params=args,
-                                    method='GET')
-        if result != {}:
-            public_ips = self.ex_list_public_ips()
-            nodes = self.list_nodes()
-            for rule in result['portforwardingrule']:
-                node = [n for n in nodes
-                        if n.id == str(rule['virtualmachineid'])]
-                addr = [a for a in public_ips if
-                        a.address == rule['ipaddress']]
+        result = list(self._iterate_sync_request(
+            command='listPortForwardingRules', key='portforwardingrule',
+            params=args, method='GET'))
+        if result:
+            public_ips = self._get_public_ips_by_address()
+            nodes = self._get_nodes_by_id()
+            for rule in result:
+                node = nodes[str(rule['virtualmachineid'])]
+                addr = public_ips[rule['ipaddress']]
                 rules.append(CloudStackPortForwardingRule
-                             (node[0],
+                             (node,
                               rule['id'],
-                              addr[0],
+                              addr,
                               rule['protocol'],
                               rule['publicport'],
                               rule['privateport'],
@@ -3034,23 +3083,21 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         if virtualmachine_id is not None:
             args['virtualmachineid'] = virtualmachine_id
 
-        result = self._sync_request(command='listIpForwardingRules',
-                                    params=args,
-                                    method='GET')
+        result = list(self._iterate_sync_request(
+            command='listIpForwardingRules', key='ipforwardingrule',
+            params=args, method='GET'))
 
         rules = []
-        if result != {}:
-            public_ips = self.ex_list_public_ips()
-            nodes = self.list_nodes()
-            for rule in result['ipforwardingrule']:
-                node = [n for n in nodes
-                        if n.id == str(rule['virtualmachineid'])]
-                addr = [a for a in public_ips if
-                        a.address == rule['ipaddress']]
+        if result:
+            public_ips = self._get_public_ips_by_address()
+            nodes = self._get_nodes_by_id()
+            for rule in result:
+                node = nodes[str(rule['virtualmachineid'])]
+                addr = public_ips[rule['ipaddress']]
                 rules.append(CloudStackIPForwardingRule
-                             (node[0],
+                             (node,
                               rule['id'],
-                              addr[0],
+                              addr,
                               rule['protocol'],
                               rule['startport'],
                               rule['endport']))
@@ -4740,6 +4787,28 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
                               driver=self, extra=extra)
         return node
 
+    def _get_nodes_by_id(self):
+        """
+        Return the nodes indexed by their ID.
+
+        :rtype: ``dict``
+        """
+        nodes = {}
+        for node in self.iterate_nodes():
+            nodes.setdefault(node.id, node)
+        return nodes
+
+    def _get_public_ips_by_address(self):
+        """
+        Return the public IP addresses indexed by their address.
+
+        :rtype: ``dict``
+        """
+        public_ips = {}
+        for ip in self.ex_list_public_ips():
+            public_ips.setdefault(ip.address, ip)
+        return public_ips
+
     def _to_key_pairs(self, data):
         key_pairs = [self._to_key_pair(data=item) for item in data]
         return key_pairs
@@ -99,8 +99,11 @@ class DigitalOcean_v2_NodeDriver(DigitalOcean_v2_BaseDriver,
                             'ssh_keys']
 
     def list_images(self):
-        data = self._paginated_request('/v2/images', 'images')
-        return list(map(self._to_image, data))
+        return list(self.iterate_images())
+
+    def iterate_images(self):
+        data = self._iterate_paginated_request('/v2/images', 'images')
+        return (self._to_image(value) for value in data)
 
     def list_key_pairs(self):
         """
@@ -117,16 +120,22 @@ class DigitalOcean_v2_NodeDriver(DigitalOcean_v2_BaseDriver,
         return list(map(self._to_location, data))
 
     def list_nodes(self):
-        data = self._paginated_request('/v2/droplets', 'droplets')
-        return list(map(self._to_node, data))
+        return list(self.iterate_nodes())
+
+    def iterate_nodes(self):
+        data = self._iterate_paginated_request('/v2/droplets', 'droplets')
+        return (self._to_node(value) for value in data)
 
     def list_sizes(self):
         data = self._paginated_request('/v2/sizes', 'sizes')
         return list(map(self._to_size, data))
 
     def list_volumes(self):
-        data = self._paginated_request('/v2/volumes', 'volumes')
-        return list(map(self._to_volume, data))
+        return list(self.iterate_volumes())
+
+    def iterate_volumes(self):
+        data = self._iterate_paginated_request('/v2/volumes', 'volumes')
+        return (self._to_volume(value) for value in data)
 
     def create_node(self, name, size, image, location, ex_create_attr=None,
                     ex_ssh_key_ids=None, ex_user_data=None):
@@ -243,7 +252,8 @@ class DigitalOcean_v2_NodeDriver(DigitalOcean_v2_BaseDriver,
         :return: A NodeImage object
         :rtype: :class:`NodeImage`
         """
-        data = self._paginated_request('/v2/images/%s' % (image_id), 'image')
+        res = self.connection.request('/v2/images/%s' % (image_id))
+        data = res.object['image']
         return self._to_image(data)
 
     def ex_change_kernel(self, node, kernel_id):
@@ -504,9 +514,8 @@ class DigitalOcean_v2_NodeDriver(DigitalOcean_v2_BaseDriver,
 
         :rtype: :class:`Node`
         """
-        data = self._paginated_request(
-            '/v2/droplets/{}'.format(node_id), 'droplet'
-        )
+        res = self.connection.request('/v2/droplets/{}'.format(node_id))
+        data = res.object['droplet']
         return self._to_node(data)
 
     def ex_create_floating_ip(self, location):
@@ -31,6 +31,7 @@ from libcloud.utils.xml import fixxpath, findtext, findattr, findall
 from libcloud.utils.publickey import get_pubkey_ssh2_fingerprint
 from libcloud.utils.publickey import get_pubkey_comment
 from libcloud.utils.iso8601 import parse_date
+from libcloud.utils.misc import chunked
 from libcloud.common.aws import AWSBaseResponse, SignedAWSConnection
 from libcloud.common.aws import DEFAULT_SIGNATURE_VERSION
 from libcloud.common.types import (InvalidCredsError, MalformedResponseError,
@@ -81,6 +82,12 @@ __all__ = [
 API_VERSION = '2016-11-15'
 NAMESPACE = 'http://ec2.amazonaws.com/doc/%s/' % (API_VERSION)
 
+# Maximum number of instances returned by a single DescribeInstances request
+DESCRIBE_INSTANCES_MAX_RESULTS = 1000
+
+# Maximum number of values of a single filter
+MAX_FILTER_VALUES = 200
+
 # Eucalyptus Constants
 DEFAULT_EUCA_API_VERSION = '3.3.0'
 EUCA_NAMESPACE = 'http://msgs.eucalyptus.com/%s' % (DEFAULT_EUCA_API_VERSION)
@@ -1614,6 +1621,14 @@ class BaseEC2NodeDriver(NodeDriver):
     path = '/'
     signature_version = DEFAULT_SIGNATURE_VERSION
 
+    # Default number of instances requested per DescribeInstances page (None
+    # means that the provider returns all the instances in one response)
+    list_nodes_page_size = None
+
+    # True if the provider supports the instance-id filter, otherwise the
+    # instances and the addresses are listed without filtering by instance
+    supports_instance_id_filter = True
+
     NODE_STATE_MAP = {
         'pending': NodeState.PENDING,
         'running': NodeState.RUNNING,
@@ -1638,7 +1653,8 @@ class BaseEC2NodeDriver(NodeDriver):
         'error': VolumeSnapshotState.ERROR,
     }
 
-    def list_nodes(self, ex_node_ids=None, ex_filters=None):
+    def list_nodes(self, ex_node_ids=None, ex_filters=None,
+                   ex_page_size=None):
         """
         Lists all nodes.
 
@@ -1653,31 +1669,95 @@ class BaseEC2NodeDriver(NodeDriver):
                                 information for certain nodes only.
         :type       ex_filters: ``dict``
 
+        :param      ex_page_size: Number of instances requested per page
+                                  (see :meth:`iterate_nodes`).
+        :type       ex_page_size: ``int``
+
         :rtype: ``list`` of :class:`Node`
         """
+        return list(self.iterate_nodes(ex_node_ids=ex_node_ids,
+                                       ex_filters=ex_filters,
+                                       ex_page_size=ex_page_size))
+
+    def iterate_nodes(self, ex_node_ids=None, ex_filters=None,
+                      ex_page_size=None):
+        """
+        Return a generator of nodes.
+
+        The instances are requested in pages (``MaxResults`` and
+        ``NextToken``) and the nodes are yielded as soon as a page is parsed.
+        The Elastic IP addresses are requested for every page using the
+        instance IDs of the page.
+
+        :param      ex_node_ids: List of ``node.id``
+        :type       ex_node_ids: ``list`` of ``str``
+
+        :param      ex_filters: The filters so that the list includes
+                                information for certain nodes only.
+        :type       ex_filters: ``dict``
 
+        :param      ex_page_size: Number of instances requested per page
+                                  (5 - 1000, defaults to
+                                  ``list_nodes_page_size``). It can't be
+                                  used together with ``ex_node_ids``.
+        :type       ex_page_size: ``int``
+
+        :rtype: ``generator`` of :class:`Node`
+        """
         params = {'Action': 'DescribeInstances'}
 
         if ex_node_ids:
             params.update(self._pathlist('InstanceId', ex_node_ids))
+        else:
+            page_size = ex_page_size or self.list_nodes_page_size
+
+            if page_size:
+                params['MaxResults'] = page_size
 
         if ex_filters:
             params.update(self._build_filters(ex_filters))
 
-        elem = self.connection.request(self.path, params=params).object
+        while True:
+            elem = self.connection.request(self.path, params=params).object
 
-        nodes = []
-        for rs in findall(element=elem, xpath='reservationSet/item',
-                          namespace=NAMESPACE):
-            nodes += self._to_nodes(rs, 'instancesSet/item')
+            nodes = []
+            for rs in findall(element=elem, xpath='reservationSet/item',
+                              namespace=NAMESPACE):
+                nodes += self._to_nodes(rs, 'instancesSet/item')
 
-        nodes_elastic_ips_mappings = self.ex_describe_addresses(nodes)
+            nodes_elastic_ips_mappings = self.ex_describe_addresses(nodes)
 
-        for node in nodes:
-            ips = nodes_elastic_ips_mappings[node.id]
-            node.public_ips.extend(ips)
+            for node in nodes:
+                ips = nodes_elastic_ips_mappings[node.id]
+                node.public_ips.extend(ips)
+                yield node
 
-        return nodes
+            next_token = findtext(element=elem, xpath='nextToken',
+                                  namespace=NAMESPACE)
+
+            if not next_token:
+                break
+
+            params['NextToken'] = next_token
+
+    def _list_polled_nodes(self, nodes, list_nodes_kwargs=None):
+        """
+        Only the polled instances are requested. The ``instance-id`` filter
+        is used instead of ``InstanceId`` so that instances which are not
+        visible yet don't cause an error.
+        """
+        if list_nodes_kwargs or not self.supports_instance_id_filter:
+            return super(BaseEC2NodeDriver, self)._list_polled_nodes(
+                nodes=nodes, list_nodes_kwargs=list_nodes_kwargs)
+
+        result = []
+
+        for batch in chunked(nodes, MAX_FILTER_VALUES):
+            node_ids = [node.id for node in batch]
+            result.extend(self.list_nodes(
+                ex_filters={'instance-id': node_ids}))
+
+        return result
 
     def list_sizes(self, location=None):
         available_types = REGION_DETAILS[self.region_name]['instance_types']
@@ -3281,25 +3361,7 @@ class BaseEC2NodeDriver(NodeDriver):
         result = self.connection.request(self.path,
                                          params=params.copy()).object
 
-        availability_zones = []
-        for element in findall(element=result,
-                               xpath='availabilityZoneInfo/item',
-                               namespace=NAMESPACE):
-            name = findtext(element=element, xpath='zoneName',
-                            namespace=NAMESPACE)
-            zone_state = findtext(element=element, xpath='zoneState',
-                                  namespace=NAMESPACE)
-            region_name = findtext(element=element, xpath='regionName',
-                                   namespace=NAMESPACE)
-
-            availability_zone = ExEC2AvailabilityZone(
-                name=name,
-                zone_state=zone_state,
-                region_name=region_name
-            )
-            availability_zones.append(availability_zone)
-
-        return availability_zones
+        return self._to_availability_zones(result)
 
     def ex_describe_tags(self, resource):
         """
@@ -3548,30 +3610,22 @@ class BaseEC2NodeDriver(NodeDriver):
         if not nodes:
             return {}
 
-        params = {'Action': 'DescribeAddresses'}
-
-        if len(nodes) == 1:
-            self._add_instance_filter(params, nodes[0])
-
-        result = self.connection.request(self.path, params=params).object
-
-        node_instance_ids = [node.id for node in nodes]
         nodes_elastic_ip_mappings = {}
 
-        # We will set only_associated to True so that we only get back
-        # IPs which are associated with instances
-        only_associated = True
-
-        for node_id in node_instance_ids:
-            nodes_elastic_ip_mappings.setdefault(node_id, [])
-            for addr in self._to_addresses(result,
-                                           only_associated):
+        # The addresses are filtered by the instance IDs, the filter values
+        # are sent in batches
+        if self.supports_instance_id_filter:
+            batches = chunked(nodes, MAX_FILTER_VALUES)
+        else:
+            batches = [nodes]
 
-                instance_id = addr.instance_id
+        for batch in batches:
+            params = {'Action': 'DescribeAddresses'}
+            self._add_instances_filter(params, batch)
 
-                if node_id == instance_id:
-                    nodes_elastic_ip_mappings[instance_id].append(
-                        addr.ip)
+            result = self.connection.request(self.path, params=params).object
+            nodes_elastic_ip_mappings.update(
+                self._to_nodes_elastic_ip_mappings(result, batch))
 
         return nodes_elastic_ip_mappings
 
@@ -4944,6 +4998,42 @@ class BaseEC2NodeDriver(NodeDriver):
 
         return EC2Network(vpc_id, name, cidr_block, extra=extra)
 
+    def _to_availability_zones(self, result):
+        availability_zones = []
+        for element in findall(element=result,
+                               xpath='availabilityZoneInfo/item',
+                               namespace=NAMESPACE):
+            name = findtext(element=element, xpath='zoneName',
+                            namespace=NAMESPACE)
+            zone_state = findtext(element=element, xpath='zoneState',
+                                  namespace=NAMESPACE)
+            region_name = findtext(element=element, xpath='regionName',
+                                   namespace=NAMESPACE)
+
+            availability_zone = ExEC2AvailabilityZone(
+                name=name,
+                zone_state=zone_state,
+                region_name=region_name
+            )
+            availability_zones.append(availability_zone)
+
+        return availability_zones
+
+    def _to_nodes_elastic_ip_mappings(self, result, nodes):
+        nodes_elastic_ip_mappings = dict((node.id, []) for node in nodes)
+
+        # We will set only_associated to True so that we only get back
+        # IPs which are associated with instances
+        only_associated = True
+
+        for addr in self._to_addresses(result, only_associated):
+            instance_id = addr.instance_id
+
+            if instance_id in nodes_elastic_ip_mappings:
+                nodes_elastic_ip_mappings[instance_id].append(addr.ip)
+
+        return nodes_elastic_ip_mappings
+
     def _to_addresses(self, response, only_associated):
         """
         Builds a list of dictionaries containing elastic IP properties.
@@ -5374,6 +5464,16 @@ class BaseEC2NodeDriver(NodeDriver):
 
         return params
 
+    def _add_instances_filter(self, params, nodes):
+        """
+        Add instance filter for multiple nodes to the provided params
+        dictionary.
+        """
+        filters = {'instance-id': [node.id for node in nodes]}
+        params.update(self._build_filters(filters))
+
+        return params
+
     def _get_state_boolean(self, element):
         """
         Checks for the instances's state
@@ -5671,6 +5771,7 @@ class EC2NodeDriver(BaseEC2NodeDriver):
     name = 'Amazon EC2'
     website = 'http://aws.amazon.com/ec2/'
     path = '/'
+    list_nodes_page_size = DESCRIBE_INSTANCES_MAX_RESULTS
 
     NODE_STATE_MAP = {
         'pending': NodeState.PENDING,
@@ -5737,6 +5838,7 @@ class EucNodeDriver(BaseEC2NodeDriver):
     region_name = 'us-east-1'
     connectionCls = EucConnection
     signature_version = '2'
+    supports_instance_id_filter = False
 
     def __init__(self, key, secret=None, secure=True, host=None,
                  path=None, port=None, api_version=DEFAULT_EUCA_API_VERSION):
@@ -5810,6 +5912,13 @@ class EucNodeDriver(BaseEC2NodeDriver):
         """
         pass
 
+    def _add_instances_filter(self, params, nodes):
+        """
+        Eucalyptus driver doesn't support filtering on instance id so this is a
+        no-op.
+        """
+        pass
+
 
 class NimbusConnection(EC2Connection):
     """
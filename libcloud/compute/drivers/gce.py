@@ -149,17 +149,35 @@ class GCEConnection(GoogleBaseConnection):
         :rtype:   ``dict``
         """
         request_path = "/aggregated/%s" % api_name
-        api_responses = []
+        api_responses = [response for response in
+                         self.request_paginated(request_path)
+                         if 'items' in response]
+        return self._merge_response_items(api_name, api_responses)
+
+    def request_paginated(self, request_path, max_results=500):
+        """
+        Return a generator which performs the requests to 'request_path'
+        page by page and yields the API responses.
+
+        The next page is only requested once the previous response has been
+        consumed, so the results can be processed while they are received.
 
-        params = {'maxResults': 500}
+        :param    request_path: Path of the list API call.
+        :type     request_path: ``str``
+
+        :keyword  max_results: Maximum number of results per page.
+        :type     max_results: ``int``
+
+        :return:  Generator of the API responses.
+        :rtype:   ``generator`` of ``dict``
+        """
+        params = {'maxResults': max_results}
         more_results = True
         while more_results:
             self.gce_params = params
             response = self.request(request_path, method='GET').object
-            if 'items' in response:
-                api_responses.append(response)
             more_results = 'pageToken' in params
-        return self._merge_response_items(api_name, api_responses)
+            yield response
 
     def _merge_response_items(self, list_name, response_list):
         """
@@ -2489,53 +2507,70 @@ class GCENodeDriver(NodeDriver):
         :return:  List of Node objects
         :rtype:   ``list`` of :class:`Node`
         """
-        list_nodes = []
+        return list(self.iterate_nodes(ex_zone=ex_zone,
+                                       ex_use_disk_cache=ex_use_disk_cache))
+
+    def iterate_nodes(self, ex_zone=None, ex_use_disk_cache=True):
+        """
+        Return a generator of nodes in the current zone or all zones.
+
+        The instances are requested page by page while the generator is
+        consumed.
+
+        :keyword  ex_zone:  Optional zone name or 'all'
+        :type     ex_zone:  ``str`` or :class:`GCEZone` or
+                            :class:`NodeLocation` or ``None``
+
+        :keyword  ex_use_disk_cache:  Disk information for each node will
+                                   retrieved from a dictionary rather
+                                   than making a distinct API call for it.
+        :type     ex_use_disk_cache: ``bool``
+
+        :return:  Generator of Node objects
+        :rtype:   ``generator`` of :class:`Node`
+        """
         zone = self._set_zone(ex_zone)
         if zone is None:
             request = '/aggregated/instances'
         else:
             request = '/zones/%s/instances' % (zone.name)
-        response = self.connection.request(request, method='GET').object
 
-        if 'items' in response:
-            # The aggregated response returns a dict for each zone
-            if zone is None:
-                # Create volume cache now for fast lookups of disk info.
-                self._ex_populate_volume_dict()
-                for v in response['items'].values():
-                    for i in v.get('instances', []):
-                        try:
-                            list_nodes.append(
-                                self._to_node(i,
-                                              use_disk_cache=ex_use_disk_cache)
-                            )
-                        # If a GCE node has been deleted between
-                        #   - is was listed by `request('.../instances', 'GET')
-                        #   - it is converted by `self._to_node(i)`
-                        # `_to_node()` will raise a ResourceNotFoundError.
-                        #
-                        # Just ignore that node and return the list of the
-                        # other nodes.
-                        except ResourceNotFoundError:
-                            pass
-            else:
-                for i in response['items']:
+        volume_dict_populated = False
+
+        try:
+            for response in self.connection.request_paginated(request):
+                if 'items' not in response:
+                    continue
+
+                # The aggregated response returns a dict for each zone
+                if zone is None:
+                    if not volume_dict_populated:
+                        # Create volume cache now for fast lookups of disk
+                        # info.
+                        self._ex_populate_volume_dict()
+                        volume_dict_populated = True
+                    instances = [i for v in response['items'].values()
+                                 for i in v.get('instances', [])]
+                else:
+                    instances = response['items']
+
+                for i in instances:
                     try:
-                        list_nodes.append(
-                            self._to_node(i, use_disk_cache=ex_use_disk_cache)
-                        )
+                        node = self._to_node(i,
+                                             use_disk_cache=ex_use_disk_cache)
                     # If a GCE node has been deleted between
                     #   - is was listed by `request('.../instances', 'GET')
                     #   - it is converted by `self._to_node(i)`
                     # `_to_node()` will raise a ResourceNotFoundError.
                     #
-                    # Just ignore that node and return the list of the
-                    # other nodes.
+                    # Just ignore that node and return the other nodes.
                     except ResourceNotFoundError:
-                        pass
-        # Clear the volume cache as lookups are complete.
-        self._ex_volume_dict = {}
-        return list_nodes
+                        continue
+
+                    yield node
+        finally:
+            # Clear the volume cache as lookups are complete.
+            self._ex_volume_dict = {}
 
     def ex_list_regions(self):
         """
@@ -2816,25 +2851,39 @@ class GCENodeDriver(NodeDriver):
         :return: A list of volume objects.
         :rtype: ``list`` of :class:`StorageVolume`
         """
-        list_volumes = []
+        return list(self.iterate_volumes(ex_zone=ex_zone))
+
+    def iterate_volumes(self, ex_zone=None):
+        """
+        Return a generator of volumes for a zone or all.
+
+        The disks are requested page by page while the generator is consumed.
+
+        :keyword  ex_zone: The zone to return volumes from.
+        :type     ex_zone: ``str`` or :class:`GCEZone` or
+                            :class:`NodeLocation` or ``None``
+
+        :return: Generator of volume objects.
+        :rtype: ``generator`` of :class:`StorageVolume`
+        """
         zone = self._set_zone(ex_zone)
         if zone is None:
             request = '/aggregated/disks'
         else:
             request = '/zones/%s/disks' % (zone.name)
 
-        response = self.connection.request(request, method='GET').object
-        if 'items' in response:
+        for response in self.connection.request_paginated(request):
+            if 'items' not in response:
+                continue
+
             # The aggregated response returns a dict for each zone
             if zone is None:
                 for v in response['items'].values():
-                    zone_volumes = [self._to_storage_volume(d)
-                                    for d in v.get('disks', [])]
-                    list_volumes.extend(zone_volumes)
+                    for d in v.get('disks', []):
+                        yield self._to_storage_volume(d)
             else:
-                list_volumes = [self._to_storage_volume(d)
-                                for d in response['items']]
-        return list_volumes
+                for d in response['items']:
+                    yield self._to_storage_volume(d)
 
     def ex_list_zones(self):
         """
@@ -7369,6 +7418,26 @@ class GCENodeDriver(NodeDriver):
         response = self.connection.request(request, method='GET').object
         return self._to_node(response)
 
+    def _list_polled_nodes(self, nodes, list_nodes_kwargs=None):
+        """
+        Only the polled nodes are requested (one request per node in the
+        node zone) instead of the aggregated list of all the instances.
+        """
+        if list_nodes_kwargs:
+            return super(GCENodeDriver, self)._list_polled_nodes(
+                nodes=nodes, list_nodes_kwargs=list_nodes_kwargs)
+
+        result = []
+
+        for node in nodes:
+            try:
+                result.append(self.ex_get_node(node.name,
+                                               node.extra.get('zone')))
+            except ResourceNotFoundError:
+                pass
+
+        return result
+
     def ex_get_project(self):
         """
         Return a Project object with project-wide information.
@@ -53,6 +53,9 @@ class KTUCloudNodeDriver(CloudStackNodeDriver):
 
         return images
 
+    def iterate_images(self, location=None):
+        return iter(self.list_images(location=location))
+
     def list_sizes(self, location=None):
         szs = self._sync_request('listAvailableProductTypes')
         sizes = []
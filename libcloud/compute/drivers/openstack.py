@@ -31,6 +31,8 @@ from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import b
 from libcloud.utils.py3 import next
 from libcloud.utils.py3 import urlparse
+from libcloud.utils.py3 import parse_qsl
+from libcloud.utils.py3 import basestring
 
 
 from libcloud.common.openstack import OpenStackBaseConnection
@@ -175,10 +177,24 @@ class OpenStackNodeDriver(NodeDriver, OpenStackDriverMixin):
     def reboot_node(self, node):
         return self._reboot_node(node, reboot_type='HARD')
 
-    def list_nodes(self, ex_all_tenants=False):
+    def list_nodes(self, ex_all_tenants=False, **kwargs):
         """
         List the nodes in a tenant
 
+        :param ex_all_tenants: List nodes for all the tenants. Note: Your user
+                               must have admin privileges for this
+                               functionality to work.
+        :type ex_all_tenants: ``bool``
+
+        Other keyword arguments are passed to :meth:`iterate_nodes`.
+        """
+        return list(self.iterate_nodes(ex_all_tenants=ex_all_tenants,
+                                       **kwargs))
+
+    def iterate_nodes(self, ex_all_tenants=False):
+        """
+        Return a generator of the nodes in a tenant
+
         :param ex_all_tenants: List nodes for all the tenants. Note: Your user
                                must have admin privileges for this
                                functionality to work.
@@ -187,8 +203,8 @@ class OpenStackNodeDriver(NodeDriver, OpenStackDriverMixin):
         params = {}
         if ex_all_tenants:
             params = {'all_tenants': 1}
-        return self._to_nodes(
-            self.connection.request('/servers/detail', params=params).object)
+        return iter(self._to_nodes(
+            self.connection.request('/servers/detail', params=params).object))
 
     def create_volume(self, size, name, location=None, snapshot=None,
                       ex_volume_type=None):
@@ -276,15 +292,18 @@ class OpenStackNodeDriver(NodeDriver, OpenStackDriverMixin):
             )
         return True
 
-    def list_volumes(self):
-        return self._to_volumes(
-            self.connection.request('/os-volumes').object)
+    def list_volumes(self, **kwargs):
+        return list(self.iterate_volumes(**kwargs))
+
+    def iterate_volumes(self):
+        return iter(self._to_volumes(
+            self.connection.request('/os-volumes').object))
 
     def ex_get_volume(self, volumeId):
         return self._to_volume(
             self.connection.request('/os-volumes/%s' % volumeId).object)
 
-    def list_images(self, location=None, ex_only_active=True):
+    def list_images(self, location=None, ex_only_active=True, **kwargs):
         """
         Lists all active images
 
@@ -294,8 +313,21 @@ class OpenStackNodeDriver(NodeDriver, OpenStackDriverMixin):
         :type ex_only_active: ``bool``
 
         """
-        return self._to_images(
-            self.connection.request('/images/detail').object, ex_only_active)
+        return list(self.iterate_images(location=location,
+                                        ex_only_active=ex_only_active,
+                                        **kwargs))
+
+    def iterate_images(self, location=None, ex_only_active=True):
+        """
+        Return a generator of the active images
+
+        @inherits: :class:`NodeDriver.iterate_images`
+
+        :param ex_only_active: True if list only active (optional)
+        :type ex_only_active: ``bool``
+        """
+        return iter(self._to_images(
+            self.connection.request('/images/detail').object, ex_only_active))
 
     def get_image(self, image_id):
         """
@@ -1222,6 +1254,133 @@ class OpenStack_1_1_NodeDriver(OpenStackNodeDriver):
                                                     None))
         super(OpenStack_1_1_NodeDriver, self).__init__(*args, **kwargs)
 
+    def iterate_nodes(self, ex_all_tenants=False, ex_page_size=None):
+        """
+        Return a generator of the nodes in a tenant
+
+        The servers are requested page by page (``limit`` and ``marker``).
+
+        :param ex_all_tenants: List nodes for all the tenants. Note: Your user
+                               must have admin privileges for this
+                               functionality to work.
+        :type ex_all_tenants: ``bool``
+
+        :param ex_page_size: Number of servers requested per page (defaults
+                             to the server side limit).
+        :type ex_page_size: ``int``
+        """
+        params = {}
+        if ex_all_tenants:
+            params = {'all_tenants': 1}
+
+        for obj in self._iterate_paginated_request('/servers/detail',
+                                                   'servers', params=params,
+                                                   page_size=ex_page_size):
+            for node in self._to_nodes(obj):
+                yield node
+
+    def _list_polled_nodes(self, nodes, list_nodes_kwargs=None):
+        """
+        Only the polled servers are requested (``GET /servers/<id>``) instead
+        of listing all the servers in the tenant.
+        """
+        if list_nodes_kwargs:
+            return super(OpenStack_1_1_NodeDriver, self)._list_polled_nodes(
+                nodes=nodes, list_nodes_kwargs=list_nodes_kwargs)
+
+        result = []
+
+        for node in nodes:
+            node = self.ex_get_node_details(node.id)
+
+            if node is not None:
+                result.append(node)
+
+        return result
+
+    def iterate_volumes(self, ex_page_size=None):
+        """
+        Return a generator of the volumes
+
+        :param ex_page_size: Number of volumes requested per page (defaults
+                             to the server side limit).
+        :type ex_page_size: ``int``
+        """
+        for obj in self._iterate_paginated_request('/os-volumes', 'volumes',
+                                                   page_size=ex_page_size):
+            for volume in self._to_volumes(obj):
+                yield volume
+
+    def iterate_images(self, location=None, ex_only_active=True,
+                       ex_page_size=None):
+        """
+        Return a generator of the active images
+
+        @inherits: :class:`NodeDriver.iterate_images`
+
+        :param ex_only_active: True if list only active (optional)
+        :type ex_only_active: ``bool``
+
+        :param ex_page_size: Number of images requested per page (defaults
+                             to the server side limit).
+        :type ex_page_size: ``int``
+        """
+        for obj in self._iterate_paginated_request('/images/detail',
+                                                   'images',
+                                                   page_size=ex_page_size):
+            for image in self._to_images(obj, ex_only_active):
+                yield image
+
+    def _iterate_paginated_request(self, url, obj, params=None,
+                                   page_size=None, connection=None):
+        """
+        Return a generator which yields the response object of every page of
+        a paginated collection.
+
+        The pages are followed using the ``next`` link of the ``<obj>_links``
+        (Compute API) or the ``next`` (Image API v2) response attribute, the
+        query parameters of the link (e.g. ``marker``) are added to the
+        request parameters.
+
+        :param url: API endpoint
+        :type url: ``str``
+
+        :param obj: Result object key
+        :type obj: ``str``
+
+        :rtype: ``generator`` of ``dict``
+        """
+        connection = connection or self.connection
+        params = dict(params or {})
+
+        if page_size:
+            params['limit'] = page_size
+
+        while True:
+            response = connection.request(url, params=params).object
+            yield response
+
+            next_url = None
+
+            for link in response.get('%s_links' % (obj), []):
+                if link.get('rel') == 'next':
+                    next_url = link['href']
+
+            if next_url is None and isinstance(response.get('next'),
+                                               basestring):
+                next_url = response['next']
+
+            if not next_url:
+                break
+
+            next_params = dict(parse_qsl(urlparse.urlparse(next_url).query))
+
+            if next_params.get('marker') in (None, params.get('marker')):
+                # Avoid requesting the same page again
+                break
+
+            params.update(next_params)
+
     def create_node(self, **kwargs):
         """Create a new node
 
@@ -2657,7 +2816,7 @@ class OpenStack_2_NodeDriver(OpenStack_1_1_NodeDriver):
         return self._to_image(self.image_connection.request(
             '/v2/images/%s' % (image_id,)).object)
 
-    def list_images(self, location=None, ex_only_active=True):
+    def list_images(self, location=None, ex_only_active=True, **kwargs):
         """
         Lists all active images using the V2 Glance API
 
@@ -2679,11 +2838,31 @@ class OpenStack_2_NodeDriver(OpenStack_1_1_NodeDriver):
             raise NotImplementedError(
                 "ex_only_active in list_images is not implemented "
                 "in the OpenStack_2_NodeDriver")
-        response = self.image_connection.request('/v2/images')
-        images = []
-        for image in response.object['images']:
-            images.append(self._to_image(image))
-        return images
+        return list(self.iterate_images(location=location, **kwargs))
+
+    def iterate_images(self, location=None, ex_only_active=True,
+                       ex_page_size=None):
+        """
+        Return a generator of the active images using the V2 Glance API
+
+        See :meth:`list_images`.
+
+        :param ex_page_size: Number of images requested per page (defaults
+                             to the server side limit).
+        :type ex_page_size: ``int``
+        """
+        if location is not None or not ex_only_active:
+            return iter(self.list_images(location=location,
+                                         ex_only_active=ex_only_active))
+
+        return self._iterate_images(page_size=ex_page_size)
+
+    def _iterate_images(self, page_size=None):
+        for obj in self._iterate_paginated_request(
+                '/v2/images', 'images', page_size=page_size,
+                connection=self.image_connection):
+            for image in obj['images']:
+                yield self._to_image(image)
 
     def ex_update_image(self, image_id, data):
         """
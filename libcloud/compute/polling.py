@@ -0,0 +1,289 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Poll loop used for waiting until nodes reach a certain state.
+
+A single :class:`NodePoller` can be shared by multiple waiters (e.g. several
+threads calling ``wait_until_running`` on the same driver). Only one of the
+waiters performs a request at a time and the request covers the pending nodes
+of all the waiters. The delay between the requests grows while none of the
+polled nodes change and is reset as soon as one of them does.
+"""
+
+import sys
+import time
+import threading
+
+__all__ = [
+    'BACKOFF_FACTOR',
+    'MAX_WAIT_PERIOD',
+
+    'NodePoller',
+    'PollTimeout'
+]
+
+# Factor by which the delay between two polls grows while nothing changes
+BACKOFF_FACTOR = 1.5
+
+# Upper bound (in seconds) of the delay between two polls
+MAX_WAIT_PERIOD = 30
+
+# How often (in seconds) the waiters which can be cancelled check whether
+# they were cancelled while they wait for a poll
+CANCEL_CHECK_PERIOD = 0.5
+
+
+class NodePoller(object):
+    """
+    Poll loop shared by the waiters of a single driver.
+
+    :param fetch: Callable which receives a list of nodes and returns the
+                  current version of those nodes (nodes which can't be found
+                  are omitted).
+    :type fetch: ``callable``
+
+    :param backoff: Factor by which the delay grows between polls which
+                    don't observe any change.
+    :type backoff: ``float``
+
+    :param max_wait_period: Upper bound of the delay between two polls.
+    :type max_wait_period: ``float``
+    """
+
+    def __init__(self, fetch, backoff=BACKOFF_FACTOR,
+                 max_wait_period=MAX_WAIT_PERIOD):
+        self.fetch = fetch
+        self.backoff = backoff
+        self.max_wait_period = max_wait_period
+
+        self._condition = threading.Condition(threading.Lock())
+
+        # uuid -> [node, number of waiters]
+        self._nodes = {}
+        # waiter id -> wait period requested by the waiter
+        self._wait_periods = {}
+        # uuid -> latest polled node
+        self._results = {}
+        self._snapshots = {}
+
+        self._generation = 0
+        self._exc_info = None
+        self._polling = False
+        self._delay = None
+        self._next_poll = 0
+
+    def iterate(self, nodes, check, wait_period=3, timeout=600,
+                cancelled=None):
+        """
+        Return a generator which yields ``(node, result)`` tuples for the
+        provided nodes as soon as ``check(node)`` returns a truthy result for
+        the polled version of the node.
+
+        :param nodes: Nodes to wait for.
+        :type nodes: ``list`` of :class:`.Node`
+
+        :param check: Callable which receives a polled node and returns a
+                      truthy value once the node is ready.
+        :type check: ``callable``
+
+        :param wait_period: Initial delay between two polls.
+        :type wait_period: ``float``
+
+        :param timeout: How many seconds to wait before giving up.
+        :type timeout: ``float``
+
+        :param cancelled: Event which stops the generator (without an error)
+                          when it's set. (optional)
+        :type cancelled: :class:`threading.Event`
+
+        :raises: ``PollTimeout`` (a :class:`RuntimeError`) if not all the
+                 nodes are ready before the timeout.
+
+        :rtype: ``generator`` of ``tuple``
+        """
+        end = time.time() + timeout
+        pending = {}
+
+        for node in nodes:
+            pending.setdefault(node.uuid, node)
+
+        waiter = object()
+        generation = self._register(waiter, pending.values(), wait_period)
+
+        try:
+            while pending:
+                generation, results = self._wait_for_poll(
+                    generation, end, cancelled=cancelled)
+
+                if cancelled is not None and cancelled.is_set():
+                    return
+
+                if results is None:
+                    raise PollTimeout(timeout)
+
+                for uuid in list(pending.keys()):
+                    node = results.get(uuid)
+
+                    if node is None:
+                        continue
+
+                    result = check(node)
+
+                    if result:
+                        del pending[uuid]
+                        self._unregister_node(uuid)
+                        yield node, result
+        finally:
+            with self._condition:
+                self._wait_periods.pop(waiter, None)
+
+            for uuid in pending:
+                self._unregister_node(uuid)
+
+    def _register(self, waiter, nodes, wait_period):
+        with self._condition:
+            for node in nodes:
+                entry = self._nodes.setdefault(node.uuid, [node, 0])
+                entry[1] += 1
+
+            self._wait_periods[waiter] = wait_period
+
+            # New nodes are polled right away
+            self._delay = None
+            self._next_poll = 0
+
+            return self._generation
+
+    def _unregister_node(self, uuid):
+        with self._condition:
+            entry = self._nodes.get(uuid)
+
+            if entry is None:
+                return
+
+            entry[1] -= 1
+
+            if entry[1] <= 0:
+                del self._nodes[uuid]
+                self._results.pop(uuid, None)
+                self._snapshots.pop(uuid, None)
+
+    def _wait_for_poll(self, generation, end, cancelled=None):
+        """
+        Wait until a poll newer than ``generation`` completes and return the
+        ``(generation, results)`` tuple, ``results`` is None if the deadline
+        expires (or ``cancelled`` is set) first.
+        """
+        condition = self._condition
+        condition.acquire()
+
+        def wait(until):
+            delay = until - time.time()
+
+            if cancelled is not None:
+                delay = min(delay, CANCEL_CHECK_PERIOD)
+
+            condition.wait(delay)
+
+        try:
+            while True:
+                if self._generation > generation:
+                    if self._exc_info is not None:
+                        raise self._exc_info[1]
+
+                    return self._generation, dict(self._results)
+
+                now = time.time()
+
+                if now >= end or \
+                        (cancelled is not None and cancelled.is_set()):
+                    return generation, None
+
+                if self._polling:
+                    wait(end)
+                    continue
+
+                if now < self._next_poll:
+                    wait(min(self._next_poll, end))
+                    continue
+
+                # This waiter performs the poll for all the waiters
+                self._polling = True
+                nodes = [entry[0] for entry in self._nodes.values()]
+
+                condition.release()
+
+                try:
+                    try:
+                        polled = self.fetch(nodes)
+                        exc_info = None
+                    except Exception:
+                        polled = []
+                        exc_info = sys.exc_info()
+                finally:
+                    condition.acquire()
+
+                self._update(polled, exc_info)
+                condition.notify_all()
+        finally:
+            condition.release()
+
+    def _update(self, polled, exc_info):
+        """
+        Store the result of a poll and schedule the next one.
+
+        Needs to be called with the condition held.
+        """
+        self._polling = False
+        self._generation += 1
+        self._exc_info = exc_info
+
+        changed = False
+
+        for node in polled:
+            if node.uuid not in self._nodes:
+                continue
+
+            snapshot = (node.state, tuple(node.public_ips or []),
+                        tuple(node.private_ips or []))
+
+            if self._snapshots.get(node.uuid) != snapshot:
+                changed = True
+
+            self._snapshots[node.uuid] = snapshot
+            self._results[node.uuid] = node
+
+        wait_period = min(self._wait_periods.values() or [0])
+
+        if changed or self._delay is None:
+            self._delay = wait_period
+        else:
+            self._delay = min(self._delay * self.backoff,
+                              max(self.max_wait_period, wait_period))
+
+        self._next_poll = time.time() + self._delay
+
+
+class PollTimeout(RuntimeError):
+    """
+    Raised by :meth:`NodePoller.iterate` when the nodes are not ready before
+    the timeout.
+    """
+
+    def __init__(self, timeout):
+        super(PollTimeout, self).__init__('Timed out after %s seconds' %
+                                          (timeout))
+        self.timeout = timeout
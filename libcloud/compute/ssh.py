@@ -31,10 +31,14 @@ except ImportError:
 
 import os
 import time
+import codecs
+import select
 import subprocess
 import logging
 import warnings
 
+from collections import deque
+
 from os.path import split as psplit
 from os.path import join as pjoin
 
@@ -144,6 +148,61 @@ class BaseSSHClient(object):
         raise NotImplementedError(
             'put not implemented for this ssh client')
 
+    def put_file(self, path, local_path=None, fo=None, chmod=None, mode='w',
+                 block_size=None, progress_callback=None):
+        """
+        Upload a local file or the content of a file object to the remote
+        node.
+
+        The default implementation reads the whole file in memory and uses
+        :meth:`put`, clients which support it stream the file.
+
+        :type path: ``str``
+        :keyword path: File path on the remote node.
+
+        :type local_path: ``str``
+        :keyword local_path: Path to the local file to upload.
+
+        :type fo: ``file``
+        :keyword fo: File object (opened in binary mode) to read the content
+                     from. Either ``local_path`` or ``fo`` needs to be
+                     provided.
+
+        :type chmod: ``int``
+        :keyword chmod: chmod file to this after creation.
+
+        :type mode: ``str``
+        :keyword mode: Mode in which the file is opened.
+
+        :type block_size: ``int``
+        :keyword block_size: How many bytes to read from the file at once.
+
+        :type progress_callback: ``callable``
+        :keyword progress_callback: Callable which is called with the number
+                                    of bytes transferred so far and the total
+                                    number of bytes (None if unknown).
+
+        :return: Full path to the location where a file has been saved.
+        :rtype: ``str``
+        """
+        if (local_path is None) == (fo is None):
+            raise ValueError('Either local_path or fo argument needs to be '
+                             'provided')
+
+        if local_path is not None:
+            with open(local_path, 'rb') as fp:
+                contents = fp.read()
+        else:
+            contents = fo.read()
+
+        file_path = self.put(path=path, contents=contents, chmod=chmod,
+                             mode=mode)
+
+        if progress_callback:
+            progress_callback(len(contents), len(contents))
+
+        return file_path
+
     def delete(self, path):
         """
         Delete/Unlink a file on the remote node.
@@ -158,13 +217,30 @@ class BaseSSHClient(object):
         raise NotImplementedError(
             'delete not implemented for this ssh client')
 
-    def run(self, cmd):
+    def run(self, cmd, stdout_callback=None, stderr_callback=None,
+            max_output_size=None):
         """
         Run a command on a remote node.
 
         :type cmd: ``str``
         :keyword cmd: Command to run.
 
+        :type stdout_callback: ``callable``
+        :keyword stdout_callback: Callable which is called with the chunks of
+                                  the standard output (decoded ``str``)
+                                  (optional).
+
+        :type stderr_callback: ``callable``
+        :keyword stderr_callback: Callable which is called with the chunks of
+                                  the standard error (decoded ``str``)
+                                  (optional).
+
+        :type max_output_size: ``int``
+        :keyword max_output_size: Maximum number of characters of the
+                                  standard output and of the standard error
+                                  which are returned (optional, only the last
+                                  ones are kept).
+
         :return ``list`` of [stdout, stderr, exit_status]
         """
         raise NotImplementedError(
@@ -200,14 +276,20 @@ class ParamikoSSHClient(BaseSSHClient):
     """
 
     # Maximum number of bytes to read at once from a socket
-    CHUNK_SIZE = 4096
+    CHUNK_SIZE = 32 * 1024
+
+    # How many bytes to read from a local file and write to the remote file
+    # at once when streaming a file
+    SFTP_BLOCK_SIZE = 32 * 1024
 
-    # How long to sleep while waiting for command to finish (to prevent busy
-    # waiting)
-    SLEEP_DELAY = 0.2
+    # Upper bound of how long to block while waiting for an event on the
+    # channel (new output, end of file, exit status) before checking the
+    # channel state again
+    MAX_WAIT_PERIOD = 1
 
     def __init__(self, hostname, port=22, username='root', password=None,
-                 key=None, key_files=None, key_material=None, timeout=None):
+                 key=None, key_files=None, key_material=None, timeout=None,
+                 cache_dirs=False):
         """
         Authentication is always attempted in the following order:
 
@@ -218,6 +300,11 @@ class ParamikoSSHClient(BaseSSHClient):
           password and key is provided)
         - Plain username/password auth, if a password was given (if password is
           provided)
+
+        A single SFTP session is used for all the file operations. If
+        ``cache_dirs`` is True, the directories created (or found) while
+        uploading the files are remembered and not created again by the
+        following uploads.
         """
         if key_files and key_material:
             raise ValueError(('key_files and key_material arguments are '
@@ -231,11 +318,15 @@ class ParamikoSSHClient(BaseSSHClient):
                                                 timeout=timeout)
 
         self.key_material = key_material
+        self.cache_dirs = cache_dirs
 
         self.client = paramiko.SSHClient()
         self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         self.logger = self._get_and_setup_logger()
 
+        self._sftp_client = None
+        self._remote_dirs = set()
+
     def connect(self):
         conninfo = {'hostname': self.hostname,
                     'port': self.port,
@@ -270,39 +361,75 @@ class ParamikoSSHClient(BaseSSHClient):
         extra = {'_path': path, '_mode': mode, '_chmod': chmod}
         self.logger.debug('Uploading file', extra=extra)
 
-        sftp = self.client.open_sftp()
-        # less than ideal, but we need to mkdir stuff otherwise file() fails
-        head, tail = psplit(path)
-
-        if path[0] == "/":
-            sftp.chdir("/")
-        else:
-            # Relative path - start from a home directory (~)
-            sftp.chdir('.')
-
-        for part in head.split("/"):
-            if part != "":
-                try:
-                    sftp.mkdir(part)
-                except IOError:
-                    # so, there doesn't seem to be a way to
-                    # catch EEXIST consistently *sigh*
-                    pass
-                sftp.chdir(part)
-
-        cwd = sftp.getcwd()
+        sftp, tail, file_path = self._prepare_upload(path=path)
 
         ak = sftp.file(tail, mode=mode)
         ak.write(contents)
         if chmod is not None:
             ak.chmod(chmod)
         ak.close()
-        sftp.close()
 
-        if path[0] == '/':
-            file_path = path
-        else:
-            file_path = pjoin(cwd, path)
+        return file_path
+
+    def put_file(self, path, local_path=None, fo=None, chmod=None, mode='w',
+                 block_size=None, progress_callback=None):
+        """
+        Upload a local file or the content of a file object to the remote
+        node.
+
+        The file is read and written in blocks of ``block_size`` bytes
+        (``SFTP_BLOCK_SIZE`` by default) and the writes are pipelined (the
+        client doesn't wait for the server to acknowledge a block before
+        sending the next one).
+
+        See :meth:`BaseSSHClient.put_file` for the arguments.
+        """
+        if (local_path is None) == (fo is None):
+            raise ValueError('Either local_path or fo argument needs to be '
+                             'provided')
+
+        extra = {'_path': path, '_local_path': local_path, '_mode': mode,
+                 '_chmod': chmod}
+        self.logger.debug('Uploading file', extra=extra)
+
+        block_size = block_size or self.SFTP_BLOCK_SIZE
+
+        if local_path is not None:
+            with open(local_path, 'rb') as fp:
+                return self.put_file(path=path, fo=fp, chmod=chmod,
+                                     mode=mode, block_size=block_size,
+                                     progress_callback=progress_callback)
+
+        try:
+            total_size = os.fstat(fo.fileno()).st_size - fo.tell()
+        except Exception:
+            total_size = None
+
+        sftp, tail, file_path = self._prepare_upload(path=path)
+        transferred = 0
+
+        ak = sftp.file(tail, mode=mode)
+
+        try:
+            ak.set_pipelined(True)
+
+            while True:
+                data = fo.read(block_size)
+
+                if not data:
+                    break
+
+                ak.write(data)
+                transferred += len(data)
+
+                if progress_callback:
+                    progress_callback(transferred, total_size)
+
+            if chmod is not None:
+                ak.chmod(chmod)
+        finally:
+            # Waits for the acknowledgement of the pipelined writes
+            ak.close()
 
         return file_path
 
@@ -310,19 +437,45 @@ class ParamikoSSHClient(BaseSSHClient):
         extra = {'_path': path}
         self.logger.debug('Deleting file', extra=extra)
 
-        sftp = self.client.open_sftp()
+        sftp = self._get_sftp_client()
+
+        # Relative paths are relative to the home directory (~)
+        sftp.chdir(None)
         sftp.unlink(path)
-        sftp.close()
         return True
 
-    def run(self, cmd, timeout=None):
+    def run(self, cmd, timeout=None, stdout_callback=None,
+            stderr_callback=None, max_output_size=None):
         """
         Note: This function is based on paramiko's exec_command()
         method.
 
+        The output is read as soon as it's received (the method blocks on the
+        channel events instead of polling it).
+
         :param timeout: How long to wait (in seconds) for the command to
                         finish (optional).
         :type timeout: ``float``
+
+        :param stdout_callback: Callable which is called with every chunk of
+                                the standard output (decoded ``str``) as soon
+                                as it's received (optional).
+        :type stdout_callback: ``callable``
+
+        :param stderr_callback: Callable which is called with every chunk of
+                                the standard error (decoded ``str``) as soon
+                                as it's received (optional).
+        :type stderr_callback: ``callable``
+
+        :param max_output_size: Maximum number of characters of the standard
+                                output and of the standard error which are
+                                kept in memory and returned (optional). Only
+                                the last ``max_output_size`` characters are
+                                kept, the callbacks still receive the whole
+                                output.
+        :type max_output_size: ``int``
+
+        :return: ``list`` of [stdout, stderr, exit_status]
         """
         extra = {'_cmd': cmd}
         self.logger.debug('Executing command', extra=extra)
@@ -336,8 +489,15 @@ class ParamikoSSHClient(BaseSSHClient):
         start_time = time.time()
         chan.exec_command(cmd)
 
-        stdout = StringIO()
-        stderr = StringIO()
+        stdout = _CommandOutput(callback=stdout_callback,
+                                max_size=max_output_size)
+        stderr = _CommandOutput(callback=stderr_callback,
+                                max_size=max_output_size)
+
+        # The output is decoded incrementally because a single chunk could
+        # contain a part of multi byte UTF-8 character
+        stdout_decoder = codecs.getincrementaldecoder('utf-8')()
+        stderr_decoder = codecs.getincrementaldecoder('utf-8')()
 
         # Create a stdin file and immediately close it to prevent any
         # interactive script from hanging the process.
@@ -352,36 +512,43 @@ class ParamikoSSHClient(BaseSSHClient):
         # Note #2: If you are going to remove "ready" checks inside the loop
         # you are going to have a bad time. Trying to consume from a channel
         # which is not ready will block for indefinitely.
-        exit_status_ready = chan.exit_status_ready()
-
-        if exit_status_ready:
-            # It's possible that some data is already available when exit
-            # status is ready
-            stdout.write(self._consume_stdout(chan).getvalue())
-            stderr.write(self._consume_stderr(chan).getvalue())
+        while True:
+            self._consume_channel_data(
+                recv_method=chan.recv, recv_ready_method=chan.recv_ready,
+                decoder=stdout_decoder, write=stdout.write)
+            self._consume_channel_data(
+                recv_method=chan.recv_stderr,
+                recv_ready_method=chan.recv_stderr_ready,
+                decoder=stderr_decoder, write=stderr.write)
+
+            # The output always arrives before the exit status
+            if chan.exit_status_ready() and not (chan.recv_ready() or
+                                                 chan.recv_stderr_ready()):
+                break
 
-        while not exit_status_ready:
-            current_time = time.time()
-            elapsed_time = (current_time - start_time)
+            wait_period = self.MAX_WAIT_PERIOD
 
-            if timeout and (elapsed_time > timeout):
-                # TODO: Is this the right way to clean up?
-                chan.close()
+            if timeout:
+                elapsed_time = (time.time() - start_time)
 
-                raise SSHCommandTimeoutError(cmd=cmd, timeout=timeout)
+                if elapsed_time > timeout:
+                    # TODO: Is this the right way to clean up?
+                    chan.close()
 
-            stdout.write(self._consume_stdout(chan).getvalue())
-            stderr.write(self._consume_stderr(chan).getvalue())
+                    raise SSHCommandTimeoutError(cmd=cmd, timeout=timeout)
 
-            # We need to check the exist status here, because the command could
-            # print some output and exit during this sleep below.
-            exit_status_ready = chan.exit_status_ready()
+                wait_period = min(wait_period, timeout - elapsed_time)
 
-            if exit_status_ready:
-                break
+            if chan.eof_received:
+                # The channel is readable from now on, wait for the exit
+                # status instead
+                chan.status_event.wait(wait_period)
+            else:
+                # Wait until the channel receives new output or end of file
+                select.select([chan], [], [], wait_period)
 
-            # Short sleep to prevent busy waiting
-            time.sleep(self.SLEEP_DELAY)
+        stdout.write(stdout_decoder.decode(b(''), final=True))
+        stderr.write(stderr_decoder.decode(b(''), final=True))
 
         # Receive the exit status code of the command we ran.
         status = chan.recv_exit_status()
@@ -397,9 +564,75 @@ class ParamikoSSHClient(BaseSSHClient):
     def close(self):
         self.logger.debug('Closing server connection')
 
+        if self._sftp_client is not None:
+            self._sftp_client.close()
+            self._sftp_client = None
+            self._remote_dirs = set()
+
         self.client.close()
         return True
 
+    def _get_sftp_client(self):
+        """
+        Return the SFTP session which is shared by all the file operations
+        (it's opened on the first use).
+        """
+        if self._sftp_client is None:
+            self._sftp_client = self.client.open_sftp()
+
+        return self._sftp_client
+
+    def _prepare_upload(self, path):
+        """
+        Create the parent directories of the provided remote path and change
+        the working directory of the SFTP session to the parent directory.
+
+        :return: ``tuple`` of the SFTP session, the file name and the full
+                 path of the file.
+        :rtype: ``tuple``
+        """
+        sftp = self._get_sftp_client()
+
+        # less than ideal, but we need to mkdir stuff otherwise file() fails
+        head, tail = psplit(path)
+
+        if path[0] == "/":
+            sftp.chdir("/")
+            remote_dir = ''
+        else:
+            # Relative path - start from a home directory (~), the session
+            # could have been moved to a different directory by a previous
+            # upload
+            sftp.chdir(None)
+            sftp.chdir('.')
+            remote_dir = '~'
+
+        for part in head.split("/"):
+            if part != "":
+                remote_dir = '%s/%s' % (remote_dir, part)
+
+                if remote_dir not in self._remote_dirs:
+                    try:
+                        sftp.mkdir(part)
+                    except IOError:
+                        # so, there doesn't seem to be a way to
+                        # catch EEXIST consistently *sigh*
+                        pass
+
+                    if self.cache_dirs:
+                        self._remote_dirs.add(remote_dir)
+
+                sftp.chdir(part)
+
+        cwd = sftp.getcwd()
+
+        if path[0] == '/':
+            file_path = path
+        else:
+            file_path = pjoin(cwd, path)
+
+        return sftp, tail, file_path
+
     def _consume_stdout(self, chan):
         """
         Try to consume stdout data from chan if it's receive ready.
@@ -428,26 +661,27 @@ class ParamikoSSHClient(BaseSSHClient):
         ready.
         """
         result = StringIO()
-        result_bytes = bytearray()
-
-        if recv_ready_method():
-            data = recv_method(self.CHUNK_SIZE)
-            result_bytes += b(data)
+        decoder = codecs.getincrementaldecoder('utf-8')()
 
-            while data:
-                ready = recv_ready_method()
+        self._consume_channel_data(recv_method=recv_method,
+                                   recv_ready_method=recv_ready_method,
+                                   decoder=decoder, write=result.write)
+        result.write(decoder.decode(b(''), final=True))
+        return result
 
-                if not ready:
-                    break
+    def _consume_channel_data(self, recv_method, recv_ready_method, decoder,
+                              write):
+        """
+        Consume the data which is available on the channel, decode it and
+        pass it to ``write``.
+        """
+        while recv_ready_method():
+            data = recv_method(self.CHUNK_SIZE)
 
-                data = recv_method(self.CHUNK_SIZE)
-                result_bytes += b(data)
+            if not data:
+                break
 
-        # We only decode data at the end because a single chunk could contain
-        # a part of multi byte UTF-8 character (whole multi bytes character
-        # could be split over two chunks)
-        result.write(result_bytes.decode('utf-8'))
-        return result
+            write(decoder.decode(b(data)))
 
     def _get_pkey_object(self, key):
         """
@@ -503,8 +737,31 @@ class ShellOutSSHClient(BaseSSHClient):
         """
         return True
 
-    def run(self, cmd):
-        return self._run_remote_shell_command([cmd])
+    def run(self, cmd, stdout_callback=None, stderr_callback=None,
+            max_output_size=None):
+        """
+        Run a command on the remote node.
+
+        The output is only available once the command has finished, so the
+        callbacks are called once with the whole output.
+
+        See :meth:`BaseSSHClient.run` for the arguments.
+        """
+        stdout, stderr, status = self._run_remote_shell_command([cmd])
+
+        for output, callback in ((stdout, stdout_callback),
+                                 (stderr, stderr_callback)):
+            if callback and output:
+                if isinstance(output, bytes):
+                    output = output.decode('utf-8', 'replace')
+
+                callback(output)
+
+        if max_output_size is not None:
+            stdout = stdout[len(stdout) - max_output_size:]
+            stderr = stderr[len(stderr) - max_output_size:]
+
+        return (stdout, stderr, status)
 
     def put(self, path, contents=None, chmod=None, mode='w'):
         if mode == 'w':
@@ -518,6 +775,82 @@ class ShellOutSSHClient(BaseSSHClient):
         self._run_remote_shell_command(cmd)
         return path
 
+    def put_file(self, path, local_path=None, fo=None, chmod=None, mode='w',
+                 block_size=None, progress_callback=None):
+        """
+        Upload a local file using ``scp`` or stream the content of a file
+        object to ``cat`` running on the remote node.
+
+        See :meth:`BaseSSHClient.put_file` for the arguments.
+        """
+        if (local_path is None) == (fo is None):
+            raise ValueError('Either local_path or fo argument needs to be '
+                             'provided')
+
+        if mode not in ['w', 'a']:
+            raise ValueError('Invalid mode: ' + mode)
+
+        if local_path is not None and mode == 'w':
+            total_size = os.path.getsize(local_path)
+            cmd = self._get_base_scp_command() + [
+                local_path, '%s@%s:%s' % (self.username, self.hostname, path)]
+            self.logger.debug('Executing command: "%s"' % (' '.join(cmd)))
+
+            child = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE)
+            _, stderr = child.communicate()
+
+            if child.returncode != 0:
+                raise IOError('Failed to upload %s: %s' % (local_path,
+                                                           stderr))
+
+            transferred = total_size
+        else:
+            if local_path is not None:
+                with open(local_path, 'rb') as fp:
+                    return self.put_file(path=path, fo=fp, chmod=chmod,
+                                         mode=mode, block_size=block_size,
+                                         progress_callback=progress_callback)
+
+            redirect = '>' if mode == 'w' else '>>'
+            cmd = self._get_base_ssh_command() + ['cat %s %s' % (redirect,
+                                                                 path)]
+            self.logger.debug('Executing command: "%s"' % (' '.join(cmd)))
+
+            child = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE)
+            transferred = 0
+            total_size = None
+
+            try:
+                while True:
+                    data = fo.read(block_size or 32 * 1024)
+
+                    if not data:
+                        break
+
+                    child.stdin.write(data)
+                    transferred += len(data)
+
+                    if progress_callback:
+                        progress_callback(transferred, total_size)
+            finally:
+                child.stdin.close()
+
+            _, stderr = child.communicate()
+
+            if child.returncode != 0:
+                raise IOError('Failed to upload %s: %s' % (path, stderr))
+
+        if chmod is not None:
+            self._run_remote_shell_command(['chmod', '%o' % (chmod), path])
+
+        if progress_callback and local_path is not None:
+            progress_callback(transferred, total_size)
+
+        return path
+
     def delete(self, path):
         cmd = ['rm', '-rf', path]
         self._run_remote_shell_command(cmd)
@@ -539,6 +872,20 @@ class ShellOutSSHClient(BaseSSHClient):
 
         return cmd
 
+    def _get_base_scp_command(self):
+        cmd = ['scp']
+
+        if self.port != 22:
+            cmd += ['-P', str(self.port)]
+
+        if self.key_files:
+            cmd += ['-i', self.key_files]
+
+        if self.timeout:
+            cmd += ['-oConnectTimeout=%s' % (self.timeout)]
+
+        return cmd
+
     def _run_remote_shell_command(self, cmd):
         """
         Run a command on a remote server.
@@ -564,6 +911,47 @@ class MockSSHClient(BaseSSHClient):
     pass
 
 
+class _CommandOutput(object):
+    """
+    Output of a command which is passed to a callback as it's received and
+    of which at most ``max_size`` last characters are kept.
+    """
+
+    def __init__(self, callback=None, max_size=None):
+        self.callback = callback
+        self.max_size = max_size
+
+        self._chunks = deque()
+        self._size = 0
+
+    def write(self, data):
+        if not data:
+            return
+
+        if self.callback:
+            self.callback(data)
+
+        self._chunks.append(data)
+        self._size += len(data)
+
+        if self.max_size is None:
+            return
+
+        while self._size > self.max_size:
+            excess = self._size - self.max_size
+            chunk = self._chunks[0]
+
+            if len(chunk) <= excess:
+                self._chunks.popleft()
+                self._size -= len(chunk)
+            else:
+                self._chunks[0] = chunk[excess:]
+                self._size -= excess
+
+    def getvalue(self):
+        return ''.join(self._chunks)
+
+
 SSHClient = ParamikoSSHClient
 if not have_paramiko:
     SSHClient = MockSSHClient
@@ -347,7 +347,8 @@ class DeploymentError(LibcloudError):
     Exception used when a Deployment Task failed.
 
     :ivar node: :class:`Node` on which this exception happened, you might want
-                to call :func:`Node.destroy`
+                to call :func:`Node.destroy` (``None`` if the node couldn't
+                be created)
     """
     def __init__(self, node, original_exception=None, driver=None):
         self.node = node
@@ -359,7 +360,8 @@ class DeploymentError(LibcloudError):
 
     def __repr__(self):
         return (('<DeploymentError: node=%s, error=%s, driver=%s>'
-                % (self.node.id, str(self.value), str(self.driver))))
+                % (getattr(self.node, 'id', None), str(self.value),
+                   str(self.driver))))
 
 
 class KeyPairError(LibcloudError):
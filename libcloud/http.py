@@ -20,6 +20,8 @@ verification, depending on libcloud.security settings.
 
 import os
 import warnings
+import threading
+
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.poolmanager import PoolManager
@@ -30,19 +32,37 @@ from libcloud.utils.py3 import urlparse, PY3
 
 __all__ = [
     'LibcloudBaseConnection',
-    'LibcloudConnection'
+    'LibcloudConnection',
+    'SessionRegistry',
+
+    'SESSION_REGISTRY'
 ]
 
 ALLOW_REDIRECTS = 1
 
 HTTP_PROXY_ENV_VARIABLE_NAME = 'http_proxy'
 
+# Default connection pool settings (same as the requests defaults)
+# Number of connection pools (one per host) to cache
+DEFAULT_POOL_CONNECTIONS = 10
+# Maximum number of connections to keep in a single pool
+DEFAULT_POOL_MAXSIZE = 10
+# True to block (instead of opening a new, not pooled connection) when all
+# the connections in a pool are in use
+DEFAULT_POOL_BLOCK = False
+
+# True to share sessions (and their connection pools) between all the
+# connections in this process which talk to the same endpoint with the same
+# settings
+SHARE_SESSIONS = os.environ.get('LIBCLOUD_SHARE_HTTP_SESSIONS',
+                                '').lower() in ('1', 'true')
+
 
 class SignedHTTPSAdapter(HTTPAdapter):
-    def __init__(self, cert_file, key_file):
+    def __init__(self, cert_file, key_file, **kwargs):
         self.cert_file = cert_file
         self.key_file = key_file
-        super(SignedHTTPSAdapter, self).__init__()
+        super(SignedHTTPSAdapter, self).__init__(**kwargs)
 
     def init_poolmanager(self, connections, maxsize, block=False):
         self.poolmanager = PoolManager(
@@ -72,8 +92,8 @@ class LibcloudBaseConnection(object):
 
     ca_cert = None
 
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
 
     def set_http_proxy(self, proxy_url):
         """
@@ -163,12 +183,36 @@ class LibcloudBaseConnection(object):
             else:
                 self.ca_cert = ca_certs_path
 
-    def _setup_signing(self, cert_file=None, key_file=None):
+    def _setup_signing(self, cert_file=None, key_file=None, **kwargs):
         """
         Setup request signing by mounting a signing
         adapter to the session
         """
-        self.session.mount('https://', SignedHTTPSAdapter(cert_file, key_file))
+        self.session.mount('https://', SignedHTTPSAdapter(cert_file, key_file,
+                                                          **kwargs))
+
+    def _setup_pool(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                    pool_block=DEFAULT_POOL_BLOCK):
+        """
+        Mount adapters with the provided connection pool settings to the
+        session.
+        """
+        for prefix in ('http://', 'https://'):
+            adapter = HTTPAdapter(pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize,
+                                  pool_block=pool_block)
+            self.session.mount(prefix, adapter)
+
+    def pool_stats(self):
+        """
+        Return statistics for the connection pools of this connection
+        session.
+
+        :return: A list with a dictionary for each connection pool.
+        :rtype: ``list`` of ``dict``
+        """
+        return get_session_pool_stats(self.session)
 
 
 class LibcloudConnection(LibcloudBaseConnection):
@@ -176,6 +220,10 @@ class LibcloudConnection(LibcloudBaseConnection):
     host = None
     response = None
 
+    # True if the session is shared with other connections (see
+    # SessionRegistry)
+    shared_session = False
+
     def __init__(self, host, port, secure=None, **kwargs):
         scheme = 'https' if secure is not None and secure else 'http'
         self.host = '{0}://{1}{2}'.format(
@@ -187,16 +235,50 @@ class LibcloudConnection(LibcloudBaseConnection):
         proxy_url_env = os.environ.get(HTTP_PROXY_ENV_VARIABLE_NAME, None)
         proxy_url = kwargs.pop('proxy_url', proxy_url_env)
 
+        # Connection pool settings
+        pool_kwargs = {}
+        for name, default in (('pool_connections', DEFAULT_POOL_CONNECTIONS),
+                              ('pool_maxsize', DEFAULT_POOL_MAXSIZE),
+                              ('pool_block', DEFAULT_POOL_BLOCK)):
+            value = kwargs.pop(name, None)
+            pool_kwargs[name] = default if value is None else value
+
+        share_session = kwargs.pop('share_session', None)
+        if share_session is None:
+            share_session = SHARE_SESSIONS
+
         self._setup_verify()
         self._setup_ca_cert()
 
-        LibcloudBaseConnection.__init__(self)
-
-        if 'cert_file' in kwargs or 'key_file' in kwargs:
-            self._setup_signing(**kwargs)
+        signing_kwargs = dict((key, kwargs[key]) for key in
+                              ('cert_file', 'key_file') if key in kwargs)
+
+        def setup_session(session):
+            self.session = session
+            self._setup_pool(**pool_kwargs)
+
+            if signing_kwargs:
+                self._setup_signing(**dict(signing_kwargs, **pool_kwargs))
+
+        if share_session:
+            key = (self.host, self.verification, proxy_url,
+                   signing_kwargs.get('cert_file'),
+                   signing_kwargs.get('key_file'),
+                   pool_kwargs['pool_connections'],
+                   pool_kwargs['pool_maxsize'],
+                   pool_kwargs['pool_block'])
+            session = SESSION_REGISTRY.get_session(key, setup=setup_session)
+            LibcloudBaseConnection.__init__(self, session=session)
+            self.shared_session = True
+        else:
+            LibcloudBaseConnection.__init__(self)
+            setup_session(self.session)
 
+        # Sessions which are shared always have the same proxy because it's a
+        # part of the registry key
         if proxy_url:
             self.set_http_proxy(proxy_url=proxy_url)
+
         self.session.timeout = kwargs.get('timeout', 60)
 
     @property
@@ -277,6 +359,128 @@ class LibcloudConnection(LibcloudBaseConnection):
         return headers
 
 
+class SessionRegistry(object):
+    """
+    A process wide registry of :class:`requests.Session` objects which allows
+    connections to the same endpoint to share connection pools (and avoid
+    new TCP and TLS handshakes).
+
+    Sessions are keyed by the endpoint (scheme, host and port), the TLS,
+    proxy and connection pool settings.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, key, setup=None):
+        """
+        Return the session for the provided key, creating it if needed.
+
+        :param key: Registry key.
+        :type key: ``tuple``
+
+        :param setup: Callable which is called with a newly created session
+                      before it's made available to other connections.
+        :type setup: ``callable``
+
+        :rtype: :class:`requests.Session`
+        """
+        with self._lock:
+            session = self._sessions.get(key, None)
+
+            if session is None:
+                session = requests.Session()
+
+                if setup:
+                    setup(session)
+
+                self._sessions[key] = session
+
+        return session
+
+    def clear(self):
+        """
+        Close and remove all the sessions from the registry.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+
+        for session in sessions:
+            session.close()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def pool_stats(self):
+        """
+        Return statistics for the connection pools of all the sessions in the
+        registry.
+
+        :rtype: ``list`` of ``dict``
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+
+        stats = []
+        for session in sessions:
+            stats.extend(get_session_pool_stats(session))
+
+        return stats
+
+
+SESSION_REGISTRY = SessionRegistry()
+
+
+def get_session_pool_stats(session):
+    """
+    Return statistics for the connection pools of the provided session.
+
+    Each item contains the ``scheme``, ``host`` and ``port`` of the pool,
+    the pool ``maxsize``, the number of ``idle_connections`` which can be
+    reused and the total ``num_connections`` which were opened and
+    ``num_requests`` which were sent using this pool.
+
+    :rtype: ``list`` of ``dict``
+    """
+    stats = []
+    adapters = []
+
+    for adapter in session.adapters.values():
+        if adapter not in adapters:
+            adapters.append(adapter)
+
+    for adapter in adapters:
+        pool_manager = getattr(adapter, 'poolmanager', None)
+
+        if pool_manager is None:
+            continue
+
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+
+            if pool is None:
+                continue
+
+            idle_connections = len([connection for connection in
+                                    list(pool.pool.queue)
+                                    if connection is not None]) \
+                if pool.pool is not None else 0
+
+            stats.append({
+                'scheme': pool.scheme,
+                'host': pool.host,
+                'port': pool.port,
+                'maxsize': pool.pool.maxsize if pool.pool is not None else 0,
+                'idle_connections': idle_connections,
+                'num_connections': pool.num_connections,
+                'num_requests': pool.num_requests
+            })
+
+    return stats
+
+
 class HttpLibResponseProxy(object):
     """
     Provides a proxy pattern around the :class:`requests.Reponse`
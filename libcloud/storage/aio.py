@@ -0,0 +1,589 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio interface for the storage drivers.
+
+Example usage::
+
+    driver = get_driver(Provider.S3)('key', 'secret')
+
+    async with get_async_driver(driver) as async_driver:
+        containers = await async_driver.list_containers()
+
+Note: This module requires Python 3.6+ and the aiohttp library.
+"""
+
+import asyncio
+from collections import deque
+
+from libcloud.utils.py3 import b
+from libcloud.utils.py3 import httplib
+from libcloud.utils.xml import fixxpath, findtext
+from libcloud.common.aio import AsyncBaseDriver
+from libcloud.common.types import InvalidCredsError, LibcloudError
+from libcloud.storage.types import ContainerDoesNotExistError
+from libcloud.storage.types import ObjectDoesNotExistError
+from libcloud.storage.base import Object, Container
+from libcloud.storage.drivers.s3 import BaseS3StorageDriver, CHUNK_SIZE
+
+__all__ = [
+    'AsyncStorageDriver',
+    'AsyncS3StorageDriver',
+
+    'get_async_driver'
+]
+
+# Size of the chunks which are read from a file object passed to
+# upload_object_via_stream
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncStorageDriver(AsyncBaseDriver):
+    """
+    asyncio interface to a :class:`libcloud.storage.base.StorageDriver`.
+
+    All the methods run the corresponding blocking driver method in an
+    executor. Subclasses provide native implementations for specific
+    drivers.
+    """
+
+    async def iterate_containers(self):
+        """
+        Return an asynchronous generator of containers.
+
+        :rtype: ``async generator`` of :class:`Container`
+        """
+        async for container in self._iterate_sync('iterate_containers'):
+            yield container
+
+    async def list_containers(self):
+        """
+        Return a list of containers.
+
+        :rtype: ``list`` of :class:`Container`
+        """
+        return [container async for container in self.iterate_containers()]
+
+    async def iterate_container_objects(self, container, **kwargs):
+        """
+        Return an asynchronous generator of objects for the given container.
+
+        Extra keyword arguments are passed to the driver method.
+
+        :param container: Container instance
+        :type container: :class:`Container`
+
+        :rtype: ``async generator`` of :class:`Object`
+        """
+        async for obj in self._iterate_sync('iterate_container_objects',
+                                            container, **kwargs):
+            yield obj
+
+    async def list_container_objects(self, container, **kwargs):
+        """
+        Return a list of objects for the given container.
+
+        :param container: Container instance.
+        :type container: :class:`Container`
+
+        :rtype: ``list`` of :class:`Object`
+        """
+        return [obj async for obj in
+                self.iterate_container_objects(container, **kwargs)]
+
+    async def get_container(self, container_name):
+        """
+        Return a container instance.
+
+        :param container_name: Container name.
+        :type container_name: ``str``
+
+        :rtype: :class:`Container`
+        """
+        return await self._run_sync('get_container', container_name)
+
+    async def get_object(self, container_name, object_name):
+        """
+        Return an object instance.
+
+        :param container_name: Container name.
+        :type  container_name: ``str``
+
+        :param object_name: Object name.
+        :type  object_name: ``str``
+
+        :rtype: :class:`Object`
+        """
+        return await self._run_sync('get_object', container_name,
+                                    object_name)
+
+    async def upload_object_via_stream(self, iterator, container,
+                                       object_name, extra=None, **kwargs):
+        """
+        Upload an object using an iterator.
+
+        ``iterator`` can be a regular iterator, a file-like object or an
+        asynchronous iterator.
+
+        :param iterator: An object which yields the object data.
+        :type iterator: ``iterator`` or ``async iterator``
+
+        :param container: Destination container.
+        :type container: :class:`Container`
+
+        :param object_name: Object name.
+        :type object_name: ``str``
+
+        :param extra: Extra attributes (optional).
+        :type extra: ``dict``
+
+        :rtype: :class:`Object`
+        """
+        if hasattr(iterator, '__aiter__'):
+            iterator = self._iterate_async_in_thread(iterator)
+
+        return await self._run_sync('upload_object_via_stream', iterator,
+                                    container, object_name, extra=extra,
+                                    **kwargs)
+
+    async def download_object_as_stream(self, obj, chunk_size=None):
+        """
+        Return an asynchronous generator which yields the object data.
+
+        :param obj: Object instance
+        :type obj: :class:`Object`
+
+        :param chunk_size: Optional chunk size (in bytes).
+        :type chunk_size: ``int``
+
+        :rtype: ``async generator`` of ``bytes``
+        """
+        async for chunk in self._iterate_sync('download_object_as_stream',
+                                              obj, chunk_size=chunk_size):
+            yield chunk
+
+    def _iterate_async_in_thread(self, iterator):
+        """
+        Return a blocking generator which can be consumed by an executor
+        thread and which pulls the items from an asynchronous iterator
+        running in the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        iterator = iterator.__aiter__()
+
+        async def get_next():
+            return await iterator.__anext__()
+
+        def generator():
+            while True:
+                future = asyncio.run_coroutine_threadsafe(get_next(), loop)
+
+                try:
+                    yield future.result()
+                except StopAsyncIteration:
+                    return
+
+        return generator()
+
+
+class AsyncS3StorageDriver(AsyncStorageDriver):
+    """
+    asyncio interface to the S3 (and S3 compatible) storage drivers.
+    """
+
+    driver_cls = BaseS3StorageDriver
+
+    async def iterate_containers(self):
+        if not self._is_native('iterate_containers'):
+            async for container in super().iterate_containers():
+                yield container
+            return
+
+        response = await self.connection.request('/')
+
+        if response.status != httplib.OK:
+            raise LibcloudError('Unexpected status code: %s' %
+                                (response.status), driver=self.driver)
+
+        for container in self.driver._to_containers(obj=response.object,
+                                                    xpath='Buckets/Bucket'):
+            yield container
+
+    async def iterate_container_objects(self, container, ex_prefix=None,
+                                        ex_delimiter=None,
+                                        ex_start_after=None,
+                                        ex_max_keys=None):
+        if not self._is_native('iterate_container_objects'):
+            kwargs = {'ex_prefix': ex_prefix, 'ex_delimiter': ex_delimiter,
+                      'ex_start_after': ex_start_after,
+                      'ex_max_keys': ex_max_keys}
+            kwargs = dict((key, value) for key, value in kwargs.items()
+                          if value is not None)
+
+            async for obj in super().iterate_container_objects(
+                    container, **kwargs):
+                yield obj
+            return
+
+        # Mirrors BaseS3StorageDriver._iterate_list_responses
+        driver = self.driver
+        list_v2 = driver.supports_s3_list_objects_v2
+        marker_param = 'start-after' if list_v2 else 'marker'
+        params = {}
+
+        if list_v2:
+            params['list-type'] = '2'
+
+        if ex_prefix:
+            params['prefix'] = ex_prefix
+
+        if ex_delimiter:
+            params['delimiter'] = ex_delimiter
+
+        if ex_max_keys:
+            params['max-keys'] = str(ex_max_keys)
+
+        if ex_start_after:
+            params[marker_param] = ex_start_after
+
+        container_path = driver._get_container_path(container)
+
+        while True:
+            response = await self.connection.request(container_path,
+                                                     params=params)
+
+            if response.status != httplib.OK:
+                raise LibcloudError('Unexpected status code: %s' %
+                                    (response.status), driver=driver)
+
+            objects = driver._to_objs(obj=response.object,
+                                      xpath='Contents', container=container)
+            prefixes = [findtext(element=element, xpath='Prefix',
+                                 namespace=driver.namespace)
+                        for element in response.object.findall(
+                            fixxpath(xpath='CommonPrefixes',
+                                     namespace=driver.namespace))]
+
+            for obj in objects:
+                yield obj
+
+            is_truncated = findtext(element=response.object,
+                                    xpath='IsTruncated',
+                                    namespace=driver.namespace)
+
+            if is_truncated.lower() != 'true':
+                break
+
+            token = findtext(element=response.object,
+                             xpath='NextContinuationToken',
+                             namespace=driver.namespace)
+
+            if list_v2 and token:
+                params['continuation-token'] = token
+                continue
+
+            marker = findtext(element=response.object, xpath='NextMarker',
+                              namespace=driver.namespace)
+            names = [obj.name for obj in objects] + prefixes
+
+            if not marker and names:
+                marker = max(names)
+
+            if not marker:
+                break
+
+            params[marker_param] = marker
+
+    async def get_container(self, container_name):
+        if not self._is_native('get_container'):
+            return await super().get_container(container_name)
+
+        try:
+            response = await self.connection.request('/%s' % container_name,
+                                                     method='HEAD')
+            if response.status == httplib.NOT_FOUND:
+                raise ContainerDoesNotExistError(value=None,
+                                                 driver=self.driver,
+                                                 container_name=container_name)
+        except InvalidCredsError:
+            # This just means the user doesn't have IAM permissions to do a
+            # HEAD request but other requests might work.
+            pass
+        return Container(name=container_name, extra=None, driver=self.driver)
+
+    async def get_object(self, container_name, object_name):
+        if not self._is_native('get_object'):
+            return await super().get_object(container_name, object_name)
+
+        driver = self.driver
+        container = await self.get_container(container_name=container_name)
+        object_path = driver._get_object_path(container, object_name)
+        response = await self.connection.request(object_path, method='HEAD')
+
+        if response.status == httplib.OK:
+            return driver._headers_to_object(object_name=object_name,
+                                             container=container,
+                                             headers=response.headers)
+
+        raise ObjectDoesNotExistError(value=None, driver=driver,
+                                      object_name=object_name)
+
+    async def download_object_as_stream(self, obj, chunk_size=None):
+        if not self._is_native('download_object_as_stream'):
+            async for chunk in super().download_object_as_stream(
+                    obj, chunk_size=chunk_size):
+                yield chunk
+            return
+
+        obj_path = self.driver._get_object_path(obj.container, obj.name)
+        response = await self.connection.request(obj_path, method='GET',
+                                                 stream=True, raw=True)
+
+        if response.status != httplib.OK:
+            response.response.close()
+
+            if response.status == httplib.NOT_FOUND:
+                raise ObjectDoesNotExistError(object_name=obj.name,
+                                              value='', driver=self.driver)
+
+            raise LibcloudError(value='Unexpected status code: %s' %
+                                      (response.status),
+                                driver=self.driver)
+
+        async for chunk in response.iter_content(chunk_size or CHUNK_SIZE):
+            yield chunk
+
+    async def upload_object_via_stream(self, iterator, container,
+                                       object_name, extra=None,
+                                       ex_storage_class=None,
+                                       ex_max_concurrency=None,
+                                       ex_part_size=None):
+        """
+        @inherits: :class:`AsyncStorageDriver.upload_object_via_stream`
+
+        The data is uploaded using the multipart API.
+
+        :param ex_storage_class: Storage class
+        :type ex_storage_class: ``str``
+
+        :param ex_max_concurrency: Maximum number of parts which are uploaded
+            at the same time (defaults to 1).
+        :type ex_max_concurrency: ``int``
+
+        :param ex_part_size: Size of a single part in bytes (defaults to
+            5 MB).
+        :type ex_part_size: ``int``
+        """
+        driver = self.driver
+
+        if (not self._is_native('upload_object_via_stream') or
+                not driver.supports_s3_multipart_upload):
+            return await super().upload_object_via_stream(
+                iterator, container, object_name, extra=extra,
+                ex_storage_class=ex_storage_class,
+                ex_max_concurrency=ex_max_concurrency,
+                ex_part_size=ex_part_size)
+
+        part_size = ex_part_size or CHUNK_SIZE
+        max_concurrency = ex_max_concurrency or 1
+
+        if part_size < CHUNK_SIZE:
+            raise ValueError('Part size must be at least %s bytes' %
+                             (CHUNK_SIZE))
+
+        extra = extra or {}
+        request_path = driver._get_object_path(container, object_name)
+        headers = driver._get_multipart_headers(
+            object_name, extra=extra, storage_class=ex_storage_class)
+
+        response = await self.connection.request(request_path, method='POST',
+                                                 headers=headers,
+                                                 params={'uploads': ''})
+
+        if response.status != httplib.OK:
+            raise LibcloudError('Error initiating multipart upload',
+                                driver=driver)
+
+        upload_id = findtext(element=response.object, xpath='UploadId',
+                             namespace=driver.namespace)
+
+        bytes_transferred = 0
+        chunks = []
+        pending = deque()
+
+        try:
+            part_number = 1
+            async for data in _read_in_chunks(iterator, part_size,
+                                              executor=self.executor):
+                bytes_transferred += len(data)
+                pending.append(asyncio.ensure_future(
+                    self._upload_multipart_part(request_path, upload_id,
+                                                part_number, data)))
+                part_number += 1
+
+                # Bound the number of parts which are held in memory
+                while len(pending) >= max_concurrency:
+                    chunks.append(await pending.popleft())
+
+            while pending:
+                chunks.append(await pending.popleft())
+
+            etag = await self._commit_multipart(request_path, upload_id,
+                                                chunks)
+        except Exception:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self._abort_multipart(request_path, upload_id)
+            raise
+
+        return Object(
+            name=object_name, size=bytes_transferred, hash=etag,
+            extra={'acl': extra.get('acl', None)},
+            meta_data=extra.get('meta_data', None), container=container,
+            driver=driver)
+
+    async def _upload_multipart_part(self, request_path, upload_id,
+                                     part_number, data):
+        headers = self.driver._get_multipart_part_headers(data)
+        params = {'uploadId': upload_id, 'partNumber': part_number}
+
+        response = await self.connection.request(request_path, method='PUT',
+                                                 data=data, headers=headers,
+                                                 params=params)
+
+        if response.status != httplib.OK:
+            raise LibcloudError('Error uploading chunk', driver=self.driver)
+
+        return (part_number, response.headers['etag'].replace('"', ''))
+
+    async def _commit_multipart(self, request_path, upload_id, chunks):
+        data = self.driver._get_multipart_commit_data(chunks)
+        headers = {'Content-Length': len(data)}
+        params = {'uploadId': upload_id}
+
+        response = await self.connection.request(request_path,
+                                                 headers=headers,
+                                                 params=params, data=data,
+                                                 method='POST')
+
+        if response.status != httplib.OK:
+            code, message = response._parse_error_details(
+                element=response.object)
+            msg = 'Error in multipart commit: %s (%s)' % (message, code)
+            raise LibcloudError(msg, driver=self.driver)
+
+        return response.object.find(fixxpath(
+            xpath='ETag', namespace=self.driver.namespace)).text
+
+    async def _abort_multipart(self, request_path, upload_id):
+        params = {'uploadId': upload_id}
+        response = await self.connection.request(request_path,
+                                                 method='DELETE',
+                                                 params=params)
+
+        if response.status != httplib.NO_CONTENT:
+            raise LibcloudError('Error in multipart abort. status_code=%d' %
+                                (response.status), driver=self.driver)
+
+
+async def _iterate(iterator, executor=None):
+    """
+    Asynchronously iterate over an asynchronous iterator, a file-like object
+    or a regular iterator.
+
+    The file-like objects and the regular iterators can block so they are
+    read in the executor.
+    """
+    if hasattr(iterator, '__aiter__'):
+        async for chunk in iterator:
+            yield chunk
+        return
+
+    loop = asyncio.get_event_loop()
+
+    if hasattr(iterator, 'read'):
+        while True:
+            chunk = await loop.run_in_executor(executor, iterator.read,
+                                               READ_CHUNK_SIZE)
+
+            if not chunk:
+                break
+
+            yield chunk
+    else:
+        iterator = iter(iterator)
+        sentinel = object()
+
+        while True:
+            chunk = await loop.run_in_executor(executor, next, iterator,
+                                               sentinel)
+
+            if chunk is sentinel:
+                break
+
+            yield chunk
+
+
+async def _read_in_chunks(iterator, chunk_size, executor=None):
+    """
+    Asynchronous version of :func:`libcloud.utils.files.read_in_chunks`
+    with ``fill_size`` and ``yield_empty`` enabled.
+    """
+    data = bytearray()
+    empty = True
+
+    async for chunk in _iterate(iterator, executor=executor):
+        data += b(chunk)
+
+        while len(data) >= chunk_size:
+            empty = False
+            yield bytes(data[:chunk_size])
+            del data[:chunk_size]
+
+    if data or empty:
+        yield bytes(data)
+
+
+# (driver class, asyncio interface class) pairs, the most specific first
+ASYNC_DRIVERS = [
+    (BaseS3StorageDriver, AsyncS3StorageDriver),
+]
+
+
+def get_async_driver(driver, session=None, executor=None):
+    """
+    Return the asyncio interface for the provided storage driver.
+
+    :param driver: Storage driver instance.
+    :type driver: :class:`libcloud.storage.base.StorageDriver`
+
+    :param session: aiohttp session to use (optional).
+    :type session: :class:`aiohttp.ClientSession`
+
+    :param executor: Executor for the methods without a native
+                     implementation (optional).
+    :type executor: :class:`concurrent.futures.Executor`
+
+    :rtype: :class:`AsyncStorageDriver`
+    """
+    for driver_cls, async_driver_cls in ASYNC_DRIVERS:
+        if isinstance(driver, driver_cls):
+            return async_driver_cls(driver, session=session,
+                                    executor=executor)
+
+    return AsyncStorageDriver(driver, session=session, executor=executor)
@@ -22,15 +22,18 @@ from __future__ import with_statement
 
 import os.path                          # pylint: disable-msg=W0404
 import hashlib
+import threading
 from os.path import join as pjoin
 
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import b
 
 import libcloud.utils.files
+from libcloud.utils.concurrency import imap_bounded
 from libcloud.common.types import LibcloudError
 from libcloud.common.base import ConnectionUserAndKey, BaseDriver
 from libcloud.storage.types import ObjectDoesNotExistError
+from libcloud.storage.types import ObjectHashMismatchError
 
 __all__ = [
     'Object',
@@ -38,11 +41,16 @@ __all__ = [
     'StorageDriver',
 
     'CHUNK_SIZE',
+    'RANGE_SIZE',
     'DEFAULT_CONTENT_TYPE'
 ]
 
 CHUNK_SIZE = 8096
 
+# Default size of a single byte range which is requested when an object is
+# downloaded using multiple parallel ranged requests
+RANGE_SIZE = 8 * 1024 * 1024
+
 # Default Content-Type which is sent when uploading an object if one is not
 # supplied and can't be detected when using non-strict mode.
 DEFAULT_CONTENT_TYPE = 'application/octet-stream'
@@ -396,13 +404,13 @@ class StorageDriver(BaseDriver):
         Otherwise if a provider doesn't support it, iterator will be exhausted
         so a total size for data to be uploaded can be determined.
 
-        Note: Exhausting the iterator means that the whole data must be
-        buffered in memory which might result in memory exhausting when
-        uploading a very large object.
+        Note: Exhausting the iterator means that the data is spooled to a
+        temporary file (it's kept in memory up to 8 MB and moved to disk
+        afterwards) before it's uploaded.
 
         If a file is located on a disk you are advised to use upload_object
         function which uses fs.stat function to determine the file size and it
-        doesn't need to buffer whole object in the memory.
+        doesn't need to copy the object data.
 
         :param iterator: An object which implements the iterator interface.
         :type iterator: :class:`object`
@@ -441,6 +449,43 @@ class StorageDriver(BaseDriver):
         raise NotImplementedError(
             'delete_object not implemented for this driver')
 
+    def ex_delete_objects(self, container, objects, max_concurrency=None):
+        """
+        Delete multiple objects.
+
+        Drivers which support a batch delete API delete the objects in
+        batches, the other drivers send concurrent ``delete_object``
+        requests.
+
+        :param container: Container instance.
+        :type container: :class:`Container`
+
+        :param objects: Objects or object names. The iterable is consumed
+                        lazily.
+        :type objects: ``iterable`` of :class:`Object` or ``str``
+
+        :param max_concurrency: Maximum number of requests which are sent at
+                                the same time (defaults to 4).
+        :type max_concurrency: ``int``
+
+        :return: A dictionary which maps the object names to ``True`` if the
+                 object was deleted or the exception which occurred.
+        :rtype: ``dict``
+        """
+        def delete_object(driver, obj):
+            try:
+                if driver.delete_object(obj):
+                    return obj.name, True
+
+                return obj.name, LibcloudError('Error deleting object',
+                                               driver=self)
+            except Exception as e:
+                return obj.name, e
+
+        return dict(self._imap_with_drivers(
+            delete_object, self._to_objects(container, objects),
+            max_concurrency=max_concurrency))
+
     def create_container(self, container_name):
         """
         Create a new container.
@@ -538,6 +583,186 @@ class StorageDriver(BaseDriver):
 
         chunk_size = chunk_size or CHUNK_SIZE
 
+        file_path = self._get_destination_file_path(
+            obj=obj, destination_path=destination_path,
+            overwrite_existing=overwrite_existing)
+
+        bytes_transferred = 0
+
+        with open(file_path, 'wb') as file_handle:
+            for chunk in response._response.iter_content(chunk_size):
+                file_handle.write(b(chunk))
+                bytes_transferred += len(chunk)
+
+        if int(obj.size) != int(bytes_transferred):
+            # Transfer failed, support retry?
+            if delete_on_failure:
+                self._delete_file(file_path)
+
+            return False
+
+        return True
+
+    def _save_object_ranged(self, obj, object_path, destination_path,
+                            overwrite_existing=False, delete_on_failure=True,
+                            max_concurrency=None, range_size=None,
+                            chunk_size=None):
+        """
+        Save object to the provided path by fetching multiple byte ranges of
+        the object in parallel.
+
+        Each range is requested over a separate connection and written at
+        its offset into a file which has been preallocated to the object
+        size.
+
+        If the object hash (ETag) is known, the ranges are only served if
+        the object didn't change in the meantime (``If-Match``) and the ETag
+        of every range is verified.
+
+        :param obj: Object instance.
+        :type obj: :class:`Object`
+
+        :param object_path: Request path of the object.
+        :type object_path: ``str``
+
+        :param destination_path: Destination directory.
+        :type destination_path: ``str``
+
+        :param overwrite_existing: True to overwrite a local path if it already
+                                   exists.
+        :type overwrite_existing: ``bool``
+
+        :param delete_on_failure: True to delete partially downloaded object if
+                                  the download fails.
+        :type delete_on_failure: ``bool``
+
+        :param max_concurrency: Maximum number of ranges which are fetched at
+                                the same time.
+        :type max_concurrency: ``int``
+
+        :param range_size: Size of a single range
+            (defaults to ``libcloud.storage.base.RANGE_SIZE``, 8 MB)
+        :type range_size: ``int``
+
+        :param chunk_size: Optional chunk size
+            (defaults to ``libcloud.storage.base.CHUNK_SIZE``, 8kb)
+        :type chunk_size: ``int``
+
+        :return: ``True`` on success, ``False`` otherwise.
+        :rtype: ``bool``
+        """
+        range_size = range_size or RANGE_SIZE
+        chunk_size = chunk_size or CHUNK_SIZE
+        size = int(obj.size)
+
+        file_path = self._get_destination_file_path(
+            obj=obj, destination_path=destination_path,
+            overwrite_existing=overwrite_existing)
+
+        with open(file_path, 'wb') as file_handle:
+            file_handle.truncate(size)
+
+        # Parts of different versions of the object must not be mixed
+        etag = obj.hash.strip('"') if obj.hash else None
+
+        # Connection objects are not thread safe so each worker thread
+        # uses its own copy of the driver connection
+        local = threading.local()
+
+        def save_range(byte_range):
+            start, end = byte_range
+            connection = getattr(local, 'connection', None)
+
+            if connection is None:
+                connection = self._clone_connection()
+                local.connection = connection
+
+            headers = {'Range': 'bytes=%d-%d' % (start, end)}
+
+            if etag:
+                headers['If-Match'] = '"%s"' % (etag)
+
+            response = connection.request(object_path, method='GET',
+                                          headers=headers, raw=True)
+            range_etag = response.headers.get('etag')
+
+            if response.status == httplib.PRECONDITION_FAILED or \
+                    (etag and range_etag and range_etag.strip('"') != etag):
+                raise ObjectHashMismatchError(
+                    value='Object changed during the download',
+                    object_name=obj.name, driver=self)
+
+            def write_range():
+                bytes_transferred = 0
+
+                with open(file_path, 'r+b') as file_handle:
+                    file_handle.seek(start)
+
+                    for chunk in response.iter_content(chunk_size):
+                        file_handle.write(b(chunk))
+                        bytes_transferred += len(chunk)
+
+                return bytes_transferred == (end - start + 1)
+
+            return self._get_object(
+                obj=obj, callback=write_range, callback_kwargs={},
+                response=response,
+                success_status_code=httplib.PARTIAL_CONTENT)
+
+        ranges = [(start, min(start + range_size, size) - 1)
+                  for start in range(0, size, range_size)]
+
+        try:
+            success = all(list(imap_bounded(save_range, ranges,
+                                            max_workers=max_concurrency)))
+        except Exception:
+            if delete_on_failure:
+                self._delete_file(file_path)
+            raise
+
+        if not success:
+            # Transfer failed, support retry?
+            if delete_on_failure:
+                self._delete_file(file_path)
+
+            return False
+
+        return True
+
+    def _use_ranged_download(self, obj, max_concurrency, range_size=None):
+        """
+        Return True if an object should be downloaded using multiple parallel
+        ranged requests.
+
+        :rtype: ``bool``
+        """
+        if not max_concurrency or max_concurrency <= 1:
+            return False
+
+        try:
+            size = int(obj.size)
+        except (TypeError, ValueError):
+            return False
+
+        return size > (range_size or RANGE_SIZE)
+
+    def _get_destination_file_path(self, obj, destination_path,
+                                   overwrite_existing=False):
+        """
+        Return the path of a local file an object should be saved to.
+
+        :param obj: Object instance.
+        :type obj: :class:`Object`
+
+        :param destination_path: Full path to a file or a directory.
+        :type destination_path: ``str``
+
+        :param overwrite_existing: True to overwrite a local path if it already
+                                   exists.
+        :type overwrite_existing: ``bool``
+
+        :rtype: ``str``
+        """
         base_name = os.path.basename(destination_path)
 
         if not base_name and not os.path.exists(destination_path):
@@ -556,24 +781,13 @@ class StorageDriver(BaseDriver):
                 'overwrite_existing=False',
                 driver=self)
 
-        bytes_transferred = 0
-
-        with open(file_path, 'wb') as file_handle:
-            for chunk in response._response.iter_content(chunk_size):
-                file_handle.write(b(chunk))
-                bytes_transferred += len(chunk)
-
-        if int(obj.size) != int(bytes_transferred):
-            # Transfer failed, support retry?
-            if delete_on_failure:
-                try:
-                    os.unlink(file_path)
-                except Exception:
-                    pass
-
-            return False
+        return file_path
 
-        return True
+    def _delete_file(self, file_path):
+        try:
+            os.unlink(file_path)
+        except Exception:
+            pass
 
     def _upload_object(self, object_name, content_type, request_path,
                        request_method='PUT',
@@ -611,24 +825,43 @@ class StorageDriver(BaseDriver):
                     content_type = DEFAULT_CONTENT_TYPE
 
         headers['Content-Type'] = content_type
-        if stream:
-            response = self.connection.request(
-                request_path,
-                method=request_method, data=stream,
-                headers=headers, raw=True)
-            stream_hash, stream_length = self._hash_buffered_stream(
-                stream,
-                self._get_hash_function())
+
+        # Data is hashed while it's being sent so it only needs to be read
+        # once
+        if stream and self._should_spool_stream(stream, headers):
+            # The iterator would be sent using chunked transfer encoding which
+            # the provider doesn't support. The data is spooled (in memory up
+            # to a limit and on disk afterwards) to determine its size.
+            hasher = self._get_hash_function()
+            spool, stream_length = libcloud.utils.files.spool_iterator(
+                stream, hasher=hasher)
+
+            with spool:
+                headers['Content-Length'] = str(stream_length)
+                response = self.connection.request(
+                    request_path,
+                    method=request_method, data=spool,
+                    headers=headers, raw=True)
+
+            stream_hash = hasher.hexdigest()
         else:
-            with open(file_path, 'rb') as file_stream:
+            if stream:
+                data = libcloud.utils.files.get_hashing_stream(
+                    stream, self._get_hash_function())
                 response = self.connection.request(
                     request_path,
-                    method=request_method, data=file_stream,
+                    method=request_method, data=data,
                     headers=headers, raw=True)
-            with open(file_path, 'rb') as file_stream:
-                stream_hash, stream_length = self._hash_buffered_stream(
-                    file_stream,
-                    self._get_hash_function())
+            else:
+                with open(file_path, 'rb') as file_stream:
+                    data = libcloud.utils.files.get_hashing_stream(
+                        file_stream, self._get_hash_function())
+                    response = self.connection.request(
+                        request_path,
+                        method=request_method, data=data,
+                        headers=headers, raw=True)
+
+            stream_hash, stream_length = data.hexdigest(), data.bytes_read
 
         if not response.success():
             response.parse_error()
@@ -640,30 +873,33 @@ class StorageDriver(BaseDriver):
                 'bytes_transferred': stream_length,
                 'data_hash': stream_hash}
 
-    def _hash_buffered_stream(self, stream, hasher, blocksize=65536):
-        total_len = 0
-
-        if hasattr(stream, '__next__') or hasattr(stream, 'next'):
-            for chunk in libcloud.utils.files.read_in_chunks(iterator=stream):
-                hasher.update(b(chunk))
-                total_len += len(chunk)
+    def _should_spool_stream(self, stream, headers):
+        """
+        Return True if a stream which is uploaded should be spooled to
+        determine its size before it's sent.
 
-            return (hasher.hexdigest(), total_len)
+        Iterators are spooled if the driver doesn't support chunked transfer
+        encoding and the ``Content-Length`` is not known. The size of the
+        file-like objects is determined by the HTTP client.
 
-        if not hasattr(stream, '__exit__'):
-            for s in stream:
-                hasher.update(s)
-                total_len = total_len + len(s)
-            return (hasher.hexdigest(), total_len)
+        :rtype: ``bool``
+        """
+        if self.supports_chunked_encoding or hasattr(stream, 'read'):
+            return False
 
-        with stream:
-            buf = stream.read(blocksize)
-            while len(buf) > 0:
-                total_len = total_len + len(buf)
-                hasher.update(buf)
-                buf = stream.read(blocksize)
+        return not any(key.lower() == 'content-length' for key in headers)
 
-        return (hasher.hexdigest(), total_len)
+    def _to_objects(self, container, objects):
+        """
+        Return a generator which yields an :class:`Object` for every object or
+        object name in ``objects``.
+        """
+        for obj in objects:
+            if isinstance(obj, Object):
+                yield obj
+            else:
+                yield Object(name=obj, size=None, hash=None, extra={},
+                             meta_data={}, container=container, driver=self)
 
     def _get_hash_function(self):
         """
@@ -557,11 +557,30 @@ class AzureBlobsStorageDriver(StorageDriver):
         return False
 
     def download_object(self, obj, destination_path, overwrite_existing=False,
-                        delete_on_failure=True):
+                        delete_on_failure=True, ex_max_concurrency=None,
+                        ex_range_size=None):
         """
         @inherits: :class:`StorageDriver.download_object`
+
+        :param ex_max_concurrency: If provided and the object is larger than
+            ``ex_range_size``, the object is downloaded using up to this many
+            parallel ranged requests.
+        :type ex_max_concurrency: ``int``
+
+        :param ex_range_size: Size of a single byte range in bytes
+            (defaults to ``libcloud.storage.base.RANGE_SIZE``, 8 MB).
+        :type ex_range_size: ``int``
         """
         obj_path = self._get_object_path(obj.container, obj.name)
+
+        if self._use_ranged_download(obj, ex_max_concurrency, ex_range_size):
+            return self._save_object_ranged(
+                obj=obj, object_path=obj_path,
+                destination_path=destination_path,
+                overwrite_existing=overwrite_existing,
+                delete_on_failure=delete_on_failure,
+                max_concurrency=ex_max_concurrency, range_size=ex_range_size)
+
         response = self.connection.request(obj_path, raw=True, data=None)
 
         return self._get_object(obj=obj, callback=self._save_object,
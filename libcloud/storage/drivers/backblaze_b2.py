@@ -17,6 +17,7 @@
 Driver for Backblaze B2 service.
 """
 
+import os
 import base64
 import hashlib
 
@@ -29,8 +30,9 @@ from libcloud.utils.py3 import b
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import next
+from libcloud.utils.files import CHUNK_SIZE
 from libcloud.utils.files import read_in_chunks
-from libcloud.utils.files import exhaust_iterator
+from libcloud.utils.files import spool_iterator
 from libcloud.utils.escape import sanitize_object_name
 
 from libcloud.common.base import ConnectionUserAndKey
@@ -334,15 +336,20 @@ class BackblazeB2StorageDriver(StorageDriver):
         # don't support that
 
         with open(file_path, 'rb') as fp:
-            iterator = iter(fp)
-            iterator = read_in_chunks(iterator=iterator)
-            data = exhaust_iterator(iterator=iterator)
+            sha1 = hashlib.sha1()
 
-        obj = self._perform_upload(data=data, container=container,
-                                   object_name=object_name,
-                                   extra=extra,
-                                   verify_hash=verify_hash,
-                                   headers=headers)
+            for chunk in read_in_chunks(iterator=fp, chunk_size=CHUNK_SIZE):
+                sha1.update(chunk)
+
+            fp.seek(0)
+
+            obj = self._perform_upload(data=fp, container=container,
+                                       object_name=object_name,
+                                       extra=extra,
+                                       verify_hash=verify_hash,
+                                       headers=headers,
+                                       sha1=sha1.hexdigest(),
+                                       size=os.fstat(fp.fileno()).st_size)
 
         return obj
 
@@ -351,18 +358,20 @@ class BackblazeB2StorageDriver(StorageDriver):
         """
         Upload an object.
 
-        Note: Backblaze does not yet support uploading via stream,
-        so this calls upload_object internally requiring the object data
-        to be loaded into memory at once
+        Note: Backblaze API requires the SHA1 hash and the size of the object
+        to be provided upfront so the data is first spooled to a temporary
+        file (in memory up to 8 MB and on disk afterwards).
         """
+        sha1 = hashlib.sha1()
+        spool, size = spool_iterator(iterator, hasher=sha1)
 
-        iterator = read_in_chunks(iterator=iterator)
-        data = exhaust_iterator(iterator=iterator)
-
-        obj = self._perform_upload(data=data, container=container,
-                                   object_name=object_name,
-                                   extra=extra,
-                                   headers=headers)
+        with spool:
+            obj = self._perform_upload(data=spool, container=container,
+                                       object_name=object_name,
+                                       extra=extra,
+                                       headers=headers,
+                                       sha1=sha1.hexdigest(),
+                                       size=size)
 
         return obj
 
@@ -481,8 +490,15 @@ class BackblazeB2StorageDriver(StorageDriver):
         return path
 
     def _perform_upload(self, data, container, object_name, extra=None,
-                        verify_hash=True, headers=None):
+                        verify_hash=True, headers=None, sha1=None, size=None):
+        """
+        Upload the object data.
 
+        :param data: Object data or a file-like object. The SHA1 hash
+                     (``sha1``) and the ``size`` need to be provided for the
+                     file-like objects.
+        :type data: ``bytes`` or :class:`file`
+        """
         if isinstance(data, str):
             data = bytearray(data)
 
@@ -498,9 +514,13 @@ class BackblazeB2StorageDriver(StorageDriver):
         headers['X-Bz-File-Name'] = object_name
         headers['Content-Type'] = content_type
 
-        sha1 = hashlib.sha1()
-        sha1.update(b(data))
-        headers['X-Bz-Content-Sha1'] = sha1.hexdigest()
+        if sha1 is None:
+            sha1 = hashlib.sha1(b(data)).hexdigest()
+
+        headers['X-Bz-Content-Sha1'] = sha1
+
+        if size is not None:
+            headers['Content-Length'] = str(size)
 
         # Include optional meta-data (up to 10 items)
         for key, value in meta_data:
@@ -195,6 +195,9 @@ class GoogleStorageDriver(BaseS3StorageDriver):
     namespace = NAMESPACE
     supports_chunked_encoding = False
     supports_s3_multipart_upload = False
+    # The XML API doesn't support the Multi-Object Delete API so the objects
+    # are deleted using concurrent DELETE requests
+    supports_s3_multi_object_delete = False
     http_vendor_prefix = 'x-goog'
 
     def __init__(self, key, secret=None, project=None, **kwargs):
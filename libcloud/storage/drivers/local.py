@@ -19,10 +19,27 @@ Provides storage driver for working with local filesystem
 
 from __future__ import with_statement
 
+import binascii
 import errno
+import hashlib
 import os
 import shutil
 import sys
+from contextlib import contextmanager
+from functools import partial
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 try:
     import lockfile
@@ -32,7 +49,6 @@ except ImportError:
                       'using pip: pip install lockfile')
 
 from libcloud.utils.files import read_in_chunks
-from libcloud.utils.py3 import relpath
 from libcloud.utils.py3 import u
 from libcloud.common.base import Connection
 from libcloud.storage.base import Object, Container, StorageDriver
@@ -46,6 +62,35 @@ from libcloud.storage.types import InvalidContainerNameError
 
 IGNORE_FOLDERS = ['.lock', '.hash']
 
+# Objects are written to temporary files with this prefix which are renamed
+# to the object names once they are complete. These files are not listed.
+TEMP_FILE_PREFIX = '.libcloud-tmp-'
+
+# Permissions of the object files
+OBJECT_FILE_MODE = int('664', 8)
+
+# Ways of copying a file to a container: "copy" copies the data (in the
+# kernel if possible), "hardlink" links the file and "reflink" clones the
+# file on the file-systems which support it (e.g. Btrfs and XFS). Both fall
+# back to "copy" if the source and the destination don't share a
+# file-system.
+COPY_MODES = ('copy', 'hardlink', 'reflink')
+
+# Size of the buffer used when the data is copied in user space
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Maximum number of bytes copied by a single copy_file_range / sendfile call
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# ioctl request which clones a file on Linux (FICLONE)
+FICLONE = 0x40049409
+
+# Errors which mean that the in-kernel copy is not supported for the files
+COPY_FALLBACK_ERRNOS = tuple(getattr(errno, name) for name in
+                             ('EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP',
+                              'ENOTSUP', 'EBADF', 'EPERM', 'EMLINK')
+                             if hasattr(errno, name))
+
 
 class LockLocalStorage(object):
     """
@@ -69,6 +114,200 @@ class LockLocalStorage(object):
             raise value
 
 
+def _replace(source, destination):
+    """
+    Atomically rename a file, replacing the destination if it exists.
+    """
+    replace = getattr(os, 'replace', None)
+
+    if replace is not None:
+        replace(source, destination)
+    elif os.name == 'nt' and os.path.exists(destination):
+        os.remove(destination)
+        os.rename(source, destination)
+    else:
+        os.rename(source, destination)
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _get_temp_path(path):
+    """
+    Return the path of a new temporary file in the directory of ``path``.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    name = binascii.hexlify(os.urandom(8)).decode('ascii')
+    return os.path.join(directory, TEMP_FILE_PREFIX + name)
+
+
+@contextmanager
+def _atomic_file(path, file_mode=None):
+    """
+    Yield a file object of a temporary file in the directory of ``path``
+    which replaces ``path`` when the block finishes without an error.
+
+    Readers never see a partially written file and concurrent writers don't
+    need to lock the path (the last one wins).
+
+    :param file_mode: Permissions of the file. If not provided, the file is
+                      created like ``open()`` does (the umask applies).
+    :type file_mode: ``int``
+    """
+    while True:
+        temp_path = _get_temp_path(path)
+
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL |
+                         getattr(os, 'O_BINARY', 0), int('666', 8))
+            break
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    try:
+        with os.fdopen(fd, 'wb', COPY_BUFFER_SIZE) as fp:
+            yield fp
+
+        if file_mode is not None:
+            os.chmod(temp_path, file_mode)
+
+        _replace(temp_path, path)
+    except BaseException:
+        _unlink(temp_path)
+        raise
+
+
+def _link_file(source, path):
+    """
+    Atomically replace ``path`` with a hard link to ``source``.
+
+    :return: False if the files can't be linked (e.g. they are on different
+             file-systems).
+    :rtype: ``bool``
+    """
+    temp_path = _get_temp_path(path)
+
+    try:
+        os.link(source, temp_path)
+    except (OSError, AttributeError) as e:
+        if getattr(e, 'errno', errno.ENOSYS) in COPY_FALLBACK_ERRNOS:
+            return False
+        raise
+
+    try:
+        _replace(temp_path, path)
+    except BaseException:
+        _unlink(temp_path)
+        raise
+
+    return True
+
+
+def _clone_file(source_fp, destination_fp):
+    """
+    Clone the file data using the FICLONE ioctl (a copy-on-write copy).
+
+    :rtype: ``bool``
+    """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+
+    try:
+        fcntl.ioctl(destination_fp.fileno(), FICLONE, source_fp.fileno())
+    except (IOError, OSError):
+        return False
+
+    return True
+
+
+def _copy_file_range(source_fd, destination_fd):
+    copy_file_range = getattr(os, 'copy_file_range', None)
+
+    if copy_file_range is None:
+        return False
+
+    copied = 0
+
+    while True:
+        try:
+            count = copy_file_range(source_fd, destination_fd,
+                                    COPY_CHUNK_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in COPY_FALLBACK_ERRNOS:
+                return False
+            raise
+
+        if count == 0:
+            return True
+
+        copied += count
+
+
+def _sendfile(source_fd, destination_fd):
+    sendfile = getattr(os, 'sendfile', None)
+
+    # Only Linux supports sending to a regular file
+    if sendfile is None or not sys.platform.startswith('linux'):
+        return False
+
+    offset = 0
+
+    while True:
+        try:
+            count = sendfile(destination_fd, source_fd, offset,
+                             COPY_CHUNK_SIZE)
+        except OSError as e:
+            if offset == 0 and e.errno in COPY_FALLBACK_ERRNOS:
+                return False
+            raise
+
+        if count == 0:
+            return True
+
+        offset += count
+
+
+def _copy_file(source, path, mode='copy', file_mode=None):
+    """
+    Atomically replace ``path`` with a copy of the ``source`` file.
+
+    The data is copied in the kernel (copy_file_range or sendfile) if
+    possible and in user space otherwise.
+
+    :param mode: One of ``COPY_MODES``.
+    :type mode: ``str``
+
+    :param file_mode: Permissions of the copied file (see
+                      :func:`_atomic_file`). A hard link keeps the
+                      permissions of the source file.
+    :type file_mode: ``int``
+    """
+    if mode not in COPY_MODES:
+        raise ValueError('Invalid copy mode: %s' % (mode))
+
+    if mode == 'hardlink' and _link_file(source, path):
+        return
+
+    with open(source, 'rb') as source_fp:
+        with _atomic_file(path, file_mode=file_mode) as destination_fp:
+            if mode == 'reflink' and _clone_file(source_fp, destination_fp):
+                return
+
+            source_fd = source_fp.fileno()
+            destination_fd = destination_fp.fileno()
+
+            if _copy_file_range(source_fd, destination_fd) or \
+                    _sendfile(source_fd, destination_fd):
+                return
+
+            shutil.copyfileobj(source_fp, destination_fp, COPY_BUFFER_SIZE)
+
+
 class LocalStorageDriver(StorageDriver):
     """
     Implementation of local file-system based storage. This is helpful
@@ -148,7 +387,7 @@ class LocalStorageDriver(StorageDriver):
 
         return Container(name=container_name, extra=extra, driver=self)
 
-    def _make_object(self, container, object_name):
+    def _make_object(self, container, object_name, stat=None):
         """
         Create an object instance
 
@@ -158,27 +397,32 @@ class LocalStorageDriver(StorageDriver):
         :param object_name: Object name.
         :type object_name: ``str``
 
+        :param stat: Result of ``os.stat`` for the object file if it's
+                     already known (e.g. from a directory listing).
+        :type stat: ``os.stat_result``
+
         :return: Object instance.
         :rtype: :class:`Object`
         """
 
-        full_path = os.path.join(self.base_path, container.name, object_name)
+        if stat is None:
+            full_path = os.path.join(self.base_path, container.name,
+                                     object_name)
 
-        if os.path.isdir(full_path):
-            raise ObjectError(value=None, driver=self, object_name=object_name)
+            if os.path.isdir(full_path):
+                raise ObjectError(value=None, driver=self,
+                                  object_name=object_name)
 
-        try:
-            stat = os.stat(full_path)
-        except Exception:
-            raise ObjectDoesNotExistError(value=None, driver=self,
-                                          object_name=object_name)
+            try:
+                stat = os.stat(full_path)
+            except Exception:
+                raise ObjectDoesNotExistError(value=None, driver=self,
+                                              object_name=object_name)
 
         # Make a hash for the file based on the metadata. We can safely
         # use only the mtime attribute here. If the file contents change,
         # the underlying file-system will change mtime
-        data_hash = self._get_hash_function()
-        data_hash.update(u(stat.st_mtime).encode('ascii'))
-        data_hash = data_hash.hexdigest()
+        data_hash = hashlib.md5(u(stat.st_mtime).encode('ascii')).hexdigest()
 
         extra = {}
         extra['creation_time'] = stat.st_ctime
@@ -203,36 +447,130 @@ class LocalStorageDriver(StorageDriver):
                 continue
             yield self._make_container(container_name)
 
-    def _get_objects(self, container):
+    def _get_objects(self, container, prefix=None):
         """
-        Recursively iterate through the file-system and return the object names
+        Recursively iterate through the file-system and return the objects
+        sorted by the name.
+
+        :param prefix: Only return the objects whose name starts with the
+                       prefix. The directories which can't contain such
+                       objects are not listed.
+        :type prefix: ``str``
         """
 
         cpath = self.get_container_cdn_url(container, check=True)
+        prefix = prefix or ''
+
+        if scandir is not None:
+            scan = self._scan_directory
+        else:
+            scan = self._list_directory
+
+        # Directories are sorted as if the names ended with a separator so
+        # the object names are yielded in order
+        stack = [iter(scan(cpath, ''))]
 
-        for folder, subfolders, files in os.walk(cpath, topdown=True):
-            # Remove unwanted subfolders
-            for subf in IGNORE_FOLDERS:
-                if subf in subfolders:
-                    subfolders.remove(subf)
+        while stack:
+            try:
+                key, path, get_stat = next(stack[-1])
+            except StopIteration:
+                stack.pop()
+                continue
+
+            if get_stat is None:
+                if key.startswith(prefix) or prefix.startswith(key):
+                    stack.append(iter(scan(path, key)))
+            elif key.startswith(prefix):
+                try:
+                    stat = get_stat()
+                except OSError:
+                    # E.g. a broken symbolic link
+                    continue
 
-            for name in files:
-                full_path = os.path.join(folder, name)
-                object_name = relpath(full_path, start=cpath)
-                yield self._make_object(container, object_name)
+                yield self._make_object(container, key, stat=stat)
 
-    def iterate_container_objects(self, container):
+    def _scan_directory(self, path, key_prefix):
+        """
+        Return the sorted ``(key, path, get_stat)`` tuples for the entries of
+        a directory. ``get_stat`` is ``None`` for the subdirectories whose key
+        ends with a separator.
+        """
+        entries = []
+
+        for entry in scandir(path):
+            if entry.name.startswith(TEMP_FILE_PREFIX):
+                continue
+
+            if entry.is_dir():
+                # Links to directories are not followed (same as os.walk)
+                if entry.name in IGNORE_FOLDERS or entry.is_symlink():
+                    continue
+
+                entries.append((key_prefix + entry.name + os.sep,
+                                entry.path, None))
+            else:
+                entries.append((key_prefix + entry.name, entry.path,
+                                entry.stat))
+
+        entries.sort(key=lambda item: item[0])
+        return entries
+
+    def _list_directory(self, path, key_prefix):
+        """
+        Same as :meth:`_scan_directory` but uses os.listdir (used when
+        scandir is not available).
+        """
+        entries = []
+
+        for name in os.listdir(path):
+            if name.startswith(TEMP_FILE_PREFIX):
+                continue
+
+            full_path = os.path.join(path, name)
+
+            if os.path.isdir(full_path):
+                if name in IGNORE_FOLDERS or os.path.islink(full_path):
+                    continue
+
+                entries.append((key_prefix + name + os.sep, full_path, None))
+            else:
+                entries.append((key_prefix + name, full_path,
+                                partial(os.stat, full_path)))
+
+        entries.sort(key=lambda item: item[0])
+        return entries
+
+    def iterate_container_objects(self, container, ex_prefix=None):
         """
         Returns a generator of objects for the given container.
 
         :param container: Container instance
         :type container: :class:`Container`
 
+        :param ex_prefix: Only return objects starting with ex_prefix
+        :type ex_prefix: ``str``
+
         :return: A generator of Object instances.
         :rtype: ``generator`` of :class:`Object`
         """
 
-        return self._get_objects(container)
+        return self._get_objects(container, prefix=ex_prefix)
+
+    def list_container_objects(self, container, ex_prefix=None):
+        """
+        Return a list of objects for the given container.
+
+        :param container: Container instance.
+        :type container: :class:`Container`
+
+        :param ex_prefix: Only return objects starting with ex_prefix
+        :type ex_prefix: ``str``
+
+        :return: A list of Object instances.
+        :rtype: ``list`` of :class:`Object`
+        """
+        return list(self.iterate_container_objects(container,
+                                                   ex_prefix=ex_prefix))
 
     def get_container(self, container_name):
         """
@@ -336,10 +674,13 @@ class LocalStorageDriver(StorageDriver):
         return True
 
     def download_object(self, obj, destination_path, overwrite_existing=False,
-                        delete_on_failure=True):
+                        delete_on_failure=True, ex_copy_mode='copy'):
         """
         Download an object to the specified destination path.
 
+        The object is copied to a temporary file which replaces the
+        destination file once it's complete.
+
         :param obj: Object instance.
         :type obj: :class:`Object`
 
@@ -355,6 +696,13 @@ class LocalStorageDriver(StorageDriver):
         the download was not successful (hash mismatch / file size).
         :type delete_on_failure: ``bool``
 
+        :param ex_copy_mode: One of ``copy``, ``hardlink`` and ``reflink``
+            (see ``COPY_MODES``), defaults to ``copy``. A hard linked file
+            shares its inode with the stored object, so writing to it (or
+            changing its permissions) modifies the object too. Use it only
+            for files which are not modified in place.
+        :type ex_copy_mode: ``str``
+
         :return: True if an object has been successfully downloaded, False
         otherwise.
         :rtype: ``bool``
@@ -379,14 +727,10 @@ class LocalStorageDriver(StorageDriver):
                 'overwrite_existing=False',
                 driver=self)
 
+        # Partially copied data is never written to file_path
         try:
-            shutil.copy(obj_path, file_path)
-        except IOError:
-            if delete_on_failure:
-                try:
-                    os.unlink(file_path)
-                except Exception:
-                    pass
+            _copy_file(obj_path, file_path, mode=ex_copy_mode)
+        except (IOError, OSError):
             return False
 
         return True
@@ -410,10 +754,14 @@ class LocalStorageDriver(StorageDriver):
                 yield data
 
     def upload_object(self, file_path, container, object_name, extra=None,
-                      verify_hash=True):
+                      verify_hash=True, ex_copy_mode='copy'):
         """
         Upload an object currently located on a disk.
 
+        The file is copied to a temporary file which replaces the object
+        file once it's complete, so concurrent uploads of the same object
+        don't need to lock it.
+
         :param file_path: Path to the object on disk.
         :type file_path: ``str``
 
@@ -429,6 +777,11 @@ class LocalStorageDriver(StorageDriver):
         :param extra: (optional) Extra attributes (driver specific).
         :type extra: ``dict``
 
+        :param ex_copy_mode: One of ``copy``, ``hardlink`` and ``reflink``
+            (see ``COPY_MODES``), defaults to ``copy``. A hard linked object
+            shares the data and the permissions with the source file.
+        :type ex_copy_mode: ``str``
+
         :rtype: ``object``
         """
 
@@ -437,11 +790,8 @@ class LocalStorageDriver(StorageDriver):
         base_path = os.path.dirname(obj_path)
 
         self._make_path(base_path)
-
-        with LockLocalStorage(obj_path):
-            shutil.copy(file_path, obj_path)
-
-        os.chmod(obj_path, int('664', 8))
+        _copy_file(file_path, obj_path, mode=ex_copy_mode,
+                   file_mode=OBJECT_FILE_MODE)
 
         return self._make_object(container, object_name)
 
@@ -486,11 +836,13 @@ class LocalStorageDriver(StorageDriver):
         obj_path = os.path.join(path, object_name)
         base_path = os.path.dirname(obj_path)
         self._make_path(base_path)
-        with LockLocalStorage(obj_path):
-            with open(obj_path, 'wb') as obj_file:
-                for data in iterator:
-                    obj_file.write(data)
-        os.chmod(obj_path, int('664', 8))
+
+        # The chunks are collected in the (reused) buffer of the file object
+        # so the small chunks don't result in a system call each
+        with _atomic_file(obj_path, file_mode=OBJECT_FILE_MODE) as obj_file:
+            for data in iterator:
+                obj_file.write(data)
+
         return self._make_object(container, object_name)
 
     def delete_object(self, obj):
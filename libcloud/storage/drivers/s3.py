@@ -15,8 +15,10 @@
 
 import base64
 import hmac
+import threading
 import time
-from hashlib import sha1
+from hashlib import md5, sha1
+from collections import deque
 
 import libcloud.utils.py3
 
@@ -35,6 +37,8 @@ from libcloud.utils.py3 import tostring
 
 from libcloud.utils.xml import fixxpath, findtext
 from libcloud.utils.files import read_in_chunks
+from libcloud.utils.misc import chunked
+from libcloud.utils.concurrency import imap_bounded, ichain_bounded
 from libcloud.common.types import InvalidCredsError, LibcloudError
 from libcloud.common.base import ConnectionUserAndKey, RawResponse
 from libcloud.common.aws import AWSBaseResponse, AWSDriver, \
@@ -81,9 +85,16 @@ CHUNK_SIZE = 5 * 1024 * 1024
 # ex_iterate_multipart_uploads.
 RESPONSES_PER_REQUEST = 100
 
+# Maximum number of keys which can be deleted using a single Multi-Object
+# Delete request.
+MULTI_DELETE_MAX_KEYS = 1000
+
 
 class S3Response(AWSBaseResponse):
     namespace = None
+    # Most of the storage calls (HEAD, PUT, DELETE) only need the status and
+    # the headers
+    parse_body_lazily = True
     valid_response_codes = [httplib.NOT_FOUND, httplib.CONFLICT,
                             httplib.BAD_REQUEST]
 
@@ -240,6 +251,9 @@ class BaseS3StorageDriver(StorageDriver):
     hash_type = 'md5'
     supports_chunked_encoding = False
     supports_s3_multipart_upload = True
+    supports_s3_multi_object_delete = True
+    # ListObjectsV2 (continuation tokens and start-after) support
+    supports_s3_list_objects_v2 = False
     ex_location_name = ''
     namespace = NAMESPACE
     http_vendor_prefix = 'x-amz'
@@ -254,7 +268,7 @@ class BaseS3StorageDriver(StorageDriver):
         raise LibcloudError('Unexpected status code: %s' % (response.status),
                             driver=self)
 
-    def list_container_objects(self, container, ex_prefix=None):
+    def list_container_objects(self, container, ex_prefix=None, **kwargs):
         """
         Return a list of objects for the given container.
 
@@ -264,37 +278,230 @@ class BaseS3StorageDriver(StorageDriver):
         :param ex_prefix: Only return objects starting with ex_prefix
         :type ex_prefix: ``str``
 
+        Other keyword arguments are passed to
+        :meth:`iterate_container_objects`.
+
         :return: A list of Object instances.
         :rtype: ``list`` of :class:`Object`
         """
         return list(self.iterate_container_objects(container,
-                                                   ex_prefix=ex_prefix))
+                                                   ex_prefix=ex_prefix,
+                                                   **kwargs))
 
-    def iterate_container_objects(self, container, ex_prefix=None):
+    def iterate_container_objects(self, container, ex_prefix=None,
+                                  ex_delimiter=None, ex_start_after=None,
+                                  ex_max_keys=None, ex_max_concurrency=None,
+                                  ex_parallel_depth=1):
         """
         Return a generator of objects for the given container.
 
+        The objects are yielded in the lexicographical order of their names.
+
+        If ``ex_max_concurrency`` is larger than 1, the common prefixes
+        (``/`` delimited) of the first ``ex_parallel_depth`` levels are
+        discovered first and are then listed concurrently. The objects are
+        still yielded in order and only a few pages of the up to
+        ``ex_max_concurrency`` prefixes which are listed at the same time
+        are held in memory.
+
         :param container: Container instance
         :type container: :class:`Container`
 
         :param ex_prefix: Only return objects starting with ex_prefix
         :type ex_prefix: ``str``
 
+        :param ex_delimiter: Only return the objects whose names don't
+                             contain the delimiter after the prefix (see
+                             :meth:`ex_iterate_common_prefixes` for the
+                             names which were rolled up).
+        :type ex_delimiter: ``str``
+
+        :param ex_start_after: Only return objects whose names are after
+                               this name.
+        :type ex_start_after: ``str``
+
+        :param ex_max_keys: Maximum number of objects returned by a single
+                            request.
+        :type ex_max_keys: ``int``
+
+        :param ex_max_concurrency: Maximum number of concurrent list
+                                  requests (can't be combined with
+                                  ``ex_delimiter``).
+        :type ex_max_concurrency: ``int``
+
+        :param ex_parallel_depth: Number of levels of prefixes which are
+                                  discovered before they are listed
+                                  concurrently.
+        :type ex_parallel_depth: ``int``
+
         :return: A generator of Object instances.
         :rtype: ``generator`` of :class:`Object`
         """
+        if ex_max_concurrency is not None and ex_max_concurrency > 1:
+            if ex_delimiter:
+                raise ValueError('ex_delimiter can\'t be used with '
+                                 'concurrent listing')
+
+            return self._iterate_container_objects_concurrently(
+                container=container, prefix=ex_prefix,
+                start_after=ex_start_after, max_keys=ex_max_keys,
+                max_concurrency=ex_max_concurrency,
+                depth=max(ex_parallel_depth, 1))
+
+        return self._iterate_container_objects(
+            container=container, prefix=ex_prefix, delimiter=ex_delimiter,
+            start_after=ex_start_after, max_keys=ex_max_keys)
+
+    def ex_iterate_common_prefixes(self, container, prefix=None,
+                                   delimiter='/', start_after=None):
+        """
+        Return a generator of the common prefixes of the object names in the
+        given container (e.g. the "directories" of the objects whose names
+        contain the ``/`` delimiter).
+
+        :param container: Container instance
+        :type container: :class:`Container`
+
+        :param prefix: Only return common prefixes starting with prefix
+        :type prefix: ``str``
+
+        :param delimiter: Delimiter which is used to roll up the names.
+        :type delimiter: ``str``
+
+        :param start_after: Only return common prefixes of the objects whose
+                            names are after this name.
+        :type start_after: ``str``
+
+        :return: A generator of the common prefixes (including the
+                 delimiter).
+        :rtype: ``generator`` of ``str``
+        """
+        for _, prefixes in self._iterate_list_responses(
+                container=container, prefix=prefix, delimiter=delimiter,
+                start_after=start_after):
+            for common_prefix in prefixes:
+                yield common_prefix
+
+    def _iterate_container_objects(self, container, prefix=None,
+                                   delimiter=None, start_after=None,
+                                   max_keys=None):
+        for objects, _ in self._iterate_list_responses(
+                container=container, prefix=prefix, delimiter=delimiter,
+                start_after=start_after, max_keys=max_keys):
+            for obj in objects:
+                yield obj
+
+    def _iterate_container_objects_concurrently(self, container, prefix,
+                                                start_after, max_keys,
+                                                max_concurrency, depth):
+        def list_level(driver, level_prefix):
+            objects, prefixes = [], []
+
+            for page_objects, page_prefixes in \
+                    driver._iterate_list_responses(
+                        container=container, prefix=level_prefix,
+                        delimiter='/', start_after=start_after,
+                        max_keys=max_keys):
+                objects.extend(page_objects)
+                prefixes.extend(page_prefixes)
+
+            return objects, prefixes
+
+        # The drivers used to list the units are kept in a pool, each of
+        # them is only used by one producer thread at a time
+        drivers = deque()
+
+        def list_unit(unit):
+            if isinstance(unit, list):
+                yield unit
+                return
+
+            try:
+                driver = drivers.popleft()
+            except IndexError:
+                driver = self._copy_driver()
+
+            try:
+                for page_objects, _ in driver._iterate_list_responses(
+                        container=container, prefix=unit,
+                        start_after=start_after, max_keys=max_keys):
+                    yield page_objects
+            finally:
+                drivers.append(driver)
+
+        # Discover the prefixes level by level, the objects which are not
+        # under any of the prefixes are returned directly
+        objects, prefixes = [], [prefix or '']
+
+        for _ in range(depth):
+            level_prefixes = []
+
+            for level_objects, next_prefixes in self._imap_with_drivers(
+                    list_level, prefixes, max_concurrency=max_concurrency):
+                objects.extend(level_objects)
+                level_prefixes.extend(next_prefixes)
+
+            prefixes = level_prefixes
+
+            if not prefixes:
+                break
+
+        # All the names which start with a prefix are contiguous in the
+        # lexicographical order, so listing the prefixes and the objects in
+        # order of their names yields a sorted stream. The consecutive
+        # objects are grouped in a single unit.
+        entries = sorted([(obj.name, obj) for obj in objects] +
+                         [(name, None) for name in prefixes],
+                         key=lambda entry: entry[0])
+        units = []
+
+        for name, obj in entries:
+            if obj is None:
+                units.append(name)
+            elif units and isinstance(units[-1], list):
+                units[-1].append(obj)
+            else:
+                units.append([obj])
+
+        # Only a few pages of every prefix which is being listed are
+        # buffered
+        for page_objects in ichain_bounded(list_unit, units,
+                                           max_workers=max_concurrency):
+            for obj in page_objects:
+                obj.driver = self
+                yield obj
+
+    def _iterate_list_responses(self, container, prefix=None, delimiter=None,
+                                start_after=None, max_keys=None):
+        """
+        Return a generator which sends the (paginated) list objects requests
+        and yields a tuple of the objects and the common prefixes of every
+        response.
+
+        ListObjectsV2 is used if the provider supports it.
+        """
+        list_v2 = self.supports_s3_list_objects_v2
+        marker_param = 'start-after' if list_v2 else 'marker'
         params = {}
-        if ex_prefix:
-            params['prefix'] = ex_prefix
 
-        last_key = None
-        exhausted = False
-        container_path = self._get_container_path(container)
+        if list_v2:
+            params['list-type'] = '2'
+
+        if prefix:
+            params['prefix'] = prefix
 
-        while not exhausted:
-            if last_key:
-                params['marker'] = last_key
+        if delimiter:
+            params['delimiter'] = delimiter
+
+        if max_keys:
+            params['max-keys'] = str(max_keys)
+
+        if start_after:
+            params[marker_param] = start_after
+
+        container_path = self._get_container_path(container)
 
+        while True:
             response = self.connection.request(container_path,
                                                params=params)
 
@@ -304,14 +511,42 @@ class BaseS3StorageDriver(StorageDriver):
 
             objects = self._to_objs(obj=response.object,
                                     xpath='Contents', container=container)
-            is_truncated = response.object.findtext(fixxpath(
-                xpath='IsTruncated', namespace=self.namespace)).lower()
-            exhausted = (is_truncated == 'false')
+            prefixes = [findtext(element=element, xpath='Prefix',
+                                 namespace=self.namespace)
+                        for element in response.object.findall(
+                            fixxpath(xpath='CommonPrefixes',
+                                     namespace=self.namespace))]
 
-            last_key = None
-            for obj in objects:
-                last_key = obj.name
-                yield obj
+            yield objects, prefixes
+
+            is_truncated = findtext(element=response.object,
+                                    xpath='IsTruncated',
+                                    namespace=self.namespace)
+
+            if is_truncated.lower() != 'true':
+                break
+
+            token = findtext(element=response.object,
+                             xpath='NextContinuationToken',
+                             namespace=self.namespace)
+
+            if list_v2 and token:
+                params['continuation-token'] = token
+                continue
+
+            # ListObjects (v1) and the providers which don't return the
+            # continuation token are paginated using the last returned name
+            marker = findtext(element=response.object, xpath='NextMarker',
+                              namespace=self.namespace)
+            names = [obj.name for obj in objects] + prefixes
+
+            if not marker and names:
+                marker = max(names)
+
+            if not marker:
+                break
+
+            params[marker_param] = marker
 
     def get_container(self, container_name):
         try:
@@ -419,9 +654,30 @@ class BaseS3StorageDriver(StorageDriver):
         return False
 
     def download_object(self, obj, destination_path, overwrite_existing=False,
-                        delete_on_failure=True):
+                        delete_on_failure=True, ex_max_concurrency=None,
+                        ex_range_size=None):
+        """
+        @inherits: :class:`StorageDriver.download_object`
+
+        :param ex_max_concurrency: If provided and the object is larger than
+            ``ex_range_size``, the object is downloaded using up to this many
+            parallel ranged requests.
+        :type ex_max_concurrency: ``int``
+
+        :param ex_range_size: Size of a single byte range in bytes
+            (defaults to ``libcloud.storage.base.RANGE_SIZE``, 8 MB).
+        :type ex_range_size: ``int``
+        """
         obj_path = self._get_object_path(obj.container, obj.name)
 
+        if self._use_ranged_download(obj, ex_max_concurrency, ex_range_size):
+            return self._save_object_ranged(
+                obj=obj, object_path=obj_path,
+                destination_path=destination_path,
+                overwrite_existing=overwrite_existing,
+                delete_on_failure=delete_on_failure,
+                max_concurrency=ex_max_concurrency, range_size=ex_range_size)
+
         response = self.connection.request(obj_path, method='GET', raw=True)
 
         return self._get_object(obj=obj, callback=self._save_object,
@@ -447,13 +703,35 @@ class BaseS3StorageDriver(StorageDriver):
             success_status_code=httplib.OK)
 
     def upload_object(self, file_path, container, object_name, extra=None,
-                      verify_hash=True, ex_storage_class=None):
+                      verify_hash=True, ex_storage_class=None,
+                      ex_max_concurrency=None, ex_part_size=None):
         """
         @inherits: :class:`StorageDriver.upload_object`
 
         :param ex_storage_class: Storage class
         :type ex_storage_class: ``str``
+
+        :param ex_max_concurrency: If provided, the object is uploaded using
+            the multipart API with up to this many parts in flight at once.
+        :type ex_max_concurrency: ``int``
+
+        :param ex_part_size: Size of a single part (in bytes) when the
+            multipart API is used (defaults to 5 MB).
+        :type ex_part_size: ``int``
         """
+        if (ex_max_concurrency or ex_part_size) and \
+                self.supports_s3_multipart_upload:
+            # Note: ETag of a multipart object is not a MD5 of the data so
+            # the whole object hash can't be verified. Each part is still
+            # verified on the server side using Content-MD5 header.
+            with open(file_path, 'rb', buffering=0) as file_handle:
+                return self._put_object_multipart(
+                    container=container, object_name=object_name,
+                    extra=extra, stream=file_handle, verify_hash=False,
+                    storage_class=ex_storage_class,
+                    part_size=ex_part_size,
+                    max_concurrency=ex_max_concurrency)
+
         return self._put_object(container=container, object_name=object_name,
                                 extra=extra, file_path=file_path,
                                 verify_hash=verify_hash,
@@ -491,7 +769,8 @@ class BaseS3StorageDriver(StorageDriver):
                         namespace=self.namespace)
 
     def _upload_multipart_chunks(self, container, object_name, upload_id,
-                                 stream, calculate_hash=True):
+                                 stream, calculate_hash=True, part_size=None,
+                                 max_concurrency=None):
         """
         Uploads data from an iterator in fixed sized chunks to S3
 
@@ -510,77 +789,153 @@ class BaseS3StorageDriver(StorageDriver):
         :keyword calculate_hash: Indicates if we must calculate the data hash
         :type calculate_hash: ``bool``
 
+        :keyword part_size: Size of a single part in bytes (defaults to 5 MB)
+        :type part_size: ``int``
+
+        :keyword max_concurrency: Maximum number of parts which are uploaded
+            at the same time (defaults to 1). At most two times this number of
+            parts is buffered in memory.
+        :type max_concurrency: ``int``
+
         :return: A tuple of (chunk info, checksum, bytes transferred)
         :rtype: ``tuple``
         """
+        part_size = part_size or CHUNK_SIZE
+        max_concurrency = max_concurrency or 1
+
+        if part_size < CHUNK_SIZE:
+            raise ValueError('Part size must be at least %s bytes' %
+                             (CHUNK_SIZE))
+
         data_hash = None
         if calculate_hash:
             data_hash = self._get_hash_function()
 
-        bytes_transferred = 0
-        count = 1
-        chunks = []
-        params = {'uploadId': upload_id}
-
+        state = {'bytes_transferred': 0}
         request_path = self._get_object_path(container, object_name)
 
-        # Read the input data in chunk sizes suitable for AWS
-        for data in read_in_chunks(stream, chunk_size=CHUNK_SIZE,
-                                   fill_size=True, yield_empty=True):
-            bytes_transferred += len(data)
+        def iterate_parts():
+            # Read the input data in chunk sizes suitable for AWS
+            part_number = 1
+            for data in read_in_chunks(stream, chunk_size=part_size,
+                                       fill_size=True, yield_empty=True):
+                state['bytes_transferred'] += len(data)
 
-            if calculate_hash:
-                data_hash.update(data)
+                if calculate_hash:
+                    data_hash.update(data)
 
-            chunk_hash = self._get_hash_function()
-            chunk_hash.update(data)
-            chunk_hash = base64.b64encode(chunk_hash.digest()).decode('utf-8')
+                yield (part_number, data)
+                part_number += 1
 
-            # The Content-MD5 header provides an extra level of data check and
-            # is recommended by amazon
-            headers = {
-                'Content-Length': len(data),
-                'Content-MD5': chunk_hash,
-            }
+        # Connections cloned by the worker threads, they are closed once all
+        # the parts are uploaded (or the upload fails)
+        connections = []
 
-            params['partNumber'] = count
+        if max_concurrency > 1:
+            # Connection objects are not thread safe so each worker thread
+            # uses its own copy of the driver connection
+            local = threading.local()
 
-            resp = self.connection.request(request_path, method='PUT',
-                                           data=data, headers=headers,
-                                           params=params)
+            def upload_part(part):
+                connection = getattr(local, 'connection', None)
 
-            if resp.status != httplib.OK:
-                raise LibcloudError('Error uploading chunk', driver=self)
+                if connection is None:
+                    connection = self._clone_connection()
+                    local.connection = connection
+                    connections.append(connection)
 
-            server_hash = resp.headers['etag'].replace('"', '')
+                return self._upload_multipart_part(
+                    request_path=request_path, upload_id=upload_id,
+                    part_number=part[0], data=part[1], connection=connection)
+        else:
+            def upload_part(part):
+                return self._upload_multipart_part(
+                    request_path=request_path, upload_id=upload_id,
+                    part_number=part[0], data=part[1])
 
-            # Keep this data for a later commit
-            chunks.append((count, server_hash))
-            count += 1
+        # Results are yielded in the part order so the list can be passed
+        # directly to _commit_multipart
+        try:
+            chunks = list(imap_bounded(upload_part, iterate_parts(),
+                                       max_workers=max_concurrency))
+        finally:
+            for connection in connections:
+                self._close_connection(connection)
 
         if calculate_hash:
             data_hash = data_hash.hexdigest()
 
-        return (chunks, data_hash, bytes_transferred)
+        return (chunks, data_hash, state['bytes_transferred'])
 
-    def _commit_multipart(self, container, object_name, upload_id, chunks):
+    def _upload_multipart_part(self, request_path, upload_id, part_number,
+                               data, connection=None):
         """
-        Makes a final commit of the data.
+        Uploads a single part of a multipart upload.
 
-        :param container: The destination container
-        :type container: :class:`Container`
-
-        :param object_name: The name of the object which we are uploading
-        :type object_name: ``str``
+        :param request_path: Path of the object which is being uploaded
+        :type request_path: ``str``
 
         :param upload_id: The upload id allocated for this multipart upload
         :type upload_id: ``str``
 
+        :param part_number: Number of this part (starting with 1)
+        :type part_number: ``int``
+
+        :param data: Part data
+        :type data: ``bytes``
+
+        :keyword connection: Connection to use (defaults to the driver
+            connection)
+        :type connection: :class:`Connection`
+
+        :return: A (part_number, server_hash) tuple
+        :rtype: ``tuple``
+        """
+        connection = connection or self.connection
+
+        headers = self._get_multipart_part_headers(data)
+        params = {'uploadId': upload_id, 'partNumber': part_number}
+
+        resp = connection.request(request_path, method='PUT',
+                                  data=data, headers=headers,
+                                  params=params)
+
+        if resp.status != httplib.OK:
+            raise LibcloudError('Error uploading chunk', driver=self)
+
+        server_hash = resp.headers['etag'].replace('"', '')
+
+        # Keep this data for a later commit
+        return (part_number, server_hash)
+
+    def _get_multipart_part_headers(self, data):
+        """
+        Return the headers for uploading a single part of a multipart upload.
+
+        :param data: Part data
+        :type data: ``bytes``
+
+        :rtype: ``dict``
+        """
+        chunk_hash = self._get_hash_function()
+        chunk_hash.update(data)
+        chunk_hash = base64.b64encode(chunk_hash.digest()).decode('utf-8')
+
+        # The Content-MD5 header provides an extra level of data check and
+        # is recommended by amazon
+        return {
+            'Content-Length': len(data),
+            'Content-MD5': chunk_hash,
+        }
+
+    def _get_multipart_commit_data(self, chunks):
+        """
+        Return the body of the request which completes a multipart upload.
+
         :param chunks: A list of (chunk_number, chunk_hash) tuples.
         :type chunks: ``list``
 
-        :return: The server side hash of the uploaded data
-        :rtype: ``str``
+        :rtype: ``bytes``
         """
         root = Element('CompleteMultipartUpload')
 
@@ -592,7 +947,28 @@ class BaseS3StorageDriver(StorageDriver):
             etag_id = SubElement(part, 'ETag')
             etag_id.text = str(etag)
 
-        data = tostring(root)
+        return tostring(root)
+
+    def _commit_multipart(self, container, object_name, upload_id, chunks):
+        """
+        Makes a final commit of the data.
+
+        :param container: The destination container
+        :type container: :class:`Container`
+
+        :param object_name: The name of the object which we are uploading
+        :type object_name: ``str``
+
+        :param upload_id: The upload id allocated for this multipart upload
+        :type upload_id: ``str``
+
+        :param chunks: A list of (chunk_number, chunk_hash) tuples.
+        :type chunks: ``list``
+
+        :return: The server side hash of the uploaded data
+        :rtype: ``str``
+        """
+        data = self._get_multipart_commit_data(chunks)
 
         headers = {'Content-Length': len(data)}
         params = {'uploadId': upload_id}
@@ -639,12 +1015,21 @@ class BaseS3StorageDriver(StorageDriver):
                                 (resp.status), driver=self)
 
     def upload_object_via_stream(self, iterator, container, object_name,
-                                 extra=None, ex_storage_class=None):
+                                 extra=None, ex_storage_class=None,
+                                 ex_max_concurrency=None, ex_part_size=None):
         """
         @inherits: :class:`StorageDriver.upload_object_via_stream`
 
         :param ex_storage_class: Storage class
         :type ex_storage_class: ``str``
+
+        :param ex_max_concurrency: Maximum number of parts which are uploaded
+            at the same time when the multipart API is used (defaults to 1).
+        :type ex_max_concurrency: ``int``
+
+        :param ex_part_size: Size of a single part (in bytes) when the
+            multipart API is used (defaults to 5 MB).
+        :type ex_part_size: ``int``
         """
 
         method = 'PUT'
@@ -654,12 +1039,11 @@ class BaseS3StorageDriver(StorageDriver):
         # Amazon provides a different (complex?) mechanism to do multipart
         # uploads
         if self.supports_s3_multipart_upload:
-            return self._put_object_multipart(container=container,
-                                              object_name=object_name,
-                                              extra=extra,
-                                              stream=iterator,
-                                              verify_hash=False,
-                                              storage_class=ex_storage_class)
+            return self._put_object_multipart(
+                container=container, object_name=object_name, extra=extra,
+                stream=iterator, verify_hash=False,
+                storage_class=ex_storage_class, part_size=ex_part_size,
+                max_concurrency=ex_max_concurrency)
         return self._put_object(container=container, object_name=object_name,
                                 extra=extra, method=method, query_args=params,
                                 stream=iterator, verify_hash=False,
@@ -676,6 +1060,97 @@ class BaseS3StorageDriver(StorageDriver):
 
         return False
 
+    def ex_delete_objects(self, container, objects, max_concurrency=None):
+        """
+        Delete multiple objects using the Multi-Object Delete API (up to 1000
+        objects per request).
+
+        Objects which don't exist are reported as deleted.
+
+        @inherits: :class:`StorageDriver.ex_delete_objects`
+        """
+        if not self.supports_s3_multi_object_delete:
+            return super(BaseS3StorageDriver, self).ex_delete_objects(
+                container=container, objects=objects,
+                max_concurrency=max_concurrency)
+
+        names = (obj.name for obj in self._to_objects(container, objects))
+        batches = chunked(names, MULTI_DELETE_MAX_KEYS)
+
+        def delete_batch(driver, names):
+            return driver._delete_objects_batch(container, names)
+
+        result = {}
+        for batch_result in self._imap_with_drivers(
+                delete_batch, batches, max_concurrency=max_concurrency):
+            result.update(batch_result)
+
+        return result
+
+    def _delete_objects_batch(self, container, names):
+        """
+        Delete up to 1000 objects using a single Multi-Object Delete request.
+
+        :param container: The container holding the objects
+        :type container: :class:`Container`
+
+        :param names: Object names
+        :type names: ``list`` of ``str``
+
+        :return: A dictionary which maps the object names to ``True`` or the
+                 error. If the whole request fails, all the names are mapped
+                 to the exception.
+        :rtype: ``dict``
+        """
+        root = Element('Delete')
+
+        # Only the errors are returned in the quiet mode
+        quiet = SubElement(root, 'Quiet')
+        quiet.text = 'true'
+
+        for name in names:
+            obj = SubElement(root, 'Object')
+            key = SubElement(obj, 'Key')
+            key.text = name
+
+        data = tostring(root)
+        data_hash = base64.b64encode(md5(b(data)).digest()).decode('utf-8')
+
+        # Content-MD5 header is required by the Multi-Object Delete API
+        headers = {'Content-Length': len(data), 'Content-MD5': data_hash}
+        params = {'delete': ''}
+        request_path = self._get_container_path(container)
+
+        try:
+            response = self.connection.request(request_path,
+                                               headers=headers,
+                                               params=params, data=data,
+                                               method='POST')
+
+            if response.status != httplib.OK:
+                raise LibcloudError('Error deleting objects. status_code=%d'
+                                    % (response.status), driver=self)
+        except Exception as e:
+            # A failed batch doesn't abort the other batches
+            return dict((name, e) for name in names)
+
+        result = dict((name, True) for name in names)
+
+        body = response.parse_body()
+        # pylint: disable=maybe-no-member
+        for node in body.findall(fixxpath(xpath='Error',
+                                          namespace=self.namespace)):
+            name = findtext(element=node, xpath='Key',
+                            namespace=self.namespace)
+            code = findtext(element=node, xpath='Code',
+                            namespace=self.namespace)
+            message = findtext(element=node, xpath='Message',
+                               namespace=self.namespace)
+            result[name] = LibcloudError('%s (%s)' % (message, code),
+                                         driver=self)
+
+        return result
+
     def ex_iterate_multipart_uploads(self, container, prefix=None,
                                      delimiter=None):
         """
@@ -758,7 +1233,8 @@ class BaseS3StorageDriver(StorageDriver):
             params['key-marker'] = key_marker
             params['upload-id-marker'] = upload_marker
 
-    def ex_cleanup_all_multipart_uploads(self, container, prefix=None):
+    def ex_cleanup_all_multipart_uploads(self, container, prefix=None,
+                                         max_concurrency=None):
         """
         Extension method for removing all partially completed S3 multipart
         uploads.
@@ -768,12 +1244,21 @@ class BaseS3StorageDriver(StorageDriver):
 
         :keyword prefix: Delete only uploads of objects with this prefix
         :type prefix: ``str``
+
+        :keyword max_concurrency: Maximum number of uploads which are aborted
+            at the same time (defaults to 4).
+        :type max_concurrency: ``int``
         """
+        uploads = self.ex_iterate_multipart_uploads(container, prefix,
+                                                    delimiter=None)
+
+        def abort_upload(driver, upload):
+            driver._abort_multipart(container, upload.key, upload.id)
 
         # Iterate through the container and delete the upload ids
-        for upload in self.ex_iterate_multipart_uploads(container, prefix,
-                                                        delimiter=None):
-            self._abort_multipart(container, upload.key, upload.id)
+        for _ in self._imap_with_drivers(abort_upload, uploads,
+                                         max_concurrency=max_concurrency):
+            pass
 
     def _clean_object_name(self, name):
         name = urlquote(name)
@@ -834,7 +1319,8 @@ class BaseS3StorageDriver(StorageDriver):
 
     def _put_object_multipart(self, container, object_name, stream,
                               extra=None, verify_hash=False,
-                              storage_class=None):
+                              storage_class=None, part_size=None,
+                              max_concurrency=None):
         """
         Uploads an object using the S3 multipart algorithm.
 
@@ -856,9 +1342,61 @@ class BaseS3StorageDriver(StorageDriver):
         :keyword storage_class: The name of the S3 object's storage class
         :type extra: ``str``
 
+        :keyword part_size: Size of a single part in bytes
+        :type part_size: ``int``
+
+        :keyword max_concurrency: Maximum number of parts which are uploaded
+            at the same time
+        :type max_concurrency: ``int``
+
         :return: The uploaded object
         :rtype: :class:`Object`
         """
+        extra = extra or {}
+        meta_data = extra.get('meta_data', None)
+        acl = extra.get('acl', None)
+
+        headers = self._get_multipart_headers(object_name, extra=extra,
+                                              storage_class=storage_class)
+        upload_id = self._initiate_multipart(container, object_name,
+                                             headers=headers)
+
+        try:
+            result = self._upload_multipart_chunks(
+                container, object_name, upload_id, stream,
+                calculate_hash=verify_hash, part_size=part_size,
+                max_concurrency=max_concurrency)
+            chunks, data_hash, bytes_transferred = result
+
+            # Commit the chunk info and complete the upload
+            etag = self._commit_multipart(container, object_name, upload_id,
+                                          chunks)
+        except Exception:
+            # Amazon provides a mechanism for aborting an upload.
+            self._abort_multipart(container, object_name, upload_id)
+            raise
+
+        return Object(
+            name=object_name, size=bytes_transferred, hash=etag,
+            extra={'acl': acl}, meta_data=meta_data, container=container,
+            driver=self)
+
+    def _get_multipart_headers(self, object_name, extra=None,
+                               storage_class=None):
+        """
+        Return the headers for initiating a multipart upload.
+
+        :param object_name: The name of the object which we are uploading
+        :type object_name: ``str``
+
+        :keyword extra: Additional options
+        :type extra: ``dict``
+
+        :keyword storage_class: The name of the S3 object's storage class
+        :type storage_class: ``str``
+
+        :rtype: ``dict``
+        """
         headers = {}
         extra = extra or {}
 
@@ -883,27 +1421,7 @@ class BaseS3StorageDriver(StorageDriver):
         if acl:
             headers[self.http_vendor_prefix + '-acl'] = acl
 
-        upload_id = self._initiate_multipart(container, object_name,
-                                             headers=headers)
-
-        try:
-            result = self._upload_multipart_chunks(container, object_name,
-                                                   upload_id, stream,
-                                                   calculate_hash=verify_hash)
-            chunks, data_hash, bytes_transferred = result
-
-            # Commit the chunk info and complete the upload
-            etag = self._commit_multipart(container, object_name, upload_id,
-                                          chunks)
-        except Exception:
-            # Amazon provides a mechanism for aborting an upload.
-            self._abort_multipart(container, object_name, upload_id)
-            raise
-
-        return Object(
-            name=object_name, size=bytes_transferred, hash=etag,
-            extra={'acl': acl}, meta_data=meta_data, container=container,
-            driver=self)
+        return headers
 
     def _to_storage_class_headers(self, storage_class):
         """
@@ -1002,6 +1520,7 @@ class BaseS3StorageDriver(StorageDriver):
 class S3StorageDriver(AWSDriver, BaseS3StorageDriver):
     name = 'Amazon S3 (us-east-1)'
     connectionCls = S3SignatureV4Connection
+    supports_s3_list_objects_v2 = True
     region_name = 'us-east-1'
 
 
@@ -0,0 +1,615 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Synchronization of local directories with storage containers.
+
+The local directory and the container are listed into manifests (object
+name to size, hash and modification time) which are compared to find the
+files which need to be uploaded, downloaded or deleted. The transfers run on
+a bounded pool of worker threads. Any :class:`StorageDriver` can be used.
+
+Example usage::
+
+    def progress(action, result):
+        print('%s %s' % (action.action, action.name))
+
+    result = sync_to_container(driver, '/srv/artifacts', container,
+                               prefix='builds/', delete=True,
+                               progress=progress)
+    print(result.bytes_transferred, result.errors)
+"""
+
+import calendar
+import errno
+import hashlib
+import inspect
+import os
+from datetime import datetime
+from email.utils import parsedate_tz, mktime_tz
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+__all__ = [
+    'ManifestEntry',
+    'SyncAction',
+    'SyncResult',
+
+    'build_local_manifest',
+    'build_remote_manifest',
+    'diff_manifests',
+    'sync_to_container',
+    'sync_from_container'
+]
+
+# Drivers whose object hash is not a hash of the object content (e.g. the
+# local storage driver hashes the modification time)
+NON_CONTENT_HASH_DRIVERS = ('Local Storage',)
+
+# Formats of the ISO 8601 modification times returned in the listings
+ISO_DATE_FORMATS = ('%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ')
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ManifestEntry(object):
+    """
+    A single file or object in a manifest.
+    """
+
+    def __init__(self, name, size, mtime=None, hash=None, path=None,
+                 obj=None):
+        """
+        :param name: Name relative to the synchronized directory or prefix
+                     using ``/`` as the separator.
+        :type name: ``str``
+
+        :param size: Size in bytes.
+        :type size: ``int``
+
+        :param mtime: Modification time (seconds since the epoch).
+        :type mtime: ``float``
+
+        :param hash: MD5 hash of the content (hex digest) if it's known.
+        :type hash: ``str``
+
+        :param path: Path of the local file.
+        :type path: ``str``
+
+        :param obj: Remote object.
+        :type obj: :class:`libcloud.storage.base.Object`
+        """
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.hash = hash
+        self.path = path
+        self.obj = obj
+
+    def get_hash(self):
+        """
+        Return the MD5 hash of the content, calculating it for the local
+        files.
+
+        :rtype: ``str``
+        """
+        if self.hash is None and self.path is not None:
+            hasher = hashlib.md5()
+
+            with open(self.path, 'rb') as fp:
+                for data in iter(lambda: fp.read(HASH_BLOCK_SIZE), b''):
+                    hasher.update(data)
+
+            self.hash = hasher.hexdigest()
+
+        return self.hash
+
+    def __repr__(self):
+        return ('<ManifestEntry: name=%s, size=%s, mtime=%s>' %
+                (self.name, self.size, self.mtime))
+
+
+class SyncAction(object):
+    """
+    A single operation which is performed by a sync.
+    """
+
+    UPLOAD = 'upload'
+    DOWNLOAD = 'download'
+    DELETE = 'delete'
+
+    def __init__(self, action, name, reason, entry):
+        """
+        :param action: One of ``upload``, ``download`` and ``delete``.
+        :type action: ``str``
+
+        :param name: Relative name of the file.
+        :type name: ``str``
+
+        :param reason: Why the action is needed (``new``, ``changed`` or
+                       ``removed``).
+        :type reason: ``str``
+
+        :param entry: Manifest entry of the source file (or of the deleted
+                      file).
+        :type entry: :class:`ManifestEntry`
+        """
+        self.action = action
+        self.name = name
+        self.reason = reason
+        self.entry = entry
+
+    @property
+    def size(self):
+        return self.entry.size
+
+    def __repr__(self):
+        return ('<SyncAction: action=%s, name=%s, reason=%s>' %
+                (self.action, self.name, self.reason))
+
+
+class SyncResult(object):
+    """
+    Result of a sync.
+
+    ``actions`` contains all the planned actions (which are not performed
+    for a dry run), ``completed`` the successful ones and ``errors`` the
+    ``(action, exception)`` tuples of the failed ones.
+    """
+
+    def __init__(self, actions, dry_run=False):
+        self.actions = actions
+        self.dry_run = dry_run
+        self.completed = []
+        self.errors = []
+        self.bytes_transferred = 0
+
+    @property
+    def success(self):
+        return not self.errors
+
+    def __repr__(self):
+        return ('<SyncResult: actions=%d, completed=%d, errors=%d>' %
+                (len(self.actions), len(self.completed), len(self.errors)))
+
+
+def build_local_manifest(path):
+    """
+    Return the manifest of the files in the provided directory (recursively).
+
+    Symbolic links to directories are not followed.
+
+    :param path: Directory path.
+    :type path: ``str``
+
+    :return: Dictionary which maps the relative names to the entries.
+    :rtype: ``dict`` of :class:`ManifestEntry`
+    """
+    manifest = {}
+    directories = [('', path)]
+
+    while directories:
+        prefix, directory = directories.pop()
+
+        for name, full_path, is_dir, stat in _list_directory(directory):
+            if is_dir:
+                directories.append((prefix + name + '/', full_path))
+                continue
+
+            manifest[prefix + name] = ManifestEntry(
+                name=prefix + name, size=stat.st_size, mtime=stat.st_mtime,
+                path=full_path)
+
+    return manifest
+
+
+def build_remote_manifest(driver, container, prefix=None):
+    """
+    Return the manifest of the objects in the provided container.
+
+    :param prefix: Only the objects whose name starts with the prefix are
+                   included and the prefix is removed from the names.
+    :type prefix: ``str``
+
+    :return: Dictionary which maps the relative names to the entries.
+    :rtype: ``dict`` of :class:`ManifestEntry`
+    """
+    prefix = prefix or ''
+    content_hash = driver.hash_type == 'md5' and \
+        driver.name not in NON_CONTENT_HASH_DRIVERS
+    manifest = {}
+
+    if prefix and _accepts_argument(driver.iterate_container_objects,
+                                    'ex_prefix'):
+        objects = driver.iterate_container_objects(container,
+                                                   ex_prefix=prefix)
+    else:
+        objects = driver.iterate_container_objects(container)
+
+    for obj in objects:
+        # The objects are filtered here as well for the drivers which don't
+        # support ex_prefix
+        if not obj.name.startswith(prefix) or obj.name.endswith('/'):
+            continue
+
+        name = obj.name[len(prefix):]
+        manifest[name] = ManifestEntry(
+            name=name, size=_to_int(obj.size), mtime=_get_object_mtime(obj),
+            hash=_get_object_hash(obj) if content_hash else None, obj=obj)
+
+    return manifest
+
+
+def diff_manifests(source, destination, delete=False, checksum=False):
+    """
+    Compare two manifests.
+
+    A file is changed if the size differs. Otherwise, if ``checksum`` is
+    True and the hashes of both files are known, the hashes are compared,
+    and if not, the file is changed if the source was modified after the
+    destination (with one second precision).
+
+    :param source: Source manifest.
+    :type source: ``dict``
+
+    :param destination: Destination manifest.
+    :type destination: ``dict``
+
+    :param delete: True to include the destination files which don't exist
+                   in the source.
+    :type delete: ``bool``
+
+    :param checksum: True to compare the content hashes.
+    :type checksum: ``bool``
+
+    :return: A list of ``(name, reason)`` tuples where ``reason`` is
+             ``new``, ``changed`` or ``removed`` (the files which should be
+             deleted).
+    :rtype: ``list`` of ``tuple``
+    """
+    changes = []
+
+    for name in sorted(source):
+        entry = source[name]
+        other = destination.get(name, None)
+
+        if other is None:
+            changes.append((name, 'new'))
+        elif _is_changed(entry, other, checksum=checksum):
+            changes.append((name, 'changed'))
+
+    if delete:
+        for name in sorted(destination):
+            if name not in source:
+                changes.append((name, 'removed'))
+
+    return changes
+
+
+def sync_to_container(driver, path, container, prefix=None, delete=False,
+                      checksum=False, dry_run=False, max_concurrency=None,
+                      progress=None):
+    """
+    Upload the new and changed files in a local directory to a container.
+
+    :param driver: Storage driver.
+    :type driver: :class:`libcloud.storage.base.StorageDriver`
+
+    :param path: Local directory.
+    :type path: ``str``
+
+    :param container: Destination container.
+    :type container: :class:`libcloud.storage.base.Container`
+
+    :param prefix: Prefix which is added to the object names.
+    :type prefix: ``str``
+
+    :param delete: True to delete the objects which don't exist locally.
+    :type delete: ``bool``
+
+    :param checksum: True to compare the content hashes of the files with the
+                     same size (see :func:`diff_manifests`).
+    :type checksum: ``bool``
+
+    :param dry_run: True to only return the planned actions.
+    :type dry_run: ``bool``
+
+    :param max_concurrency: Maximum number of transfers at the same time
+                            (defaults to 4).
+    :type max_concurrency: ``int``
+
+    :param progress: Callable which is called with the action and the
+                     :class:`SyncResult` after every action.
+    :type progress: ``callable``
+
+    :rtype: :class:`SyncResult`
+    """
+    prefix = prefix or ''
+    local = build_local_manifest(path)
+    remote = build_remote_manifest(driver, container, prefix=prefix)
+    actions = _get_actions(local, remote, SyncAction.UPLOAD, delete=delete,
+                           checksum=checksum)
+    result = SyncResult(actions, dry_run=dry_run)
+
+    if dry_run:
+        return result
+
+    def upload(driver, action):
+        driver.upload_object(action.entry.path, container,
+                             prefix + action.name)
+        return action.size
+
+    transfers = [action for action in actions
+                 if action.action == SyncAction.UPLOAD]
+    _run(driver, upload, transfers, result, max_concurrency, progress)
+
+    deletes = [action for action in actions
+               if action.action == SyncAction.DELETE]
+
+    if deletes:
+        deleted = driver.ex_delete_objects(
+            container, [action.entry.obj for action in deletes],
+            max_concurrency=max_concurrency)
+
+        for action in deletes:
+            error = deleted.get(action.entry.obj.name, None)
+
+            if not isinstance(error, Exception):
+                error = None
+
+            _record(result, action, error=error, progress=progress)
+
+    return result
+
+
+def sync_from_container(driver, container, path, prefix=None, delete=False,
+                        checksum=False, dry_run=False, max_concurrency=None,
+                        progress=None):
+    """
+    Download the new and changed objects in a container to a local
+    directory.
+
+    The modification time of the downloaded files is set to the modification
+    time of the objects so they are not downloaded again.
+
+    :param prefix: Only the objects whose name starts with the prefix are
+                   downloaded and the prefix is removed from the file names.
+    :type prefix: ``str``
+
+    :param delete: True to delete the local files which don't exist in the
+                   container.
+    :type delete: ``bool``
+
+    See :func:`sync_to_container` for the other arguments.
+
+    :rtype: :class:`SyncResult`
+    """
+    local = build_local_manifest(path)
+    remote = build_remote_manifest(driver, container, prefix=prefix)
+    actions = _get_actions(remote, local, SyncAction.DOWNLOAD, delete=delete,
+                           checksum=checksum)
+    result = SyncResult(actions, dry_run=dry_run)
+
+    if dry_run:
+        return result
+
+    def download(driver, action):
+        entry = action.entry
+        file_path = _get_local_path(path, action.name)
+        _makedirs(os.path.dirname(file_path))
+
+        if not driver.download_object(entry.obj, file_path,
+                                      overwrite_existing=True):
+            raise IOError('Failed to download object %s' % (entry.obj.name))
+
+        if entry.mtime is not None:
+            os.utime(file_path, (entry.mtime, entry.mtime))
+
+        return entry.size
+
+    def delete_file(driver, action):
+        os.remove(action.entry.path)
+        return 0
+
+    transfers = [action for action in actions
+                 if action.action == SyncAction.DOWNLOAD]
+    _run(driver, download, transfers, result, max_concurrency, progress)
+
+    deletes = [action for action in actions
+               if action.action == SyncAction.DELETE]
+    _run(driver, delete_file, deletes, result, 1, progress)
+
+    return result
+
+
+def _get_actions(source, destination, action, delete=False, checksum=False):
+    actions = []
+
+    for name, reason in diff_manifests(source, destination, delete=delete,
+                                       checksum=checksum):
+        if reason == 'removed':
+            actions.append(SyncAction(SyncAction.DELETE, name, reason,
+                                      destination[name]))
+        else:
+            actions.append(SyncAction(action, name, reason, source[name]))
+
+    return actions
+
+
+def _run(driver, func, actions, result, max_concurrency, progress):
+    """
+    Perform the actions using the driver worker pool and record the results.
+    """
+    def call(driver, action):
+        try:
+            return action, func(driver, action), None
+        except Exception as e:
+            return action, 0, e
+
+    for action, size, error in driver._imap_with_drivers(
+            call, actions, max_concurrency=max_concurrency):
+        _record(result, action, error=error, size=size, progress=progress)
+
+
+def _record(result, action, error=None, size=0, progress=None):
+    if error is None:
+        result.completed.append(action)
+        result.bytes_transferred += size or 0
+    else:
+        result.errors.append((action, error))
+
+    if progress is not None:
+        progress(action, result)
+
+
+def _is_changed(source, destination, checksum=False):
+    if source.size != destination.size:
+        return True
+
+    if checksum and (source.hash or source.path) and \
+            (destination.hash or destination.path):
+        return source.get_hash() != destination.get_hash()
+
+    if source.mtime is None or destination.mtime is None:
+        return False
+
+    # Remote modification times have one second precision
+    return int(source.mtime) > int(destination.mtime)
+
+
+def _list_directory(path):
+    """
+    Yield a ``(name, path, is_dir, stat)`` tuple for every entry in the
+    provided directory (``stat`` is ``None`` for the directories).
+    """
+    if scandir is not None:
+        for entry in scandir(path):
+            if entry.is_dir(follow_symlinks=False):
+                yield entry.name, entry.path, True, None
+            elif entry.is_file():
+                yield entry.name, entry.path, False, entry.stat()
+
+        return
+
+    for name in os.listdir(path):
+        full_path = os.path.join(path, name)
+
+        if os.path.isdir(full_path) and not os.path.islink(full_path):
+            yield name, full_path, True, None
+        elif os.path.isfile(full_path):
+            yield name, full_path, False, os.stat(full_path)
+
+
+def _get_object_hash(obj):
+    value = (obj.hash or '').strip('"').lower()
+
+    # Hashes of the multipart uploads are not MD5 hashes of the content
+    if len(value) != 32 or not all(c in '0123456789abcdef' for c in value):
+        return None
+
+    return value
+
+
+def _get_object_mtime(obj):
+    value = obj.extra.get('modify_time', None)
+
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    value = obj.extra.get('last_modified', None)
+
+    if not value:
+        return None
+
+    date = parsedate_tz(value)
+
+    if date is not None:
+        return float(mktime_tz(date))
+
+    for date_format in ISO_DATE_FORMATS:
+        try:
+            date = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+
+        return calendar.timegm(date.timetuple()) + date.microsecond / 1e6
+
+    return None
+
+
+def _get_local_path(path, name):
+    """
+    Return the path of the local file for the provided relative object name.
+
+    The names which would resolve to a file outside of ``path`` (e.g.
+    ``../name`` or ``/name``) are rejected.
+    """
+    parts = name.split('/')
+
+    separators = [sep for sep in (os.sep, os.altsep) if sep]
+
+    def is_unsafe(part):
+        return part in ('', os.curdir, os.pardir) or \
+            os.path.isabs(part) or any(sep in part for sep in separators)
+
+    if any(is_unsafe(part) for part in parts):
+        raise ValueError('Object name %s is not a valid relative path' %
+                         (name))
+
+    root = os.path.abspath(path)
+    file_path = os.path.abspath(os.path.join(root, *parts))
+
+    if not file_path.startswith(os.path.join(root, '')):
+        raise ValueError('Object name %s is not a valid relative path' %
+                         (name))
+
+    return file_path
+
+
+def _accepts_argument(func, name):
+    """
+    Return True if the provided function accepts an argument with the
+    provided name.
+    """
+    getargspec = getattr(inspect, 'getfullargspec', None) or \
+        getattr(inspect, 'getargspec')
+
+    try:
+        spec = getargspec(func)
+    except TypeError:
+        return False
+
+    return name in spec.args or name in getattr(spec, 'kwonlyargs', [])
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
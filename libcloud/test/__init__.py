@@ -15,6 +15,7 @@
 
 import unittest
 import random
+import threading
 import requests
 from libcloud.common.base import Response
 from libcloud.http import LibcloudConnection
@@ -36,6 +37,10 @@ from libcloud.utils.py3 import urlquote
 
 XML_HEADERS = {'content-type': 'application/xml'}
 
+# requests_mock patches requests globally so mocked requests which are issued
+# from multiple threads at the same time need to be serialized
+_MOCK_LOCK = threading.RLock()
+
 
 class LibcloudTestCase(unittest.TestCase):
     def __init__(self, *args, **kwargs):
@@ -135,7 +140,7 @@ class MockHttp(LibcloudConnection):
         # this is to catch any special chars e.g. ~ in the request. URL
         url = urlquote(url)
 
-        with requests_mock.mock() as m:
+        with _MOCK_LOCK, requests_mock.mock() as m:
             m.register_uri(method, url, text=r_body, reason=r_reason,
                            headers=r_headers, status_code=r_status)
             try:
@@ -152,13 +157,24 @@ class MockHttp(LibcloudConnection):
         headers = self._normalize_headers(headers=headers)
         r_status, r_body, r_headers, r_reason = self._get_request(method, url, body, headers)
 
-        with requests_mock.mock() as m:
+        with _MOCK_LOCK, requests_mock.mock() as m:
             m.register_uri(method, url, text=r_body, reason=r_reason,
                            headers=r_headers, status_code=r_status)
             super(MockHttp, self).prepared_request(
                 method=method, url=url, body=body, headers=headers,
                 raw=raw, stream=stream)
 
+        # A real server reads the whole request body
+        self._consume_body(body)
+
+    def _consume_body(self, body):
+        if hasattr(body, 'read'):
+            while body.read(8096):
+                pass
+        elif hasattr(body, '__next__') or hasattr(body, 'next'):
+            for _ in body:
+                pass
+
     # Mock request/response example
     def _example(self, method, url, body, headers):
         """
@@ -0,0 +1,115 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for testing the asyncio interfaces (requires Python 3.6+).
+"""
+
+import asyncio
+import unittest
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:
+    aiohttp = None
+
+from libcloud.utils.py3 import b
+
+__all__ = [
+    'aiohttp',
+    'MockHttpServer',
+    'AsyncTestCase'
+]
+
+
+class MockHttpServer(object):
+    """
+    A local aiohttp server which dispatches the requests to the methods of
+    a :class:`libcloud.test.MockHttp` class so the existing mocks and
+    fixtures can be used for testing the asyncio interfaces.
+    """
+
+    def __init__(self, mock_cls):
+        self.mock_cls = mock_cls
+        self.requests = []
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.port
+
+    async def start(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route('*', '/{path:.*}', self._handle)
+        self._server = TestServer(app, host='127.0.0.1')
+        await self._server.start_server()
+
+    async def close(self):
+        await self._server.close()
+
+    def configure(self, connection):
+        """
+        Point a libcloud connection at this server.
+        """
+        connection.host = '127.0.0.1'
+        connection.port = self.port
+        connection.secure = False
+
+    async def _handle(self, request):
+        body = await request.read()
+        url = request.raw_path
+        headers = dict(request.headers)
+        self.requests.append((request.method, url, body, headers))
+
+        mock = self.mock_cls('127.0.0.1', self.port)
+        status, r_body, r_headers, reason = mock._get_request(
+            request.method, url, body, headers)
+
+        r_headers = dict(r_headers or {})
+        # The mocks return unicode bodies for the binary data
+        r_body = b(r_body) if r_body and request.method != 'HEAD' else None
+
+        if r_body is not None:
+            r_headers.pop('content-length', None)
+            r_headers.pop('Content-Length', None)
+
+        return web.Response(status=status, body=r_body, headers=r_headers,
+                            reason=reason)
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not available')
+class AsyncTestCase(unittest.TestCase):
+    """
+    Base class for the asyncio tests. Every test method gets a new event
+    loop and a :class:`MockHttpServer` for ``mock_cls``.
+    """
+
+    mock_cls = None
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = MockHttpServer(self.mock_cls)
+        self.run_async(self.server.start())
+
+    def tearDown(self):
+        self.run_async(self.server.close())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
@@ -0,0 +1,222 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+
+import requests_mock
+from mock import patch
+
+from libcloud.common.base import ConnectionKey, JsonResponse
+from libcloud.common.cache import ResponseCache, ENTRY_OVERHEAD
+from libcloud.compute.drivers.ec2 import EC2NodeDriver
+from libcloud.test import LibcloudTestCase, unittest
+from libcloud.test.compute.test_ec2 import EC2MockHttp
+from libcloud.test.secrets import EC2_PARAMS
+
+
+class JsonConnection(ConnectionKey):
+    responseCls = JsonResponse
+
+    def add_default_headers(self, headers):
+        # Changes for every request like the real signatures
+        headers['Authorization'] = 'signature %s' % (time.time())
+        return headers
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(ttls={'/images': 60})
+        self.conn = JsonConnection('key', host='mock.com', port=80,
+                                   secure=False)
+        self.conn.response_cache = self.cache
+        self.conn.connect()
+
+    def test_get_ttl(self):
+        cache = ResponseCache(ttls={'DescribeImages': 10,
+                                    ('ec2', 'DescribeImages'): 20,
+                                    '/v1/images': 30,
+                                    '/v1/images/public': 40,
+                                    'gce': 50}, default_ttl=5)
+
+        self.assertEqual(cache.get_ttl('ec2', 'DescribeImages'), 20)
+        self.assertEqual(cache.get_ttl('other', 'DescribeImages'), 10)
+        self.assertEqual(cache.get_ttl('other', '/v1/images/1'), 30)
+        self.assertEqual(cache.get_ttl('other', '/v1/images/public/1'), 40)
+        self.assertEqual(cache.get_ttl('gce', '/v1/zones'), 50)
+        self.assertEqual(cache.get_ttl('other', '/v1/zones'), 5)
+
+    def test_get_requests_are_cached(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images', text='[1]')
+
+            first = self.conn.request('/images', params={'a': 1})
+            second = self.conn.request('/images', params={'a': 1})
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(first.object, [1])
+        self.assertEqual(second.object, [1])
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_different_params_and_credentials_are_not_shared(self):
+        other_conn = JsonConnection('other key', host='mock.com', port=80,
+                                    secure=False)
+        other_conn.response_cache = self.cache
+        other_conn.connect()
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images', text='[1]')
+
+            self.conn.request('/images', params={'a': 1})
+            self.conn.request('/images', params={'a': 2})
+            other_conn.request('/images', params={'a': 1})
+
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual(len(self.cache), 3)
+
+    def test_not_cached_requests(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes', text='[]')
+            m.register_uri('POST', 'http://mock.com/images', text='[]')
+            m.register_uri('GET', 'http://mock.com/images/1', text='[]',
+                           headers={'Cache-Control': 'no-store'})
+
+            for _ in range(2):
+                self.conn.request('/nodes')
+                self.conn.request('/images', method='POST')
+                self.conn.request('/images/1')
+
+        self.assertEqual(m.call_count, 6)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_error_responses_are_not_cached(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images', status_code=500,
+                           text='{}')
+
+            for _ in range(2):
+                self.assertRaises(Exception, self.conn.request, '/images')
+
+        self.assertEqual(m.call_count, 2)
+
+    def test_expired_entry_is_revalidated(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images',
+                           [{'text': '[1]', 'headers': {'ETag': '"v1"'}},
+                            {'status_code': 304, 'text': ''}])
+
+            self.conn.request('/images')
+
+            with patch('libcloud.common.cache.time.time',
+                       return_value=time.time() + 120):
+                response = self.conn.request('/images')
+                self.assertFalse(self.cache.get(
+                    list(self.cache._entries.keys())[0]).expired)
+
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(m.request_history[1].headers['If-None-Match'],
+                         '"v1"')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.object, [1])
+        self.assertEqual(self.cache.revalidations, 1)
+
+    def test_expired_entry_without_etag_is_removed(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images',
+                           [{'text': '[1]'}, {'text': '[2]'}])
+
+            self.conn.request('/images')
+
+            with patch('libcloud.common.cache.time.time',
+                       return_value=time.time() + 120):
+                response = self.conn.request('/images')
+
+        self.assertFalse('If-None-Match' in m.request_history[1].headers)
+        self.assertEqual(response.object, [2])
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 2 * (ENTRY_OVERHEAD + 3)
+
+        with requests_mock.Mocker() as m:
+            for index in range(3):
+                m.register_uri('GET', 'http://mock.com/images/%s' % (index),
+                               text='[%s]' % (index))
+
+            self.conn.request('/images/0')
+            self.conn.request('/images/1')
+            # Mark the first one as recently used
+            self.conn.request('/images/0')
+            self.conn.request('/images/2')
+
+            self.assertEqual(m.call_count, 3)
+
+            self.conn.request('/images/0')
+            self.assertEqual(m.call_count, 3)
+
+            self.conn.request('/images/1')
+            self.assertEqual(m.call_count, 4)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.size, self.cache.max_bytes)
+
+    def test_invalidate(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/images/1', text='[]')
+            m.register_uri('GET', 'http://mock.com/images/2', text='[]')
+
+            self.conn.request('/images/1')
+            self.conn.request('/images/2')
+
+        self.assertEqual(self.cache.invalidate(action='/images/1'), 1)
+        self.assertEqual(self.cache.invalidate(driver='other'), 0)
+        self.assertEqual(self.cache.invalidate(action='/images'), 1)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.size, 0)
+
+
+class EC2ResponseCacheTestCase(LibcloudTestCase):
+    def setUp(self):
+        super(EC2ResponseCacheTestCase, self).setUp()
+        EC2MockHttp.test = self
+        EC2NodeDriver.connectionCls.conn_class = EC2MockHttp
+        EC2MockHttp.use_param = 'Action'
+        EC2MockHttp.type = None
+
+        self.cache = ResponseCache(ttls={'DescribeImages': 3600})
+        self.driver = EC2NodeDriver(*EC2_PARAMS, region='us-east-1',
+                                    response_cache=self.cache)
+
+    def test_list_images(self):
+        images = self.driver.list_images()
+        cached_images = self.driver.list_images()
+
+        self.assertExecutedMethodCount(1)
+        self.assertEqual([image.id for image in images],
+                         [image.id for image in cached_images])
+
+        self.driver.list_images(ex_owner='amazon')
+        self.driver.list_nodes()
+        self.driver.list_nodes()
+        # list_nodes sends DescribeInstances and DescribeAddresses
+        self.assertExecutedMethodCount(6)
+
+        self.cache.invalidate(driver=self.driver.name)
+        self.driver.list_images()
+        self.assertExecutedMethodCount(7)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
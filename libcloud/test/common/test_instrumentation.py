@@ -0,0 +1,219 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import socket
+
+import requests_mock
+from mock import patch
+
+from libcloud.common.base import Connection, JsonResponse
+from libcloud.common.exceptions import BaseHTTPError
+from libcloud.common.instrumentation import Instrument, MetricsAggregator
+from libcloud.common.instrumentation import add_instrument
+from libcloud.common.instrumentation import remove_instrument
+from libcloud.common.instrumentation import get_instruments
+from libcloud.common.instrumentation import get_body_size
+from libcloud.test import unittest
+
+
+class RecordingInstrument(Instrument):
+    def __init__(self):
+        self.events = []
+
+    def on_request(self, event):
+        self.events.append(event)
+
+
+class FailingInstrument(Instrument):
+    def on_request(self, event):
+        raise ValueError('broken instrument')
+
+
+class JsonConnection(Connection):
+    responseCls = JsonResponse
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.instrument = RecordingInstrument()
+        add_instrument(self.instrument)
+
+        self.conn = JsonConnection(host='mock.com', port=80, secure=False)
+        self.conn.connect()
+
+    def tearDown(self):
+        remove_instrument(self.instrument)
+
+    def test_add_and_remove_instrument(self):
+        self.assertTrue(self.instrument in get_instruments())
+
+        add_instrument(self.instrument)
+        self.assertEqual(get_instruments().count(self.instrument), 1)
+
+        remove_instrument(self.instrument)
+        self.assertFalse(self.instrument in get_instruments())
+
+    def test_request_event(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/nodes',
+                           text='{"id": 1}')
+            response = self.conn.request('/nodes', params={'a': 'b'},
+                                         data=u'{"name": "\u00fc"}',
+                                         method='POST')
+
+        self.assertEqual(response.object, {'id': 1})
+        self.assertEqual(len(self.instrument.events), 1)
+
+        event = self.instrument.events[0]
+        self.assertEqual(event.driver, 'JsonConnection')
+        self.assertEqual(event.action, '/nodes')
+        self.assertEqual(event.method, 'POST')
+        self.assertEqual(event.status, 200)
+        self.assertTrue(event.success)
+        self.assertEqual(event.retries, 0)
+        self.assertEqual(event.bytes_sent, 14)
+        self.assertEqual(event.bytes_received, 9)
+        self.assertEqual(sorted(event.timings.keys()),
+                         ['download', 'first_byte', 'parse', 'prepare',
+                          'total'])
+        self.assertTrue(all(value >= 0 for value in event.timings.values()))
+
+    def test_request_event_error_status(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes', status_code=500,
+                           text='{"error": "failure"}')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/nodes')
+
+        event = self.instrument.events[0]
+        self.assertEqual(event.status, 500)
+        self.assertFalse(event.success)
+        self.assertTrue(isinstance(event.error, BaseHTTPError))
+
+    @patch('os.environ', {'LIBCLOUD_RETRY_FAILED_HTTP_REQUESTS': True})
+    def test_request_event_retries(self):
+        self.conn.retry_delay = 0
+        self.conn.timeout = 1
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes',
+                           [{'exc': socket.error},
+                            {'exc': socket.error},
+                            {'text': '{}'}])
+            self.conn.request('/nodes')
+
+        self.assertEqual(self.instrument.events[0].retries, 2)
+
+    def test_connection_instruments(self):
+        instrument = RecordingInstrument()
+        self.conn.instruments = [instrument]
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes', text='{}')
+            self.conn.request('/nodes')
+
+        self.assertEqual(len(instrument.events), 1)
+        self.assertEqual(len(self.instrument.events), 1)
+
+    def test_failing_instrument_does_not_break_request(self):
+        self.conn.instruments = [FailingInstrument()]
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes', text='{}')
+            response = self.conn.request('/nodes')
+
+        self.assertEqual(response.object, {})
+        self.assertEqual(len(self.instrument.events), 1)
+
+    def test_get_body_size(self):
+        self.assertEqual(get_body_size(None), 0)
+        self.assertEqual(get_body_size(b'abc'), 3)
+        self.assertEqual(get_body_size(u'\u00fc'), 2)
+        self.assertEqual(get_body_size(iter([b'abc'])), None)
+
+
+class MetricsAggregatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsAggregator(buckets=(0.1, 1.0))
+        self.conn = JsonConnection(host='mock.com', port=80, secure=False)
+        self.conn.instruments = [self.metrics]
+        self.conn.connect()
+
+    def test_get_stats(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes', text='{}')
+            m.register_uri('DELETE', 'http://mock.com/nodes/1',
+                           status_code=404, text='{}')
+
+            self.conn.request('/nodes', params={'page': 1})
+            self.conn.request('/nodes', params={'page': 2})
+            self.assertRaises(BaseHTTPError, self.conn.request, '/nodes/1',
+                              method='DELETE')
+
+        stats = self.metrics.get_stats()
+        self.assertEqual(sorted(stats.keys()),
+                         [('JsonConnection', 'DELETE /nodes/1'),
+                          ('JsonConnection', 'GET /nodes')])
+
+        nodes = stats[('JsonConnection', 'GET /nodes')]
+        self.assertEqual(nodes['count'], 2)
+        self.assertEqual(nodes['errors'], 0)
+        self.assertEqual(nodes['statuses'], {200: 2})
+        self.assertEqual(nodes['bytes_received'], 4)
+        self.assertEqual(nodes['histogram'],
+                         [(0.1, 2), (1.0, 0), (float('inf'), 0)])
+        self.assertTrue(nodes['timings']['total'] >= 0)
+
+        delete = stats[('JsonConnection', 'DELETE /nodes/1')]
+        self.assertEqual(delete['count'], 1)
+        self.assertEqual(delete['errors'], 1)
+        self.assertEqual(delete['statuses'], {404: 1})
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.get_stats(), {})
+
+    def test_query_api_actions(self):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', text='{}')
+
+            # EC2 style APIs send every call to the same path
+            self.conn.request('/', params={'Action': 'DescribeInstances'})
+            self.conn.request('/', params={'Action': 'DescribeInstances'})
+            self.conn.request('/', params={'Action': 'DescribeImages'})
+
+        stats = self.metrics.get_stats()
+        self.assertEqual(sorted(stats.keys()),
+                         [('JsonConnection', 'GET DescribeImages'),
+                          ('JsonConnection', 'GET DescribeInstances')])
+        self.assertEqual(
+            stats[('JsonConnection', 'GET DescribeInstances')]['count'], 2)
+
+    def test_key_func(self):
+        metrics = MetricsAggregator(key_func=lambda event: event.method)
+        self.conn.instruments = [metrics]
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/nodes/1', text='{}')
+            m.register_uri('GET', 'http://mock.com/nodes/2', text='{}')
+
+            self.conn.request('/nodes/1')
+            self.conn.request('/nodes/2')
+
+        stats = metrics.get_stats()
+        self.assertEqual(stats[('JsonConnection', 'GET')]['count'], 2)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,238 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import threading
+import time
+
+import requests_mock
+from mock import Mock, patch
+
+from libcloud.utils.retry import RetryPolicy
+from libcloud.common.base import Connection, PollingConnection
+from libcloud.common.ratelimit import TokenBucket, RateLimiter
+from libcloud.common.ratelimit import get_rate_limiter, clear_rate_limiters
+from libcloud.test import unittest
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.multiple('libcloud.common.ratelimit.time',
+                                 time=self.clock.time,
+                                 sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_acquire(self):
+        bucket = TokenBucket(rate=2, burst=2)
+
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0.5)
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+        # Tokens are added over time up to the burst size
+        self.clock.now += 10
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0.5)
+
+    def test_rate_limiter_stats(self):
+        limiter = RateLimiter(rates={'read': (1, 1)})
+
+        for _ in range(3):
+            limiter.acquire('read')
+            limiter.release('read')
+
+        # Mutations are not limited
+        limiter.acquire('mutate')
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats['read']['requests'], 3)
+        self.assertEqual(stats['read']['waited'], 2)
+        self.assertEqual(stats['read']['total_wait'], 2)
+        self.assertEqual(stats['read']['max_wait'], 1)
+        self.assertEqual(stats['read']['in_flight'], 0)
+        self.assertEqual(stats['mutate']['waited'], 0)
+        self.assertEqual(stats['mutate']['in_flight'], 1)
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = Connection(host='mock.com', port=80, secure=False)
+        self.conn.connect()
+
+    def tearDown(self):
+        clear_rate_limiters()
+
+    def test_classify(self):
+        limiter = RateLimiter()
+        polling_conn = PollingConnection()
+        polling_conn.polling = True
+
+        self.assertEqual(limiter.classify(self.conn, 'GET', '/'), 'read')
+        self.assertEqual(limiter.classify(self.conn, 'HEAD', '/'), 'read')
+        self.assertEqual(limiter.classify(self.conn, 'DELETE', '/'),
+                         'mutate')
+        self.assertEqual(limiter.classify(self.conn, 'POST', '/',
+                                          {'Action': 'DescribeImages'}),
+                         'read')
+        self.assertEqual(limiter.classify(self.conn, 'GET', '/',
+                                          {'Action': 'RunInstances'}),
+                         'mutate')
+        self.assertEqual(limiter.classify(polling_conn, 'GET', '/'), 'poll')
+
+    def test_custom_classify(self):
+        limiter = RateLimiter(classify=lambda connection, method, action,
+                              params: 'custom')
+        self.assertEqual(limiter.classify(self.conn, 'GET', '/', None),
+                         'custom')
+
+    def test_get_rate_limiter(self):
+        limiter = get_rate_limiter(('ec2', 'key'), rates=10)
+
+        self.assertTrue(get_rate_limiter(('ec2', 'key')) is limiter)
+        self.assertFalse(get_rate_limiter(('ec2', 'other')) is limiter)
+
+        clear_rate_limiters()
+        self.assertFalse(get_rate_limiter(('ec2', 'key')) is limiter)
+
+    def test_connection_requests_are_limited(self):
+        limiter = RateLimiter(rates={'mutate': 1000})
+        self.conn.rate_limiter = limiter
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', text='ok')
+            m.register_uri('POST', 'http://mock.com/', text='ok')
+
+            self.conn.request('/')
+            self.conn.request('/', method='POST')
+            self.conn.request('/', method='POST')
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats['read']['requests'], 1)
+        self.assertEqual(stats['mutate']['requests'], 2)
+        self.assertEqual(stats['mutate']['in_flight'], 0)
+
+    def test_slot_is_acquired_before_tokens(self):
+        limiter = RateLimiter(rates={'read': 10}, concurrency={'read': 1})
+        calls = Mock()
+        limiter._semaphores['read'] = calls.semaphore
+        limiter._buckets['read'] = calls.bucket
+
+        limiter.acquire('read')
+
+        self.assertEqual([call[0] for call in calls.mock_calls],
+                         ['semaphore.acquire', 'bucket.acquire'])
+
+    def test_slot_is_released_before_retry_delay(self):
+        limiter = RateLimiter(concurrency={'read': 1})
+        self.conn.rate_limiter = limiter
+        self.conn.retry_policy = RetryPolicy(max_attempts=2, base_delay=0)
+        in_flight = []
+
+        def sleep(delay):
+            in_flight.append(limiter.get_stats()['read']['in_flight'])
+
+        with patch('libcloud.utils.retry.time.sleep', sleep):
+            with requests_mock.Mocker() as m:
+                m.register_uri('GET', 'http://mock.com/',
+                               [{'status_code': 503, 'text': 'busy'},
+                                {'status_code': 200, 'text': 'ok'}])
+                self.conn.request('/')
+
+        self.assertEqual(in_flight, [0])
+
+        stats = limiter.get_stats()['read']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_concurrency(self):
+        limiter = RateLimiter(concurrency={'read': 2})
+        lock = threading.Lock()
+        in_flight = [0]
+        max_in_flight = [0]
+
+        def send_request():
+            limiter.acquire('read')
+
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+
+            time.sleep(0.05)
+
+            with lock:
+                in_flight[0] -= 1
+
+            limiter.release('read')
+
+        threads = [threading.Thread(target=send_request) for _ in range(6)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        stats = limiter.get_stats()['read']
+        self.assertEqual(max_in_flight[0], 2)
+        self.assertEqual(stats['requests'], 6)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertTrue(stats['max_wait'] > 0)
+
+    def test_polling_requests(self):
+        limiter = RateLimiter()
+
+        class JobConnection(PollingConnection):
+            rate_limiter = limiter
+
+            def get_poll_request_kwargs(self, response, context,
+                                        request_kwargs):
+                return {'action': '/job'}
+
+            def has_completed(self, response):
+                return True
+
+        conn = JobConnection(host='mock.com', port=80, secure=False)
+        conn.connect()
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/jobs', text='ok')
+            m.register_uri('GET', 'http://mock.com/job', text='ok')
+            conn.async_request('/jobs', method='POST')
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats['mutate']['requests'], 1)
+        self.assertEqual(stats['poll']['requests'], 1)
+        self.assertFalse(conn.polling)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -15,11 +15,18 @@
 
 import socket
 import ssl
+import time
+from email.utils import formatdate
 
+import requests_mock
 from mock import Mock, patch, MagicMock
 
+from io import BytesIO
 from libcloud.utils.misc import TRANSIENT_SSL_ERROR
+from libcloud.utils.retry import RetryPolicy, RetryBudget
+from libcloud.utils.retry import parse_retry_after, is_idempotent_request
 from libcloud.common.base import Connection
+from libcloud.common.exceptions import BaseHTTPError, RateLimitReachedError
 from libcloud.test import unittest
 
 CONFLICT_RESPONSE_STATUS = [
@@ -56,5 +63,234 @@ class FailedRequestRetryTestCase(unittest.TestCase):
                 self.assertRaises(ssl.SSLError, conn.request, '/')
                 self.assertGreater(connection.request.call_count, 1)
 
+
+class DummyDriver(object):
+    name = 'Amazon EC2'
+
+
+@patch('libcloud.utils.retry.time.sleep')
+class RetryPolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0)
+        self.conn = Connection(host='mock.com', port=80, secure=False)
+        self.conn.retry_policy = self.policy
+        self.conn.connect()
+
+    def test_retryable_status_is_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/',
+                           [{'status_code': 503, 'text': 'busy'},
+                            {'status_code': 200, 'text': 'ok'}])
+            response = self.conn.request('/')
+
+        self.assertEqual(response.body, 'ok')
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_max_attempts(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', status_code=500,
+                           text='error')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/')
+
+        self.assertEqual(m.call_count, 3)
+
+    def test_not_retryable_status(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', status_code=404,
+                           text='not found')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/')
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(sleep.call_count, 0)
+
+    def test_connection_errors_are_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/',
+                           [{'exc': socket.error},
+                            {'status_code': 200, 'text': 'ok'}])
+            self.assertEqual(self.conn.request('/').body, 'ok')
+
+        self.assertEqual(m.call_count, 2)
+
+    def test_retry_after_is_honored(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/',
+                           [{'status_code': 429, 'text': 'slow down',
+                             'headers': {'Retry-After': '7'}},
+                            {'status_code': 200, 'text': 'ok'}])
+            self.conn.request('/')
+
+        sleep.assert_called_once_with(7.0)
+
+    def test_long_retry_after_is_not_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', status_code=429,
+                           text='slow down',
+                           headers={'Retry-After': '3600'})
+            self.assertRaises(RateLimitReachedError, self.conn.request, '/')
+
+        self.assertEqual(m.call_count, 1)
+
+    def test_driver_classifier(self, sleep):
+        self.conn.driver = DummyDriver()
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/',
+                           [{'status_code': 400,
+                             'text': '<Code>RequestLimitExceeded</Code>'},
+                            {'status_code': 400,
+                             'text': '<Code>InvalidParameterValue</Code>'}])
+            self.assertRaises(BaseHTTPError, self.conn.request, '/')
+
+        self.assertEqual(m.call_count, 2)
+
+    def test_retry_budget(self, sleep):
+        self.policy.budget_ratio = 0
+        self.policy.budget_min_retries = 1
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('GET', 'http://mock.com/', status_code=503,
+                           text='busy')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/')
+            self.assertEqual(m.call_count, 2)
+
+            # The budget is exhausted
+            self.assertRaises(BaseHTTPError, self.conn.request, '/')
+            self.assertEqual(m.call_count, 3)
+
+    def test_raw_request_file_body_is_rewound(self, sleep):
+        data = BytesIO(b'0123456789')
+        data.seek(2)
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(request.body.read())
+            context.status_code = 503 if len(bodies) == 1 else 200
+            return 'ok'
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('PUT', 'http://mock.com/', text=callback)
+            response = self.conn.request('/', method='PUT', data=data,
+                                         raw=True)
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(bodies, [b'23456789', b'23456789'])
+
+    def test_non_idempotent_server_error_is_not_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/', status_code=503,
+                           text='busy')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/',
+                              method='POST')
+
+            # Query API actions which modify resources
+            m.register_uri('GET', 'http://mock.com/', status_code=503,
+                           text='busy')
+            self.assertRaises(BaseHTTPError, self.conn.request, '/',
+                              params={'Action': 'RunInstances'})
+
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(sleep.call_count, 0)
+
+    def test_non_idempotent_connection_error_is_not_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/',
+                           [{'exc': socket.error},
+                            {'status_code': 200, 'text': 'ok'}])
+            self.assertRaises(socket.error, self.conn.request, '/',
+                              method='POST')
+
+        self.assertEqual(m.call_count, 1)
+
+    def test_non_idempotent_throttling_is_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/',
+                           [{'status_code': 429, 'text': 'slow down'},
+                            {'status_code': 200, 'text': 'ok'}])
+            response = self.conn.request('/', method='POST')
+
+        self.assertEqual(response.body, 'ok')
+        self.assertEqual(m.call_count, 2)
+
+    def test_non_idempotent_retries_opt_in(self, sleep):
+        self.conn.retry_non_idempotent = True
+
+        with requests_mock.Mocker() as m:
+            m.register_uri('POST', 'http://mock.com/',
+                           [{'status_code': 503, 'text': 'busy'},
+                            {'status_code': 200, 'text': 'ok'}])
+            response = self.conn.request('/', method='POST')
+
+        self.assertEqual(response.body, 'ok')
+        self.assertEqual(m.call_count, 2)
+
+    def test_stream_response_is_closed_before_retry(self, sleep):
+        with patch('requests.Response.close', autospec=True) as close:
+            with requests_mock.Mocker() as m:
+                m.register_uri('GET', 'http://mock.com/',
+                               [{'status_code': 503, 'text': 'busy'},
+                                {'status_code': 200, 'text': 'ok'}])
+                response = self.conn.request('/', raw=True, stream=True)
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(close.call_count, 1)
+
+    def test_raw_request_iterator_body_is_not_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.register_uri('PUT', 'http://mock.com/', status_code=503,
+                           text='busy')
+            response = self.conn.request('/', method='PUT',
+                                         data=iter([b'1']), raw=True)
+
+        self.assertEqual(response.status, 503)
+        self.assertEqual(m.call_count, 1)
+
+
+class RetryPolicyUtilsTestCase(unittest.TestCase):
+    def test_is_idempotent_request(self):
+        self.assertTrue(is_idempotent_request('GET'))
+        self.assertTrue(is_idempotent_request('delete'))
+        self.assertFalse(is_idempotent_request('POST'))
+        self.assertFalse(is_idempotent_request('PATCH'))
+        self.assertTrue(is_idempotent_request(
+            'POST', params={'Action': 'DescribeInstances'}))
+        self.assertFalse(is_idempotent_request(
+            'GET', params={'Action': 'TerminateInstances'}))
+
+    def test_get_delay(self):
+        policy = RetryPolicy(base_delay=1, max_delay=10, backoff=3)
+
+        for previous in (0, 1, 2, 5, 20):
+            delay = policy.get_delay(previous)
+            self.assertTrue(1 <= delay <= min(10, max(1, previous * 3)))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120)
+        self.assertEqual(parse_retry_after('-1'), 0)
+        self.assertEqual(parse_retry_after(None), None)
+        self.assertEqual(parse_retry_after('invalid'), None)
+
+        http_date = formatdate(time.time() + 60, usegmt=True)
+        self.assertTrue(50 < parse_retry_after(http_date) <= 60)
+
+    def test_retry_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=0, window=10)
+
+        for _ in range(4):
+            budget.record_request()
+
+        self.assertTrue(budget.try_retry())
+        self.assertTrue(budget.try_retry())
+        self.assertFalse(budget.try_retry())
+
+        with patch('libcloud.utils.retry.time.time',
+                   return_value=time.time() + 11):
+            self.assertFalse(budget.try_retry())
+            budget.record_request()
+            budget.record_request()
+            self.assertTrue(budget.try_retry())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,158 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import asyncio
+import unittest
+
+from libcloud.http import LibcloudConnection
+from libcloud.compute.drivers.ec2 import EC2NodeDriver, NimbusNodeDriver
+from libcloud.compute.drivers.dummy import DummyNodeDriver
+from libcloud.test.aio import aiohttp, AsyncTestCase
+from libcloud.test.secrets import EC2_PARAMS
+from libcloud.test.compute.test_ec2 import EC2MockHttp
+
+try:
+    from libcloud.compute.aio import get_async_driver
+    from libcloud.compute.aio import AsyncNodeDriver, AsyncEC2NodeDriver
+except ImportError:
+    pass
+
+
+class AsyncEC2Tests(AsyncTestCase):
+    mock_cls = EC2MockHttp
+    driver_type = EC2NodeDriver
+
+    def setUp(self):
+        super(AsyncEC2Tests, self).setUp()
+        EC2MockHttp.test = None
+        EC2MockHttp.use_param = 'Action'
+        EC2MockHttp.type = None
+
+        self.driver = self.driver_type(*EC2_PARAMS, region='us-east-1')
+        self.driver.connection.conn_class = LibcloudConnection
+        self.server.configure(self.driver.connection)
+        self.async_driver = get_async_driver(self.driver)
+
+    def tearDown(self):
+        self.run_async(self.async_driver.close())
+        super(AsyncEC2Tests, self).tearDown()
+
+    def test_get_async_driver(self):
+        self.assertTrue(isinstance(self.async_driver, AsyncEC2NodeDriver))
+        self.assertTrue(isinstance(get_async_driver(DummyNodeDriver(0)),
+                                   AsyncNodeDriver))
+
+    def test_list_nodes(self):
+        nodes = self.run_async(self.async_driver.list_nodes())
+        node = nodes[0]
+
+        self.assertEqual(node.id, 'i-4382922a')
+        self.assertEqual(len(node.public_ips), 2)
+        self.assertEqual(sorted(node.public_ips)[0], '1.2.3.4')
+        self.assertEqual(node.extra['availability'], 'us-east-1d')
+
+        actions = [request[1].split('Action=')[1].split('&')[0]
+                   for request in self.server.requests]
+        self.assertEqual(actions, ['DescribeInstances', 'DescribeAddresses'])
+
+    def test_list_nodes_concurrently(self):
+        async def list_all():
+            return await asyncio.gather(self.async_driver.list_nodes(),
+                                        self.async_driver.list_volumes(),
+                                        self.async_driver.list_key_pairs(),
+                                        self.async_driver.list_images())
+
+        nodes, volumes, key_pairs, images = self.run_async(list_all())
+
+        self.assertEqual(nodes[0].id, 'i-4382922a')
+        self.assertEqual(len(volumes), 3)
+        self.assertEqual(volumes[2].extra['snapshot_id'], 'snap-30d37269')
+        self.assertEqual(key_pairs[0].name, 'gsg-keypair')
+        self.assertEqual(len(images), 2)
+        self.assertEqual(images[0].id, 'ami-57ba933a')
+
+    def test_list_locations(self):
+        locations = self.run_async(self.async_driver.list_locations())
+
+        self.assertEqual([location.name for location in locations],
+                         ['eu-west-1a', 'eu-west-1b'])
+        self.assertEqual(locations[0].availability_zone.name, 'eu-west-1a')
+
+    def test_list_sizes(self):
+        sizes = self.run_async(self.async_driver.list_sizes())
+
+        self.assertTrue('m1.small' in [size.id for size in sizes])
+        self.assertEqual(len(self.server.requests), 0)
+
+
+class AsyncNimbusTests(AsyncEC2Tests):
+    driver_type = NimbusNodeDriver
+
+    def test_list_nodes(self):
+        # Nimbus doesn't support elastic IPs so the blocking driver method
+        # which doesn't send a request is used
+        nodes = self.run_async(self.async_driver.list_nodes())
+
+        self.assertEqual(nodes[0].public_ips, ['1.2.3.4'])
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class RequiredArgumentsDummyNodeDriver(DummyNodeDriver):
+    def __new__(cls, creds, **kwargs):
+        # Same as the drivers which pick a class for the API version
+        return super(RequiredArgumentsDummyNodeDriver, cls).__new__(cls)
+
+    def list_nodes(self):
+        assert self.connection.driver is self
+        return super(RequiredArgumentsDummyNodeDriver, self).list_nodes()
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not available')
+class AsyncDummyTests(unittest.TestCase):
+    def test_list_nodes_runs_in_executor(self):
+        loop = asyncio.new_event_loop()
+        async_driver = get_async_driver(DummyNodeDriver(0))
+
+        try:
+            nodes = loop.run_until_complete(async_driver.list_nodes())
+            loop.run_until_complete(async_driver.close())
+        finally:
+            loop.close()
+
+        self.assertEqual(len(nodes), 2)
+
+    def test_driver_with_required_new_arguments(self):
+        loop = asyncio.new_event_loop()
+        driver = RequiredArgumentsDummyNodeDriver(0)
+        async_driver = get_async_driver(driver)
+
+        async def iterate_nodes():
+            return [node async for node in
+                    async_driver._iterate_sync('iterate_nodes')]
+
+        try:
+            nodes = loop.run_until_complete(async_driver.list_nodes())
+            iterated = loop.run_until_complete(iterate_nodes())
+            loop.run_until_complete(async_driver.close())
+        finally:
+            loop.close()
+
+        self.assertEqual(len(nodes), 2)
+        self.assertEqual(len(iterated), 2)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -286,7 +286,28 @@ class AzureNodeDriverTests(LibcloudTestCase):
     @mock.patch('libcloud.compute.drivers.azure_arm.AzureNodeDriver'
                 '._fetch_power_state', return_value=NodeState.UPDATING)
     def test_list_nodes(self, fps_mock):
-        nodes = self.driver.list_nodes()
+        with mock.patch.object(self.driver, 'ex_get_nic') as nic_mock:
+            nodes = self.driver.list_nodes()
+
+        self.assertEqual(len(nodes), 1)
+
+        # Power state is read from the statusOnly listing and the addresses
+        # from the NIC and public IP listings
+        self.assertEqual(nodes[0].name, 'test-node-1')
+        self.assertEqual(nodes[0].state, NodeState.STOPPED)
+        self.assertEqual(nodes[0].private_ips, ['10.0.0.1'])
+        self.assertEqual(nodes[0].public_ips, ['40.1.1.1'])
+
+        fps_mock.assert_not_called()
+        nic_mock.assert_not_called()
+
+    @mock.patch('libcloud.compute.drivers.azure_arm.AzureNodeDriver'
+                '._fetch_power_state', return_value=NodeState.UPDATING)
+    def test_list_nodes__per_node_fallback(self, fps_mock):
+        with mock.patch.object(self.driver, '_get_nic_map', return_value={}), \
+                mock.patch.object(self.driver, '_get_power_state_map',
+                                  return_value={}):
+            nodes = self.driver.list_nodes()
 
         self.assertEqual(len(nodes), 1)
 
@@ -307,10 +328,44 @@ class AzureNodeDriverTests(LibcloudTestCase):
         self.assertEqual(nodes[0].name, 'test-node-1')
         self.assertNotEqual(nodes[0].state, NodeState.UPDATING)
         self.assertEqual(nodes[0].private_ips, ['10.0.0.1'])
-        self.assertEqual(nodes[0].public_ips, [])
+        self.assertEqual(nodes[0].public_ips, ['40.1.1.1'])
 
         fps_mock.assert_not_called()
 
+    def test_iterate_nodes_follows_next_link(self):
+        next_link = ('https://management.azure.com/subscriptions/%s/'
+                     'providers/Microsoft.Compute/virtualMachines'
+                     '?api-version=2015-06-15&%%24skiptoken=page2' %
+                     (self.SUBSCRIPTION_ID))
+
+        def with_next_link(fixture):
+            fixture = json.loads(fixture)
+            fixture['nextLink'] = next_link
+            return (httplib.OK, json.dumps(fixture), {},
+                    httplib.responses[httplib.OK])
+
+        AzureMockHttp.responses = [
+            with_next_link,
+            lambda f: (httplib.OK, f, {}, httplib.responses[httplib.OK]),
+        ]
+        connection = self.driver.connection
+
+        with mock.patch.object(connection, 'request',
+                               wraps=connection.request) as mock_request:
+            nodes = self.driver.iterate_nodes(ex_fetch_nic=False,
+                                              ex_fetch_power_state=False)
+            first = next(nodes)
+            self.assertEqual(mock_request.call_count, 1)
+
+            nodes = [first] + list(nodes)
+
+        self.assertEqual([node.name for node in nodes],
+                         ['test-node-1', 'test-node-1'])
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args[1]['params'],
+                         {'api-version': '2015-06-15',
+                          '$skiptoken': 'page2'})
+
     def test_create_volume(self):
         location = self.driver.list_locations()[-1]
         volume = self.driver.create_volume(
@@ -605,6 +660,8 @@ class AzureMockHttp(MockHttp):
             # character limit for file names
             file_name = n.replace('99999999_9999_9999_9999_999999999999',
                                   AzureNodeDriverTests.SUBSCRIPTION_ID)
+            if 'statusOnly=true' in url:
+                file_name += '_statusOnly'
             fixture = self.fixtures.load(file_name + ".json")
 
             if method in ('POST', 'PUT'):
@@ -45,6 +45,25 @@ class BaseTests(unittest.TestCase):
     def test_base_node_driver(self):
         NodeDriver('foo')
 
+    def test_base_node_driver_iterate_and_list_fallbacks(self):
+        driver = NodeDriver('foo')
+        self.assertRaises(NotImplementedError, driver.list_nodes)
+        self.assertRaises(NotImplementedError, driver.iterate_nodes)
+
+        class ListDriver(NodeDriver):
+            def list_nodes(self):
+                return [1, 2]
+
+        class IterateDriver(NodeDriver):
+            def iterate_images(self, location=None):
+                return iter([location])
+
+        self.assertEqual(list(ListDriver('foo').iterate_nodes()), [1, 2])
+        self.assertEqual(IterateDriver('foo').list_images(location='a'),
+                         ['a'])
+        self.assertRaises(NotImplementedError,
+                          IterateDriver('foo').list_volumes)
+
     def test_base_connection_key(self):
         ConnectionKey('foo')
 
@@ -27,6 +27,7 @@ except ImportError:
 
 from libcloud.compute.base import NodeLocation, NodeSize, NodeImage
 from libcloud.common.types import ProviderError
+from libcloud.common.cloudstack import DEFAULT_PAGE_SIZE
 from libcloud.compute.drivers.cloudstack import CloudStackNodeDriver, \
     CloudStackAffinityGroupType
 from libcloud.compute.types import LibcloudError, Provider, InvalidCredsError
@@ -634,6 +635,27 @@ class CloudStackCommonTestCase(TestCaseMixin):
         self.assertEqual({"testkey": "testvalue", "foo": "bar"},
                          nodes[0].extra['tags'])
 
+    def test_iterate_sync_request_paginated(self):
+        pages = []
+
+        def list_nodes_mock(self, **kwargs):
+            pages.append((kwargs['page'], kwargs['pagesize']))
+            body, obj = self._load_fixture('listVirtualMachines_default.json')
+            response = obj['listvirtualmachinesresponse']
+            index = int(kwargs['page']) - 1
+            response['virtualmachine'] = response['virtualmachine'][index:index + 1]
+            return (httplib.OK, json.dumps(obj), {}, httplib.responses[httplib.OK])
+
+        CloudStackMockHttp._cmd_listVirtualMachines = list_nodes_mock
+        try:
+            vms = list(self.driver._iterate_sync_request(
+                'listVirtualMachines', key='virtualmachine', page_size=1))
+        finally:
+            del CloudStackMockHttp._cmd_listVirtualMachines
+
+        self.assertEqual([vm['id'] for vm in vms], [2600, 2601])
+        self.assertEqual(pages, [('1', '1'), ('2', '1'), ('3', '1')])
+
     def test_list_nodes_location_filter(self):
         def list_nodes_mock(self, **kwargs):
             self.assertTrue('zoneid' in kwargs)
@@ -660,6 +682,114 @@ class CloudStackCommonTestCase(TestCaseMixin):
         finally:
             del CloudStackMockHttp._cmd_listVirtualMachines
 
+    def test_iterate_nodes_multiple_pages(self):
+        fixture = json.loads(CloudStackMockHttp.fixtures.load(
+            'listVirtualMachines_default.json'))
+        template = fixture['listvirtualmachinesresponse']['virtualmachine'][1]
+        pages = []
+
+        def list_nodes_mock(self, **kwargs):
+            page = int(kwargs['page'])
+            pages.append(page)
+
+            # A full first page and a partial second page
+            count = DEFAULT_PAGE_SIZE if page == 1 else 1
+            start = (page - 1) * DEFAULT_PAGE_SIZE
+            vms = [dict(template, id=str(start + index), name='vm-%s' %
+                        (start + index)) for index in range(count)]
+            body = json.dumps({'listvirtualmachinesresponse':
+                               {'virtualmachine': vms}})
+            return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+        CloudStackMockHttp._cmd_listVirtualMachines = list_nodes_mock
+        try:
+            nodes = self.driver.iterate_nodes()
+            first_page = [next(nodes) for _ in range(DEFAULT_PAGE_SIZE)]
+
+            # The second page is requested once the first one is consumed
+            self.assertEqual(pages, [1])
+
+            nodes = first_page + list(nodes)
+        finally:
+            del CloudStackMockHttp._cmd_listVirtualMachines
+
+        self.assertEqual(pages, [1, 2])
+        self.assertEqual(len(nodes), DEFAULT_PAGE_SIZE + 1)
+        self.assertEqual(nodes[-1].id, str(DEFAULT_PAGE_SIZE))
+
+    def _mock_list_nodes_max_page_size(self, error, pages):
+        fixture = json.loads(CloudStackMockHttp.fixtures.load(
+            'listVirtualMachines_default.json'))
+        template = fixture['listvirtualmachinesresponse']['virtualmachine'][1]
+        vms = [dict(template, id=str(index), name='vm-%s' % (index))
+               for index in range(6)]
+
+        def list_nodes_mock(self, **kwargs):
+            pages.append((kwargs.get('page'), kwargs.get('pagesize')))
+
+            if kwargs.get('pagesize') is None:
+                page_vms = vms
+            elif int(kwargs['pagesize']) > 5:
+                body = json.dumps({'listvirtualmachinesresponse':
+                                   {'errorcode': 431, 'errortext': error}})
+                return (431, body, {}, httplib.responses[httplib.OK])
+            else:
+                page_size = int(kwargs['pagesize'])
+                start = (int(kwargs['page']) - 1) * page_size
+                page_vms = vms[start:start + page_size]
+
+            body = json.dumps({'listvirtualmachinesresponse':
+                               {'virtualmachine': page_vms}})
+            return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+        CloudStackMockHttp._cmd_listVirtualMachines = list_nodes_mock
+
+    def test_list_nodes_max_page_size(self):
+        pages = []
+        self._mock_list_nodes_max_page_size(
+            "Page size can't exceed max allowed page size value: 5", pages)
+        try:
+            nodes = self.driver.list_nodes()
+        finally:
+            del CloudStackMockHttp._cmd_listVirtualMachines
+
+        # The pages are requested again with the maximum page size
+        self.assertEqual(self.driver.page_size, 5)
+        self.assertEqual(pages, [('1', str(DEFAULT_PAGE_SIZE)), ('1', '5'),
+                                 ('2', '5')])
+        self.assertEqual([node.id for node in nodes],
+                         [str(index) for index in range(6)])
+
+    def test_list_nodes_unknown_max_page_size(self):
+        pages = []
+        self._mock_list_nodes_max_page_size(
+            "Page size can't exceed max allowed page size value", pages)
+        try:
+            nodes = self.driver.list_nodes()
+        finally:
+            del CloudStackMockHttp._cmd_listVirtualMachines
+
+        # The virtual machines are requested without pagination
+        self.assertEqual(self.driver.page_size, None)
+        self.assertEqual(pages, [('1', str(DEFAULT_PAGE_SIZE)), (None, None)])
+        self.assertEqual(len(nodes), 6)
+
+    def test_iterate_sync_request_page_size_error(self):
+        pages = []
+        self._mock_list_nodes_max_page_size(
+            "Page size can't exceed max allowed page size value: 5", pages)
+        try:
+            # An explicit page size isn't lowered
+            self.assertRaises(ProviderError, list,
+                              self.driver._iterate_sync_request(
+                                  'listVirtualMachines', key='virtualmachine',
+                                  page_size=10))
+        finally:
+            del CloudStackMockHttp._cmd_listVirtualMachines
+
+        self.assertEqual(self.driver.page_size, DEFAULT_PAGE_SIZE)
+        self.assertEqual(pages, [('1', '10')])
+
     def test_ex_get_node(self):
         node = self.driver.ex_get_node(2600)
         self.assertEqual('test', node.name)
@@ -171,6 +171,20 @@ class DeploymentTests(unittest.TestCase):
         expected = '/root/relative.sh'
         client.run.assert_called_once_with(expected)
 
+    def test_script_deployment_output_options(self):
+        client = Mock()
+        client.put.return_value = '/home/ubuntu/relative.sh'
+        client.run.return_value = ('', '', 0)
+
+        callback = Mock()
+        sd = ScriptDeployment(script='echo "foo"', name='/root/relative.sh',
+                              stdout_callback=callback, max_output_size=100)
+        sd.run(self.node, client)
+
+        client.run.assert_called_once_with('/root/relative.sh',
+                                           stdout_callback=callback,
+                                           max_output_size=100)
+
     def test_script_file_deployment_with_arguments(self):
         file_path = os.path.abspath(__file__)
         client = Mock()
@@ -489,6 +503,112 @@ class DeploymentTests(unittest.TestCase):
         node = self.driver.deploy_node(deploy=Mock())
         self.assertEqual(self.node.id, node.id)
 
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+        mock_ssh_module.have_paramiko = True
+
+        deploy = Mock()
+        results = list(self.driver.deploy_nodes(
+            deploy=deploy, nodes=[self.node, self.node2], wait_period=0.1,
+            timeout=0.5, max_concurrency=2))
+
+        self.assertEqual(sorted([node.uuid for node, _ in results]),
+                         sorted([self.node.uuid, self.node2.uuid]))
+        self.assertEqual([error for _, error in results], [None, None])
+        self.assertEqual(deploy.run.call_count, 2)
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_create_node_kwargs(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+        mock_ssh_module.have_paramiko = True
+
+        created_nodes = {'test1': self.node, 'test2': self.node2}
+        self.driver.create_node = Mock()
+        self.driver.create_node.side_effect = \
+            lambda name: created_nodes[name]
+
+        results = list(self.driver.deploy_nodes(
+            deploy=Mock(), create_node_kwargs=[{'name': 'test1'},
+                                               {'name': 'test2'}],
+            wait_period=0.1, timeout=0.5))
+
+        self.assertEqual(self.driver.create_node.call_count, 2)
+        self.assertEqual(sorted([node.uuid for node, _ in results]),
+                         sorted([self.node.uuid, self.node2.uuid]))
+
+        self.driver.features = {}
+        self.assertRaises(NotImplementedError, self.driver.deploy_nodes,
+                          deploy=Mock(), create_node_kwargs=[{'name': 'a'}])
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_create_node_errors(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+        mock_ssh_module.have_paramiko = True
+
+        def create_node(name):
+            if name == 'test2':
+                raise LibcloudError('quota exceeded')
+
+            return self.node
+
+        self.driver.create_node = Mock(side_effect=create_node)
+
+        deploy = Mock()
+        results = list(self.driver.deploy_nodes(
+            deploy=deploy, create_node_kwargs=[{'name': 'test1'},
+                                               {'name': 'test2'}],
+            wait_period=0.1, timeout=0.5))
+
+        self.assertEqual(len(results), 2)
+
+        # The failed create_node call is reported first
+        node_kwargs, error = results[0]
+        self.assertEqual(node_kwargs, {'name': 'test2'})
+        self.assertTrue(isinstance(error, DeploymentError))
+        self.assertTrue(error.node is None)
+        self.assertTrue(str(error).find('quota exceeded') != -1)
+
+        # The node which was created is still deployed
+        node, error = results[1]
+        self.assertEqual(node.uuid, self.node.uuid)
+        self.assertEqual(error, None)
+        self.assertEqual(deploy.run.call_count, 1)
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_per_node_errors(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MISSING'
+        mock_ssh_module.have_paramiko = True
+
+        deploy = Mock()
+        deploy.run.side_effect = Exception('foo')
+
+        results = list(self.driver.deploy_nodes(
+            deploy=deploy, nodes=[self.node], wait_period=0.1, timeout=0.5))
+
+        # The node never shows up
+        self.assertEqual(len(results), 1)
+        node, error = results[0]
+        self.assertEqual(node.uuid, self.node.uuid)
+        self.assertTrue(isinstance(error, DeploymentError))
+        self.assertTrue(str(error.value).find('Timed out') != -1)
+        self.assertEqual(deploy.run.call_count, 0)
+
+        # The deployment fails
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+
+        results = list(self.driver.deploy_nodes(
+            deploy=deploy, nodes=[self.node], wait_period=0.1, timeout=0.5,
+            max_tries=2))
+        node, error = results[0]
+        self.assertTrue(isinstance(error, DeploymentError))
+        self.assertTrue(str(error.value).find('Failed after 2 tries') != -1)
+        self.assertEqual(deploy.run.call_count, 2)
+
 
 class RackspaceMockHttp(MockHttp):
     fixtures = ComputeFileFixtures('openstack')
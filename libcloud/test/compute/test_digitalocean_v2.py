@@ -18,6 +18,8 @@ import unittest
 from datetime import datetime
 from libcloud.utils.iso8601 import UTC
 
+from mock import patch
+
 try:
     import simplejson as json
 except ImportError:
@@ -226,6 +228,23 @@ class DigitalOcean_v2_Tests(LibcloudTestCase):
         nodes = self.driver._paginated_request('/v2/droplets', 'droplets')
         self.assertEqual(len(nodes), 2)
 
+    def test_iterate_nodes_requests_pages_lazily(self):
+        DigitalOceanMockHttp.type = 'PAGE_ONE'
+        connection = self.driver.connection
+
+        with patch.object(connection, 'request',
+                          wraps=connection.request) as mock_request:
+            nodes = self.driver.iterate_nodes()
+            first = next(nodes)
+            self.assertEqual(mock_request.call_count, 1)
+
+            nodes = [first] + list(nodes)
+
+        self.assertEqual(len(nodes), 2)
+        self.assertEqual(nodes[0].name, 'example.com')
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args[1]['params'], {'page': 2})
+
     def test_list_volumes(self):
         volumes = self.driver.list_volumes()
         self.assertEqual(len(volumes), 1)
@@ -20,7 +20,11 @@ import sys
 from datetime import datetime
 from libcloud.utils.iso8601 import UTC
 
+from mock import patch
+
 from libcloud.utils.py3 import httplib
+from libcloud.utils.py3 import parse_qs
+from libcloud.utils.py3 import urlparse
 
 from libcloud.compute.drivers.ec2 import EC2NodeDriver
 from libcloud.compute.drivers.ec2 import EC2PlacementGroup
@@ -30,6 +34,7 @@ from libcloud.compute.drivers.ec2 import IdempotentParamError
 from libcloud.compute.drivers.ec2 import REGION_DETAILS, VALID_EC2_REGIONS
 from libcloud.compute.drivers.ec2 import ExEC2AvailabilityZone
 from libcloud.compute.drivers.ec2 import EC2NetworkSubnet
+from libcloud.compute.drivers.ec2 import MAX_FILTER_VALUES
 from libcloud.compute.base import Node, NodeImage, NodeSize, NodeLocation
 from libcloud.compute.base import StorageVolume, VolumeSnapshot
 from libcloud.compute.types import KeyPairDoesNotExistError, StorageVolumeState, \
@@ -715,6 +720,47 @@ class EC2Tests(LibcloudTestCase, TestCaseMixin):
         self.driver.ex_create_tags(node, {'sample': 'another tag'})
         self.driver.ex_delete_tags(node, {'sample': None})
 
+    def test_iterate_nodes_paginated(self):
+        EC2MockHttp.type = 'paginated'
+        EC2MockHttp.paginated_requests = []
+
+        nodes = self.driver.iterate_nodes(ex_page_size=5)
+        self.assertEqual([node.id for node in nodes],
+                         ['i-4382922a', 'i-8474834a'] * 2)
+
+        requests = EC2MockHttp.paginated_requests
+        describe_instances = [query for query in requests
+                              if query['Action'] == ['DescribeInstances']]
+        describe_addresses = [query for query in requests
+                              if query['Action'] == ['DescribeAddresses']]
+
+        self.assertEqual(len(describe_instances), 2)
+        self.assertEqual(describe_instances[0]['MaxResults'], ['5'])
+        self.assertEqual(describe_instances[1]['NextToken'], ['page2'])
+
+        # Elastic IPs are requested for the instances of every page
+        for query in describe_addresses:
+            self.assertEqual(query['Filter.1.Name'], ['instance-id'])
+            self.assertEqual(query['Filter.1.Value.2'], ['i-8474834a'])
+
+    def test_list_polled_nodes_uses_instance_id_filter(self):
+        node = self.driver.list_nodes()[0]
+
+        EC2MockHttp.type = 'paginated'
+        EC2MockHttp.paginated_requests = []
+
+        nodes = self.driver._list_polled_nodes([node])
+        self.assertTrue(node.id in [polled.id for polled in nodes])
+
+        describe_instances = [query for query in
+                              EC2MockHttp.paginated_requests
+                              if query['Action'] == ['DescribeInstances']]
+        self.assertEqual(describe_instances[0]['Filter.1.Name'],
+                         ['instance-id'])
+        self.assertEqual(describe_instances[0]['Filter.1.Value.1'],
+                         [node.id])
+        self.assertFalse('InstanceId.1' in describe_instances[0])
+
     def test_ex_describe_addresses_for_node(self):
         node1 = Node('i-4382922a', None, None, None, None, self.driver)
         ip_addresses1 = self.driver.ex_describe_addresses_for_node(node1)
@@ -1315,11 +1361,30 @@ class EC2SAEastTests(EC2Tests):
 
 class EC2MockHttp(MockHttp):
     fixtures = ComputeFileFixtures('ec2')
+    paginated_requests = []
 
     def _DescribeInstances(self, method, url, body, headers):
         body = self.fixtures.load('describe_instances.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
+    def _paginated_DescribeInstances(self, method, url, body, headers):
+        query = parse_qs(urlparse.urlparse(url).query)
+        self.paginated_requests.append(query)
+        body = self.fixtures.load('describe_instances.xml')
+
+        if 'NextToken' not in query:
+            body = body.replace('</DescribeInstancesResponse>',
+                                '<nextToken>page2</nextToken>'
+                                '</DescribeInstancesResponse>')
+
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _paginated_DescribeAddresses(self, method, url, body, headers):
+        query = parse_qs(urlparse.urlparse(url).query)
+        self.paginated_requests.append(query)
+        body = self.fixtures.load('describe_addresses_multi.xml')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
     def _DescribeReservedInstances(self, method, url, body, headers):
         body = self.fixtures.load('describe_reserved_instances.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
@@ -1839,6 +1904,33 @@ class EucTests(LibcloudTestCase, TestCaseMixin):
         self.assertTrue('m1.medium' in ids)
         self.assertTrue('m3.xlarge' in ids)
 
+    def test_list_polled_nodes_without_instance_id_filter(self):
+        nodes = self.driver.list_nodes()
+        connection = self.driver.connection
+
+        with patch.object(connection, 'request',
+                          wraps=connection.request) as mock_request:
+            polled = self.driver._list_polled_nodes(nodes[:1])
+
+        self.assertEqual([node.id for node in polled], [nodes[0].id])
+
+        for call in mock_request.call_args_list:
+            self.assertFalse(any(key.startswith('Filter.') for key in
+                                 call[1]['params']))
+
+    def test_ex_describe_addresses_single_request(self):
+        nodes = [Node('i-%s' % (index), None, None, None, None, self.driver)
+                 for index in range(MAX_FILTER_VALUES + 1)]
+        connection = self.driver.connection
+
+        with patch.object(connection, 'request',
+                          wraps=connection.request) as mock_request:
+            result = self.driver.ex_describe_addresses(nodes)
+
+        # The addresses aren't filtered so they are requested only once
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(len(result), len(nodes))
+
 
 class OutscaleTests(EC2Tests):
 
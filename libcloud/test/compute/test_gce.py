@@ -624,6 +624,26 @@ class GCENodeDriverTest(GoogleTestCase, TestCaseMixin):
         self.assertEqual(len(regions), 3)
         self.assertEqual(regions[0].name, 'europe-west1')
 
+    def test_request_paginated(self):
+        connection = self.driver.connection
+
+        with mock.patch.object(connection, 'request',
+                               wraps=connection.request) as mock_request:
+            responses = connection.request_paginated('/regions')
+            first = next(responses)
+
+            # The next page is requested once the first one is consumed
+            self.assertEqual(mock_request.call_count, 1)
+            self.assertTrue('nextPageToken' in first)
+
+            responses = [first] + list(responses)
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual([[item['name'] for item in response['items']]
+                          for response in responses],
+                         [['asia-east1', 'europe-west1'], ['us-central1']])
+        self.assertEqual(connection.gce_params, None)
+
     def test_ex_list_snapshots(self):
         snapshots = self.driver.ex_list_snapshots()
         self.assertEqual(len(snapshots), 2)
@@ -810,6 +810,15 @@ class OpenStack_1_1_Tests(unittest.TestCase, TestCaseMixin):
         self.assertTrue(node.extra.get('service_name') is not None)
         self.assertTrue(node.extra.get('uri') is not None)
 
+    def test_iterate_nodes_paginated(self):
+        self.driver_klass.connectionCls.conn_class.type = 'PAGINATED'
+
+        nodes = self.driver.iterate_nodes(ex_page_size=1)
+        self.assertFalse(isinstance(nodes, list))
+
+        nodes = list(nodes)
+        self.assertEqual([node.id for node in nodes], ['12065', '12064'])
+
     def test_list_nodes_no_image_id_attribute(self):
         # Regression test for LIBCLOD-455
         self.driver_klass.connectionCls.conn_class.type = 'ERROR_STATE_NO_IMAGE_ID'
@@ -1849,6 +1858,22 @@ class OpenStack_1_1_MockHttp(MockHttp, unittest.TestCase):
         body = self.fixtures.load('_servers_detail.json')
         return (httplib.OK, body, self.json_content_headers, httplib.responses[httplib.OK])
 
+    def _v1_1_slug_servers_detail_PAGINATED(self, method, url, body, headers):
+        self.assertUrlContainsQueryParams(url, {'limit': '1'})
+        servers = json.loads(self.fixtures.load('_servers_detail.json'))
+
+        if 'marker=' not in url:
+            servers['servers'] = servers['servers'][:1]
+            servers['servers_links'] = [{
+                'rel': 'next',
+                'href': 'https://api.example.com/v1.1/slug/servers/detail'
+                        '?limit=1&marker=12065'}]
+        else:
+            self.assertUrlContainsQueryParams(url, {'marker': '12065'})
+            servers['servers'] = servers['servers'][1:]
+
+        return (httplib.OK, json.dumps(servers), self.json_content_headers, httplib.responses[httplib.OK])
+
     def _v1_1_slug_servers_detail_ERROR_STATE_NO_IMAGE_ID(self, method, url, body, headers):
         body = self.fixtures.load('_servers_detail_ERROR_STATE.json')
         return (httplib.OK, body, self.json_content_headers, httplib.responses[httplib.OK])
@@ -0,0 +1,241 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+import threading
+
+from mock import patch
+
+from libcloud.test import unittest
+from libcloud.common.types import LibcloudError
+from libcloud.compute.base import Node, NodeDriver
+from libcloud.compute.types import NodeState
+from libcloud.compute.polling import NodePoller, PollTimeout
+
+
+class FakeCloud(object):
+    """
+    Cloud in which every node becomes running after a number of polls.
+    """
+
+    def __init__(self, driver, polls_until_running):
+        self.driver = driver
+        self.polls_until_running = polls_until_running
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def fetch(self, nodes):
+        with self.lock:
+            self.fetched.append(sorted([node.id for node in nodes]))
+
+            result = []
+
+            for node in nodes:
+                polls = self.polls_until_running[node.id]
+                self.polls_until_running[node.id] = polls - 1
+
+                if polls > 1:
+                    state = NodeState.PENDING
+                    public_ips = []
+                else:
+                    state = NodeState.RUNNING
+                    public_ips = ['10.0.0.%s' % (node.id)]
+
+                result.append(Node(id=node.id, name=node.name, state=state,
+                                   public_ips=public_ips, private_ips=[],
+                                   driver=self.driver))
+
+            return result
+
+
+class NodePollerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = NodeDriver('key')
+        self.nodes = [Node(id=str(index), name='node-%s' % (index),
+                           state=NodeState.PENDING, public_ips=[],
+                           private_ips=[], driver=self.driver)
+                      for index in range(1, 4)]
+
+    def test_nodes_are_yielded_when_ready(self):
+        cloud = FakeCloud(self.driver, {'1': 2, '2': 1, '3': 3})
+        poller = NodePoller(cloud.fetch)
+
+        def check(node):
+            return node.state == NodeState.RUNNING and node.public_ips
+
+        result = [(node.id, ips) for node, ips in
+                  poller.iterate(self.nodes, check, wait_period=0.01,
+                                 timeout=10)]
+
+        self.assertEqual(result, [('2', ['10.0.0.2']), ('1', ['10.0.0.1']),
+                                  ('3', ['10.0.0.3'])])
+
+        # Ready nodes are not polled anymore
+        self.assertEqual(cloud.fetched, [['1', '2', '3'], ['1', '3'], ['3']])
+
+    def test_delay_backs_off_while_nothing_changes(self):
+        poller = NodePoller(lambda nodes: nodes, backoff=2, max_wait_period=5)
+        waiter = object()
+        poller._register(waiter, self.nodes, wait_period=1)
+
+        delays = []
+
+        for _ in range(5):
+            with poller._condition:
+                poller._update(list(self.nodes), None)
+                delays.append(poller._delay)
+
+        self.assertEqual(delays, [1, 2, 4, 5, 5])
+
+        # A change resets the delay
+        node = Node(id='1', name='node-1', state=NodeState.RUNNING,
+                    public_ips=[], private_ips=[], driver=self.driver)
+
+        with poller._condition:
+            poller._update([node], None)
+
+        self.assertEqual(poller._delay, 1)
+
+    def test_timeout(self):
+        poller = NodePoller(lambda nodes: [])
+
+        try:
+            list(poller.iterate(self.nodes, bool, wait_period=0.01,
+                                timeout=0.05))
+        except PollTimeout as e:
+            self.assertEqual(e.timeout, 0.05)
+        else:
+            self.fail('Exception was not thrown')
+
+        self.assertEqual(poller._nodes, {})
+
+    def test_cancellation(self):
+        poller = NodePoller(lambda nodes: [])
+        cancelled = threading.Event()
+        timer = threading.Timer(0.1, cancelled.set)
+        timer.start()
+
+        start = time.time()
+        result = list(poller.iterate(self.nodes, bool, wait_period=60,
+                                     timeout=60, cancelled=cancelled))
+        timer.join()
+
+        # The waiter stops without an error long before the next poll
+        self.assertEqual(result, [])
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(poller._nodes, {})
+
+    def test_fetch_exception_is_propagated(self):
+        def fetch(nodes):
+            raise ValueError('fetch failed')
+
+        poller = NodePoller(fetch)
+        self.assertRaisesRegexp(ValueError, 'fetch failed', list,
+                                poller.iterate(self.nodes, bool, timeout=1))
+
+    def test_concurrent_waiters_share_poll_loop(self):
+        cloud = FakeCloud(self.driver, {'1': 3, '2': 3, '3': 3})
+        registered = threading.Event()
+
+        def fetch(nodes):
+            # Hold the first poll back until every waiter has registered
+            registered.wait(5)
+            return cloud.fetch(nodes)
+
+        def is_running(node):
+            return node.state == NodeState.RUNNING
+
+        poller = NodePoller(fetch)
+        results = {}
+
+        def wait(nodes):
+            results[nodes[0].id] = [node.id for node, _ in
+                                    poller.iterate(nodes, is_running,
+                                                   wait_period=0.01,
+                                                   timeout=10)]
+
+        threads = [threading.Thread(target=wait, args=([node],))
+                   for node in self.nodes]
+
+        for thread in threads:
+            thread.start()
+
+        for _ in range(500):
+            with poller._condition:
+                if len(poller._wait_periods) == len(threads):
+                    break
+
+            registered.wait(0.01)
+
+        registered.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {'1': ['1'], '2': ['2'], '3': ['3']})
+
+        # The polls which followed the registration of all the waiters
+        # covered the nodes of all of them
+        self.assertTrue(['1', '2', '3'] in cloud.fetched)
+        self.assertTrue(len(cloud.fetched) <= 4)
+
+
+class IterateUntilRunningTests(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = NodeDriver('key')
+        self.nodes = [Node(id=str(index), name='node-%s' % (index),
+                           state=NodeState.PENDING, public_ips=[],
+                           private_ips=[], driver=self.driver)
+                      for index in range(1, 3)]
+
+    def test_wait_until_running_returns_nodes_in_order(self):
+        cloud = FakeCloud(self.driver, {'1': 2, '2': 1})
+
+        with patch.object(NodeDriver, '_list_polled_nodes',
+                          side_effect=cloud.fetch):
+            iterated = [node.id for node, _ in
+                        self.driver.iterate_until_running(self.nodes,
+                                                          wait_period=0.01)]
+
+        self.assertEqual(iterated, ['2', '1'])
+
+        cloud = FakeCloud(self.driver, {'1': 2, '2': 1})
+
+        with patch.object(NodeDriver, '_list_polled_nodes',
+                          side_effect=cloud.fetch):
+            result = self.driver.wait_until_running(self.nodes,
+                                                    wait_period=0.01)
+
+        self.assertEqual([(node.id, ips) for node, ips in result],
+                         [('1', ['10.0.0.1']), ('2', ['10.0.0.2'])])
+
+    def test_node_poller_is_shared(self):
+        poller = self.driver._get_node_poller()
+        self.assertTrue(self.driver._get_node_poller() is poller)
+        self.assertFalse(self.driver._get_node_poller({'a': 1}) is poller)
+
+    def test_timeout(self):
+        with patch.object(NodeDriver, 'list_nodes', return_value=[]):
+            self.assertRaisesRegexp(LibcloudError, 'Timed out after 0.05',
+                                    self.driver.wait_until_running,
+                                    self.nodes, wait_period=0.01,
+                                    timeout=0.05)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
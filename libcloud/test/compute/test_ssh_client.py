@@ -21,17 +21,21 @@ import os
 import sys
 import tempfile
 
+from io import BytesIO
+
 from libcloud import _init_once
 from libcloud.test import LibcloudTestCase
 from libcloud.test import unittest
 from libcloud.compute.ssh import ParamikoSSHClient
 from libcloud.compute.ssh import ShellOutSSHClient
 from libcloud.compute.ssh import have_paramiko
+from libcloud.compute.ssh import SSHCommandTimeoutError
 
 from libcloud.utils.py3 import StringIO
 from libcloud.utils.py3 import u
+from libcloud.utils.py3 import b
 
-from mock import patch, Mock, MagicMock
+from mock import patch, Mock
 
 if not have_paramiko:
     ParamikoSSHClient = None  # NOQA
@@ -194,10 +198,6 @@ class ParamikoSSHClientTests(LibcloudTestCase):
                          'port': 22}
         mock.client.connect.assert_called_once_with(**expected_conn)
 
-    @patch.object(ParamikoSSHClient, '_consume_stdout',
-                  MagicMock(return_value=StringIO('')))
-    @patch.object(ParamikoSSHClient, '_consume_stderr',
-                  MagicMock(return_value=StringIO('')))
     def test_basic_usage_absolute_path(self):
         """
         Basic execution.
@@ -224,6 +224,8 @@ class ParamikoSSHClientTests(LibcloudTestCase):
         mock_cli.open_sftp().file.assert_called_once_with('random_script.sh',
                                                           mode='w')
 
+        mock_cli.get_transport().open_session.return_value = \
+            self._create_channel(stdout_chunks=[], stderr_chunks=[])
         mock.run(sd)
 
         # Make assertions over 'run' method
@@ -252,6 +254,132 @@ class ParamikoSSHClientTests(LibcloudTestCase):
         mock.close()
         self.assertLogMsg('Closing server connection')
 
+    def test_put_file_streams_file_and_reuses_sftp_session(self):
+        client = self.ssh_cli
+        sftp = client.client.open_sftp.return_value
+        sftp.getcwd.return_value = '/home/ubuntu/dir'
+
+        progress = []
+        fo = BytesIO(b('a') * 10)
+
+        file_path = client.put_file(path='dir/file.bin', fo=fo, chmod=0o644,
+                                    block_size=4,
+                                    progress_callback=lambda *args:
+                                    progress.append(args))
+
+        self.assertEqual(file_path, '/home/ubuntu/dir/dir/file.bin')
+        sftp.file.assert_called_once_with('file.bin', mode='w')
+
+        remote_file = sftp.file.return_value
+        remote_file.set_pipelined.assert_called_once_with(True)
+        self.assertEqual([call[0][0] for call in
+                          remote_file.write.call_args_list],
+                         [b('aaaa'), b('aaaa'), b('aa')])
+        remote_file.chmod.assert_called_once_with(0o644)
+        self.assertTrue(remote_file.close.called)
+
+        self.assertEqual([transferred for transferred, _ in progress],
+                         [4, 8, 10])
+
+        # The SFTP session is reused
+        client.put(path='dir/file.txt', contents='foo')
+        client.delete(path='dir/file.txt')
+        self.assertEqual(client.client.open_sftp.call_count, 1)
+
+        client.close()
+        sftp.close.assert_called_once_with()
+
+    def test_put_file_local_path_and_directory_cache(self):
+        client = self.ssh_cli
+        client.cache_dirs = True
+        sftp = client.client.open_sftp.return_value
+
+        client.put_file(path='/opt/app/file.py', local_path=__file__)
+        client.put_file(path='/opt/app/other.py', local_path=__file__)
+
+        self.assertEqual(sftp.mkdir.call_count, 2)
+
+        with open(__file__, 'rb') as fp:
+            content = fp.read()
+
+        written = b('').join([call[0][0] for call in
+                              sftp.file.return_value.write.call_args_list])
+        self.assertEqual(written, content * 2)
+
+        self.assertRaises(ValueError, client.put_file, path='/opt/file')
+
+    def _create_channel(self, stdout_chunks, stderr_chunks, exit_status=0):
+        stdout_chunks = list(stdout_chunks)
+        stderr_chunks = list(stderr_chunks)
+
+        chan = Mock()
+        chan.eof_received = False
+        chan.recv_ready.side_effect = lambda: bool(stdout_chunks)
+        chan.recv.side_effect = lambda size: stdout_chunks.pop(0)
+        chan.recv_stderr_ready.side_effect = lambda: bool(stderr_chunks)
+        chan.recv_stderr.side_effect = lambda size: stderr_chunks.pop(0)
+        chan.exit_status_ready.return_value = True
+        chan.recv_exit_status.return_value = exit_status
+        return chan
+
+    @patch('libcloud.compute.ssh.time.sleep')
+    @patch('libcloud.compute.ssh.select.select')
+    def test_run_waits_for_channel_events(self, mock_select, mock_sleep):
+        chan = self._create_channel(stdout_chunks=[b('foo'), b('bar')],
+                                    stderr_chunks=[b('err')], exit_status=2)
+        chan.exit_status_ready.side_effect = [False, True]
+        self.ssh_cli.client.get_transport().open_session.return_value = chan
+
+        stdout, stderr, status = self.ssh_cli.run('cmd')
+
+        self.assertEqual(stdout, 'foobar')
+        self.assertEqual(stderr, 'err')
+        self.assertEqual(status, 2)
+
+        # The client blocks on the channel instead of sleeping
+        mock_select.assert_called_once_with(
+            [chan], [], [], ParamikoSSHClient.MAX_WAIT_PERIOD)
+        self.assertEqual(mock_sleep.call_count, 0)
+
+        # After the end of file the client waits for the exit status
+        chan = self._create_channel(stdout_chunks=[], stderr_chunks=[])
+        chan.eof_received = True
+        chan.exit_status_ready.side_effect = [False, True]
+        self.ssh_cli.client.get_transport().open_session.return_value = chan
+
+        self.ssh_cli.run('cmd')
+        chan.status_event.wait.assert_called_once_with(
+            ParamikoSSHClient.MAX_WAIT_PERIOD)
+
+    def test_run_output_callbacks_and_max_output_size(self):
+        # Multi byte character split over two chunks
+        chan = self._create_channel(
+            stdout_chunks=[b'line 1\n', b'line 2\n\xc3', b'\xa9\n'],
+            stderr_chunks=[b('error\n')])
+        self.ssh_cli.client.get_transport().open_session.return_value = chan
+
+        stdout_chunks = []
+        stderr_chunks = []
+
+        stdout, stderr, _ = self.ssh_cli.run(
+            'cmd', stdout_callback=stdout_chunks.append,
+            stderr_callback=stderr_chunks.append, max_output_size=5)
+
+        self.assertEqual(''.join(stdout_chunks), u('line 1\nline 2\n\xe9\n'))
+        self.assertEqual(''.join(stderr_chunks), 'error\n')
+        self.assertEqual(stdout, u(' 2\n\xe9\n'))
+        self.assertEqual(stderr, 'rror\n')
+
+    @patch('libcloud.compute.ssh.select.select')
+    def test_run_timeout(self, _):
+        chan = self._create_channel(stdout_chunks=[], stderr_chunks=[])
+        chan.exit_status_ready.return_value = False
+        self.ssh_cli.client.get_transport().open_session.return_value = chan
+
+        self.assertRaises(SSHCommandTimeoutError, self.ssh_cli.run, 'cmd',
+                          timeout=0.01)
+        self.assertTrue(chan.close.called)
+
     def assertLogMsg(self, expected_msg):
         with open(self.tmp_file, 'r') as fp:
             content = fp.read()
@@ -399,6 +527,60 @@ class ShellOutSSHClientTests(LibcloudTestCase):
         self.assertEqual(cmd3, ['ssh', '-i', '/home/my.key',
                                 '-oConnectTimeout=5', 'root@localhost'])
 
+    def test_run_output_arguments(self):
+        client = ShellOutSSHClient(hostname='localhost', username='root')
+        stdout, stderr = [], []
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value.communicate.return_value = (
+                b('0123456789'), b('error'))
+            mock_popen.return_value.returncode = 1
+
+            result = client.run('ls', stdout_callback=stdout.append,
+                                stderr_callback=stderr.append,
+                                max_output_size=4)
+
+        self.assertEqual(result, (b('6789'), b('error')[1:], 1))
+        self.assertEqual(stdout, ['0123456789'])
+        self.assertEqual(stderr, ['error'])
+
+    def test_put_file(self):
+        client = ShellOutSSHClient(hostname='localhost', username='root',
+                                   port=2222, key='/home/my.key')
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value.communicate.return_value = ('', '')
+            mock_popen.return_value.returncode = 0
+            progress = []
+
+            client.put_file(path='/tmp/file.py', local_path=__file__,
+                            chmod=0o755, progress_callback=lambda *args:
+                            progress.append(args))
+
+            size = os.path.getsize(__file__)
+            self.assertEqual(mock_popen.call_args_list[0][0][0],
+                             ['scp', '-P', '2222', '-i', '/home/my.key',
+                              __file__, 'root@localhost:/tmp/file.py'])
+            self.assertEqual(mock_popen.call_args_list[1][0][0],
+                             ['ssh', '-i', '/home/my.key', 'root@localhost',
+                              'chmod 755 /tmp/file.py'])
+            self.assertEqual(progress, [(size, size)])
+
+            # File objects are streamed to cat
+            mock_popen.reset_mock()
+            client.put_file(path='/tmp/file.txt', fo=BytesIO(b('foo')),
+                            mode='a')
+
+            self.assertEqual(mock_popen.call_args[0][0],
+                             ['ssh', '-i', '/home/my.key', 'root@localhost',
+                              'cat >> /tmp/file.txt'])
+            stdin = mock_popen.return_value.stdin
+            stdin.write.assert_called_once_with(b('foo'))
+
+            mock_popen.return_value.returncode = 1
+            self.assertRaises(IOError, client.put_file, path='/tmp/file.py',
+                              local_path=__file__)
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
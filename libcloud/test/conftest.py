@@ -1,6 +1,14 @@
 import os.path
+import sys
+
 import pytest
 
+# The asyncio interfaces use syntax which is only available in Python 3.6+
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.extend(['aio.py', 'compute/test_aio.py',
+                           'storage/test_aio.py'])
+
 
 def pytest_configure(config):
     """Check that secrets.py is valid"""
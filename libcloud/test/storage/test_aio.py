@@ -0,0 +1,282 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+from io import BytesIO
+
+from libcloud.http import LibcloudConnection
+from libcloud.utils.py3 import httplib
+from libcloud.utils.retry import RetryPolicy
+from libcloud.common.cache import ResponseCache
+from libcloud.common.ratelimit import RateLimiter
+from libcloud.common.instrumentation import Instrument
+from libcloud.storage.base import Container, Object
+from libcloud.storage.types import ObjectDoesNotExistError
+from libcloud.storage.drivers.s3 import S3StorageDriver, CHUNK_SIZE
+from libcloud.test.aio import AsyncTestCase
+from libcloud.test.secrets import STORAGE_S3_PARAMS
+from libcloud.test.storage.test_s3 import S3MockHttp
+
+try:
+    from libcloud.storage.aio import get_async_driver
+    from libcloud.storage.aio import AsyncS3StorageDriver
+except ImportError:
+    pass
+
+
+class S3OverriddenGetObjectDriver(S3StorageDriver):
+    def get_object(self, container_name, object_name):
+        return Object(name=object_name, size=0, hash=None, extra={},
+                      container=Container(name=container_name, extra={},
+                                          driver=self),
+                      meta_data=None, driver=self)
+
+
+class AsyncS3Tests(AsyncTestCase):
+    mock_cls = S3MockHttp
+    driver_type = S3StorageDriver
+
+    def setUp(self):
+        super(AsyncS3Tests, self).setUp()
+        S3MockHttp.type = None
+
+        self.driver = self.driver_type(*STORAGE_S3_PARAMS)
+        # Blocking fallback requests go to the local server as well
+        self.driver.connection.conn_class = LibcloudConnection
+        self.server.configure(self.driver.connection)
+        self.async_driver = get_async_driver(self.driver)
+
+    def tearDown(self):
+        self.run_async(self.async_driver.close())
+        super(AsyncS3Tests, self).tearDown()
+
+    def test_get_async_driver(self):
+        self.assertTrue(isinstance(self.async_driver, AsyncS3StorageDriver))
+
+    def test_list_containers_success(self):
+        S3MockHttp.type = 'list_containers'
+        containers = self.run_async(self.async_driver.list_containers())
+
+        self.assertEqual(len(containers), 2)
+        self.assertTrue('creation_date' in containers[1].extra)
+
+        # Requests are signed by the driver connection
+        headers = self.server.requests[0][3]
+        self.assertTrue(headers['Authorization'].startswith(
+            'AWS4-HMAC-SHA256'))
+
+    def test_list_container_objects_iterator_has_more(self):
+        S3MockHttp.type = 'ITERATOR'
+        container = Container(name='test_container', extra={},
+                              driver=self.driver)
+        objects = self.run_async(
+            self.async_driver.list_container_objects(container=container))
+
+        self.assertEqual(len(objects), 5)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertTrue('start-after=3.zip' in self.server.requests[1][1])
+
+    def test_list_container_objects_arguments(self):
+        container = Container(name='listing_container', extra={},
+                              driver=self.driver)
+        objects = self.run_async(self.async_driver.list_container_objects(
+            container=container, ex_prefix='dir', ex_start_after='dir1/a',
+            ex_max_keys=1))
+
+        self.assertEqual([obj.name for obj in objects],
+                         ['dir1/b', 'dir1/sub/c', 'dir2/a', 'dir2/sub/b',
+                          'dir2/sub/c'])
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertTrue('max-keys=1' in self.server.requests[0][1])
+
+        objects = self.run_async(self.async_driver.list_container_objects(
+            container=container, ex_prefix='dir2/', ex_delimiter='/'))
+        self.assertEqual([obj.name for obj in objects], ['dir2/a'])
+
+    def test_get_object_success(self):
+        S3MockHttp.type = 'get_object'
+        obj = self.run_async(self.async_driver.get_object(
+            container_name='test2', object_name='test'))
+
+        self.assertEqual(obj.name, 'test')
+        self.assertEqual(obj.container.name, 'test2')
+        self.assertEqual(obj.size, '12345')
+        self.assertEqual(obj.hash, 'e31208wqsdoj329jd')
+        self.assertEqual(obj.extra['content_type'], 'application/zip')
+        self.assertEqual(obj.meta_data['rabbits'], 'monkeys')
+
+    def test_get_object_overridden_method_uses_driver(self):
+        driver = S3OverriddenGetObjectDriver(*STORAGE_S3_PARAMS)
+        self.server.configure(driver.connection)
+        async_driver = get_async_driver(driver)
+
+        obj = self.run_async(async_driver.get_object(
+            container_name='test2', object_name='test'))
+
+        self.assertEqual(obj.size, 0)
+        self.assertEqual(len(self.server.requests), 0)
+
+    def test_download_object_as_stream_success(self):
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo_bar_object', size=1000, hash=None, extra={},
+                     container=container, meta_data=None, driver=self.driver)
+
+        async def download():
+            return [chunk async for chunk in
+                    self.async_driver.download_object_as_stream(
+                        obj, chunk_size=100)]
+
+        chunks = self.run_async(download())
+
+        self.assertEqual(len(b''.join(chunks)), 1000)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+
+    def test_download_object_as_stream_not_found(self):
+        S3MockHttp.type = 'NOT_FOUND'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo_bar_object', size=1000, hash=None, extra={},
+                     container=container, meta_data=None, driver=self.driver)
+
+        async def download():
+            async for _ in self.async_driver.download_object_as_stream(obj):
+                pass
+
+        self.assertRaises(ObjectDoesNotExistError, self.run_async,
+                          download())
+
+    def test_upload_big_object_via_stream_concurrently(self):
+        S3MockHttp.type = 'MULTIPART'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        async def iterator():
+            for _ in range(3):
+                yield b'0' * CHUNK_SIZE
+
+        obj = self.run_async(self.async_driver.upload_object_via_stream(
+            iterator(), container, 'foo_test_stream_data',
+            extra={'content_type': 'text/plain'}, ex_max_concurrency=2))
+
+        self.assertEqual(obj.name, 'foo_test_stream_data')
+        self.assertEqual(obj.size, CHUNK_SIZE * 3)
+
+        methods = [request[0] for request in self.server.requests]
+        self.assertEqual(methods, ['POST', 'PUT', 'PUT', 'PUT', 'POST'])
+
+        commit_body = self.server.requests[-1][2].decode('utf-8')
+        self.assertTrue(commit_body.index('<PartNumber>1</PartNumber>') <
+                        commit_body.index('<PartNumber>2</PartNumber>') <
+                        commit_body.index('<PartNumber>3</PartNumber>'))
+
+    def test_upload_small_object_via_stream(self):
+        S3MockHttp.type = 'MULTIPART'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        obj = self.run_async(self.async_driver.upload_object_via_stream(
+            iter([b'2', b'34']), container, 'foo_test_stream_data'))
+
+        self.assertEqual(obj.size, 3)
+        self.assertEqual(self.server.requests[1][2], b'234')
+
+    def test_upload_object_via_stream_abort(self):
+        S3MockHttp.type = 'MULTIPART'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        async def faulty_iterator():
+            yield b'0' * CHUNK_SIZE
+            raise RuntimeError('Error in fetching data')
+
+        self.assertRaises(RuntimeError, self.run_async,
+                          self.async_driver.upload_object_via_stream(
+                              faulty_iterator(), container,
+                              'foo_test_stream_data'))
+        self.assertEqual(self.server.requests[-1][0], 'DELETE')
+
+    def test_upload_object_via_stream_invalid_part_size(self):
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        self.assertRaises(ValueError, self.run_async,
+                          self.async_driver.upload_object_via_stream(
+                              iter([b'1']), container,
+                              'foo_test_stream_data', ex_part_size=1))
+
+    def test_upload_small_object_via_file_object(self):
+        S3MockHttp.type = 'MULTIPART'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        obj = self.run_async(self.async_driver.upload_object_via_stream(
+            BytesIO(b'234'), container, 'foo_test_stream_data'))
+
+        self.assertEqual(obj.size, 3)
+        self.assertEqual(self.server.requests[1][2], b'234')
+
+    def test_retry_rate_limiter_and_instruments(self):
+        S3MockHttp.type = 'list_containers'
+        responses = [(httplib.SERVICE_UNAVAILABLE, '', {},
+                      httplib.responses[httplib.SERVICE_UNAVAILABLE])]
+
+        class RetryMockHttp(S3MockHttp):
+            def _get_request(self, *args, **kwargs):
+                if responses:
+                    return responses.pop()
+
+                return super(RetryMockHttp, self)._get_request(*args,
+                                                               **kwargs)
+
+        events = []
+        instrument = Instrument()
+        instrument.on_request = events.append
+
+        self.server.mock_cls = RetryMockHttp
+        connection = self.driver.connection
+        connection.retry_policy = RetryPolicy(max_attempts=3, base_delay=0)
+        connection.rate_limiter = RateLimiter(concurrency=1)
+        connection.instruments = [instrument]
+
+        containers = self.run_async(self.async_driver.list_containers())
+
+        self.assertEqual(len(containers), 2)
+        self.assertEqual(len(self.server.requests), 2)
+
+        stats = connection.rate_limiter.get_stats()['read']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['in_flight'], 0)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].status, httplib.OK)
+        self.assertEqual(events[0].retries, 1)
+        self.assertEqual(events[0].method, 'GET')
+
+    def test_response_cache(self):
+        S3MockHttp.type = 'list_containers'
+        self.driver.connection.response_cache = ResponseCache(default_ttl=60)
+
+        for _ in range(2):
+            containers = self.run_async(self.async_driver.list_containers())
+            self.assertEqual(len(containers), 2)
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.driver.connection.response_cache.hits, 1)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
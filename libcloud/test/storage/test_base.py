@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import sys
 import hashlib
 
@@ -26,8 +27,10 @@ from libcloud.utils.py3 import StringIO
 from libcloud.utils.py3 import b
 from libcloud.utils.py3 import PY2
 
-from libcloud.storage.base import StorageDriver
+from libcloud.common.types import LibcloudError
+from libcloud.storage.base import Container, Object, StorageDriver
 from libcloud.storage.base import DEFAULT_CONTENT_TYPE
+from libcloud.storage.types import ObjectDoesNotExistError
 
 from libcloud.test import unittest
 from libcloud.test import MockHttp
@@ -139,15 +142,21 @@ class BaseStorageTests(unittest.TestCase):
     @mock.patch('libcloud.utils.files.read_in_chunks')
     def test_upload_object_hash_calculation_is_efficient(self, mock_read_in_chunks,
                                                          mock_exhaust_iterator):
-        # Verify that we don't buffer whole file in memory when calculating
-        # object has when iterator has __next__ method, but instead read and calculate hash in chunks
+        # Verify that we don't buffer whole file in memory and don't read the
+        # data twice when calculating object hash, but instead calculate hash
+        # while the data is being sent
         size = 100
 
+        def send_data(*args, **kwargs):
+            data = kwargs['data']
+            for _ in data:
+                pass
+            return Mock()
+
         self.driver1.connection = Mock()
+        self.driver1.connection.request.side_effect = send_data
 
         # stream has __next__ method and next() method
-        mock_read_in_chunks.return_value = 'a' * size
-
         iterator = BodyStream('a' * size)
         self.assertTrue(hasattr(iterator, '__next__'))
         self.assertTrue(hasattr(iterator, 'next'))
@@ -155,9 +164,6 @@ class BaseStorageTests(unittest.TestCase):
         upload_func = Mock()
         upload_func.return_value = True, '', size
 
-        self.assertEqual(mock_read_in_chunks.call_count, 0)
-        self.assertEqual(mock_exhaust_iterator.call_count, 0)
-
         result = self.driver1._upload_object(object_name='test1',
                                              content_type=None,
                                              upload_func=upload_func,
@@ -175,12 +181,7 @@ class BaseStorageTests(unittest.TestCase):
         headers = self.driver1.connection.request.call_args[-1]['headers']
         self.assertEqual(headers['Content-Type'], DEFAULT_CONTENT_TYPE)
 
-        self.assertEqual(mock_read_in_chunks.call_count, 1)
-        self.assertEqual(mock_exhaust_iterator.call_count, 0)
-
         # stream has only has next() method
-        mock_read_in_chunks.return_value = 'b' * size
-
         iterator = iter([str(v) for v in ['b' * size]])
 
         if PY2:
@@ -190,12 +191,6 @@ class BaseStorageTests(unittest.TestCase):
             self.assertTrue(hasattr(iterator, '__next__'))
             self.assertFalse(hasattr(iterator, 'next'))
 
-        self.assertEqual(mock_read_in_chunks.call_count, 1)
-        self.assertEqual(mock_exhaust_iterator.call_count, 0)
-
-        self.assertEqual(mock_read_in_chunks.call_count, 1)
-        self.assertEqual(mock_exhaust_iterator.call_count, 0)
-
         result = self.driver1._upload_object(object_name='test2',
                                              content_type=None,
                                              upload_func=upload_func,
@@ -213,9 +208,102 @@ class BaseStorageTests(unittest.TestCase):
         headers = self.driver1.connection.request.call_args[-1]['headers']
         self.assertEqual(headers['Content-Type'], DEFAULT_CONTENT_TYPE)
 
-        self.assertEqual(mock_read_in_chunks.call_count, 2)
+        self.assertEqual(mock_read_in_chunks.call_count, 0)
         self.assertEqual(mock_exhaust_iterator.call_count, 0)
 
+    def test_upload_object_file_is_read_once(self):
+        size = 100
+
+        def send_data(*args, **kwargs):
+            data = kwargs['data']
+            while data.read(10):
+                pass
+            return Mock()
+
+        self.driver1.connection = Mock()
+        self.driver1.connection.request.side_effect = send_data
+
+        file_path = os.path.abspath(__file__) + '.temp'
+        self.addCleanup(os.unlink, file_path)
+
+        with open(file_path, 'wb') as fp:
+            fp.write(b('a') * size)
+
+        with mock.patch('libcloud.storage.base.open', create=True,
+                        side_effect=open) as mock_open:
+            result = self.driver1._upload_object(object_name='test1',
+                                                 content_type=None,
+                                                 request_path='/',
+                                                 file_path=file_path)
+
+        hasher = hashlib.md5()
+        hasher.update(b('a') * size)
+
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(result['data_hash'], hasher.hexdigest())
+        self.assertEqual(result['bytes_transferred'], size)
+
+    def test_upload_iterator_is_spooled_without_chunked_encoding(self):
+        sent = []
+
+        def send_data(*args, **kwargs):
+            data = kwargs['data']
+            sent.append((kwargs['headers'], b('').join(iter(data))))
+            return Mock()
+
+        self.driver2.connection = Mock()
+        self.driver2.connection.request.side_effect = send_data
+
+        iterator = iter([b('a') * 10, b('b') * 20])
+        result = self.driver2._upload_object(object_name='test1',
+                                             content_type=None,
+                                             request_path='/',
+                                             stream=iterator)
+
+        hasher = hashlib.md5()
+        hasher.update(b('a') * 10 + b('b') * 20)
+
+        self.assertEqual(sent[0][0]['Content-Length'], '30')
+        self.assertEqual(sent[0][1], b('a') * 10 + b('b') * 20)
+        self.assertEqual(result['data_hash'], hasher.hexdigest())
+        self.assertEqual(result['bytes_transferred'], 30)
+
+        # Iterators are streamed if the provider supports chunked encoding
+        self.driver1.connection = Mock()
+        self.driver1.connection.request.side_effect = send_data
+
+        self.driver1._upload_object(object_name='test1', content_type=None,
+                                    request_path='/',
+                                    stream=iter([b('a') * 10]))
+        self.assertFalse('Content-Length' in sent[1][0])
+
+    def test_ex_delete_objects(self):
+        container = Container(name='container', extra={}, driver=self.driver1)
+        obj = Object(name='object', size=1, hash=None, extra={},
+                     meta_data={}, container=container, driver=self.driver1)
+
+        def delete_object(obj):
+            if obj.name == 'missing':
+                raise ObjectDoesNotExistError(value=None, driver=None,
+                                              object_name=obj.name)
+
+            return obj.name != 'failed'
+
+        with mock.patch.object(StorageDriver, 'delete_object',
+                               side_effect=delete_object) as mock_delete:
+            result = self.driver1.ex_delete_objects(
+                container, iter([obj, 'name', 'missing', 'failed']),
+                max_concurrency=2)
+
+        self.assertEqual(mock_delete.call_count, 4)
+        self.assertEqual(sorted(result.keys()),
+                         ['failed', 'missing', 'name', 'object'])
+        self.assertTrue(result['object'] is True)
+        self.assertTrue(result['name'] is True)
+        self.assertTrue(isinstance(result['missing'],
+                                   ObjectDoesNotExistError))
+        self.assertTrue(isinstance(result['failed'], LibcloudError))
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
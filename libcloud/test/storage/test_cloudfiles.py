@@ -317,6 +317,24 @@ class CloudFilesTests(unittest.TestCase):
                                              delete_on_failure=True)
         self.assertTrue(result)
 
+    def test_download_object_ranged(self):
+        CloudFilesMockHttp.type = 'RANGED'
+        container = Container(name='foo_bar_container', extra={}, driver=self)
+        obj = Object(name='foo_bar_object', size=1000, hash=None, extra={},
+                     container=container, meta_data=None,
+                     driver=CloudFilesStorageDriver)
+        destination_path = os.path.abspath(__file__) + '.temp'
+        result = self.driver.download_object(obj=obj,
+                                             destination_path=destination_path,
+                                             overwrite_existing=True,
+                                             delete_on_failure=True,
+                                             ex_max_concurrency=2,
+                                             ex_range_size=300)
+        self.assertTrue(result)
+
+        with open(destination_path, 'rb') as fp:
+            self.assertEqual(fp.read(), b('0123456789' * 100))
+
     def test_download_object_invalid_file_size(self):
         CloudFilesMockHttp.type = 'INVALID_SIZE'
         container = Container(name='foo_bar_container', extra={}, driver=self)
@@ -1156,6 +1174,15 @@ class CloudFilesMockHttp(MockHttp, unittest.TestCase):
         return (httplib.CREATED, body, headers,
                 httplib.responses[httplib.OK])
 
+    def _v1_MossoCloudFS_foo_bar_container_foo_bar_object_RANGED(
+            self, method, url, body, headers):
+        # test_download_object_ranged
+        start, end = headers['Range'].replace('bytes=', '').split('-')
+        body = ('0123456789' * 100)[int(start):int(end) + 1]
+        return (httplib.PARTIAL_CONTENT, body,
+                self.base_headers,
+                httplib.responses[httplib.PARTIAL_CONTENT])
+
     def _v1_MossoCloudFS_foo_bar_container_foo_bar_object_INVALID_SIZE(
             self, method, url, body, headers):
         # test_download_object_invalid_file_size
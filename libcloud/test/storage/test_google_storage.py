@@ -64,6 +64,7 @@ def _error_helper(code, headers):
 
 class GoogleStorageMockHttp(S3MockHttp):
     fixtures = StorageFileFixtures('google_storage')
+    namespace = google_storage.NAMESPACE
 
     def _test2_test_get_object(self, method, url, body, headers):
         # test_get_object
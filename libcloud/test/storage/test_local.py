@@ -18,6 +18,7 @@ from __future__ import with_statement
 import os
 import sys
 import shutil
+import threading
 import unittest
 import tempfile
 
@@ -33,6 +34,8 @@ from libcloud.storage.types import InvalidContainerNameError
 try:
     from libcloud.storage.drivers.local import LocalStorageDriver
     from libcloud.storage.drivers.local import LockLocalStorage
+    from libcloud.storage.drivers.local import scandir
+    from libcloud.storage.drivers.local import COPY_MODES, TEMP_FILE_PREFIX
     from lockfile import LockTimeout
 except ImportError:
     print('lockfile library is not available, skipping local_storage tests...')
@@ -127,6 +130,77 @@ class LocalTests(unittest.TestCase):
         container.delete()
         self.remove_tmp_file(tmppath)
 
+    def test_iterate_container_objects_sorted_and_prefix(self):
+        tmppath = self.make_tmp_file()
+        self.addCleanup(self.remove_tmp_file, tmppath)
+
+        container = self.driver.create_container('test3')
+        names = ['b', 'a/b', 'a-c', 'a/b/c', 'a/bc', 'ab/d', 'c/d/e']
+
+        for name in names:
+            if name != 'a/b':
+                container.upload_object(tmppath, name)
+
+        objects = self.driver.iterate_container_objects(container)
+        self.assertEqual([obj.name for obj in objects],
+                         ['a-c', 'a/b/c', 'a/bc', 'ab/d', 'b', 'c/d/e'])
+
+        objects = self.driver.list_container_objects(container,
+                                                     ex_prefix='a/b')
+        self.assertEqual([obj.name for obj in objects], ['a/b/c', 'a/bc'])
+        self.assertEqual(objects[0].size, 4096)
+        self.assertEqual(objects[0].hash,
+                         self.driver.get_object('test3', 'a/b/c').hash)
+
+        if scandir is None:
+            return
+
+        # Directories which can't contain matching objects are not listed
+        with mock.patch('libcloud.storage.drivers.local.scandir',
+                        wraps=scandir) as mock_scandir:
+            objects = list(self.driver.iterate_container_objects(
+                container, ex_prefix='c/'))
+
+        self.assertEqual([obj.name for obj in objects], ['c/d/e'])
+        self.assertEqual(mock_scandir.call_count, 3)
+
+    def test_iterate_container_objects_without_scandir(self):
+        tmppath = self.make_tmp_file()
+        self.addCleanup(self.remove_tmp_file, tmppath)
+
+        container = self.driver.create_container('test3')
+
+        for name in ['b', 'a-c', 'a/b/c', 'a/bc', 'ab/d', 'c/d/e']:
+            container.upload_object(tmppath, name)
+
+        expected = [obj.name for obj in
+                    self.driver.iterate_container_objects(container)]
+
+        with mock.patch('libcloud.storage.drivers.local.scandir', None):
+            objects = self.driver.list_container_objects(container)
+
+            self.assertEqual([obj.name for obj in objects], expected)
+            self.assertEqual(objects[2].size, 4096)
+
+            objects = self.driver.list_container_objects(container,
+                                                         ex_prefix='a/b')
+            self.assertEqual([obj.name for obj in objects],
+                             ['a/b/c', 'a/bc'])
+
+    @unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks not supported')
+    def test_iterate_container_objects_skips_broken_symlinks(self):
+        container = self.driver.create_container('test3')
+        container.upload_object_via_stream(iter([b'data']), 'a')
+        container.upload_object_via_stream(iter([b'data']), 'c')
+        os.symlink(os.path.join(self.key, 'missing'),
+                   os.path.join(self.key, 'test3', 'b'))
+
+        for scan in (scandir, None):
+            with mock.patch('libcloud.storage.drivers.local.scandir', scan):
+                objects = self.driver.list_container_objects(container)
+
+            self.assertEqual([obj.name for obj in objects], ['a', 'c'])
+
     def test_get_container_doesnt_exist(self):
         try:
             self.driver.get_container(container_name='container1')
@@ -293,6 +367,125 @@ class LocalTests(unittest.TestCase):
         self.remove_tmp_file(tmppath)
         os.unlink(destination_path)
 
+    def test_upload_object_replaces_object_atomically(self):
+        tmppath = self.make_tmp_file()
+        self.addCleanup(self.remove_tmp_file, tmppath)
+        container = self.driver.create_container('test7')
+        container_path = os.path.join(self.key, 'test7')
+
+        container.upload_object_via_stream(iter([b'old']), 'dir/object')
+
+        def failing_iterator():
+            yield b'new'
+            raise IOError('read failed')
+
+        self.assertRaises(IOError, container.upload_object_via_stream,
+                          failing_iterator(), 'dir/object')
+
+        # The previous version is intact and no temporary files are left
+        obj = self.driver.get_object('test7', 'dir/object')
+        self.assertEqual(b''.join(obj.as_stream()), b'old')
+        self.assertEqual(os.listdir(os.path.join(container_path, 'dir')),
+                         ['object'])
+
+        obj = container.upload_object(tmppath, 'dir/object')
+        self.assertEqual(obj.size, 4096)
+        self.assertEqual(os.stat(os.path.join(container_path, 'dir',
+                                              'object')).st_mode & 0o777,
+                         0o664)
+
+    def test_temporary_files_are_not_listed(self):
+        container = self.driver.create_container('test7')
+        container.upload_object_via_stream(iter([b'data']), 'object')
+        open(os.path.join(self.key, 'test7', TEMP_FILE_PREFIX + 'x'),
+             'w').close()
+
+        self.assertEqual([obj.name for obj in container.list_objects()],
+                         ['object'])
+
+    def test_upload_object_copy_modes(self):
+        tmppath = self.make_tmp_file()
+        self.addCleanup(self.remove_tmp_file, tmppath)
+        container = self.driver.create_container('test7')
+
+        for mode in COPY_MODES:
+            obj = self.driver.upload_object(tmppath, container, mode,
+                                            ex_copy_mode=mode)
+            self.assertEqual(b''.join(obj.as_stream()), b'blah' * 1024)
+
+        linked_path = os.path.join(self.key, 'test7', 'hardlink')
+        self.assertEqual(os.stat(linked_path).st_ino, os.stat(tmppath).st_ino)
+
+        self.assertRaises(ValueError, self.driver.upload_object, tmppath,
+                          container, 'object', ex_copy_mode='invalid')
+
+    def test_download_object_uses_umask(self):
+        container = self.driver.create_container('test7')
+        obj = container.upload_object_via_stream(iter([b'data']), 'object')
+
+        destination_path = os.path.join(self.key, 'downloaded')
+        umask = os.umask(0o027)
+
+        try:
+            self.assertTrue(self.driver.download_object(obj,
+                                                        destination_path))
+        finally:
+            os.umask(umask)
+
+        # Only the objects in the container get the fixed permissions
+        self.assertEqual(os.stat(destination_path).st_mode & 0o777, 0o640)
+        self.assertEqual(os.stat(os.path.join(self.key, 'test7',
+                                              'object')).st_mode & 0o777,
+                         0o664)
+
+    def test_download_object_copy_fallback(self):
+        tmppath = self.make_tmp_file()
+        self.addCleanup(self.remove_tmp_file, tmppath)
+        container = self.driver.create_container('test7')
+        obj = container.upload_object(tmppath, 'object')
+
+        destination_path = tmppath + '.temp'
+        self.addCleanup(os.unlink, destination_path)
+
+        with mock.patch('libcloud.storage.drivers.local._copy_file_range',
+                        return_value=False), \
+                mock.patch('libcloud.storage.drivers.local._sendfile',
+                           return_value=False):
+            result = self.driver.download_object(obj, destination_path)
+
+        self.assertTrue(result)
+
+        with open(destination_path, 'rb') as fp:
+            self.assertEqual(fp.read(), b'blah' * 1024)
+
+    def test_concurrent_uploads_of_same_object(self):
+        container = self.driver.create_container('test7')
+        errors = []
+
+        def upload(index):
+            try:
+                for _ in range(20):
+                    container.upload_object_via_stream(
+                        iter([b'%d' % (index)] * 100), 'object')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=upload, args=(index,))
+                   for index in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+        data = b''.join(self.driver.get_object('test7',
+                                               'object').as_stream())
+        self.assertEqual(len(data), 100)
+        self.assertEqual(len(set(data)), 1)
+
     def test_download_object_as_stream_success(self):
         tmppath = self.make_tmp_file()
         container = self.driver.create_container('test6')
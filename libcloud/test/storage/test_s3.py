@@ -19,7 +19,7 @@ import os
 import sys
 
 from io import BytesIO
-from hashlib import sha1
+from hashlib import md5, sha1
 
 import mock
 from mock import Mock
@@ -49,17 +49,25 @@ from libcloud.storage.drivers.s3 import S3APSEStorageDriver
 from libcloud.storage.drivers.s3 import S3APNEStorageDriver
 from libcloud.storage.drivers.s3 import CHUNK_SIZE
 from libcloud.utils.py3 import b
+from libcloud.utils.retry import RetryPolicy
 
 from libcloud.test import MockHttp  # pylint: disable-msg=E0611
 from libcloud.test import unittest, make_response, generate_random_data
 from libcloud.test.file_fixtures import StorageFileFixtures  # pylint: disable-msg=E0611
 from libcloud.test.secrets import STORAGE_S3_PARAMS
 
+RANGED_OBJECT_DATA = '0123456789' * 100
+
+LISTING_KEYS = ['a.txt', 'dir1/a', 'dir1/b', 'dir1/sub/c', 'dir2/a',
+                'dir2/sub/b', 'dir2/sub/c', 'e', 'z/y']
+
 
 class S3MockHttp(MockHttp):
 
     fixtures = StorageFileFixtures('s3')
     base_headers = {}
+    namespace = S3StorageDriver.namespace
+    list_requests = []
 
     def _UNAUTHORIZED(self, method, url, body, headers):
         return (httplib.UNAUTHORIZED,
@@ -123,6 +131,69 @@ class S3MockHttp(MockHttp):
                 self.base_headers,
                 httplib.responses[httplib.OK])
 
+    def _listing_container(self, method, url, body, headers):
+        # Emulates ListObjects (v1) and ListObjectsV2 for LISTING_KEYS
+        query = dict((key, value[0]) for key, value in
+                     parse_qs(urlparse.urlparse(url).query).items())
+        self.list_requests.append(query)
+
+        list_v2 = query.get('list-type') == '2'
+        prefix = query.get('prefix', '')
+        delimiter = query.get('delimiter', None)
+        max_keys = int(query.get('max-keys', 2))
+
+        if 'continuation-token' in query:
+            after = query['continuation-token'].replace('token-', '')
+        else:
+            after = query.get('start-after' if list_v2 else 'marker', '')
+
+        entries = []
+
+        for key in LISTING_KEYS:
+            if not key.startswith(prefix) or key <= after:
+                continue
+
+            rest = key[len(prefix):]
+
+            if delimiter and delimiter in rest:
+                common_prefix = prefix + rest.split(delimiter)[0] + delimiter
+
+                # Marker which points to a common prefix skips all the keys
+                # which start with it
+                if common_prefix == after or \
+                        ('prefix', common_prefix) in entries:
+                    continue
+
+                entries.append(('prefix', common_prefix))
+            else:
+                entries.append(('key', key))
+
+        is_truncated = len(entries) > max_keys
+        entries = entries[:max_keys]
+
+        body = '<ListBucketResult xmlns="%s">' % (self.namespace)
+        body += '<IsTruncated>%s</IsTruncated>' % (str(is_truncated).lower())
+
+        for kind, name in entries:
+            if kind == 'key':
+                body += ('<Contents><Key>%s</Key><ETag>"etag"</ETag>'
+                         '<Size>1</Size></Contents>' % (name))
+            else:
+                body += ('<CommonPrefixes><Prefix>%s</Prefix>'
+                         '</CommonPrefixes>' % (name))
+
+        if is_truncated and list_v2:
+            body += ('<NextContinuationToken>token-%s'
+                     '</NextContinuationToken>' % (entries[-1][1]))
+        elif is_truncated and delimiter:
+            body += '<NextMarker>%s</NextMarker>' % (entries[-1][1])
+
+        body += '</ListBucketResult>'
+        return (httplib.OK,
+                body,
+                self.base_headers,
+                httplib.responses[httplib.OK])
+
     def _test2_get_object(self, method, url, body, headers):
         body = self.fixtures.load('list_container_objects.xml')
         return (httplib.OK,
@@ -275,6 +346,33 @@ class S3MockHttp(MockHttp):
                     headers,
                     httplib.responses[httplib.OK])
 
+    def _foo_bar_container_MULTI_DELETE(self, method, url, body, headers):
+        # test_ex_delete_objects
+        assert method == 'POST'
+        assert 'delete' in parse_qs(urlparse.urlsplit(url).query,
+                                    keep_blank_values=True)
+        assert headers['Content-MD5'] == base64.b64encode(
+            md5(b(body)).digest()).decode('utf-8')
+
+        body = b(body).decode('utf-8')
+        self.test.delete_requests.append(body)
+
+        if '<Key>invalid</Key>' in body:
+            return (httplib.BAD_REQUEST, '', headers,
+                    httplib.responses[httplib.BAD_REQUEST])
+        elif '<Key>unavailable</Key>' in body:
+            return (httplib.SERVICE_UNAVAILABLE, '', headers,
+                    httplib.responses[httplib.SERVICE_UNAVAILABLE])
+        elif '<Key>bar</Key>' in body:
+            body = self.fixtures.load('delete_objects_error.xml')
+        else:
+            body = self.fixtures.load('delete_objects.xml')
+
+        return (httplib.OK,
+                body,
+                headers,
+                httplib.responses[httplib.OK])
+
     def _foo_bar_container_LIST_MULTIPART(self, method, url, body, headers):
         query_string = urlparse.urlsplit(url).query
         query = parse_qs(query_string)
@@ -329,6 +427,34 @@ class S3MockHttp(MockHttp):
                 headers,
                 httplib.responses[httplib.OK])
 
+    def _foo_bar_container_foo_bar_object_RANGED(self, method, url, body,
+                                                 headers):
+        # test_download_object_ranged
+        start, end = headers['Range'].replace('bytes=', '').split('-')
+        body = RANGED_OBJECT_DATA[int(start):int(end) + 1]
+
+        if headers.get('If-Match', '"etag"') != '"etag"':
+            return (httplib.PRECONDITION_FAILED, '', {},
+                    httplib.responses[httplib.PRECONDITION_FAILED])
+
+        return (httplib.PARTIAL_CONTENT,
+                body,
+                {'etag': '"etag"'},
+                httplib.responses[httplib.PARTIAL_CONTENT])
+
+    def _foo_bar_container_foo_bar_object_RANGED_CHANGED(self, method, url,
+                                                         body, headers):
+        # test_download_object_ranged_object_changed
+        start, end = headers['Range'].replace('bytes=', '').split('-')
+        body = RANGED_OBJECT_DATA[int(start):int(end) + 1]
+
+        # If-Match is ignored and the later ranges are of a new version
+        etag = '"etag"' if start == '0' else '"new-etag"'
+        return (httplib.PARTIAL_CONTENT,
+                body,
+                {'etag': etag},
+                httplib.responses[httplib.PARTIAL_CONTENT])
+
     def _foo_bar_container_foo_bar_object_NO_BUFFER(self, method, url, body, headers):
         # test_download_object_data_is_not_buffered_in_memory
         body = generate_random_data(1000)
@@ -367,6 +493,23 @@ class S3MockHttp(MockHttp):
                 headers,
                 httplib.responses[httplib.OK])
 
+    def _foo_bar_container_foo_test_upload_RETRY(self, method, url, body,
+                                                 headers):
+        # test_upload_object_retry_verifies_hash
+        self._retry_attempts = getattr(self, '_retry_attempts', 0) + 1
+
+        if self._retry_attempts == 1:
+            return (httplib.SERVICE_UNAVAILABLE,
+                    '',
+                    {},
+                    httplib.responses[httplib.SERVICE_UNAVAILABLE])
+
+        headers = {'etag': '"%s"' % (md5(b('0123456789')).hexdigest())}
+        return (httplib.OK,
+                '',
+                headers,
+                httplib.responses[httplib.OK])
+
     def _foo_bar_container_foo_bar_object_INVALID_SIZE(self, method, url,
                                                        body, headers):
         # test_upload_object_invalid_file_size
@@ -509,6 +652,87 @@ class S3Tests(unittest.TestCase):
         self.assertEqual(obj.container.name, 'test_container')
         self.assertTrue('owner' in obj.meta_data)
 
+    def test_list_container_objects_paginated(self):
+        container = Container(name='listing_container', extra={},
+                              driver=self.driver)
+        self.mock_response_klass.list_requests = []
+
+        objects = self.driver.list_container_objects(container=container)
+        self.assertEqual([obj.name for obj in objects], LISTING_KEYS)
+        self.assertEqual(len(self.mock_response_klass.list_requests), 5)
+
+        list_type = self.mock_response_klass.list_requests[0].get(
+            'list-type', None)
+        self.assertEqual(list_type,
+                         '2' if self.driver.supports_s3_list_objects_v2
+                         else None)
+
+        objects = self.driver.list_container_objects(
+            container=container, ex_prefix='dir', ex_delimiter='/',
+            ex_max_keys=10)
+        self.assertEqual(objects, [])
+
+        objects = self.driver.list_container_objects(
+            container=container, ex_delimiter='/', ex_start_after='dir2/a')
+        self.assertEqual([obj.name for obj in objects], ['e'])
+
+        objects = self.driver.list_container_objects(
+            container=container, ex_prefix='dir2/', ex_start_after='dir2/a')
+        self.assertEqual([obj.name for obj in objects],
+                         ['dir2/sub/b', 'dir2/sub/c'])
+
+    def test_ex_iterate_common_prefixes(self):
+        container = Container(name='listing_container', extra={},
+                              driver=self.driver)
+
+        prefixes = list(self.driver.ex_iterate_common_prefixes(container))
+        self.assertEqual(prefixes, ['dir1/', 'dir2/', 'z/'])
+
+        prefixes = list(self.driver.ex_iterate_common_prefixes(
+            container, prefix='dir2/'))
+        self.assertEqual(prefixes, ['dir2/sub/'])
+
+    def test_list_container_objects_concurrently(self):
+        container = Container(name='listing_container', extra={},
+                              driver=self.driver)
+
+        for depth in (1, 2, 3):
+            objects = self.driver.list_container_objects(
+                container=container, ex_max_concurrency=3,
+                ex_parallel_depth=depth)
+            self.assertEqual([obj.name for obj in objects], LISTING_KEYS)
+            self.assertTrue(all(obj.driver is self.driver
+                                for obj in objects))
+
+        objects = self.driver.list_container_objects(
+            container=container, ex_prefix='dir', ex_start_after='dir1/b',
+            ex_max_concurrency=3)
+        self.assertEqual([obj.name for obj in objects],
+                         ['dir1/sub/c', 'dir2/a', 'dir2/sub/b',
+                          'dir2/sub/c'])
+
+        self.assertRaises(ValueError, self.driver.list_container_objects,
+                          container=container, ex_delimiter='/',
+                          ex_max_concurrency=3)
+
+    def test_list_container_objects_concurrently_streams_pages(self):
+        container = Container(name='listing_container', extra={},
+                              driver=self.driver)
+        copy_driver = self.driver._copy_driver
+
+        with mock.patch.object(self.driver, '_copy_driver',
+                               side_effect=copy_driver) as mock_copy_driver:
+            objects = self.driver.list_container_objects(
+                container=container, ex_max_keys=1, ex_max_concurrency=2,
+                ex_parallel_depth=2)
+
+        self.assertEqual([obj.name for obj in objects], LISTING_KEYS)
+        self.assertTrue(all(obj.driver is self.driver for obj in objects))
+
+        # The driver copies are reused by the prefixes, at most one is made
+        # per worker of the discovery and of the listing
+        self.assertTrue(mock_copy_driver.call_count <= 4)
+
     def test_get_container_doesnt_exist(self):
         self.mock_response_klass.type = 'get_container'
         try:
@@ -665,6 +889,83 @@ class S3Tests(unittest.TestCase):
                                              delete_on_failure=True)
         self.assertTrue(result)
 
+    def test_download_object_ranged(self):
+        self.mock_response_klass.type = 'RANGED'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo_bar_object', size=1000, hash=None, extra={},
+                     container=container, meta_data=None,
+                     driver=self.driver_type)
+        destination_path = self._file_path
+        result = self.driver.download_object(obj=obj,
+                                             destination_path=destination_path,
+                                             overwrite_existing=True,
+                                             delete_on_failure=True,
+                                             ex_max_concurrency=3,
+                                             ex_range_size=128)
+        self.assertTrue(result)
+
+        with open(destination_path, 'rb') as fp:
+            self.assertEqual(fp.read(), b(RANGED_OBJECT_DATA))
+
+    def test_download_object_ranged_if_match(self):
+        self.mock_response_klass.type = 'RANGED'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        destination_path = self._file_path
+
+        obj = Object(name='foo_bar_object', size=1000, hash='etag', extra={},
+                     container=container, meta_data=None,
+                     driver=self.driver_type)
+        result = self.driver.download_object(obj=obj,
+                                             destination_path=destination_path,
+                                             overwrite_existing=True,
+                                             ex_max_concurrency=3,
+                                             ex_range_size=128)
+        self.assertTrue(result)
+
+        # The object was replaced since it was listed
+        obj.hash = 'stale-etag'
+        self.assertRaises(ObjectHashMismatchError,
+                          self.driver.download_object, obj=obj,
+                          destination_path=destination_path,
+                          overwrite_existing=True, delete_on_failure=True,
+                          ex_max_concurrency=3, ex_range_size=128)
+        self.assertFalse(os.path.exists(destination_path))
+
+    def test_download_object_ranged_object_changed(self):
+        self.mock_response_klass.type = 'RANGED_CHANGED'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo_bar_object', size=1000, hash='etag', extra={},
+                     container=container, meta_data=None,
+                     driver=self.driver_type)
+        destination_path = self._file_path
+
+        self.assertRaises(ObjectHashMismatchError,
+                          self.driver.download_object, obj=obj,
+                          destination_path=destination_path,
+                          overwrite_existing=True, delete_on_failure=True,
+                          ex_max_concurrency=3, ex_range_size=128)
+        self.assertFalse(os.path.exists(destination_path))
+
+    def test_download_object_ranged_invalid_file_size(self):
+        self.mock_response_klass.type = 'RANGED'
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo_bar_object', size=1100, hash=None, extra={},
+                     container=container, meta_data=None,
+                     driver=self.driver_type)
+        destination_path = self._file_path
+        result = self.driver.download_object(obj=obj,
+                                             destination_path=destination_path,
+                                             overwrite_existing=True,
+                                             delete_on_failure=True,
+                                             ex_max_concurrency=3,
+                                             ex_range_size=128)
+        self.assertFalse(result)
+        self.assertFalse(os.path.exists(destination_path))
+
     def test_download_object_invalid_file_size(self):
         self.mock_response_klass.type = 'INVALID_SIZE'
         container = Container(name='foo_bar_container', extra={},
@@ -824,6 +1125,27 @@ class S3Tests(unittest.TestCase):
         self.assertTrue('some-value' in obj.meta_data)
         self.driver_type._upload_object = old_func
 
+    def test_upload_object_retry_verifies_hash(self):
+        self.mock_response_klass.type = 'RETRY'
+        self.driver.connection.retry_policy = RetryPolicy(max_attempts=3,
+                                                          base_delay=0)
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        with open(self._file_path, 'wb') as fp:
+            fp.write(b('0123456789'))
+
+        with mock.patch('libcloud.utils.retry.time.sleep'):
+            obj = self.driver.upload_object(file_path=self._file_path,
+                                            container=container,
+                                            object_name='foo_test_upload',
+                                            verify_hash=True)
+
+        self.assertEqual(obj.size, 10)
+        self.assertEqual(obj.hash, md5(b('0123456789')).hexdigest())
+        self.assertEqual(self.driver.connection.connection._retry_attempts,
+                         2)
+
     def test_upload_object_with_acl(self):
         def upload_file(self, object_name=None, content_type=None,
                         request_path=None, request_method=None,
@@ -956,6 +1278,115 @@ class S3Tests(unittest.TestCase):
 
         return
 
+    def test_upload_big_object_via_stream_concurrently(self):
+        if not self.driver.supports_s3_multipart_upload:
+            return
+
+        self.mock_response_klass.type = 'MULTIPART'
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        object_name = 'foo_test_stream_data'
+        iterator = BytesIO(b('234' * CHUNK_SIZE))
+        extra = {'content_type': 'text/plain'}
+
+        connections = []
+        clone_connection = self.driver._clone_connection
+
+        def clone():
+            connection = clone_connection()
+            connections.append(connection)
+            return connection
+
+        with mock.patch.object(self.driver, '_commit_multipart',
+                               wraps=self.driver._commit_multipart) as commit, \
+                mock.patch.object(self.driver, '_clone_connection',
+                                  side_effect=clone), \
+                mock.patch.object(self.driver, '_close_connection') as close:
+            obj = self.driver.upload_object_via_stream(
+                container=container, object_name=object_name,
+                iterator=iterator, extra=extra, ex_max_concurrency=3)
+
+        self.assertEqual(obj.name, object_name)
+        self.assertEqual(obj.size, CHUNK_SIZE * 3)
+
+        # The connections of the worker threads are closed
+        self.assertTrue(connections)
+        self.assertEqual(set(id(call[0][0]) for call in close.call_args_list),
+                         set(id(connection) for connection in connections))
+        self.assertEqual(close.call_count, len(connections))
+
+        # Parts must be committed in order regardless of completion order
+        chunks = commit.call_args[0][3]
+        self.assertEqual([part_number for part_number, _ in chunks],
+                         [1, 2, 3])
+
+    def test_upload_object_via_stream_invalid_part_size(self):
+        if not self.driver.supports_s3_multipart_upload:
+            return
+
+        self.mock_response_klass.type = 'MULTIPART'
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        iterator = BytesIO(b('234'))
+
+        self.assertRaises(ValueError, self.driver.upload_object_via_stream,
+                          container=container,
+                          object_name='foo_test_stream_data',
+                          iterator=iterator, ex_part_size=1024)
+
+    def test_upload_object_via_stream_concurrently_abort(self):
+        if not self.driver.supports_s3_multipart_upload:
+            return
+
+        self.mock_response_klass.type = 'MULTIPART'
+
+        def upload_part(request_path, upload_id, part_number, data,
+                        connection=None):
+            if part_number == 2:
+                raise LibcloudError('Error uploading chunk')
+
+            return (part_number, 'etag')
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        object_name = 'foo_test_stream_data'
+        iterator = BytesIO(b('234' * CHUNK_SIZE))
+
+        with mock.patch.object(self.driver, '_upload_multipart_part',
+                               side_effect=upload_part), \
+                mock.patch.object(self.driver, '_abort_multipart') as abort, \
+                mock.patch.object(self.driver, '_close_connection') as close:
+            self.assertRaises(LibcloudError,
+                              self.driver.upload_object_via_stream,
+                              container=container, object_name=object_name,
+                              iterator=iterator, ex_max_concurrency=2)
+
+        abort.assert_called_once_with(container, object_name, mock.ANY)
+
+        # The connections of the worker threads are closed on failure too
+        self.assertTrue(close.call_count > 0)
+
+    def test_upload_object_concurrently(self):
+        if not self.driver.supports_s3_multipart_upload:
+            return
+
+        self.mock_response_klass.type = 'MULTIPART'
+
+        with open(self._file_path, 'wb') as fp:
+            fp.write(b('1') * (CHUNK_SIZE + 10))
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = self.driver.upload_object(file_path=self._file_path,
+                                        container=container,
+                                        object_name='foo_test_stream_data',
+                                        ex_max_concurrency=2)
+
+        self.assertEqual(obj.name, 'foo_test_stream_data')
+        self.assertEqual(obj.size, CHUNK_SIZE + 10)
+
     def test_s3_list_multipart_uploads(self):
         if not self.driver.supports_s3_multipart_upload:
             return
@@ -985,6 +1416,60 @@ class S3Tests(unittest.TestCase):
 
         self.driver.ex_cleanup_all_multipart_uploads(container)
 
+    def test_ex_delete_objects(self):
+        if not self.driver.supports_s3_multi_object_delete:
+            return
+
+        self.mock_response_klass.type = 'MULTI_DELETE'
+        self.mock_response_klass.test = self
+        self.delete_requests = []
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        obj = Object(name='foo', size=1234, hash=None, extra=None,
+                     meta_data=None, container=container, driver=self.driver)
+
+        with mock.patch('libcloud.storage.drivers.s3.MULTI_DELETE_MAX_KEYS',
+                        2):
+            result = self.driver.ex_delete_objects(
+                container, iter([obj, 'bar', 'baz & <qux>']),
+                max_concurrency=1)
+
+        self.assertEqual(len(self.delete_requests), 2)
+        self.assertTrue('<Key>baz &amp; &lt;qux&gt;</Key>' in
+                        self.delete_requests[1])
+        self.assertTrue(result['foo'] is True)
+        self.assertTrue(result['baz & <qux>'] is True)
+        self.assertTrue(isinstance(result['bar'], LibcloudError))
+        self.assertTrue('AccessDenied' in str(result['bar']))
+
+    def test_ex_delete_objects_failed_batch(self):
+        if not self.driver.supports_s3_multi_object_delete:
+            return
+
+        self.mock_response_klass.type = 'MULTI_DELETE'
+        self.mock_response_klass.test = self
+        self.delete_requests = []
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+
+        with mock.patch('libcloud.storage.drivers.s3.MULTI_DELETE_MAX_KEYS',
+                        2):
+            result = self.driver.ex_delete_objects(
+                container, ['invalid', 'a', 'unavailable', 'b', 'foo'],
+                max_concurrency=1)
+
+        # The failed batches don't abort the following ones
+        self.assertEqual(len(self.delete_requests), 3)
+        self.assertTrue(result['foo'] is True)
+
+        for name in ['invalid', 'a', 'unavailable', 'b']:
+            self.assertTrue(isinstance(result[name], LibcloudError))
+
+        self.assertTrue('status_code=400' in str(result['a']))
+        self.assertTrue(result['unavailable'] is result['b'])
+
     def test_delete_object_not_found(self):
         self.mock_response_klass.type = 'NOT_FOUND'
         container = Container(name='foo_bar_container', extra={},
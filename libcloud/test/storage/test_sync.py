@@ -0,0 +1,265 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import shutil
+import tempfile
+
+import mock
+
+from libcloud.storage.base import Object
+from libcloud.storage.sync import ManifestEntry, SyncAction
+from libcloud.storage.sync import build_local_manifest, diff_manifests
+from libcloud.storage.sync import sync_to_container, sync_from_container
+from libcloud.storage.sync import _get_object_hash, _get_object_mtime
+from libcloud.test import unittest
+
+try:
+    from libcloud.storage.drivers.local import LocalStorageDriver
+except ImportError:
+    print('lockfile library is not available, skipping sync tests...')
+    LocalStorageDriver = None
+
+
+class ManifestTests(unittest.TestCase):
+    def test_diff_manifests(self):
+        source = {
+            'new': ManifestEntry('new', 1, mtime=10),
+            'size': ManifestEntry('size', 2, mtime=10),
+            'newer': ManifestEntry('newer', 1, mtime=21.5),
+            'same': ManifestEntry('same', 1, mtime=10.9),
+            'hash': ManifestEntry('hash', 1, mtime=10, hash='a')
+        }
+        destination = {
+            'size': ManifestEntry('size', 1, mtime=10),
+            'newer': ManifestEntry('newer', 1, mtime=20),
+            'same': ManifestEntry('same', 1, mtime=10),
+            'hash': ManifestEntry('hash', 1, mtime=10, hash='b'),
+            'removed': ManifestEntry('removed', 1, mtime=10)
+        }
+
+        self.assertEqual(diff_manifests(source, destination),
+                         [('new', 'new'), ('newer', 'changed'),
+                          ('size', 'changed')])
+        self.assertEqual(diff_manifests(source, destination, delete=True,
+                                        checksum=True),
+                         [('hash', 'changed'), ('new', 'new'),
+                          ('newer', 'changed'), ('size', 'changed'),
+                          ('removed', 'removed')])
+
+    def test_object_hash_and_mtime(self):
+        def make_object(hash, extra):
+            return Object(name='name', size=1, hash=hash, extra=extra,
+                          meta_data={}, container=None, driver=None)
+
+        obj = make_object('"D41D8CD98F00B204E9800998ECF8427E"',
+                          {'last_modified': '2011-04-09T19:05:18.000Z'})
+        self.assertEqual(_get_object_hash(obj),
+                         'd41d8cd98f00b204e9800998ecf8427e')
+        self.assertEqual(_get_object_mtime(obj), 1302375918)
+
+        obj = make_object('d41d8cd98f00b204e9800998ecf8427e-2',
+                          {'last_modified': 'Sat, 09 Apr 2011 19:05:18 GMT'})
+        self.assertEqual(_get_object_hash(obj), None)
+        self.assertEqual(_get_object_mtime(obj), 1302375918)
+
+        obj = make_object(None, {'modify_time': 1302375918.5})
+        self.assertEqual(_get_object_mtime(obj), 1302375918.5)
+
+
+class LocalSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.key = tempfile.mkdtemp()
+        self.path = tempfile.mkdtemp()
+        self.driver = LocalStorageDriver(self.key, None)
+        self.container = self.driver.create_container('container')
+
+        self.write_file('a.txt', 'a')
+        self.write_file('dir/b.txt', 'bb')
+        self.write_file('dir/sub/c.txt', 'ccc')
+
+    def tearDown(self):
+        shutil.rmtree(self.key)
+        shutil.rmtree(self.path)
+
+    def write_file(self, name, data, path=None):
+        file_path = os.path.join(path or self.path, *name.split('/'))
+
+        if not os.path.exists(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+
+        with open(file_path, 'w') as fp:
+            fp.write(data)
+
+        return file_path
+
+    def get_object_names(self):
+        return sorted(obj.name for obj in
+                      self.driver.iterate_container_objects(self.container))
+
+    def test_build_local_manifest(self):
+        manifest = build_local_manifest(self.path)
+
+        self.assertEqual(sorted(manifest.keys()),
+                         ['a.txt', 'dir/b.txt', 'dir/sub/c.txt'])
+        self.assertEqual(manifest['dir/sub/c.txt'].size, 3)
+        self.assertEqual(manifest['a.txt'].get_hash(),
+                         '0cc175b9c0f1b6a831c399e269772661')
+
+    def test_sync_to_container(self):
+        calls = []
+
+        def progress(action, result):
+            calls.append((action.action, action.name))
+
+        result = sync_to_container(self.driver, self.path, self.container,
+                                   prefix='builds/', progress=progress)
+
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.completed), 3)
+        self.assertEqual(result.bytes_transferred, 6)
+        self.assertEqual(sorted(calls),
+                         [('upload', 'a.txt'), ('upload', 'dir/b.txt'),
+                          ('upload', 'dir/sub/c.txt')])
+        self.assertEqual(self.get_object_names(),
+                         ['builds/a.txt', 'builds/dir/b.txt',
+                          'builds/dir/sub/c.txt'])
+
+        # Nothing changed
+        result = sync_to_container(self.driver, self.path, self.container,
+                                   prefix='builds/')
+        self.assertEqual(result.actions, [])
+
+        self.write_file('dir/b.txt', 'changed')
+        os.remove(os.path.join(self.path, 'a.txt'))
+
+        result = sync_to_container(self.driver, self.path, self.container,
+                                   prefix='builds/', delete=True,
+                                   dry_run=True)
+        self.assertEqual([(action.action, action.name, action.reason)
+                          for action in result.actions],
+                         [(SyncAction.UPLOAD, 'dir/b.txt', 'changed'),
+                          (SyncAction.DELETE, 'a.txt', 'removed')])
+        self.assertEqual(result.completed, [])
+        self.assertEqual(len(self.get_object_names()), 3)
+
+        result = sync_to_container(self.driver, self.path, self.container,
+                                   prefix='builds/', delete=True,
+                                   max_concurrency=1)
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.completed), 2)
+        self.assertEqual(self.get_object_names(),
+                         ['builds/dir/b.txt', 'builds/dir/sub/c.txt'])
+
+        obj = self.driver.get_object('container', 'builds/dir/b.txt')
+        self.assertEqual(obj.size, len('changed'))
+
+    def test_sync_from_container(self):
+        sync_to_container(self.driver, self.path, self.container)
+        destination = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, destination)
+        self.write_file('extra.txt', 'extra', path=destination)
+
+        result = sync_from_container(self.driver, self.container,
+                                     destination, delete=True)
+
+        self.assertTrue(result.success)
+        self.assertEqual(sorted(build_local_manifest(destination).keys()),
+                         ['a.txt', 'dir/b.txt', 'dir/sub/c.txt'])
+
+        with open(os.path.join(destination, 'dir', 'sub', 'c.txt')) as fp:
+            self.assertEqual(fp.read(), 'ccc')
+
+        # Modification times are copied from the objects
+        result = sync_from_container(self.driver, self.container,
+                                     destination)
+        self.assertEqual(result.actions, [])
+
+    def test_sync_from_container_prefix(self):
+        sync_to_container(self.driver, self.path, self.container,
+                          prefix='builds/')
+        self.write_file('other.txt', 'other')
+        sync_to_container(self.driver, self.path, self.container)
+        destination = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, destination)
+
+        iterate_container_objects = self.driver.iterate_container_objects
+        prefixes = []
+
+        def iterate(container, ex_prefix=None):
+            prefixes.append(ex_prefix)
+            return iterate_container_objects(container, ex_prefix=ex_prefix)
+
+        with mock.patch.object(self.driver, 'iterate_container_objects',
+                               iterate):
+            result = sync_from_container(self.driver, self.container,
+                                         destination, prefix='builds/')
+
+        # The prefix is passed to the drivers which support it
+        self.assertEqual(prefixes, ['builds/'])
+        self.assertTrue(result.success)
+        self.assertEqual(sorted(build_local_manifest(destination).keys()),
+                         ['a.txt', 'dir/b.txt', 'dir/sub/c.txt'])
+
+    def test_sync_from_container_rejects_unsafe_names(self):
+        destination = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, destination)
+        objects = [Object(name=name, size=1, hash=None, extra={},
+                          meta_data={}, container=self.container,
+                          driver=self.driver)
+                   for name in ('../evil.txt', 'dir/../../evil.txt',
+                                '/tmp/evil.txt')]
+
+        with mock.patch.object(self.driver, 'iterate_container_objects',
+                               return_value=objects):
+            with mock.patch.object(self.driver, 'download_object') as m:
+                result = sync_from_container(self.driver, self.container,
+                                             destination)
+
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.errors), 3)
+        self.assertTrue(all(isinstance(error, ValueError)
+                            for _, error in result.errors))
+        self.assertEqual(m.call_count, 0)
+        self.assertEqual(os.listdir(destination), [])
+
+    def test_errors_are_recorded(self):
+        upload_object = LocalStorageDriver.upload_object
+
+        def upload(driver, file_path, container, object_name, **kwargs):
+            if object_name == 'a.txt':
+                raise IOError('upload failed')
+
+            return upload_object(driver, file_path, container, object_name,
+                                 **kwargs)
+
+        with mock.patch.object(LocalStorageDriver, 'upload_object', upload):
+            result = sync_to_container(self.driver, self.path,
+                                       self.container)
+
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.completed), 2)
+        self.assertEqual(result.errors[0][0].name, 'a.txt')
+        self.assertTrue(isinstance(result.errors[0][1], IOError))
+
+
+if not LocalStorageDriver:
+    class LocalSyncTests(unittest.TestCase):  # NOQA
+        pass
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
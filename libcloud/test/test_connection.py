@@ -18,17 +18,28 @@ import os
 import socket
 import sys
 import ssl
+import threading
+import warnings
 
 from mock import Mock, patch
 
 import requests_mock
 
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
 from libcloud.test import unittest
-from libcloud.common.base import Connection, CertificateConnection
+from libcloud.common.base import BaseDriver, Connection, CertificateConnection
 from libcloud.http import LibcloudBaseConnection
 from libcloud.http import LibcloudConnection
 from libcloud.http import SignedHTTPSAdapter
+from libcloud.http import SESSION_REGISTRY
 from libcloud.utils.misc import retry
+from libcloud.common.exceptions import RateLimitReachedError
 
 
 class BaseConnectionClassTestCase(unittest.TestCase):
@@ -380,6 +391,24 @@ class ConnectionClassTestCase(unittest.TestCase):
             self.assertGreater(mock_connect.call_count, 1,
                                'Retry logic failed')
 
+    def test_retry_is_deprecated(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            retry(timeout=1)
+
+        self.assertEqual([warning.category for warning in caught],
+                         [DeprecationWarning])
+
+    def test_retry_rate_limit_reached(self):
+        func = Mock(__name__='func',
+                    side_effect=[RateLimitReachedError(retry_after=0),
+                                 'ok'])
+
+        with patch('libcloud.utils.misc.time.sleep') as sleep:
+            self.assertEqual(retry(timeout=1)(func)(), 'ok')
+
+        sleep.assert_called_once_with(0)
+
 
 class CertificateConnectionClassTestCase(unittest.TestCase):
     def setUp(self):
@@ -392,5 +421,139 @@ class CertificateConnectionClassTestCase(unittest.TestCase):
         self.assertTrue(isinstance(adapter, SignedHTTPSAdapter))
         self.assertEqual(adapter.cert_file, 'test.pem')
 
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class OKRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.orig_proxy = os.environ.pop('http_proxy', None)
+
+    def tearDown(self):
+        SESSION_REGISTRY.clear()
+
+        if self.orig_proxy:
+            os.environ['http_proxy'] = self.orig_proxy
+
+    def test_pool_settings(self):
+        conn = LibcloudConnection(host='localhost', port=443,
+                                  pool_connections=3, pool_maxsize=20,
+                                  pool_block=True)
+
+        for prefix in ('http://', 'https://'):
+            adapter = conn.session.adapters[prefix]
+            self.assertEqual(adapter._pool_connections, 3)
+            self.assertEqual(adapter._pool_maxsize, 20)
+            self.assertTrue(adapter._pool_block)
+
+    def test_pool_settings_from_driver(self):
+        driver = BaseDriver('key', pool_maxsize=20, pool_block=True)
+
+        self.assertEqual(driver.connection.pool_maxsize, 20)
+        adapter = driver.connection.connection.session.adapters['https://']
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertTrue(adapter._pool_block)
+
+    def test_signing_adapter_uses_pool_settings(self):
+        conn = CertificateConnection(cert_file='test.pem',
+                                     url='https://test.com/test')
+        conn.pool_maxsize = 20
+        conn.connect()
+
+        adapter = conn.connection.session.adapters['https://']
+        self.assertTrue(isinstance(adapter, SignedHTTPSAdapter))
+        self.assertEqual(adapter._pool_maxsize, 20)
+
+    def test_sessions_are_not_shared_by_default(self):
+        conn1 = LibcloudConnection(host='localhost', port=443)
+        conn2 = LibcloudConnection(host='localhost', port=443)
+
+        self.assertFalse(conn1.session is conn2.session)
+        self.assertEqual(len(SESSION_REGISTRY), 0)
+
+    def test_shared_sessions(self):
+        conn1 = LibcloudConnection(host='localhost', port=443,
+                                   share_session=True)
+        conn2 = LibcloudConnection(host='localhost', port=443,
+                                   share_session=True)
+        conn3 = LibcloudConnection(host='localhost', port=8443,
+                                   share_session=True)
+        conn4 = LibcloudConnection(host='localhost', port=443,
+                                   share_session=True, pool_maxsize=20)
+
+        self.assertTrue(conn1.session is conn2.session)
+        self.assertFalse(conn1.session is conn3.session)
+        self.assertFalse(conn1.session is conn4.session)
+        self.assertEqual(len(SESSION_REGISTRY), 3)
+
+        driver1 = BaseDriver('key', host='localhost', share_session=True)
+        driver2 = BaseDriver('key', host='localhost', share_session=True)
+        self.assertTrue(driver1.connection.connection.session is
+                        driver2.connection.connection.session)
+
+        SESSION_REGISTRY.clear()
+        self.assertEqual(len(SESSION_REGISTRY), 0)
+
+    def test_close_cloned_connection(self):
+        for share_session in (False, True):
+            driver = BaseDriver('key', host='localhost',
+                                share_session=share_session)
+            connection = driver._clone_connection()
+            session = connection.connection.session
+
+            with patch.object(session, 'close') as close:
+                driver._close_connection(connection)
+
+            # Sessions shared with other connections are left open
+            self.assertEqual(close.call_count, 0 if share_session else 1)
+
+    def test_pool_stats(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), OKRequestHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            port = server.server_address[1]
+            conn1 = LibcloudConnection(host='127.0.0.1', port=port,
+                                       share_session=True)
+            conn2 = LibcloudConnection(host='127.0.0.1', port=port,
+                                       share_session=True)
+
+            for conn in (conn1, conn2):
+                conn.request('GET', '/')
+                self.assertEqual(conn.response.text, 'ok')
+
+            stats = conn1.pool_stats()
+            registry_stats = SESSION_REGISTRY.pool_stats()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['host'], '127.0.0.1')
+        self.assertEqual(stats[0]['port'], port)
+        self.assertEqual(stats[0]['maxsize'], 10)
+        # The second request reused the connection of the first one
+        self.assertEqual(stats[0]['num_connections'], 1)
+        self.assertEqual(stats[0]['num_requests'], 2)
+        self.assertEqual(stats[0]['idle_connections'], 1)
+        self.assertEqual(registry_stats, stats)
+
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -18,8 +18,10 @@ import unittest
 
 import requests
 import requests_mock
+from mock import patch, PropertyMock
 
-from libcloud.common.base import XmlResponse, JsonResponse, Connection
+from libcloud.common.base import Response, XmlResponse, JsonResponse
+from libcloud.common.base import Connection
 from libcloud.common.types import MalformedResponseError
 from libcloud.http import LibcloudConnection
 
@@ -94,6 +96,43 @@ class ResponseClassesTests(unittest.TestCase):
         parsed = response.parse_body()
         self.assertEqual(parsed, '')
 
+    def test_JsonResponse_class_parse_body_lazily(self):
+        class LazyJsonResponse(JsonResponse):
+            parse_body_lazily = True
+
+        with requests_mock.mock() as m:
+            m.register_uri('GET', 'mock://test.com/', text='{"foo": "bar"')
+            response_obj = requests.get('mock://test.com/')
+            response = LazyJsonResponse(response=response_obj,
+                                        connection=self.mock_connection)
+
+        # Malformed body only raises when it's parsed
+        self.assertEqual(response.status, 200)
+        self.assertRaises(MalformedResponseError, getattr, response, 'object')
+
+        response.body = '{"foo": "bar"}'
+        self.assertEqual(response.object, {'foo': 'bar'})
+
+    def test_Response_class_body_is_decoded_on_first_access(self):
+        class LazyResponse(Response):
+            parse_body_lazily = True
+
+        with requests_mock.mock() as m:
+            m.register_uri('GET', 'mock://test.com/', text=' foo ')
+            response_obj = requests.get('mock://test.com/')
+            response = LazyResponse(response=response_obj,
+                                    connection=self.mock_connection)
+
+        with patch.object(requests.Response, 'text',
+                          new_callable=PropertyMock) as text:
+            text.return_value = ' bar '
+            self.assertEqual(response.status, 200)
+            self.assertEqual(text.call_count, 0)
+
+            self.assertEqual(response.object, 'bar')
+            self.assertEqual(response.body, 'bar')
+            self.assertEqual(text.call_count, 1)
+
     def test_RawResponse_class_read_method(self):
         """
         Test that the RawResponse class includes a response
@@ -15,13 +15,17 @@
 # limitations under the License.
 
 import sys
+import time
+import hashlib
 import pytest
 import socket
+import threading
 import codecs
 import unittest
 import warnings
 import os.path
 import requests_mock
+from io import BytesIO
 from itertools import chain
 
 # In Python > 2.7 DeprecationWarnings are disabled by default
@@ -47,6 +51,9 @@ from libcloud.utils.networking import join_ipv4_segments
 from libcloud.utils.networking import increment_ipv4_segments
 from libcloud.utils.decorators import wrap_non_libcloud_exceptions
 from libcloud.utils.connection import get_response_object
+from libcloud.utils.concurrency import imap_bounded
+from libcloud.utils.concurrency import imap_unordered_bounded
+from libcloud.utils.concurrency import ichain_bounded
 from libcloud.common.types import LibcloudError
 from libcloud.storage.drivers.dummy import DummyIterator
 
@@ -222,6 +229,57 @@ class TestUtils(unittest.TestCase):
 
             self.assertEqual(index, 548)
 
+    def test_read_in_chunks_iterator_small_chunks_fill_size(self):
+        def iterator():
+            for x in range(0, 1000):
+                yield b('abc')
+
+        result = list(libcloud.utils.files.read_in_chunks(iterator(),
+                                                          chunk_size=1024,
+                                                          fill_size=True))
+        self.assertEqual([len(chunk) for chunk in result], [1024, 1024, 952])
+        self.assertEqual(b('').join(result), b('abc') * 1000)
+
+    def test_read_in_chunks_iterator_large_chunks_fill_size(self):
+        def iterator():
+            for x in range(0, 3):
+                yield b('a') * 25
+
+        result = list(libcloud.utils.files.read_in_chunks(iterator(),
+                                                          chunk_size=10,
+                                                          fill_size=True))
+        self.assertEqual([len(chunk) for chunk in result],
+                         [10, 10, 10, 10, 10, 10, 10, 5])
+
+    def test_read_in_chunks_readinto(self):
+        data = b('a') * 25
+
+        result = list(libcloud.utils.files.read_in_chunks(BytesIO(data),
+                                                          chunk_size=10,
+                                                          fill_size=True))
+        self.assertEqual(result, [b('a') * 10, b('a') * 10, b('a') * 5])
+
+        result = list(libcloud.utils.files.read_in_chunks(BytesIO(b('')),
+                                                          chunk_size=10,
+                                                          yield_empty=True))
+        self.assertEqual(result, [b('')])
+
+    def test_read_in_chunks_readinto_short_reads(self):
+        class ShortReadFile(BytesIO):
+            def readinto(self, buf):
+                return BytesIO.readinto(self, memoryview(buf)[:3])
+
+        data = b('0123456789') * 3
+
+        result = list(libcloud.utils.files.read_in_chunks(
+            ShortReadFile(data), chunk_size=10, fill_size=True))
+        self.assertEqual(result, [b('0123456789')] * 3)
+
+        result = list(libcloud.utils.files.read_in_chunks(
+            ShortReadFile(data), chunk_size=10, fill_size=False))
+        self.assertEqual(b('').join(result), data)
+        self.assertEqual(len(result), 10)
+
     def test_exhaust_iterator(self):
         def iterator_func():
             for x in range(0, 1000):
@@ -246,6 +304,68 @@ class TestUtils(unittest.TestCase):
         result = libcloud.utils.files.exhaust_iterator(iterator=iterator)
         self.assertEqual(result, b(data))
 
+    def test_spool_iterator(self):
+        data = b('a') * 100
+        hasher = hashlib.md5()
+        spool, size = libcloud.utils.files.spool_iterator(
+            iterator=iter([data] * 3), hasher=hasher, max_memory=150)
+
+        with spool:
+            # Data is moved to disk once it's larger than max_memory
+            self.assertTrue(spool._rolled)
+            self.assertEqual(spool.read(), data * 3)
+
+        self.assertEqual(size, 300)
+        self.assertEqual(hasher.hexdigest(), hashlib.md5(data * 3).hexdigest())
+
+        spool, size = libcloud.utils.files.spool_iterator(
+            iterator=StringIO('12345678990'))
+
+        with spool:
+            self.assertFalse(spool._rolled)
+            self.assertEqual(spool.read(), b('12345678990'))
+
+        self.assertEqual(size, 11)
+
+    def test_hashing_stream_iterator(self):
+        data = ['foo', 'bar', 'baz']
+        stream = libcloud.utils.files.get_hashing_stream(iter(data),
+                                                         hashlib.md5())
+        self.assertEqual(list(stream), [b('foo'), b('bar'), b('baz')])
+        self.assertEqual(stream.bytes_read, 9)
+        self.assertEqual(stream.hexdigest(),
+                         hashlib.md5(b('foobarbaz')).hexdigest())
+
+    def test_hashing_stream_filelike(self):
+        data = b('a') * 100
+        stream = libcloud.utils.files.get_hashing_stream(BytesIO(data),
+                                                         hashlib.md5())
+        self.assertEqual(stream.read(60) + stream.read(), data)
+        self.assertEqual(stream.read(), b(''))
+        self.assertEqual(stream.bytes_read, 100)
+        self.assertEqual(stream.hexdigest(), hashlib.md5(data).hexdigest())
+
+    def test_hashing_stream_filelike_seek(self):
+        data = BytesIO(b('0123456789'))
+        data.seek(2)
+        stream = libcloud.utils.files.get_hashing_stream(data, hashlib.md5())
+        stream.read()
+
+        # Rewinding the stream discards the data which has been hashed
+        self.assertEqual(stream.seek(2), 2)
+        self.assertEqual(stream.bytes_read, 0)
+        self.assertEqual(stream.read(), b('23456789'))
+        self.assertEqual(stream.hexdigest(),
+                         hashlib.md5(b('23456789')).hexdigest())
+
+        # Seeking forward hashes the data which has been skipped
+        stream.seek(5)
+        self.assertEqual(stream.bytes_read, 3)
+        self.assertEqual(stream.read(), b('56789'))
+        self.assertEqual(stream.bytes_read, 8)
+        self.assertEqual(stream.hexdigest(),
+                         hashlib.md5(b('23456789')).hexdigest())
+
     def test_unicode_urlquote(self):
         # Regression tests for LIBCLOUD-429
         if PY3:
@@ -385,6 +505,155 @@ class NetworkingUtilsTestCase(unittest.TestCase):
             self.assertEqual(result, incremented_ip)
 
 
+class ConcurrencyUtilsTestCase(unittest.TestCase):
+    def test_imap_bounded_preserves_order(self):
+        result = list(imap_bounded(lambda x: x * 2, range(50),
+                                   max_workers=4))
+        self.assertEqual(result, [x * 2 for x in range(50)])
+
+    def test_imap_bounded_single_worker(self):
+        result = list(imap_bounded(lambda x: x + 1, [1, 2, 3],
+                                   max_workers=1))
+        self.assertEqual(result, [2, 3, 4])
+
+    def test_imap_bounded_consumes_input_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        results = imap_bounded(lambda x: x, items(), max_workers=2,
+                               max_pending=4)
+        self.assertEqual(next(results), 0)
+        self.assertTrue(len(consumed) <= 5)
+        results.close()
+
+    def test_imap_bounded_reraises_exception(self):
+        def func(x):
+            if x == 3:
+                raise ValueError('boom')
+            return x
+
+        results = imap_bounded(func, range(10), max_workers=3)
+        self.assertEqual(next(results), 0)
+        self.assertRaises(ValueError, list, results)
+
+    def test_imap_unordered_bounded_yields_results_as_completed(self):
+        release = threading.Event()
+
+        def func(x):
+            if x == 0:
+                # The first item finishes last
+                release.wait(5)
+            elif x == 9:
+                release.set()
+            return x * 2
+
+        result = list(imap_unordered_bounded(func, range(10), max_workers=3))
+        self.assertEqual(sorted(result), [x * 2 for x in range(10)])
+        self.assertEqual(result[-1], 0)
+
+    def test_imap_unordered_bounded_limits_concurrency(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def func(x):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+
+            time.sleep(0.01)
+
+            with lock:
+                running[0] -= 1
+
+            return x
+
+        result = list(imap_unordered_bounded(func, range(20), max_workers=3))
+        self.assertEqual(sorted(result), list(range(20)))
+        self.assertTrue(max_running[0] <= 3)
+
+    def test_imap_unordered_bounded_reraises_exception(self):
+        def items():
+            yield 1
+            raise ValueError('boom')
+
+        self.assertRaises(ValueError, list,
+                          imap_unordered_bounded(lambda x: x, items()))
+        self.assertEqual(list(imap_unordered_bounded(lambda x: x, [])), [])
+
+    def test_imap_unordered_bounded_cancellation(self):
+        cancelled = threading.Event()
+        closed = threading.Event()
+
+        def items():
+            try:
+                yield 1
+
+                # Blocks until the consumer stops
+                cancelled.wait(5)
+                yield 2
+            finally:
+                closed.set()
+
+        results = imap_unordered_bounded(lambda x: x, items(),
+                                         cancelled=cancelled)
+        self.assertEqual(next(results), 1)
+        results.close()
+
+        self.assertTrue(cancelled.is_set())
+
+        # The source generator is closed once it produces the next item
+        self.assertTrue(closed.wait(5))
+
+    def test_ichain_bounded_preserves_order(self):
+        def func(x):
+            for i in range(x):
+                yield (x, i)
+
+        result = list(ichain_bounded(func, range(10), max_workers=3))
+        self.assertEqual(result, [(x, i) for x in range(10)
+                                  for i in range(x)])
+
+    def test_ichain_bounded_limits_buffered_values(self):
+        produced = []
+        closed = threading.Event()
+
+        def func(x):
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                closed.set()
+
+        results = ichain_bounded(func, [1], max_workers=2, max_buffered=2)
+        self.assertEqual(next(results), 0)
+        time.sleep(0.1)
+
+        # The consumed value, the buffered values and the blocked one
+        self.assertTrue(len(produced) <= 4)
+        results.close()
+
+        # The producer stops once the consumer went away
+        self.assertTrue(closed.wait(5))
+
+    def test_ichain_bounded_reraises_exception(self):
+        def func(x):
+            yield x
+
+            if x == 2:
+                raise ValueError('boom')
+
+        results = ichain_bounded(func, range(5), max_workers=2)
+        self.assertEqual([next(results), next(results), next(results)],
+                         [0, 1, 2])
+        self.assertRaises(ValueError, next, results)
+
+
 def test_decorator():
 
     @wrap_non_libcloud_exceptions
@@ -0,0 +1,349 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for running blocking driver operations on a bounded pool of worker
+threads.
+"""
+
+import sys
+import threading
+from collections import deque
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue  # NOQA
+
+__all__ = [
+    'DEFAULT_MAX_WORKERS',
+
+    'imap_bounded',
+    'imap_unordered_bounded',
+    'ichain_bounded'
+]
+
+# Default number of worker threads used by the concurrent code paths
+DEFAULT_MAX_WORKERS = 4
+
+
+class _Task(object):
+    """
+    A single unit of work submitted to the worker threads.
+    """
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.exc_info = None
+        self.done = threading.Event()
+
+    def get(self):
+        self.done.wait()
+
+        if self.exc_info is not None:
+            raise self.exc_info[1]
+
+        return self.result
+
+
+def imap_bounded(func, iterable, max_workers=DEFAULT_MAX_WORKERS,
+                 max_pending=None):
+    """
+    Return a generator which calls ``func`` for every item in ``iterable``
+    using up to ``max_workers`` threads and yields the results in the input
+    order.
+
+    The input iterable is consumed lazily, so at most ``max_pending`` items
+    are held in memory at any time. This makes it possible to feed large
+    (e.g. multi-GB) streams through the pool without buffering them.
+
+    If ``func`` raises, the pending work is cancelled, the running calls are
+    waited for and the exception is re-raised to the consumer.
+
+    :param func: Callable which is called with a single item.
+    :type func: ``callable``
+
+    :param iterable: Items to process.
+    :type iterable: ``iterable``
+
+    :param max_workers: Maximum number of worker threads.
+    :type max_workers: ``int``
+
+    :param max_pending: Maximum number of items which have been read from
+                        the iterable but not yet yielded (defaults to two
+                        times ``max_workers``).
+    :type max_pending: ``int``
+
+    :rtype: ``generator``
+    """
+    max_workers = max(int(max_workers or 1), 1)
+
+    if max_workers == 1:
+        for item in iterable:
+            yield func(item)
+
+        return
+
+    max_pending = max(int(max_pending or (max_workers * 2)), max_workers)
+
+    tasks = queue.Queue()
+    cancelled = threading.Event()
+    pending = deque()
+
+    def worker():
+        while True:
+            task = tasks.get()
+
+            if task is None:
+                return
+
+            if not cancelled.is_set():
+                try:
+                    task.result = func(task.item)
+                except Exception:
+                    task.exc_info = sys.exc_info()
+
+            task.done.set()
+
+    threads = []
+    for _ in range(max_workers):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    try:
+        for item in iterable:
+            task = _Task(item)
+            pending.append(task)
+            tasks.put(task)
+
+            while len(pending) >= max_pending:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        cancelled.set()
+
+        for _ in threads:
+            tasks.put(None)
+
+        for thread in threads:
+            thread.join()
+
+
+def imap_unordered_bounded(func, iterable, max_workers=DEFAULT_MAX_WORKERS,
+                           cancelled=None):
+    """
+    Return a generator which calls ``func`` for every item in ``iterable``
+    using up to ``max_workers`` threads and yields the results as soon as
+    they are available (in the completion order).
+
+    The input iterable is consumed by a separate thread, so an item is
+    dispatched as soon as the iterable produces it even if the iterable
+    blocks between the items (e.g. while waiting for nodes to come up). At
+    most ``max_workers`` items are processed at the same time.
+
+    If ``func`` or the iterable raise, no more items are dispatched and the
+    exception is re-raised to the consumer. Calls which are already running
+    are not waited for.
+
+    When the consumer stops early (the generator is closed or an exception
+    is raised), ``cancelled`` is set and the iterable is closed once it
+    produces its next item. An iterable which blocks for a long time between
+    the items should watch ``cancelled`` to stop sooner.
+
+    :param func: Callable which is called with a single item.
+    :type func: ``callable``
+
+    :param iterable: Items to process.
+    :type iterable: ``iterable``
+
+    :param max_workers: Maximum number of concurrent calls.
+    :type max_workers: ``int``
+
+    :param cancelled: Event which is set when the consumer stops early.
+                      (optional)
+    :type cancelled: :class:`threading.Event`
+
+    :rtype: ``generator``
+    """
+    max_workers = max(int(max_workers or 1), 1)
+
+    results = queue.Queue()
+    slots = threading.Semaphore(max_workers)
+
+    if cancelled is None:
+        cancelled = threading.Event()
+
+    def run(item):
+        try:
+            if not cancelled.is_set():
+                results.put(('result', func(item)))
+        except Exception:
+            results.put(('error', sys.exc_info()))
+        finally:
+            slots.release()
+
+    def feed():
+        count = 0
+
+        try:
+            for item in iterable:
+                slots.acquire()
+
+                if cancelled.is_set():
+                    slots.release()
+
+                    # Let a generator run its cleanup (e.g. stop polling)
+                    close = getattr(iterable, 'close', None)
+                    if close is not None:
+                        close()
+
+                    break
+
+                thread = threading.Thread(target=run, args=(item,))
+                thread.daemon = True
+                thread.start()
+                count += 1
+        except Exception:
+            results.put(('error', sys.exc_info()))
+
+        results.put(('done', count))
+
+    feeder = threading.Thread(target=feed)
+    feeder.daemon = True
+    feeder.start()
+
+    received = 0
+    expected = None
+
+    try:
+        while expected is None or received < expected:
+            kind, value = results.get()
+
+            if kind == 'done':
+                expected = value
+            elif kind == 'error':
+                raise value[1]
+            else:
+                received += 1
+                yield value
+    finally:
+        cancelled.set()
+
+
+def ichain_bounded(func, iterable, max_workers=DEFAULT_MAX_WORKERS,
+                   max_buffered=2):
+    """
+    Return a generator which yields the values produced by the iterators
+    returned by ``func`` for every item in ``iterable``, in the input order
+    (like ``itertools.chain``).
+
+    Up to ``max_workers`` iterators are consumed at the same time by worker
+    threads, each of them at most ``max_buffered`` values ahead of the
+    consumer, so the memory usage is bounded regardless of the length of the
+    iterators.
+
+    If ``func`` or an iterator raise, the exception is re-raised to the
+    consumer once it reaches the corresponding item.
+
+    :param func: Callable which is called with a single item and returns an
+                 iterable.
+    :type func: ``callable``
+
+    :param iterable: Items to process.
+    :type iterable: ``iterable``
+
+    :param max_workers: Maximum number of iterators which are consumed at the
+                        same time.
+    :type max_workers: ``int``
+
+    :param max_buffered: Maximum number of values which are buffered per
+                         iterator.
+    :type max_buffered: ``int``
+
+    :rtype: ``generator``
+    """
+    max_workers = max(int(max_workers or 1), 1)
+    max_buffered = max(int(max_buffered or 1), 1)
+
+    cancelled = threading.Event()
+    buffers = deque()
+    items = iter(iterable)
+
+    def put(buffer, message):
+        # Don't block forever if the consumer went away
+        while not cancelled.is_set():
+            try:
+                buffer.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def produce(item, buffer):
+        iterator = None
+
+        try:
+            iterator = iter(func(item))
+
+            for value in iterator:
+                if not put(buffer, ('value', value)):
+                    return
+        except Exception:
+            put(buffer, ('error', sys.exc_info()))
+        else:
+            put(buffer, ('done', None))
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    def start(item):
+        buffer = queue.Queue(maxsize=max_buffered)
+        thread = threading.Thread(target=produce, args=(item, buffer))
+        thread.daemon = True
+        thread.start()
+        buffers.append(buffer)
+
+    try:
+        exhausted = False
+
+        while True:
+            while not exhausted and len(buffers) < max_workers:
+                try:
+                    start(next(items))
+                except StopIteration:
+                    exhausted = True
+
+            if not buffers:
+                break
+
+            buffer = buffers.popleft()
+
+            while True:
+                kind, value = buffer.get()
+
+                if kind == 'error':
+                    raise value[1]
+                elif kind == 'done':
+                    break
+
+                yield value
+    finally:
+        cancelled.set()
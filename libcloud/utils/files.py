@@ -13,8 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import os
 import mimetypes
+import tempfile
 
 from libcloud.utils.py3 import PY3
 from libcloud.utils.py3 import httplib
@@ -26,10 +28,21 @@ if PY3:
 
 CHUNK_SIZE = 8096
 
+# Maximum number of bytes of a spooled stream which are kept in memory before
+# the data is moved to a temporary file on disk
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# Size of the chunks which are read from the file-like objects when spooling
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
 __all__ = [
     'read_in_chunks',
     'exhaust_iterator',
-    'guess_file_mime_type'
+    'spool_iterator',
+    'guess_file_mime_type',
+    'HashingStream',
+    'HashingFileStream',
+    'get_hashing_stream'
 ]
 
 
@@ -38,6 +51,11 @@ def read_in_chunks(iterator, chunk_size=None, fill_size=False,
     """
     Return a generator which yields data in chunks.
 
+    Data is accumulated in a single ``bytearray`` buffer so the amount of
+    copying is linear in the size of the data, regardless of the size of the
+    chunks returned by the iterator. File like objects which support
+    ``readinto`` are read directly into one reusable buffer.
+
     :param iterator: An object which implements an iterator interface
                      or a File like object with read method.
     :type iterator: :class:`object` which implements iterator interface.
@@ -52,12 +70,26 @@ def read_in_chunks(iterator, chunk_size=None, fill_size=False,
     :param yield_empty: If true and iterator returned no data, only yield empty
                         bytes object
     :type yield_empty: ``bool``
-
-    TODO: At some point in the future we could use byte arrays here if version
-    >= Python 3. This should speed things up a bit and reduce memory usage.
     """
     chunk_size = chunk_size or CHUNK_SIZE
 
+    if hasattr(iterator, 'readinto'):
+        chunks = _read_file_in_chunks(iterator, chunk_size=chunk_size,
+                                      fill_size=fill_size)
+    else:
+        chunks = _read_iterator_in_chunks(iterator, chunk_size=chunk_size,
+                                          fill_size=fill_size)
+
+    empty = True
+    for chunk in chunks:
+        empty = False
+        yield chunk
+
+    if empty and yield_empty:
+        yield b('')
+
+
+def _read_iterator_in_chunks(iterator, chunk_size, fill_size):
     if isinstance(iterator, (file, httplib.HTTPResponse)):
         get_data = iterator.read
         args = (chunk_size, )
@@ -65,39 +97,93 @@ def read_in_chunks(iterator, chunk_size=None, fill_size=False,
         get_data = next
         args = (iterator, )
 
-    data = b('')
-    empty = False
+    data = bytearray()
+
+    while True:
+        try:
+            chunk = b(get_data(*args))
+        except StopIteration:
+            break
+
+        if len(chunk) == 0:
+            break
+
+        if not fill_size:
+            yield chunk
+            continue
+
+        data += chunk
+
+        if len(data) < chunk_size:
+            continue
+
+        # Slicing a memoryview doesn't copy the data so each byte is only
+        # copied once more, into the yielded chunk
+        view = memoryview(data)
+        offset = 0
+
+        while len(data) - offset >= chunk_size:
+            yield view[offset:offset + chunk_size].tobytes()
+            offset += chunk_size
+
+        # Buffer can't be resized while it's exported
+        del view
+        del data[:offset]
+
+    if len(data) > 0:
+        yield bytes(data)
+
+
+def _read_file_in_chunks(file_obj, chunk_size, fill_size):
+    """
+    Read data from a file like object into a single reusable buffer using
+    ``readinto``.
+
+    Objects on which ``readinto`` can't be used fall back to ``read``.
+    """
+    view = memoryview(bytearray(chunk_size))
+    first_read = True
 
-    while not empty or len(data) > 0:
-        if not empty:
+    while True:
+        size = 0
+
+        while size < chunk_size:
             try:
-                chunk = b(get_data(*args))
-                if len(chunk) > 0:
-                    data += chunk
-                else:
-                    empty = True
-            except StopIteration:
-                empty = True
-
-        if len(data) == 0:
-            if empty and yield_empty:
-                yield b('')
+                read = file_obj.readinto(view[size:])
+            except (ValueError, io.UnsupportedOperation):
+                if not first_read:
+                    raise
+
+                for chunk in _read_iterator_in_chunks(file_obj,
+                                                      chunk_size=chunk_size,
+                                                      fill_size=fill_size):
+                    yield chunk
+
+                return
+
+            first_read = False
+
+            if not read:
+                break
+
+            size += read
+
+            if not fill_size:
+                break
 
+        if size == 0:
             return
 
-        if fill_size:
-            if empty or len(data) >= chunk_size:
-                yield data[:chunk_size]
-                data = data[chunk_size:]
-        else:
-            yield data
-            data = b('')
+        yield view[:size].tobytes()
 
 
 def exhaust_iterator(iterator):
     """
     Exhaust an iterator and return all data returned by it.
 
+    Note: All the data is held in memory, use :func:`spool_iterator` for the
+    streams of an unknown size.
+
     :type iterator: :class:`object` which implements iterator interface.
     :param iterator: An object which implements an iterator interface
                      or a File like object with read method.
@@ -105,25 +191,210 @@ def exhaust_iterator(iterator):
     :rtype ``str``
     :return Data returned by the iterator.
     """
-    data = b('')
-
-    try:
-        chunk = b(next(iterator))
-    except StopIteration:
-        chunk = b('')
-
-    while len(chunk) > 0:
-        data += chunk
+    # Chunks are joined once at the end so the data is copied in linear time
+    chunks = []
 
+    while True:
         try:
             chunk = b(next(iterator))
         except StopIteration:
-            chunk = b('')
+            break
+
+        if len(chunk) == 0:
+            break
+
+        chunks.append(chunk)
+
+    return b('').join(chunks)
+
+
+def spool_iterator(iterator, hasher=None, max_memory=SPOOL_MAX_MEMORY):
+    """
+    Copy the data returned by an iterator (or a file-like object) to a
+    temporary file which is kept in memory until it grows larger than
+    ``max_memory`` bytes and is moved to disk afterwards.
+
+    This makes it possible to determine the size of a stream (e.g. for the
+    providers which need the ``Content-Length``) using bounded memory.
+
+    :param iterator: An object which implements the iterator interface or a
+                     file-like object with read method.
+    :type iterator: :class:`object`
+
+    :param hasher: Instantiated hash function (e.g. ``hashlib.md5()``) which
+                   is updated with the data.
+    :type hasher: :class:`object`
+
+    :param max_memory: Maximum number of bytes which are held in memory.
+    :type max_memory: ``int``
+
+    :return: A tuple of the temporary file (positioned at the beginning)
+             and the data size. The caller is responsible for closing the
+             file.
+    :rtype: ``tuple``
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    size = 0
+
+    is_file = hasattr(iterator, 'read')
 
-    return data
+    try:
+        while True:
+            if is_file:
+                chunk = b(iterator.read(SPOOL_CHUNK_SIZE))
+            else:
+                chunk = b(next(iterator, b('')))
+
+            if len(chunk) == 0:
+                break
+
+            if hasher is not None:
+                hasher.update(chunk)
+
+            spool.write(chunk)
+            size += len(chunk)
+
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+
+    return spool, size
 
 
 def guess_file_mime_type(file_path):
     filename = os.path.basename(file_path)
     (mimetype, encoding) = mimetypes.guess_type(filename)
     return mimetype, encoding
+
+
+class HashingStream(object):
+    """
+    Wrapper around an iterator which updates a hash and counts the number of
+    bytes as the data is consumed.
+
+    This allows the hash of the uploaded data to be calculated while the data
+    is being sent over the wire, without reading it a second time.
+    """
+
+    def __init__(self, stream, hasher):
+        """
+        :param stream: An object which implements the iterator interface.
+        :type stream: :class:`object`
+
+        :param hasher: Instantiated hash function (e.g. ``hashlib.md5()``).
+        :type hasher: :class:`object`
+        """
+        self._stream = stream
+        self._hasher = hasher
+        self.bytes_read = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = b(next(self._stream))
+        self._update(chunk)
+        return chunk
+
+    next = __next__
+
+    def hexdigest(self):
+        """
+        Return hex digest of the data which has been read so far.
+
+        :rtype: ``str``
+        """
+        return self._hasher.hexdigest()
+
+    def _update(self, chunk):
+        chunk = b(chunk)
+        self._hasher.update(chunk)
+        self.bytes_read += len(chunk)
+
+
+class HashingFileStream(HashingStream):
+    """
+    Wrapper around a file-like object which updates a hash and counts the
+    number of bytes as the data is read.
+
+    The hash state is kept in sync with the stream position when the stream
+    is rewound (e.g. when a failed upload is retried).
+    """
+
+    def __init__(self, stream, hasher):
+        super(HashingFileStream, self).__init__(stream=stream, hasher=hasher)
+
+        try:
+            self._start = stream.tell()
+        except Exception:
+            self._start = None
+
+        self._initial_hasher = hasher.copy()
+
+    def read(self, size=-1):
+        chunk = self._stream.read(size)
+        self._update(chunk)
+        return chunk
+
+    def __next__(self):
+        chunk = self.read(CHUNK_SIZE)
+
+        if not chunk:
+            raise StopIteration
+
+        return chunk
+
+    next = __next__
+
+    # Those are used by the HTTP client to determine the length of the data
+
+    def fileno(self):
+        return self._stream.fileno()
+
+    def tell(self):
+        return self._stream.tell()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._stream.seek(offset, whence)
+        position = self._stream.tell()
+
+        # Discard the data which has been hashed so far and hash again the
+        # data between the initial position and the new one
+        self._hasher = self._initial_hasher.copy()
+        self.bytes_read = 0
+
+        if self._start is not None and position > self._start:
+            self._stream.seek(self._start)
+            remaining = position - self._start
+
+            while remaining > 0:
+                chunk = self._stream.read(min(CHUNK_SIZE, remaining))
+
+                if not chunk:
+                    break
+
+                self._update(chunk)
+                remaining -= len(chunk)
+
+        return position
+
+
+def get_hashing_stream(stream, hasher):
+    """
+    Wrap a file-like object or an iterator so the data hash and size are
+    calculated as the data is read.
+
+    :param stream: A file-like object with read method or an object which
+                   implements the iterator interface.
+    :type stream: :class:`object`
+
+    :param hasher: Instantiated hash function (e.g. ``hashlib.md5()``).
+    :type hasher: :class:`object`
+
+    :rtype: :class:`HashingStream`
+    """
+    if hasattr(stream, 'read'):
+        return HashingFileStream(stream, hasher)
+
+    return HashingStream(stream, hasher)
@@ -19,7 +19,7 @@ import binascii
 import socket
 import time
 import ssl
-from datetime import datetime, timedelta
+import warnings
 from functools import wraps
 
 from libcloud.utils.py3 import httplib
@@ -37,6 +37,7 @@ __all__ = [
     'dict2str',
     'reverse_dict',
     'lowercase_keys',
+    'chunked',
     'get_secure_random_string',
     'retry',
 
@@ -234,6 +235,24 @@ def lowercase_keys(dictionary):
     return dict(((k.lower(), v) for k, v in dictionary.items()))
 
 
+def chunked(iterable, size):
+    """
+    Return a generator which yields lists of up to ``size`` items from the
+    provided iterable. The iterable is consumed lazily.
+    """
+    chunk = []
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
 def get_secure_random_string(size):
     """
     Return a string of ``size`` random bytes. Returned string is suitable for
@@ -278,6 +297,10 @@ def retry(retry_exceptions=RETRY_EXCEPTIONS, retry_delay=DEFAULT_DELAY,
     """
     Retry decorator that helps to handle common transient exceptions.
 
+    Note: This decorator is deprecated, set a
+    :class:`libcloud.utils.retry.RetryPolicy` on the driver (``retry_policy``
+    driver argument) instead.
+
     :param retry_exceptions: types of exceptions to retry on.
     :param retry_delay: retry delay between the attempts.
     :param timeout: maximum time to wait.
@@ -288,6 +311,14 @@ def retry(retry_exceptions=RETRY_EXCEPTIONS, retry_delay=DEFAULT_DELAY,
     retry_request = retry(timeout=1, retry_delay=1, backoff=1)
     retry_request(self.connection.request)()
     """
+    # Imported here because libcloud.utils.retry depends on this module
+    from libcloud.utils.retry import RetryPolicy
+
+    warnings.warn('libcloud.utils.misc.retry is deprecated, use the '
+                  'retry_policy driver argument '
+                  '(libcloud.utils.retry.RetryPolicy) instead',
+                  category=DeprecationWarning, stacklevel=2)
+
     if retry_exceptions is None:
         retry_exceptions = RETRY_EXCEPTIONS
     if retry_delay is None:
@@ -299,6 +330,14 @@ def retry(retry_exceptions=RETRY_EXCEPTIONS, retry_delay=DEFAULT_DELAY,
 
     timeout = max(timeout, 0)
 
+    # The delays are only bounded by the timeout, like they used to
+    policy = RetryPolicy(max_attempts=None, timeout=timeout,
+                         base_delay=retry_delay,
+                         max_delay=max(timeout, retry_delay),
+                         backoff=backoff,
+                         retry_exceptions=retry_exceptions,
+                         budget_ratio=None)
+
     def transform_ssl_error(func, *args, **kwargs):
         try:
             return func(*args, **kwargs)
@@ -313,8 +352,7 @@ def retry(retry_exceptions=RETRY_EXCEPTIONS, retry_delay=DEFAULT_DELAY,
     def decorator(func):
         @wraps(func)
         def retry_loop(*args, **kwargs):
-            current_delay = retry_delay
-            end = datetime.now() + timedelta(seconds=timeout)
+            state = policy.start(driver=None)
 
             while True:
                 try:
@@ -327,14 +365,15 @@ def retry(retry_exceptions=RETRY_EXCEPTIONS, retry_delay=DEFAULT_DELAY,
 
                         # Reset retries if we're told to wait due to rate
                         # limiting
-                        current_delay = retry_delay
-                        end = datetime.now() + timedelta(
-                            seconds=exc.retry_after + timeout)
-                    elif datetime.now() >= end:
+                        state = policy.start(driver=None)
+                        continue
+
+                    delay = state.get_exception_delay(exc)
+
+                    if delay is None:
                         raise
-                    else:
-                        time.sleep(current_delay)
-                        current_delay *= backoff
+
+                    state.sleep(delay)
 
         return retry_loop
     return decorator
@@ -0,0 +1,451 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Retry policies for :class:`libcloud.common.base.Connection`.
+
+A policy is attached to a connection using the ``retry_policy`` attribute
+(or the ``retry_policy`` driver keyword argument). The same policy should be
+shared by all the connections of a driver (or of a process) so the retry
+budgets are shared as well.
+
+Example usage::
+
+    policy = RetryPolicy(max_attempts=5, max_delay=20)
+    driver = cls('key', 'secret', retry_policy=policy)
+"""
+
+import random
+import ssl
+import threading
+import time
+
+from collections import deque
+from email.utils import parsedate_tz, mktime_tz
+
+from libcloud.utils.py3 import httplib
+from libcloud.utils.py3 import basestring
+from libcloud.utils.misc import TRANSIENT_SSL_ERROR, RETRY_EXCEPTIONS
+from libcloud.common.exceptions import BaseHTTPError
+from libcloud.common.ratelimit import READ_ACTION_PREFIXES
+
+__all__ = [
+    'RetryPolicy',
+    'RetryBudget',
+    'RetryState',
+
+    'parse_retry_after',
+    'is_idempotent_request',
+    'DEFAULT_RETRY_STATUSES',
+    'DEFAULT_CLASSIFIERS',
+    'IDEMPOTENT_METHODS'
+]
+
+# Statuses which indicate throttling or a transient server side error
+DEFAULT_RETRY_STATUSES = (httplib.TOO_MANY_REQUESTS
+                          if hasattr(httplib, 'TOO_MANY_REQUESTS') else 429,
+                          httplib.INTERNAL_SERVER_ERROR,
+                          httplib.BAD_GATEWAY,
+                          httplib.SERVICE_UNAVAILABLE,
+                          httplib.GATEWAY_TIMEOUT)
+
+# Methods of the requests which can be sent again after a server error or a
+# connection error (the server might have processed the first attempt)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+
+
+def _is_aws_throttling(status, headers, body):
+    if status in DEFAULT_RETRY_STATUSES:
+        return True
+
+    # Throttling errors are returned with 400 status code
+    return status == httplib.BAD_REQUEST and \
+        any(code in body for code in ('RequestLimitExceeded', 'Throttling',
+                                      'ThrottlingException',
+                                      'SlowDown'))
+
+
+def _is_google_throttling(status, headers, body):
+    if status in DEFAULT_RETRY_STATUSES:
+        return True
+
+    # Rate limit errors are returned with 403 status code
+    return status == httplib.FORBIDDEN and \
+        any(reason in body for reason in ('rateLimitExceeded',
+                                          'userRateLimitExceeded'))
+
+
+# Status classifiers per driver name. A classifier is called with the status
+# code, the (lowercase) headers and the body and returns True if the request
+# should be retried.
+DEFAULT_CLASSIFIERS = {
+    'Amazon EC2': _is_aws_throttling,
+    'Amazon S3': _is_aws_throttling,
+    'Google Compute Engine': _is_google_throttling,
+    'Google Storage': _is_google_throttling,
+}
+
+
+def parse_retry_after(value):
+    """
+    Parse the value of a Retry-After header which is either a number of
+    seconds or an HTTP-date.
+
+    :return: Number of seconds to wait or ``None`` if the value is not valid.
+    :rtype: ``float``
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    http_date = parsedate_tz(value)
+
+    if http_date is None:
+        return None
+
+    return max(0.0, mktime_tz(http_date) - time.time())
+
+
+def is_idempotent_request(method, params=None):
+    """
+    Return True if sending the provided request more than once has the same
+    effect as sending it once.
+
+    The query API (e.g. EC2) requests are identified by the ``Action``
+    parameter and only the actions which read data are idempotent.
+
+    :rtype: ``bool``
+    """
+    action_name = None
+
+    if isinstance(params, dict):
+        action_name = params.get('Action', None)
+
+    if isinstance(action_name, basestring):
+        return action_name.startswith(READ_ACTION_PREFIXES)
+
+    return (method or 'GET').upper() in IDEMPOTENT_METHODS
+
+
+class RetryBudget(object):
+    """
+    Limits the retries to a fraction of the requests sent in a sliding time
+    window so the retries can't multiply the load on a throttled provider.
+
+    ``min_retries`` retries are always allowed in a window so the drivers
+    with little traffic can still retry.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10, window=10):
+        """
+        :param ratio: Maximum number of retries per request.
+        :type ratio: ``float``
+
+        :param min_retries: Number of retries which are allowed in a window
+                            regardless of the number of requests.
+        :type min_retries: ``int``
+
+        :param window: Length of the window (in seconds).
+        :type window: ``int``
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            self._requests.append(now)
+
+    def try_retry(self):
+        """
+        Record a retry if the budget allows it.
+
+        :return: True if the retry is allowed.
+        :rtype: ``bool``
+        """
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+
+            allowed = self.min_retries + self.ratio * len(self._requests)
+
+            if len(self._retries) + 1 > allowed:
+                return False
+
+            self._retries.append(now)
+            return True
+
+    def _expire(self, now):
+        start = now - self.window
+
+        for timestamps in (self._requests, self._retries):
+            while timestamps and timestamps[0] < start:
+                timestamps.popleft()
+
+
+class RetryPolicy(object):
+    """
+    Retries the requests which failed with a transient error (connection
+    errors, timeouts and the throttling / unavailable statuses).
+
+    Delays use "decorrelated jitter" (each delay is a random value between
+    ``base_delay`` and ``backoff`` times the previous delay, capped by
+    ``max_delay``) so the clients which were throttled at the same time
+    don't retry at the same time. ``Retry-After`` headers are honored.
+    """
+
+    def __init__(self, max_attempts=5, timeout=60, base_delay=0.5,
+                 max_delay=30, backoff=3, retry_statuses=None,
+                 classifiers=None, retry_exceptions=RETRY_EXCEPTIONS,
+                 max_retry_after=120, budget_ratio=0.2, budget_min_retries=10,
+                 budget_window=10):
+        """
+        :param max_attempts: Maximum number of attempts (including the first
+                             one). ``None`` means limited by ``timeout``
+                             only.
+        :type max_attempts: ``int``
+
+        :param timeout: No retries are made after this many seconds from the
+                        first attempt.
+        :type timeout: ``float``
+
+        :param base_delay: Minimum delay between the attempts (in seconds).
+        :type base_delay: ``float``
+
+        :param max_delay: Maximum delay between the attempts (in seconds),
+                          ``Retry-After`` excluded.
+        :type max_delay: ``float``
+
+        :param backoff: Growth factor of the delay range.
+        :type backoff: ``float``
+
+        :param retry_statuses: Statuses which are retried for the drivers
+                               without a classifier.
+        :type retry_statuses: ``tuple`` of ``int``
+
+        :param classifiers: Status classifiers per driver name (see
+                            ``DEFAULT_CLASSIFIERS``), merged with the
+                            defaults.
+        :type classifiers: ``dict``
+
+        :param retry_exceptions: Exceptions which are retried.
+        :type retry_exceptions: ``tuple``
+
+        :param max_retry_after: Requests whose ``Retry-After`` is longer
+                                than this (in seconds) are not retried.
+        :type max_retry_after: ``float``
+
+        :param budget_ratio: Maximum ratio of retries to requests per driver
+                             (``None`` disables the budget).
+        :type budget_ratio: ``float``
+
+        :param budget_min_retries: Retries per budget window which are
+                                   allowed regardless of the ratio.
+        :type budget_min_retries: ``int``
+
+        :param budget_window: Length of the budget window (in seconds).
+        :type budget_window: ``float``
+        """
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.retry_statuses = tuple(retry_statuses or DEFAULT_RETRY_STATUSES)
+        self.classifiers = dict(DEFAULT_CLASSIFIERS)
+        self.classifiers.update(classifiers or {})
+        self.retry_exceptions = retry_exceptions
+        self.max_retry_after = max_retry_after
+
+        self.budget_ratio = budget_ratio
+        self.budget_min_retries = budget_min_retries
+        self.budget_window = budget_window
+
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def start(self, driver, body_position=None, idempotent=True):
+        """
+        Return the state for a new request of the provided driver.
+
+        :param driver: Driver name.
+        :type driver: ``str``
+
+        :param body_position: Position of the request body file object which
+                              it's rewound to before it's sent again.
+        :type body_position: ``int``
+
+        :param idempotent: False if the request can't be safely sent again
+                           after a server error or a connection error (only
+                           the throttled requests are retried then).
+        :type idempotent: ``bool``
+
+        :rtype: :class:`RetryState`
+        """
+        budget = self.get_budget(driver)
+
+        if budget is not None:
+            budget.record_request()
+
+        return RetryState(policy=self, driver=driver, budget=budget,
+                          body_position=body_position, idempotent=idempotent)
+
+    def get_budget(self, driver):
+        """
+        Return the retry budget for the provided driver name.
+
+        :rtype: :class:`RetryBudget`
+        """
+        if self.budget_ratio is None:
+            return None
+
+        with self._lock:
+            budget = self._budgets.get(driver, None)
+
+            if budget is None:
+                budget = RetryBudget(ratio=self.budget_ratio,
+                                     min_retries=self.budget_min_retries,
+                                     window=self.budget_window)
+                self._budgets[driver] = budget
+
+        return budget
+
+    def is_retryable_status(self, driver, status, headers, body):
+        """
+        Return True if a response with the provided status should be
+        retried.
+        """
+        classifier = self.classifiers.get(driver, None)
+
+        if classifier is not None:
+            return classifier(status, headers, body)
+
+        return status in self.retry_statuses
+
+    def is_retryable_exception(self, exc):
+        """
+        Return True if the provided exception should be retried.
+        """
+        # The responses are classified by is_retryable_status before they are
+        # parsed
+        if isinstance(exc, BaseHTTPError):
+            return False
+
+        if isinstance(exc, ssl.SSLError):
+            return TRANSIENT_SSL_ERROR in str(exc)
+
+        return isinstance(exc, self.retry_exceptions)
+
+    def get_delay(self, previous_delay):
+        """
+        Return the delay before the next attempt.
+        """
+        upper = max(self.base_delay, previous_delay * self.backoff)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class RetryState(object):
+    """
+    Retry state of a single request.
+    """
+
+    def __init__(self, policy, driver, budget=None, body_position=None,
+                 idempotent=True):
+        self.policy = policy
+        self.driver = driver
+        self.budget = budget
+        self.body_position = body_position
+        self.idempotent = idempotent
+
+        self.retries = 0
+        self.start = time.time()
+        self.delay = policy.base_delay
+
+    def get_response_delay(self, status, headers, body_func):
+        """
+        Return the delay before retrying a request which received a response
+        with the provided status or ``None`` if it shouldn't be retried.
+
+        :param headers: Lowercase response headers.
+        :type headers: ``dict``
+
+        :param body_func: Callable which returns the response body (it's only
+                          called for the error responses).
+        :type body_func: ``callable``
+        """
+        if not isinstance(status, int) or status < 400:
+            return None
+
+        # The server errors don't guarantee that the request wasn't processed
+        if not self.idempotent and status >= 500:
+            return None
+
+        if not self.policy.is_retryable_status(self.driver, status, headers,
+                                               body_func()):
+            return None
+
+        retry_after = parse_retry_after(headers.get('retry-after', None))
+        return self._get_delay(retry_after=retry_after)
+
+    def get_exception_delay(self, exc):
+        """
+        Return the delay before retrying a request which failed with the
+        provided exception or ``None`` if it shouldn't be retried.
+        """
+        if not self.idempotent or \
+                not self.policy.is_retryable_exception(exc):
+            return None
+
+        retry_after = getattr(exc, 'retry_after', None) or None
+        return self._get_delay(retry_after=retry_after)
+
+    def sleep(self, delay):
+        self.retries += 1
+        time.sleep(delay)
+
+    def _get_delay(self, retry_after=None):
+        policy = self.policy
+
+        if policy.max_attempts is not None and \
+                self.retries + 1 >= policy.max_attempts:
+            return None
+
+        if retry_after is not None and retry_after > policy.max_retry_after:
+            return None
+
+        delay = policy.get_delay(self.delay)
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        elapsed = time.time() - self.start
+        if policy.timeout is not None and elapsed + delay > policy.timeout:
+            return None
+
+        if self.budget is not None and not self.budget.try_retry():
+            return None
+
+        self.delay = delay
+        return delay
@@ -16,6 +16,7 @@ import os
 import sys
 
 from setuptools import setup
+from setuptools.command.build_py import build_py
 from distutils.core import Command
 from os.path import join as pjoin
 
@@ -39,6 +40,7 @@ PY3 = sys.version_info[0] == 3
 PY3_pre_34 = PY3 and sys.version_info < (3, 4)
 PY2_pre_27 = PY2 and sys.version_info < (2, 7)
 PY2_pre_279 = PY2 and sys.version_info < (2, 7, 9)
+PY_pre_36 = sys.version_info < (3, 6)
 
 HTML_VIEWSOURCE_BASE = 'https://svn.apache.org/viewvc/libcloud/trunk'
 PROJECT_BASE_DIR = 'http://libcloud.apache.org'
@@ -52,6 +54,13 @@ DOC_TEST_MODULES = ['libcloud.compute.drivers.dummy',
                     'libcloud.container.drivers.dummy',
                     'libcloud.backup.drivers.dummy']
 
+# Modules which use syntax which is only available in Python 3.6+ (asyncio
+# interfaces)
+PY36_MODULES = ['libcloud/common/aio.py', 'libcloud/compute/aio.py',
+                'libcloud/storage/aio.py', 'libcloud/test/aio.py',
+                'libcloud/test/compute/test_aio.py',
+                'libcloud/test/storage/test_aio.py']
+
 SUPPORTED_VERSIONS = ['2.7', 'PyPy', '3.3+']
 
 TEST_REQUIREMENTS = [
@@ -117,6 +126,23 @@ class ApiDocsCommand(Command):
             % (HTML_VIEWSOURCE_BASE, PROJECT_BASE_DIR))
 
 
+class BuildPyCommand(build_py):
+    """
+    Skip the modules which can't be byte-compiled by the running Python
+    version.
+    """
+
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+
+        if not PY_pre_36:
+            return modules
+
+        excluded = [os.path.normpath(path) for path in PY36_MODULES]
+        return [(package, module, path) for package, module, path in modules
+                if os.path.normpath(path) not in excluded]
+
+
 forbid_publish()
 
 install_requires = ['requests']
@@ -149,6 +175,7 @@ setup(
     tests_require=TEST_REQUIREMENTS,
     cmdclass={
         'apidocs': ApiDocsCommand,
+        'build_py': BuildPyCommand,
     },
     zip_safe=False,
     classifiers=[